@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time the actions of ten handed limit hold'em hands.
+
+  python benchmarks/bench_actions.py [hands]
+
+The stacks are refilled before each hand. Every player calls (or
+checks) until the showdown, except that two players raise each round
+and one player folds preflop. The time per
+action includes everything PokerGame does between two actions
+(position, side pots, end of round, showdown at the end of the hand).
+"""
+import sys
+import time
+from os import path
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokergame
+
+def table(players):
+    game = pokergame.PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+    game.setVariant("holdem")
+    game.setBettingStructure("level-2-4-limit")
+    for serial in xrange(1, players + 1):
+        game.addPlayer(serial, serial - 1)
+        game.payBuyIn(serial, game.maxBuyIn())
+        game.sit(serial)
+        game.autoBlindAnte(serial)
+    return game
+
+def play(game, hand_serial):
+    actions = 0
+    for player in game.playersAll():
+        player.money = 1000000
+    game.beginTurn(hand_serial)
+    raised = {}
+    while game.isRunning() and not game.isBlindAnteRound():
+        serial = game.getSerialInPosition()
+        possible = game.possibleActions(serial)
+        if game.state == pokergame.GAME_STATE_PRE_FLOP and serial == 3 and "fold" in possible:
+            game.fold(serial)
+        elif "raise" in possible and raised.get(game.state, 0) < 2:
+            raised[game.state] = raised.get(game.state, 0) + 1
+            game.callNraise(serial, 0)
+        elif "call" in possible:
+            game.call(serial)
+        else:
+            game.check(serial)
+        actions += 1
+    return actions
+
+def main(hands):
+    game = table(10)
+    actions = 0
+    start = time.time()
+    for hand_serial in xrange(1, hands + 1):
+        actions += play(game, hand_serial)
+    elapsed = time.time() - start
+    print "%5d hands %6d actions %8.3f s %8.1f us/action" % ( hands, actions, elapsed, elapsed * 1000000 / actions )
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
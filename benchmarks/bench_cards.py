@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time the PokerCards operations used by PokerGame on seven cards hands.
+
+  python benchmarks/bench_cards.py [loops]
+"""
+import sys
+import timeit
+from os import path
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+SETUP = """
+from pokerengine.pokercards import PokerCards
+hand = PokerCards(['Ah', 'Kd', '2c', '7s', '9h', 'Tc', 'Jd'])
+hand.setVisible(12, False)
+other = hand.copy()
+"""
+
+OPERATIONS = (
+    ( "parse", "PokerCards(['Ah', 'Kd', '2c', '7s', '9h', 'Tc', 'Jd'])" ),
+    ( "hasCard", "hand.hasCard(50)" ),
+    ( "areVisible", "hand.areVisible()" ),
+    ( "areHidden", "hand.areHidden()" ),
+    ( "tolist", "hand.tolist(True)" ),
+    ( "__eq__", "hand == other" ),
+    ( "setVisible", "hand.setVisible(37, True)" ),
+    ( "copy", "hand.copy()" ),
+)
+
+def main(loops):
+    for ( name, statement ) in OPERATIONS:
+        elapsed = min(timeit.repeat(statement, SETUP, repeat = 3, number = loops))
+        print "%-12s %8.3f us" % ( name, elapsed * 1000000 / loops )
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
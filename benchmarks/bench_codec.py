@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Compare the size and encoding time of hand histories encoded with
+pokerhistory, pickle and cPickle, and check that they decode to the
+same events.
+
+  python benchmarks/bench_codec.py [hands]
+
+The histories are recorded from hands played at limit hold'em, no limit
+omaha high/low and pot limit omaha tables where every player picks a
+random action among the possible ones.
+"""
+import sys
+import time
+import pickle
+import cPickle
+from os import path
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokergame
+from pokerengine.pokerhistory import encodeHistory, decodeHistory
+
+TABLES = (
+    ( "holdem", "level-2-4-limit" ),
+    ( "omaha8", "level-10-20-no-limit" ),
+    ( "omaha", "level-10-15-pot-limit" ),
+)
+
+def table(variant, betting_structure, players):
+    game = pokergame.PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+    game.setVariant(variant)
+    game.setBettingStructure(betting_structure)
+    game.setMaxPlayers(players)
+    for serial in xrange(1, players + 1):
+        game.addPlayer(serial)
+        game.payBuyIn(serial, game.maxBuyIn())
+        game.sit(serial)
+        game.autoBlindAnte(serial)
+    return game
+
+def record(random, hands):
+    histories = []
+    for ( variant, betting_structure ) in TABLES:
+        for hand_serial in xrange(1, hands / len(TABLES) + 1):
+            #
+            # A new table every 20 hands, the blinds of the levels
+            # would otherwise grow until the players are busted
+            #
+            if hand_serial % 20 == 1:
+                game = table(variant, betting_structure, 8)
+            game.beginTurn(hand_serial)
+            while game.isRunning() and not game.isBlindAnteRound():
+                serial = game.getSerialInPosition()
+                action = random.choice(game.possibleActions(serial))
+                if action == "raise":
+                    game.callNraise(serial, 0)
+                elif action == "call":
+                    game.call(serial)
+                elif action == "check":
+                    game.check(serial)
+                else:
+                    game.fold(serial)
+            histories.append(game.historyGet()[:])
+    return histories
+
+def timed(function, histories):
+    start = time.time()
+    encoded = [ function(history) for history in histories ]
+    return ( encoded, time.time() - start )
+
+def main(hands):
+    histories = record(Random(1), hands)
+    events = sum(len(history) for history in histories)
+    ( encoded, codec ) = timed(encodeHistory, histories)
+    ( pickled, pickle_time ) = timed(pickle.dumps, histories)
+    ( cpickled, cpickle_time ) = timed(lambda history: cPickle.dumps(history, cPickle.HIGHEST_PROTOCOL), histories)
+    start = time.time()
+    decoded = [ decodeHistory(data) for data in encoded ]
+    decode_time = time.time() - start
+    start = time.time()
+    for data in cpickled:
+        cPickle.loads(data)
+    cunpickle_time = time.time() - start
+    if decoded != histories:
+        for ( history, events ) in zip(histories, decoded):
+            if history != events:
+                print "history differs for %s" % ( history, )
+                print "got %s" % ( events, )
+                return 1
+    count = len(histories)
+    for ( name, data, elapsed ) in (
+        ( "pokerhistory", encoded, codec ),
+        ( "pickle", pickled, pickle_time ),
+        ( "cPickle -1", cpickled, cpickle_time ),
+        ):
+        size = sum(map(len, data))
+        print "%-12s %6d bytes/hand %8.1f us/hand encode" % ( name, size / count, elapsed * 1000000 / count )
+    print "%d hands %d events identical, decode pokerhistory %.1f us/hand cPickle -1 %.1f us/hand" % ( count, events, decode_time * 1000000 / count, cunpickle_time * 1000000 / count )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time the binding of a variant and a betting structure to a table.
+
+  python benchmarks/bench_descriptor.py [tables]
+
+The "parse" line re-parses the files for every table, which is what
+setVariant/setBettingStructure did before the descriptors were shared.
+The "bind" line is the cost of binding a table to the compiled
+descriptors.
+"""
+import sys
+import time
+from os import path
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokerdescriptor
+from pokerengine.pokergame import PokerGameServer
+
+DIRS = [ path.join(BENCHMARKS_PATH, "../conf") ]
+VARIANT = "holdem"
+BETTING_STRUCTURE = "level-001"
+
+def bind(games, parse):
+    start = time.time()
+    for game in games:
+        if parse:
+            pokerdescriptor.clearDescriptors()
+        game.setVariant(VARIANT)
+        game.setBettingStructure(BETTING_STRUCTURE)
+    return time.time() - start
+
+def main(tables):
+    games = [ PokerGameServer("poker.%s.xml", DIRS) for i in xrange(tables) ]
+    for ( label, parse ) in ( ( "parse", True ), ( "bind", False ) ):
+        elapsed = bind(games, parse)
+        print "%-6s %6d tables %8.3f s %10.1f us/table" % ( label, tables, elapsed, elapsed * 1000000 / tables )
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time the bot decisions of PokerGame.handEV, before and after the flop.
+
+  python benchmarks/bench_equity.py [decisions]
+
+For 2, 6 and 10 players, compares pokereval.PokerEval.poker_eval with
+10000 iterations (the previous bot evaluation), PokerEquity.handsEV
+with the default bot budget (10000 iterations, no time budget and no
+precision: what the game runs) and PokerEquity.handsEV with a 10 per
+mille precision (bot_eval_precision = 10, off by default).
+
+On the development machine the default budget costs the same as
+pokereval (it is pokereval), 5 to 15 ms per decision. The sampling
+with a precision stops after 1000 to 2300 runouts but still takes 30
+to 90 ms per decision: a runout of PokerEquity costs about 40 times
+more than a runout of pokereval.
+"""
+import sys
+import time
+from os import path
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+import pokereval
+
+from pokerengine.pokerequity import PokerEquity
+
+NOCARD = 255
+
+def decisions(count, players, board_size):
+    random = Random(1)
+    deck = range(52)
+    result = []
+    for i in xrange(count):
+        random.shuffle(deck)
+        pockets = [ deck[:2] ] + [ [NOCARD, NOCARD] ] * (players - 1)
+        board = deck[2:2 + board_size] + [NOCARD] * (5 - board_size)
+        result.append(( pockets, board ))
+    return result
+
+def timed(name, hands, evaluate):
+    equity_iterations = [0]
+    start = time.time()
+    for ( pockets, board ) in hands:
+        equity_iterations[0] += evaluate(pockets, board)
+    elapsed = time.time() - start
+    count = len(hands)
+    print "   %-18s %5d decisions %8.3f s %8.1f decisions/s %6d runouts/decision" % ( name, count, elapsed, count / elapsed, equity_iterations[0] / count )
+
+def main(count):
+    eval = pokereval.PokerEval()
+    equity = PokerEquity(eval, Random(1))
+    #
+    # Fill the rank lookup table once, as a long running server would
+    #
+    equity.handsEV("holdem", [ [0, 1], [NOCARD, NOCARD] ], [NOCARD] * 5, 20000, precision = 1)
+    def pokerEval(pockets, board):
+        eval.poker_eval(game = "holdem", pockets = pockets, board = board, fill_pockets = 1, iterations = 10000)
+        return 10000
+    def default(pockets, board):
+        equity.handsEV("holdem", pockets, board, 10000)
+        return equity.iterations
+    def precise(pockets, board):
+        equity.handsEV("holdem", pockets, board, 10000, precision = 10)
+        return equity.iterations
+    for ( round, board_size ) in ( ( "pre-flop", 0 ), ( "flop", 3 ) ):
+        for players in ( 2, 6, 10 ):
+            hands = decisions(count, players, board_size)
+            print "%s, %d players" % ( round, players )
+            timed("pokereval", hands, pokerEval)
+            timed("equity, default", hands, default)
+            timed("equity, precision", hands, precise)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
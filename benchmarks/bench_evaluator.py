@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time ten handed showdowns with each best hand evaluator.
+
+  python benchmarks/bench_evaluator.py [showdowns]
+
+Each showdown evaluates the best hands of ten players with a single
+bestHands() call and then asks for every best hand again, as
+readablePlayerBestHands does.
+"""
+import sys
+import time
+from os import path
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+import pokereval
+
+from pokerengine import pokerevaluator
+
+def showdowns(count, variant):
+    random = Random(1)
+    deck = range(52)
+    result = []
+    pocket_size = 4 if variant == "omaha8" else 2
+    for i in xrange(count):
+        random.shuffle(deck)
+        board = deck[:5]
+        requests = []
+        for player in xrange(10):
+            pocket = deck[5 + player * pocket_size:5 + ( player + 1 ) * pocket_size]
+            if variant == "omaha8":
+                requests.append(( 'hi', pocket, board ))
+                requests.append(( 'low', pocket, board ))
+            else:
+                requests.append(( 'hi', pocket + board, [] ))
+        result.append(requests)
+    return result
+
+def main(count):
+    eval = pokereval.PokerEval()
+    for variant in ( "holdem", "omaha8" ):
+        hands = showdowns(count, variant)
+        for name in sorted(pokerevaluator.EVALUATORS.keys()):
+            evaluator = pokerevaluator.get_evaluator(name, eval)
+            start = time.time()
+            for requests in hands:
+                evaluator.reset()
+                evaluator.bestHands(requests)
+                for ( side, hand, board ) in requests:
+                    evaluator.best(side, hand, board)
+            elapsed = time.time() - start
+            print "%-7s %-10s %6d showdowns %8.3f s %10.1f showdowns/s" % ( variant, name, count, elapsed, count / elapsed )
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
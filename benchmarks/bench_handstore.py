@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time the archiving of hand histories in a PokerHandStore, the lookup
+of random hands and the iteration over all of them.
+
+  python benchmarks/bench_handstore.py [hands] [directory]
+
+The histories are hands recorded as in bench_codec.py, archived again
+and again with increasing hand serials in 16MB segments. The directory
+(a temporary directory by default) is removed at the end.
+"""
+import sys
+import time
+import shutil
+import tempfile
+from os import path
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine.pokerhistory import encodeHistory
+from pokerengine.pokerhandstore import PokerHandStore
+from bench_codec import record
+
+LOOKUPS = 20000
+
+def main(hands, directory):
+    random = Random(1)
+    encoded = [ encodeHistory(history) for history in record(random, 90) ]
+    store = PokerHandStore(directory, segment_size = 16 * 1024 * 1024)
+    size = 0
+    start = time.time()
+    for hand_serial in xrange(1, hands + 1):
+        data = encoded[hand_serial % len(encoded)]
+        store.appendEncoded(hand_serial, data)
+        size += len(data)
+    store.flush(sync = True)
+    elapsed = time.time() - start
+    print "append %8d hands %6.1f MB in %d segments %8.0f hands/s %6.1f MB/s" % ( hands, size / 1048576.0, len(store.segments), hands / elapsed, size / 1048576.0 / elapsed )
+    store.close()
+
+    store = PokerHandStore(directory, segment_size = 16 * 1024 * 1024)
+    latencies = []
+    for i in xrange(LOOKUPS):
+        hand_serial = random.randint(1, hands)
+        start = time.time()
+        data = store.getEncoded(hand_serial)
+        latencies.append(time.time() - start)
+        if data != encoded[hand_serial % len(encoded)]:
+            print "hand %d differs" % hand_serial
+            return 1
+    latencies.sort()
+    print "lookup %8d hands %8.1f us/lookup, p99 %8.1f us" % ( LOOKUPS, sum(latencies) * 1000000 / LOOKUPS, latencies[LOOKUPS * 99 / 100] * 1000000 )
+
+    count = 0
+    start = time.time()
+    for ( hand_serial, data ) in store.iterEncoded():
+        count += 1
+    elapsed = time.time() - start
+    print "iterate %7d hands %8.0f hands/s" % ( count, count / elapsed )
+    store.close()
+    return 0
+
+if __name__ == '__main__':
+    hands = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    if len(sys.argv) > 2:
+        sys.exit(main(hands, sys.argv[2]))
+    directory = tempfile.mkdtemp()
+    try:
+        status = main(hands, directory)
+    finally:
+        shutil.rmtree(directory)
+    sys.exit(status)
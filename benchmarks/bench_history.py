@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Check the histories reduced by PokerGame._historyReduce against the
+previous implementation and time both.
+
+  python benchmarks/bench_history.py [histories]
+
+Each history is the beginning of a ten players hand on a busy table:
+players sit, sit out, wait for the big blind, rebuy and change seats
+hundreds of times while the blinds are requested, as seen by an
+observer joining the table before the first betting round ends.
+"""
+import sys
+import time
+from os import path
+from copy import deepcopy
+from collections import defaultdict
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokergame
+from pokerengine.pokercards import PokerCards
+
+def legacyHistoryReduce(turn_history, money_map, in_place=False):
+    #
+    # PokerGame._historyReduce before it reduced the history by
+    # structural sharing instead of a deepcopy
+    #
+    player_list_index = 7
+    serial2chips_index = 9
+    
+    if not in_place: turn_history = deepcopy(turn_history)
+        
+    game_event = None
+    player_list_new = None
+    remove_indexes = []
+    sitouts_for_player = defaultdict(list)
+    sits_for_player = defaultdict(list)
+    index = 0
+    for index,event in enumerate(turn_history):
+        event_type = event[0]
+        if pokergame.PokerGame._historyFinalEvent(event):
+            break
+        elif event_type == 'game':
+            game_event = turn_history[index]
+        elif event_type == 'sit':
+            remove_indexes.append(index)
+            sits_for_player[event[1]].append(index)
+        elif event_type in ('blind_request','ante_request'):
+            remove_indexes.append(index)
+        elif event_type in ('sitOut','wait_blind'):
+            remove_indexes.append(index)
+            sitouts_for_player[event[1]].append(index)
+        elif event_type == 'wait_for':
+            remove_indexes.append(index)
+            sitouts_for_player[event[1]].append(index)
+        elif event_type == 'player_list':
+            remove_indexes.append(index)
+            player_list_new = event[1]
+    if player_list_new is not None:
+        for serial in set(game_event[player_list_index]) - set(player_list_new):
+            del game_event[serial2chips_index][serial]
+        for serial in set(player_list_new) - set(game_event[player_list_index]):
+            game_event[serial2chips_index][serial] = money_map[serial]
+        game_event[player_list_index][:] = player_list_new
+        for index,event in enumerate(turn_history):
+            if event[0] == 'rebuy' and event[1] in player_list_new:
+                remove_indexes.append(index)
+    for p_index in range(0,len(turn_history)):
+        if (
+            not turn_history[p_index][0] == "position" or 
+            not turn_history[p_index][1] >= 0 
+            or p_index in remove_indexes
+        ):
+            continue
+        event_type, position, serial = turn_history[p_index]
+        position_reduced = game_event[player_list_index].index(serial) \
+            if serial is not None and serial in game_event[player_list_index] \
+            else None
+        if position == position_reduced:
+            pass
+        elif position_reduced is not None and position >= 0: 
+            turn_history[p_index] = (event_type, position_reduced, serial)
+        else:
+            remove_indexes.append(p_index)
+    pos_last = None
+    for p_index in range(0,len(turn_history)):
+        if (
+            not turn_history[p_index][0] == "position" or 
+            not turn_history[p_index][1] >= 0 
+            or p_index in remove_indexes
+        ):
+            continue
+        pos_current = turn_history[p_index]
+        if pos_current == pos_last:
+            remove_indexes.append(p_index)
+        else:
+            pos_last = pos_current
+    for index in sorted(remove_indexes,reverse=True):
+        del turn_history[index]
+    
+    if not in_place:
+        return turn_history
+
+def history(random, length):
+    serials = range(1, 21)
+    seated = random.sample(serials, 10)
+    money = dict(( serial, random.randint(100, 10000) ) for serial in serials)
+    turn_history = [ ( 'game', 0, 1, 0, 0, 'holdem', 'config', sorted(seated), 0, dict(( serial, money[serial] ) for serial in seated) ) ]
+    for i in xrange(length):
+        serial = random.choice(serials)
+        event_type = random.choice(('sit', 'sitOut', 'wait_for', 'wait_blind', 'blind_request', 'position', 'position', 'rebuy', 'blind', 'player_list'))
+        if event_type == 'position':
+            turn_history.append(( 'position', random.randint(-1, 9), random.choice(seated + [ None ]) ))
+        elif event_type == 'player_list':
+            seated = random.sample(serials, 10)
+            turn_history.append(( 'player_list', sorted(seated) ))
+        elif event_type == 'blind_request':
+            turn_history.append(( 'blind_request', serial, 100, 0, 'big' ))
+        elif event_type == 'blind':
+            turn_history.append(( 'blind', serial, 100, 0 ))
+        elif event_type == 'rebuy':
+            turn_history.append(( 'rebuy', serial, 1000 ))
+        elif event_type == 'wait_for':
+            turn_history.append(( 'wait_for', serial, 'big' ))
+        else:
+            turn_history.append(( event_type, serial ))
+    turn_history.append(( 'position', -1, None ))
+    turn_history.append(( 'round', 'pre-flop', PokerCards([]), dict(( serial, PokerCards([ serial, serial + 13 ]) ) for serial in seated) ))
+    for serial in seated[:3]:
+        turn_history.append(( 'position', seated.index(serial), serial ))
+        turn_history.append(( 'call', serial, 100 ))
+    return ( turn_history, money )
+
+def main(count):
+    random = Random(1)
+    histories = [ history(random, random.randint(50, 1000)) for i in xrange(count) ]
+    legacy = 0.0
+    current = 0.0
+    for ( turn_history, money ) in histories:
+        start = time.time()
+        expected = legacyHistoryReduce(turn_history, money)
+        legacy += time.time() - start
+        original = deepcopy(turn_history)
+        start = time.time()
+        reduced = pokergame.PokerGame._historyReduce(turn_history, money)
+        current += time.time() - start
+        if reduced != expected or turn_history != original:
+            print "reduced history differs for %s" % ( turn_history, )
+            print "expected %s" % ( expected, )
+            print "got      %s" % ( reduced, )
+            return 1
+    events = sum(len(turn_history) for ( turn_history, money ) in histories)
+    print "%6d histories (%d events) identical, legacy %8.1f us/history, current %8.1f us/history, speedup %.2f" % ( count, events, legacy * 1000000 / count, current * 1000000 / count, legacy / current )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
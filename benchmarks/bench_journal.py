@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time the commit of journal records (pokerjournal.PokerJournal), one
+fsync per action against group commits, and report the throughput and
+the latency from append to the commit callback.
+
+  python benchmarks/bench_journal.py [actions] [directory]
+
+The records are the actions of holdem hands played by ten players,
+appended by a single thread as fast as possible (throughput) and at
+ACTIONS_PER_SECOND (latency). The directory defaults to a temporary
+directory: it must be on the disk to be measured, not in memory.
+"""
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from os import path
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokerjournal
+from pokerengine.pokergame import PokerGameServer
+
+ACTIONS_PER_SECOND = 5000
+
+#
+# max_latency of the group commits measured, None is one fsync per action
+#
+LATENCIES = ( None, 0.0, 0.001, 0.005 )
+
+def actions(random, count):
+    result = []
+    hand_serial = 1
+    while len(result) < count:
+        #
+        # A new table every 20 hands, the blinds of the levels would
+        # otherwise grow until the players are busted
+        #
+        if hand_serial % 20 == 1:
+            game = PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+            game.setVariant("holdem")
+            game.setBettingStructure("level-2-4-limit")
+            for serial in xrange(1, 11):
+                game.addPlayer(serial)
+                game.payBuyIn(serial, game.maxBuyIn())
+                game.sit(serial)
+                game.autoBlindAnte(serial)
+        game.beginTurn(hand_serial)
+        hand_serial += 1
+        while game.isRunning():
+            serial = game.getSerialInPosition()
+            action = random.choice(game.possibleActions(serial))
+            if action == "raise":
+                game.callNraise(serial, 0)
+                result.append(( "callNraise", ( serial, 0 ), {} ))
+            else:
+                getattr(game, action)(serial)
+                result.append(( action, ( serial, ), {} ))
+    return result[:count]
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def measure(directory, records, max_latency, rate):
+    shutil.rmtree(directory, True)
+    latencies = []
+    appended = {}
+    lock = threading.Lock()
+    done = threading.Event()
+    last = len(records) - 1
+    def committed(lsn):
+        latency = time.time() - appended[lsn]
+        lock.acquire()
+        latencies.append(latency)
+        lock.release()
+        if lsn == last:
+            done.set()
+    journal = pokerjournal.PokerJournal(directory, max_latency = max_latency or 0.0, dispatch = lambda callback, lsn: callback(lsn))
+    if max_latency is not None:
+        journal.start()
+    start = time.time()
+    for ( index, record ) in enumerate(records):
+        if rate:
+            delay = start + float(index) / rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        now = time.time()
+        lsn = journal.append(index % 20, pokerjournal.JOURNAL_ACTION, record)
+        appended[lsn] = now
+        journal.whenCommitted(lsn, committed)
+        if max_latency is None:
+            journal.commit()
+    done.wait()
+    elapsed = time.time() - start
+    journal.close()
+    latencies.sort()
+    return ( len(records) / elapsed, percentile(latencies, 0.5), percentile(latencies, 0.99) )
+
+def main(count, directory):
+    records = actions(Random(1), count)
+    for max_latency in LATENCIES:
+        mode = max_latency is None and "fsync per action  " or "group, %5.1f ms   " % ( max_latency * 1000 )
+        ( throughput, p50, p99 ) = measure(directory, records, max_latency, None)
+        print "%s unpaced: %8d actions/s, commit latency p50 %7.2f ms p99 %7.2f ms" % ( mode, throughput, p50 * 1000, p99 * 1000 )
+        ( throughput, p50, p99 ) = measure(directory, records, max_latency, ACTIONS_PER_SECOND)
+        print "%s %4d/s : %8d actions/s, commit latency p50 %7.2f ms p99 %7.2f ms" % ( mode, ACTIONS_PER_SECOND, throughput, p50 * 1000, p99 * 1000 )
+    return 0
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    if len(sys.argv) > 2:
+        directory = path.join(sys.argv[2], "bench_journal")
+        sys.exit(main(count, directory))
+    else:
+        top = tempfile.mkdtemp()
+        try:
+            sys.exit(main(count, path.join(top, "journal")))
+        finally:
+            shutil.rmtree(top)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Check the messages of history2messages against the previous
+implementation and time both.
+
+  python benchmarks/bench_messages.py [hands] [renderings]
+
+The histories are hands recorded as in bench_codec.py, each of them is
+rendered renderings times (10 by default) with the pockets, as for a
+support export of archived hands.
+"""
+import sys
+import time
+from os import path
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokergame
+from pokerengine.pokerchips import PokerChips
+from pokerengine import log as engine_log
+from bench_codec import record
+
+_ = pokergame._
+
+def legacyResolve2messages(game, hands, serial2name, serial2displayed, frame):
+    #
+    # __historyResolve2messages and history2messages before they were
+    # turned into generators using cached templates
+    #
+    messages = []
+    best = {
+        'hi': 0,
+        'low': 0x0FFFFFFF
+    }
+    for serial in frame['serials']:
+        for side in ('hi', 'low'):
+            if serial not in hands:
+                continue
+            hand = hands[serial]
+            if side not in hand:
+                continue
+            if hand[side][1][0] == 'Nothing':
+                continue
+
+            hand = hand[side]
+            show = False
+            if ((side == 'hi' and best['hi'] <= hand[0]) or
+                 (side == 'low' and best['low'] >= hand[0])):
+                best[side] = hand[0]
+                show = True
+
+            if serial in serial2displayed and not serial in frame[side]:
+                #
+                # If the player already exposed the hand and is not going
+                # to win this side of the pot, there is no need to issue
+                # a message.
+                #
+                continue
+            if show:
+                serial2displayed[serial] = True
+                value = game.readableHandValueLong(side, hand[1][0], hand[1][1:])
+                side_fmt = '(%s)' % _(side) if side == 'low' else ''
+                messages.append(_("%(name)s shows %(value)s %(side)s") % {
+                    'name': serial2name(serial),
+                    'value': value,
+                    'side': side_fmt
+                })
+            else:
+                messages.append(_("%(name)s mucks loosing hand") % {
+                    'name': serial2name(serial)
+                })
+
+    for side in ('hi', 'low'):
+        if side not in frame: continue
+        message = ' '.join(serial2name(serial) for serial in frame[side])
+        side_fmt = '(%s)' % _(side) if side == 'low' else ''
+        if len(frame[side]) > 1:
+            message += _(" tie %(side)s") % {'side': side_fmt}
+        else:
+            message += _(" wins %(side)s") % {'side': side_fmt}
+        messages.append(message)
+
+    if len(frame['serial2share']) > 1:
+        if 'chips_left' in frame:
+            messages.append(
+                _("winners share a pot of %(pot)s") % {'pot': PokerChips.tostring(frame['pot'])} +
+                _(" (minus %(chips_left)d odd chips)") % {'chips_left': frame['chips_left']}
+            )
+        else:
+            messages.append(_("winners share a pot of %(pot)s") % {'pot': PokerChips.tostring(frame['pot'])})
+
+    for (serial, share) in frame['serial2share'].iteritems():
+        messages.append(_("%(name)s receives %(amount)s") % {
+            'name': serial2name(serial),
+            'amount': PokerChips.tostring(share)
+        })
+
+    return messages
+
+
+def legacyHistory2messages(game, history, serial2name=str, pocket_messages=False):
+    messages = []
+    subject = ''
+    for event in history:
+        event_type = event[0]
+        if event_type == "game":
+            level, hand_serial, hands_count, time, variant, betting_structure, player_list, dealer, serial2chips = event[1:]
+            subject = _("hand #%(hand_serial)d, %(variant)s, %(betting_structure)s") % {
+                'hand_serial': hand_serial,
+                'variant': _(variant),
+                'betting_structure': betting_structure
+            }
+
+        elif event_type == "wait_for":
+            serial, reason = event[1:]
+            messages.append(
+                _("%(serial)s waiting for ") % {'serial': serial2name(serial)} +
+                ("late blind" if reason == "late" else "big blind")
+            )
+
+        elif event_type == "player_list":
+            pass
+
+        elif event_type == "round":
+            name, board, pockets = event[1:]
+            if pockets:
+                messages.append(_("%(name)s, %(len_pockets)d players") % {
+                    'name': name,
+                    'len_pockets': len(pockets)
+                })
+            else:
+                messages.append(name)
+            if board and not board.isEmpty():
+                messages.append(_("Board: %(board)s") % {
+                    'board': game.cards2string(board)
+                })
+            if pockets and pocket_messages:
+                for (serial, pocket) in pockets.iteritems():
+                    if not pocket.areAllNocard():
+                        messages.append(_("Cards player %(name)s: %(card)s") % {
+                            'name': serial2name(serial),
+                            'card': game.cards2string(pocket)
+                        })
+        elif event_type == "showdown":
+            board, pockets = event[1:]
+            if board and not board.isEmpty():
+                messages.append(_("Board: %(cards)s") % {
+                    'cards': game.cards2string(board)
+                })
+            if pockets and pocket_messages:
+                for (serial, pocket) in pockets.iteritems():
+                    if not pocket.areAllNocard():
+                        messages.append(_("Cards player %(name)s: %(cards)s") % {
+                            'name': serial2name(serial),
+                            'cards': game.cards2string(pocket)
+                        })
+        elif event_type == "rake":
+            amount = event[1]
+            messages.append(_("Rake %(amount)s") % {
+                'amount': PokerChips.tostring(amount)
+            })
+        elif event_type == "position":
+            pass
+        elif event_type == "blind_request":
+            pass
+        elif event_type == "wait_blind":
+            pass
+        elif event_type == "rebuy":
+            pass
+        elif event_type == "blind":
+            serial, amount, dead = event[1:]
+            if dead:
+                messages.append(_("%(name)s pays %(amount)s blind and %(dead)d dead") % {
+                    'name': serial2name(serial),
+                    'amount': PokerChips.tostring(amount),
+                    'dead': dead,
+                })
+            else:
+                messages.append(_("%(name)s pays %(amount)s blind") % {
+                    'name': serial2name(serial),
+                    'amount': PokerChips.tostring(amount),
+                })
+        elif event_type == "ante_request":
+            pass
+        elif event_type == "ante":
+            serial, amount = event[1:]
+            messages.append(_("%(name)s pays %(amount)s ante") % {
+                'name': serial2name(serial),
+                'amount': PokerChips.tostring(amount)
+            })
+        elif event_type == "all-in":
+            serial = event[1]
+            messages.append(_("%(name)s is all in") % {'name': serial2name(serial)})
+        elif event_type == "call":
+            serial, amount = event[1:]
+            messages.append(_("%(name)s calls %(amount)s") % {
+                'name': serial2name(serial),
+                'amount': PokerChips.tostring(amount)
+            })
+        elif event_type == "check":
+            serial = event[1]
+            messages.append(_("%(name)s checks") % {'name': serial2name(serial)})
+        elif event_type == "fold":
+            serial = event[1]
+            messages.append(_("%(name)s folds") % {'name': serial2name(serial)})
+        elif event_type == "raise":
+            serial, amount = event[1:]
+            messages.append(_("%(name)s raises %(amount)s") % {
+                'name': serial2name(serial),
+                'amount': PokerChips.tostring(amount)
+            })
+        elif event_type == "canceled":
+            serial, amount = event[1:]
+            if serial > 0 and amount > 0:
+                messages.append(_("turn canceled") + _(" (%(amount)s returned to %(name)s)") % {
+                    'amount': PokerChips.tostring(amount),
+                    'name': serial2name(serial)
+                })
+            else:
+                messages.append(_("turn canceled"))
+        elif event_type == "end":
+            winners, showdown_stack = event[1:]
+            if showdown_stack:
+                game_state = showdown_stack[0]
+                if game_state['foldwin']:
+                    serial = winners[0]
+                    messages.append(_("%(name)s receives %(amount)s (everyone else folded)") % {
+                        'name': serial2name(serial),
+                        'amount': PokerChips.tostring(game_state['serial2share'][serial])
+                    })
+                else:
+                    serial2displayed = {}
+                    hands = showdown_stack[0]['serial2best']
+                    for frame in showdown_stack[1:]:
+                        message = None
+                        if frame['type'] == 'left_over':
+                            message = _("%(name)s receives %(amount)d odd chips") % {
+                                'name': serial2name(frame['serial']),
+                                'amount': frame['chips_left']
+                            }
+                        elif frame['type'] == 'uncalled':
+                            message = _("returning uncalled bet %(amount)s to %(name)s") % {
+                                'amount': PokerChips.tostring(frame['uncalled']),
+                                'name': serial2name(frame['serial'])
+                            }
+                        elif frame['type'] == 'resolve':
+                            messages.extend(legacyResolve2messages(game, hands, serial2name, serial2displayed, frame))
+                        else:
+                            engine_log.warn("history2messages unexpected showdown_stack frame type %s (%s)", frame['type'], str(frame))
+                        if message:
+                            messages.append(message)
+            else:
+                engine_log.warn("ERROR history2messages ignored empty showdown_stack")
+        elif event_type == "sitOut":
+            serial = event[1]
+            messages.append(_("%(name)s sits out") % {'name': serial2name(serial)})
+        elif event_type == "leave":
+            pass
+        elif event_type == "finish":
+            pass
+        elif event_type == "muck":
+            pass
+        elif event_type == "sit":
+            pass
+        else:
+            engine_log.warn("history2messages: unknown history type %s", event_type)
+
+    return (subject, messages)
+
+def render(function, game, history):
+    #
+    # A frame of an omaha8 hand without a qualifying low hand has
+    # low = None and history2messages raises TypeError
+    #
+    try:
+        return function(game, history, pocket_messages = True)
+    except TypeError:
+        return TypeError
+
+def main(hands, renderings):
+    histories = record(Random(1), hands)
+    game = pokergame.PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+    game.setVariant("holdem")
+    legacy = 0.0
+    current = 0.0
+    for i in xrange(renderings):
+        for history in histories:
+            start = time.time()
+            expected = render(legacyHistory2messages, game, history)
+            legacy += time.time() - start
+            start = time.time()
+            messages = render(pokergame.history2messages, game, history)
+            current += time.time() - start
+            if messages != expected:
+                print "messages differ for %s" % ( history, )
+                print "expected %s" % ( expected, )
+                print "got      %s" % ( messages, )
+                return 1
+    count = len(histories) * renderings
+    print "%6d hands rendered identical, legacy %6.1f us/hand, current %6.1f us/hand, speedup %.2f" % ( count, legacy * 1000000 / count, current * 1000000 / count, legacy / current )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, int(sys.argv[2]) if len(sys.argv) > 2 else 10))
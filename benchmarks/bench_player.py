@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Memory used by seated players and time of PokerPlayer.copy.
+
+  python benchmarks/bench_player.py [players]
+
+The players are seated at ten handed tables. The memory is the growth
+of the resident set size of the process (Linux /proc/self/statm)
+divided by the number of players, so it includes everything a player
+allocates (cards, logger, ...).
+"""
+import gc
+import os
+import sys
+import time
+from os import path
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokergame
+
+def rss():
+    fd = open("/proc/self/statm")
+    try:
+        return int(fd.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    finally:
+        fd.close()
+
+def main(count):
+    game = pokergame.PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+    game.setVariant("holdem")
+    game.setBettingStructure("level-001")
+    gc.collect()
+    before = rss()
+    players = []
+    for serial in xrange(1, count + 1):
+        player = pokergame.PokerPlayer(serial, "player%d" % serial, game)
+        player.seat = serial % 10
+        player.money = 2000
+        player.sit_out = False
+        player.buy_in_payed = True
+        players.append(player)
+    gc.collect()
+    after = rss()
+    print "%6d players %8.1f bytes/player" % ( count, float(after - before) / count )
+    start = time.time()
+    copies = [ player.copy() for player in players ]
+    elapsed = time.time() - start
+    print "%6d copies  %8.2f us/copy" % ( len(copies), elapsed * 1000000 / len(copies) )
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
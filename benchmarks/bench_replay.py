@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time the replay of recorded hands (pokerreplay.PokerReplay) against
+playing them live, and check that both end in the same state.
+
+  python benchmarks/bench_replay.py [hands]
+
+The hands are played by six players at a level-2-4-limit holdem table,
+each picking a random possible action, with a callback registered.
+
+On the development machine the replay runs at about 700 hands/s
+(1.4 ms/hand) against 500 hands/s live: the replay skips the
+callbacks, the history and the shuffling but it still runs the
+PokerGame methods of every action, which is where the time goes. It
+is far from tens of thousands of hands/s; a process being rebuilt
+only replays the last hand of each of its tables, which takes about
+a second for a thousand tables.
+"""
+import sys
+import time
+from os import path
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokerreplay
+from pokerengine.pokergame import PokerGameServer
+
+def newGame():
+    game = PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+    game.setVariant("holdem")
+    game.setBettingStructure("level-2-4-limit")
+    game.registerCallback(lambda *args: None)
+    return game
+
+def record(random, count):
+    hands = []
+    elapsed = 0.0
+    for hand_serial in xrange(1, count + 1):
+        #
+        # A new table every 20 hands, the blinds of the levels would
+        # otherwise grow until the players are busted
+        #
+        if hand_serial % 20 == 1:
+            game = newGame()
+            for serial in xrange(1, 7):
+                game.addPlayer(serial)
+                game.payBuyIn(serial, game.maxBuyIn())
+                game.sit(serial)
+                game.autoBlindAnte(serial)
+            recorder = pokerreplay.PokerHandRecorder(game)
+            recorder.start()
+        start = time.time()
+        game.beginTurn(hand_serial)
+        hands.append(recorder.hand)
+        while game.isRunning():
+            serial = game.getSerialInPosition()
+            action = random.choice(game.possibleActions(serial))
+            if action == "raise":
+                game.callNraise(serial, 0)
+            else:
+                getattr(game, action)(serial)
+        elapsed += time.time() - start
+        hands[-1]['money'] = game.moneyMap()
+    return ( hands, elapsed )
+
+def main(count):
+    ( hands, live ) = record(Random(1), count)
+    replay = pokerreplay.PokerReplay(newGame())
+    start = time.time()
+    for hand in hands:
+        replay.replay(hand)
+        if replay.game.moneyMap() != hand['money']:
+            print "hand %d replayed differently" % replay.game.hand_serial
+            return 1
+    replayed = time.time() - start
+    print "%d hands" % count
+    print "live   %8.1f us/hand %8d hands/s" % ( live * 1000000 / count, count / live )
+    print "replay %8.1f us/hand %8d hands/s" % ( replayed * 1000000 / count, count / replayed )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time the showdown settlement (PokerGame.distributeMoney) of ten
+handed omaha8 hands where everybody goes all in preflop with a
+different stack, making nine side pots split between hi and low.
+
+  python benchmarks/bench_settlement.py [hands]
+"""
+import sys
+import time
+from os import path
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokergame
+from pokerengine.pokerinstrument import PokerInstrumentation
+
+def table(players):
+    game = pokergame.PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+    game.setVariant("omaha8")
+    game.setBettingStructure("level-10-20-no-limit")
+    for serial in xrange(1, players + 1):
+        game.addPlayer(serial, serial - 1)
+        game.payBuyIn(serial, game.maxBuyIn())
+        game.sit(serial)
+        game.autoBlindAnte(serial)
+    return game
+
+def play(game, hand_serial):
+    for player in game.playersAll():
+        player.money = 1000 + player.serial * 100
+    game.beginTurn(hand_serial)
+    while game.isRunning() and not game.isBlindAnteRound():
+        serial = game.getSerialInPosition()
+        if "raise" in game.possibleActions(serial):
+            game.callNraise(serial, game.getPlayerMoney(serial))
+        else:
+            game.call(serial)
+    return len(game.side_pots['pots'])
+
+def main(hands):
+    instrumentation = PokerInstrumentation()
+    pots = 0
+    start = time.time()
+    for hand_serial in xrange(1, hands + 1):
+        #
+        # A new table for each hand, the busted players would
+        # otherwise sit out
+        #
+        game = table(10)
+        game.setInstrumentation(instrumentation)
+        pots += play(game, hand_serial)
+    elapsed = time.time() - start
+    settlement = instrumentation.snapshot()['methods']['distributeMoney']
+    print "%5d hands %6d pots %8.3f s, settlement %8.1f us/hand" % ( hands, pots, elapsed, settlement['wall'] * 1000000 / settlement['count'] )
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Play bot tables in pokershard.PokerShards with a growing number of
+worker processes and report the hands per second.
+
+  python benchmarks/bench_shard.py [tables] [seconds] [iterations]
+
+Each table seats six bots and a hand begins as soon as the previous
+one ended. The tables are replaced every 20 hands (the blinds of the
+levels would otherwise grow until the players are busted), which also
+measures the creation of games from snapshots. iterations is the
+bot_eval_iterations of the bots.
+
+The development machine has a single cpu (nproc is 1): there the
+workers share one core and the benchmark only shows the cost of the
+processes and the messages. There is no multi-core measurement yet
+and no claim on how the hands per second scale with the cores.
+"""
+import sys
+import time
+import multiprocessing
+from os import path
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokershard
+from pokerengine.pokergame import PokerGameServer
+
+def template():
+    game = PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+    game.setVariant("holdem")
+    game.setBettingStructure("level-2-4-limit")
+    for serial in xrange(1, 7):
+        game.addPlayer(serial)
+        game.payBuyIn(serial, game.maxBuyIn())
+        game.sit(serial)
+        game.autoBlindAnte(serial)
+        game.botPlayer(serial)
+    return game.snapshot()
+
+def measure(workers, count, seconds, iterations):
+    snapshot = template()
+    settings = { 'bot_eval_iterations': iterations }
+    shards = pokershard.PokerShards(workers, [path.join(BENCHMARKS_PATH, '../conf')], hand_delay = 0, events = ( "end", ))
+    hands = {}
+    next_id = [count + 1]
+    def events(game_id, events):
+        hands[game_id] = hands.get(game_id, 0) + len(events)
+        if hands[game_id] >= 20 and game_id in shards.route:
+            shards.removeGame(game_id)
+            shards.createGame(next_id[0], snapshot, settings)
+            next_id[0] += 1
+    shards.callback_events = events
+    shards.start()
+    for game_id in xrange(1, count + 1):
+        shards.createGame(game_id, snapshot, settings)
+    start = time.time()
+    while time.time() - start < seconds:
+        shards.poll(0.1)
+    elapsed = time.time() - start
+    shards.stop()
+    return sum(hands.values()) / elapsed
+
+def main(count, seconds, iterations):
+    cpus = multiprocessing.cpu_count()
+    workers = sorted(set([ 1, 2, cpus ] + [ 2 ** power for power in xrange(cpus.bit_length()) ]))
+    single = None
+    for worker in workers:
+        rate = measure(worker, count, seconds, iterations)
+        single = single or rate
+        print "%3d workers (%d cpus), %5d tables: %8.1f hands/s, x%.2f" % ( worker, cpus, count, rate, rate / single )
+    return 0
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    sys.exit(main(count, seconds, iterations))
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Check the side pots built by PokerGame against the previous
+implementation on random multi-way all in rounds and time both.
+
+  python benchmarks/bench_sidepots.py [rounds]
+
+Each round has 2 to 10 players with random contributions, some of them
+folded or all in, on top of 0 to 2 side pots made in previous rounds.
+"""
+import sys
+import time
+from os import path
+from copy import deepcopy
+from random import Random
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine import pokergame
+
+def legacyMakeSidePots(self):
+    #
+    # PokerGame.__makeSidePots before it was rewritten as a single
+    # pass over the sorted contributions
+    #
+    amount_index = 0
+    total_index = 1
+    last_pot_index = -1
+    round_contributions = self.side_pots['contributions'][self.current_round]
+    pots = self.side_pots['pots']
+    pots[last_pot_index][amount_index] += self.side_pots['building']  # amount
+    pots[last_pot_index][total_index] += self.side_pots['building']  # total
+    self.side_pots['building'] = 0
+    current_pot_index = len(pots) - 1
+    if not round_contributions:
+        return
+
+    serials_by_contribution = round_contributions[len(pots) - 1].items()[:]
+    serials_by_contribution.sort(key=lambda s: s[1], reverse=True)
+    max_contribution_not_fold = 0
+
+    for serial, contribution in serials_by_contribution:
+        if not self.getPlayer(serial).isFold():
+            max_contribution_not_fold = contribution
+            break
+    else:
+        raise UserWarning("every user is fold")
+
+    def filterPlayers(player):
+        if player.side_pot_index == current_pot_index:
+            if not player.isAllIn():
+                if max_contribution_not_fold != serials_by_contribution[0][1] and round_contributions[len(pots) - 1].get(player.serial,0) >= max_contribution_not_fold:
+                    return True
+                return False
+            return True
+        return False
+
+    players = filter(filterPlayers, self.playersAll())
+
+    if not players:
+        return
+    players.sort(key=lambda player: round_contributions[len(pots) - 1].get(player.serial,0))
+    for player in players:
+        pot_contributions = round_contributions[len(pots) - 1]
+        if player.serial not in pot_contributions:
+            continue
+        if len(pot_contributions) == 1:
+            break
+        new_pot_contributions = {}
+        pot = pots[last_pot_index]
+        new_pot = [0, 0]
+        new_pot_index = len(pots)
+        contribution = pot_contributions[player.serial]
+        for serial in pot_contributions.keys():
+            other_contribution = pot_contributions[serial]
+            pot_contributions[serial] = min(contribution, other_contribution)
+            remainder = other_contribution - pot_contributions[serial]
+            pot[amount_index] -= remainder
+            pot[total_index] -= remainder
+            other_player = self.getPlayer(serial)
+            if other_contribution > contribution:
+                new_pot_contributions[serial] = remainder
+                new_pot[amount_index] += remainder
+                other_player.side_pot_index = new_pot_index
+            elif (other_contribution == contribution and
+                   not other_player.isAllIn()):
+                other_player.side_pot_index = new_pot_index
+        round_contributions[new_pot_index] = new_pot_contributions
+        new_pot[total_index] = new_pot[amount_index] + pot[total_index]
+        pots.append(new_pot)
+
+def table(players):
+    game = pokergame.PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+    game.setVariant("holdem")
+    game.setBettingStructure("level-10-20-no-limit")
+    for serial in xrange(1, players + 1):
+        game.addPlayer(serial, serial - 1)
+    return game
+
+def scenario(random, players):
+    """
+    Return ( side_pots, fold, all_in ) for a random round of players.
+    """
+    pots = [ [0, 0] ]
+    for i in xrange(random.randint(0, 2)):
+        amount = random.randint(0, 1000)
+        pots.append([amount, pots[-1][1] + amount])
+    serials = random.sample(xrange(1, players + 1), random.randint(2, players))
+    contributions = {}
+    fold = {}
+    all_in = {}
+    for serial in serials:
+        contributions[serial] = random.choice(( 0, 10, 20, 40, random.randint(1, 2000) ))
+        fold[serial] = random.random() < 0.3
+        all_in[serial] = not fold[serial] and random.random() < 0.4
+    fold[random.choice(serials)] = False
+    pot_index = len(pots) - 1
+    side_pots = {
+        'contributions': { 'total': {}, 1: { pot_index: contributions } },
+        'pots': pots,
+        'building': sum(contributions.values()),
+        'last_round': 1,
+        }
+    return ( side_pots, fold, all_in )
+
+def prepare(game, ( side_pots, fold, all_in )):
+    game.side_pots = deepcopy(side_pots)
+    game.current_round = 1
+    pot_index = len(side_pots['pots']) - 1
+    for player in game.playersAll():
+        player.fold = fold.get(player.serial, True)
+        player.all_in = all_in.get(player.serial, False)
+        player.side_pot_index = pot_index
+
+def result(game):
+    return ( game.side_pots, dict(( player.serial, player.side_pot_index ) for player in game.playersAll()) )
+
+def main(rounds):
+    random = Random(1)
+    players = 10
+    game = table(players)
+    scenarios = [ scenario(random, players) for i in xrange(rounds) ]
+    legacy = 0.0
+    current = 0.0
+    for round in scenarios:
+        prepare(game, round)
+        start = time.time()
+        legacyMakeSidePots(game)
+        legacy += time.time() - start
+        expected = result(game)
+        prepare(game, round)
+        start = time.time()
+        game._PokerGame__makeSidePots()
+        current += time.time() - start
+        if result(game) != expected:
+            print "side pots differ for %s" % ( round, )
+            print "expected %s" % ( expected, )
+            print "got      %s" % ( result(game), )
+            return 1
+    print "%6d rounds identical, legacy %6.1f us/round, current %6.1f us/round, speedup %.2f" % ( rounds, legacy * 1000000 / rounds, current * 1000000 / rounds, legacy / current )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Time PokerGame.snapshot and PokerGame.restore on ten players tables
+in the middle of a hand and report the size of the snapshots.
+
+  python benchmarks/bench_snapshot.py [count]
+
+The tables play holdem, omaha8 and 7stud, each until the second
+betting round of its first hand, every player calling or checking.
+"""
+import sys
+import time
+import zlib
+from os import path
+
+BENCHMARKS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCHMARKS_PATH, ".."))
+
+from pokerengine.pokergame import PokerGameServer
+
+TABLES = (
+    ( "holdem", "level-2-4-limit" ),
+    ( "omaha8", "level-10-20-no-limit" ),
+    ( "7stud", "level-10-15-pot-limit" ),
+)
+
+def newGame():
+    return PokerGameServer("poker.%s.xml", [path.join(BENCHMARKS_PATH, '../conf')])
+
+def table(variant, betting_structure):
+    game = newGame()
+    game.setVariant(variant)
+    game.setBettingStructure(betting_structure)
+    for serial in xrange(1, 11):
+        game.addPlayer(serial)
+        game.payBuyIn(serial, game.maxBuyIn())
+        game.sit(serial)
+        game.autoBlindAnte(serial)
+    game.beginTurn(1)
+    rounds = 0
+    state = game.state
+    while game.isRunning() and rounds < 2:
+        serial = game.getSerialInPosition()
+        if game.canCheck(serial):
+            game.check(serial)
+        else:
+            game.call(serial)
+        if game.state != state:
+            state = game.state
+            rounds += 1
+    serial = game.getSerialInPosition()
+    game.call(serial) if game.canCall(serial) else game.check(serial)
+    return game
+
+def state(game):
+    return (
+        game.state, game.pot, game.board, game.side_pots, game.turn_history,
+        [ ( player.serial, player.money, player.bet, player.hand ) for player in game.playersAll() ],
+        )
+
+def main(count):
+    for ( variant, betting_structure ) in TABLES:
+        game = table(variant, betting_structure)
+        other = newGame()
+        snapshot = game.snapshot()
+        other.restore(snapshot)
+        if state(other) != state(game):
+            print "%s: the restored game differs" % variant
+            return 1
+        start = time.time()
+        for i in xrange(count):
+            game.snapshot()
+        snapshot_time = time.time() - start
+        start = time.time()
+        for i in xrange(count):
+            other.restore(snapshot)
+        restore_time = time.time() - start
+        print "%-7s %-22s %s, %3d events: %5d bytes (%4d compressed), snapshot %6.1f us, restore %6.1f us" % (
+            variant, betting_structure, game.state, len(game.turn_history),
+            len(snapshot), len(zlib.compress(snapshot, 1)),
+            snapshot_time * 1000000 / count, restore_time * 1000000 / count )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,146 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Betting rules of the rounds of a betting structure, compiled from the
+bet_info dictionaries the first time PokerGame.betRule needs them
+instead of inspecting and parsing the dictionaries on each bet.
+
+ fixed="30"            FixedLimitRule   30 to 30
+ pow_level="2"         LevelLimitRule   2 * 2**(level - 1) to the same
+ min="10" max="300"    SpreadLimitRule  10 to 300
+ min="big" max="pot"   PotLimitRule     the big blind to the pot
+ min_pow_level="20"    NoLimitRule      20 * 2**(level - 1) to all the money
+
+min may be an integer, "big" for the big blind or be replaced by
+min_pow_level. Each rule also knows the cap (maximum number of raises)
+of the round.
+"""
+import re
+
+DIGITS = re.compile("[0-9]+$")
+
+class BetRule(object):
+
+    __slots__ = ('cap', 'min_bet', 'min_big', 'min_pow_level', 'level_bets')
+
+    #
+    # The maximum bet: an integer, "pot" or "money"
+    #
+    max_bet = None
+
+    def __init__(self, info):
+        self.cap = info["cap"]
+        self.min_bet = 0
+        self.min_big = False
+        self.min_pow_level = None
+        #
+        # level => bet of the rules depending on the level
+        #
+        self.level_bets = {}
+        if 'min' in info:
+            if info["min"] == "big":
+                self.min_big = True
+            else:
+                self.min_bet = int(info["min"])
+        elif 'min_pow_level' in info:
+            self.min_pow_level = int(info["min_pow_level"])
+
+    def levelBet(self, base, level):
+        bet = self.level_bets.get(level)
+        if bet is None:
+            bet = self.level_bets[level] = base * pow(2, level - 1)
+        return bet
+
+    def minBet(self, game):
+        if self.min_big:
+            return game.bigBlind()
+        elif self.min_pow_level is not None:
+            return self.levelBet(self.min_pow_level, game.getLevel())
+        else:
+            return self.min_bet
+
+    def limits(self, game):
+        """
+        Return the ( min bet, max bet ) of the round, regardless of
+        the bet and money of the player (see PokerGame.betLimits).
+        """
+        return ( self.minBet(game), self.max_bet )
+
+class NoLimitRule(BetRule):
+
+    __slots__ = ()
+
+    max_bet = "money"
+
+class PotLimitRule(BetRule):
+
+    __slots__ = ()
+
+    max_bet = "pot"
+
+class SpreadLimitRule(BetRule):
+
+    __slots__ = ('max_bet',)
+
+    def __init__(self, info):
+        BetRule.__init__(self, info)
+        self.max_bet = int(info["max"])
+
+class FixedLimitRule(BetRule):
+
+    __slots__ = ('fixed',)
+
+    def __init__(self, info):
+        BetRule.__init__(self, info)
+        self.fixed = int(info["fixed"])
+
+    def limits(self, game):
+        return ( self.fixed, self.fixed )
+
+class LevelLimitRule(BetRule):
+
+    __slots__ = ('pow_level',)
+
+    def __init__(self, info):
+        BetRule.__init__(self, info)
+        self.pow_level = int(info["pow_level"])
+
+    def limits(self, game):
+        bet = self.levelBet(self.pow_level, game.getLevel())
+        return ( bet, bet )
+
+def compileBetRule(info):
+    """
+    Return the BetRule of a bet_info dictionary.
+    """
+    if 'fixed' in info:
+        return FixedLimitRule(info)
+    elif 'pow_level' in info:
+        return LevelLimitRule(info)
+    elif 'max' in info:
+        if DIGITS.match(info["max"]):
+            return SpreadLimitRule(info)
+        elif info["max"] == "pot":
+            return PotLimitRule(info)
+        else:
+            raise UserWarning("unexpected max bet %s, expected an integer or pot" % info["max"])
+    else:
+        return NoLimitRule(info)
@@ -26,8 +26,6 @@
 #  Henry Precheur <henry@precheur.org> (2004)
 #
 
-from pokereval import PokerEval
-
 def visible_card(card):
     return (card & PokerCards.VALUE_CARD_MASK)
 
@@ -72,7 +70,52 @@ letter2names = {
     '2': 'Deuces'
     }
 
-class PokerCards:
+#
+# String representation of a card (as understood by
+# pokereval.PokerEval.string2card) => card
+#
+STRING2CARD = dict(
+    ( rank + suit, suit_index * 13 + rank_index )
+    for ( suit_index, suit ) in enumerate('hdcs')
+    for ( rank_index, rank ) in enumerate('23456789TJQKA')
+    )
+STRING2CARD['__'] = 255
+
+class PokerCardsList(list):
+    """
+    The list of cards returned by PokerCards.cards. Modifying it in
+    place (append, remove, cards[i] = ...) updates the PokerCards it
+    comes from.
+    """
+    __slots__ = ( 'owner', )
+
+    def __init__(self, owner):
+        list.__init__(self, owner._cards)
+        self.owner = owner
+
+def _updateOwner(name):
+    method = getattr(list, name)
+    def update(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.owner.setCards(self)
+        return result
+    update.__name__ = name
+    return update
+
+for name in ( 'append', 'extend', 'insert', 'remove', 'pop', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__setslice__', '__delslice__', '__iadd__', '__imul__' ):
+    setattr(PokerCardsList, name, _updateOwner(name))
+del name
+
+class PokerCards(object):
+    """
+    The cards are kept in deal order in the _cards tuple. Each card is
+    also recorded in the visible or hidden bit mask (bit N is card N)
+    and NOCARD placeholders are counted, so that membership,
+    visibility and equality do not loop over the cards. cards is a
+    list (PokerCardsList) built from the tuple, modifying it in place
+    or assigning a new list (cards = [...]) updates the masks.
+    """
     NOCARD = 255
     MAX_CARD = 64 # 64 > 52 cards 0x0100 0000
     NB_CARD = 52
@@ -86,14 +129,40 @@ class PokerCards:
     def __init__(self, cards = []):
         self.set(cards)
 
+    def getCards(self):
+        return PokerCardsList(self)
+
+    def setCards(self, cards):
+        cards = tuple(cards)
+        self._cards = cards
+        visible = 0
+        hidden = 0
+        nocards = 0
+        for card in cards:
+            if card == PokerCards.NOCARD:
+                nocards += 1
+            elif card & PokerCards.VISIBLE_CARD_MASK:
+                hidden |= 1 << (card & PokerCards.VALUE_CARD_MASK)
+            else:
+                visible |= 1 << card
+        self.visible = visible
+        self.hidden = hidden
+        self.nocards = nocards
+        self.duplicated = bin(visible | hidden).count("1") + nocards != len(cards)
+
+    cards = property(getCards, setCards)
+
     def __eq__(self, other):
         if type(self) != type(other): return False
-        
-        cards = self.cards[:]
-        cards.sort()
-        other_cards = other.cards[:]
-        other_cards.sort()
-        return cards == other_cards
+
+        if self.visible != other.visible or self.hidden != other.hidden or self.nocards != other.nocards:
+            return False
+        if not self.duplicated and not other.duplicated:
+            return True
+        #
+        # The same card more than once, compare the lists
+        #
+        return sorted(self._cards) == sorted(other._cards)
 
     def __ne__(self, other):
         return type(self) != type(other) or not self.__eq__(other)
@@ -104,26 +173,29 @@ class PokerCards:
                 x & PokerCards.VALUE_CARD_MASK,
                 "not visible" if x & PokerCards.VISIBLE_CARD_MASK else "visible"
             )
-            for x in self.cards 
+            for x in self._cards 
         ])
             
     def __repr__(self):
-        return "%s(%s)" % (self.__class__.__name__, self.cards)
+        return "%s(%s)" % (self.__class__.__name__, list(self._cards))
 
     def nocard(self):
         return PokerCards.NOCARD
 
     def copy(self):
-        other = PokerCards()
-        other.cards = [ x for x in self.cards ]
+        other = PokerCards.__new__(PokerCards)
+        other._cards = self._cards
+        other.visible = self.visible
+        other.hidden = self.hidden
+        other.nocards = self.nocards
+        other.duplicated = self.duplicated
         return other
         
     def getValue(self, card):
         value = None
         if type(card) is str:
-            poker_eval = PokerEval()
-            try: value = poker_eval.string2card(card)
-            except RuntimeError: raise UserWarning, "Invalid card %s" %(card)
+            value = STRING2CARD.get(card)
+            if value is None: raise UserWarning, "Invalid card %s" %(card)
         else:
             if card != PokerCards.NOCARD:
                 value = card & PokerCards.VALUE_CARD_MASK
@@ -134,7 +206,11 @@ class PokerCards:
         
     def set(self, cards):
         if isinstance(cards, PokerCards):
-            self.cards = cards.cards[:]
+            self._cards = cards._cards
+            self.visible = cards.visible
+            self.hidden = cards.hidden
+            self.nocards = cards.nocards
+            self.duplicated = cards.duplicated
             return
         if type(cards) is not list:
             cards = [cards]
@@ -142,72 +218,85 @@ class PokerCards:
             
     def add(self, card, visible):
         card_value = self.getValue(card)
-        self.cards.append(card_value | ((not visible and PokerCards.NOT_VISIBLE_CARD) or PokerCards.VISIBLE_CARD))
+        if card_value == PokerCards.NOCARD:
+            self.nocards += 1
+        else:
+            bit = 1 << (card_value & PokerCards.VALUE_CARD_MASK)
+            if ( self.visible | self.hidden ) & bit:
+                self.duplicated = True
+            if not visible or card_value & PokerCards.VISIBLE_CARD_MASK:
+                card_value |= PokerCards.NOT_VISIBLE_CARD
+                self.hidden |= bit
+            else:
+                self.visible |= bit
+        self._cards += ( card_value, )
         
     def allVisible(self):
-        for i in xrange(len(self.cards)):
-            self.cards[i] = visible_card(self.cards[i])
+        self.cards = [ visible_card(card) for card in self._cards ]
         
     def allHidden(self):
-        for i in xrange(len(self.cards)):
-            self.cards[i] = not_visible_card(self.cards[i])
+        self.cards = [ not_visible_card(card) for card in self._cards ]
 
     def hasCard(self, value):
-        for card in self.cards:
-            if value == self.nocard():
-                if card == self.nocard():
-                    return True
-            elif card & PokerCards.VALUE_CARD_MASK == value:
-                return True
-        return False
+        if value == PokerCards.NOCARD:
+            return self.nocards > 0
+        if value < 0 or value >= PokerCards.MAX_CARD:
+            return False
+        return bool(( self.visible | self.hidden ) >> value & 1)
 
     def areVisible(self):
-        for card in self.cards:
-            if card & PokerCards.NOT_VISIBLE_CARD:
-                return False
-        return True
+        return self.hidden == 0 and self.nocards == 0
         
     def areHidden(self):
-        for card in self.cards:
-            if is_visible(card):
-                return False
-        return True
+        return self.visible == 0
 
     def areAllNocard(self):
-        for card in self.cards:
-            if card != PokerCards.NOCARD:
-                return False
-        return True
+        return self.nocards == len(self._cards)
         
     def setVisible(self, value, visible):
         if value == self.nocard(): return
-        for i in xrange(len(self.cards)):
-            if self.cards[i] & PokerCards.VALUE_CARD_MASK == value:
-                if visible:
-                    self.cards[i] = visible_card(value)
-                else:
-                    self.cards[i] = not_visible_card(value)
+        bit = 1 << value
+        if not ( self.visible | self.hidden ) & bit:
+            return
+        if visible:
+            card = visible_card(value)
+        else:
+            card = not_visible_card(value)
+        self._cards = tuple(card if other & PokerCards.VALUE_CARD_MASK == value else other for other in self._cards)
+        if visible:
+            self.visible |= bit
+            self.hidden &= ~bit
+        else:
+            self.hidden |= bit
+            self.visible &= ~bit
 
     def tolist(self, show_all):
-        result = []
-        for card in self.cards:
-            if is_visible(card) or show_all and card != PokerCards.NOCARD:
-                result.append(card_value(card))
-            else:
-                result.append(self.nocard())
-        return result
+        if self.hidden == 0 and self.nocards == 0:
+            return list(self._cards)
+        if show_all:
+            return [ card if card == PokerCards.NOCARD else card_value(card) for card in self._cards ]
+        return [ card if is_visible(card) else PokerCards.NOCARD for card in self._cards ]
 
     def toRawList(self):
-        return self.cards[:]
+        return list(self._cards)
+
+    @staticmethod
+    def fromRawList(cards):
+        #
+        # The reverse of toRawList, cards is used as is and not checked
+        #
+        other = PokerCards.__new__(PokerCards)
+        other.setCards(cards)
+        return other
 
     def getVisible(self):
-        return [c for c in self.cards if is_visible(c)]
+        return [c for c in self._cards if is_visible(c)]
     
     def isEmpty(self):
-        return len(self.cards) == 0
+        return len(self._cards) == 0
 
     def len(self):
-        return len(self.cards)
+        return len(self._cards)
 
     def loseNotVisible(self):
-        self.cards = map(lambda card: card & PokerCards.NOT_VISIBLE_CARD and PokerCards.NOCARD or card, self.cards)
+        self.cards = map(lambda card: card & PokerCards.NOT_VISIBLE_CARD and PokerCards.NOCARD or card, self._cards)
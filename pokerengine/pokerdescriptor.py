@@ -0,0 +1,249 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Compiled variant and betting structure descriptions.
+
+Reading a poker.<variant>.xml or poker.<betting structure>.xml file
+requires parsing it and running a dozen XPath queries. The result only
+depends on the file content, therefore it is compiled once into an
+immutable descriptor that is shared by all the PokerGame instances of
+the process. A descriptor is recompiled when the modification time,
+size or inode of the file changes. Games bind to a descriptor by
+copying the few mutable structures they alter during a hand
+(round_info, bet_info, blind_info, ante_info).
+"""
+import os
+import sys
+from collections import namedtuple
+
+from pokerengine import log as engine_log
+log = engine_log.get_child('pokerdescriptor')
+
+from pokerengine.pokerengineconfig import Config
+
+#
+# (compiler, resolved path) => (stamp, descriptor)
+#
+DESCRIPTORS_CACHE = {}
+
+RoundInfo = namedtuple('RoundInfo', 'name position board board_size hand_size cards')
+
+class VariantDescriptor(namedtuple('VariantDescriptor', 'config path name type win_orders rounds max_hand_size max_board_size')):
+
+    __slots__ = ()
+
+    def roundInfo(self):
+        """
+        Return a (round_info, round_info_backup) tuple of lists of
+        dictionaries suitable for PokerGame.round_info and
+        PokerGame.round_info_backup. The lists of cards are private to
+        the caller and shared between the two lists, as they were when
+        the file was read by PokerGame.setVariant.
+        """
+        round_info = []
+        round_info_backup = []
+        for info in self.rounds:
+            info = {
+                "name": info.name,
+                "position": info.position,
+                "board": list(info.board),
+                "board_size": info.board_size,
+                "hand_size": info.hand_size,
+                "cards": list(info.cards),
+            }
+            round_info.append(info)
+            round_info_backup.append(info.copy())
+        return ( round_info, round_info_backup )
+
+class BettingStructureDescriptor(namedtuple('BettingStructureDescriptor', 'config path name buy_in max_buy_in best_buy_in unit variants blind blind_levels ante ante_levels')):
+
+    __slots__ = ()
+
+    def betInfo(self, variant):
+        """
+        Return a new list of dictionaries describing the betting rounds
+        of the variant, equivalent to the /bet/variants[contains(@ids,variant)]/round
+        XPath query.
+        """
+        bet_info = []
+        for ( ids, rounds ) in self.variants:
+            if variant in ids:
+                bet_info.extend(dict(info) for info in rounds)
+        return bet_info
+
+    def blindInfo(self):
+        return self.blind and dict(self.blind)
+
+    def anteInfo(self):
+        return self.ante and dict(self.ante)
+
+def compileVariant(config):
+    win_orders = []
+    for win_order in config.headerGetList("/poker/variant/wins/winner/@order"):
+        if win_order == "low8":
+            win_orders.append("low")
+        elif win_order == "high":
+            win_orders.append("hi")
+        else:
+            log.inform("unexpected win order: %s for variant %s", win_order, config.path)
+    if not win_orders:
+        raise UserWarning("failed to read win orders from %s" % config.path)
+
+    rounds = []
+    board_size = 0
+    hand_size = 0
+    for name in config.headerGetList("/poker/variant/round/@name"):
+        board = config.headerGetList("/poker/variant/round[@name='%s']/deal[@card='board']" % (name,))
+        board_size += len(board)
+        cards = config.headerGetList("/poker/variant/round[@name='%s']/deal[@card='up' or @card='down']/@card" % (name,))
+        hand_size += len(cards)
+        position = config.headerGet("/poker/variant/round[@name='%s']/position/@type" % (name,))
+        rounds.append(RoundInfo(name, position, tuple(board), board_size, hand_size, tuple(cards)))
+
+    variant_type = config.headerGet("/poker/variant/@type")
+    if variant_type == "community":
+        max_board_size = len(config.headerGetList("/poker/variant/community/position"))
+    else:
+        max_board_size = 0
+
+    return VariantDescriptor(
+        config = config,
+        path = config.path,
+        name = config.headerGet("/poker/variant/@name"),
+        type = variant_type,
+        win_orders = tuple(win_orders),
+        rounds = tuple(rounds),
+        max_hand_size = len(config.headerGetList("/poker/variant/hand/position")),
+        max_board_size = max_board_size
+        )
+
+def compileBettingStructure(config):
+    variants = []
+    for index, properties in enumerate(config.headerGetProperties("/bet/variants")):
+        rounds = []
+        for bet_info in config.headerGetProperties("/bet/variants[%d]/round" % (index + 1)):
+            if 'cap' not in bet_info:
+                bet_info["cap"] = sys.maxint
+            else:
+                bet_info["cap"] = int(bet_info["cap"])
+            if bet_info["cap"] < 0:
+                bet_info["cap"] = sys.maxint
+            rounds.append(tuple(bet_info.iteritems()))
+        variants.append(( properties.get("ids", ""), tuple(rounds) ))
+
+    blind = False
+    blind_levels = None
+    blind_info = config.headerGetProperties("/bet/blind")
+    if len(blind_info) > 0:
+        blinds = blind_info[0]
+        blind = {
+            "change": 'change' in blinds and blinds["change"]
+        }
+
+        if blind["change"] != False:
+            blind["frequency"] = int(blinds["frequency"])
+            blind["unit"] = blinds["unit"]
+            if blind["change"] == "levels":
+                blind_levels = config.headerGet('/bet/blind/@levels')
+            elif blind["change"] == "double":
+                blind["small"] = int(blinds["small"])
+                blind["small_reference"] = blind["small"]
+                blind["big"] = int(blinds["big"])
+                blind["big_reference"] = blind["big"]
+        else:
+            blind["small"] = int(blinds["small"])
+            blind["big"] = int(blinds["big"])
+        blind = tuple(blind.iteritems())
+
+    ante = False
+    ante_levels = None
+    ante_info = config.headerGetProperties("/bet/ante")
+    if len(ante_info) > 0:
+        antes = ante_info[0]
+        ante = {
+            "change": 'change' in antes and antes["change"]
+            }
+
+        if ante["change"]:
+            ante["frequency"] = int(antes["frequency"])
+            ante["unit"] = antes["unit"]
+            if ante["change"] == "levels":
+                ante_levels = config.headerGet('/bet/ante/@levels')
+            elif ante["change"] == "double":
+                ante["value"] = int(antes["value"])
+                ante["value_reference"] = ante["value"]
+                ante["bring-in"] = int(antes["bring-in"])
+                ante["bring-in_reference"] = ante["bring-in"]
+        else:
+            ante["value"] = int(antes["value"])
+            ante["bring-in"] = int(antes["bring-in"])
+        ante = tuple(ante.iteritems())
+
+    return BettingStructureDescriptor(
+        config = config,
+        path = config.path,
+        name = config.headerGet("/bet/description"),
+        buy_in = int(config.headerGet('/bet/@buy-in') or "0"),
+        max_buy_in = int(config.headerGet('/bet/@max-buy-in') or sys.maxint),
+        best_buy_in = int(config.headerGet('/bet/@best-buy-in') or "0"),
+        unit = int(config.headerGet('/bet/@unit')),
+        variants = tuple(variants),
+        blind = blind,
+        blind_levels = blind_levels,
+        ante = ante,
+        ante_levels = ante_levels
+        )
+
+def _stamp(path):
+    info = os.stat(path)
+    return ( info.st_mtime, info.st_size, info.st_ino )
+
+def getDescriptor(compiler, dirs, path, previous = None):
+    """
+    Return the descriptor built by compiler() from the file found
+    by looking for path in dirs. The file is only parsed if it was
+    never compiled before or if it changed since it was last compiled.
+    If path cannot be found, fall back to the previous path, as
+    Config.load does when called twice on the same object.
+    """
+    config = Config(dirs)
+    config.path = previous
+    found = config.find(path) or previous
+    if found:
+        cached = DESCRIPTORS_CACHE.get(( compiler, found ))
+        if cached and cached[0] == _stamp(found):
+            return cached[1]
+    config.load(path)
+    descriptor = compiler(config)
+    #
+    # stat after loading because Config.load may upgrade the file
+    #
+    DESCRIPTORS_CACHE[( compiler, config.path )] = ( _stamp(config.path), descriptor )
+    return descriptor
+
+def getVariantDescriptor(dirs, path, previous = None):
+    return getDescriptor(compileVariant, dirs, path, previous)
+
+def getBettingStructureDescriptor(dirs, path, previous = None):
+    return getDescriptor(compileBettingStructure, dirs, path, previous)
+
+def clearDescriptors():
+    DESCRIPTORS_CACHE.clear()
@@ -60,12 +60,17 @@ class Config:
         self.doc = libxml2.parseFile(self.path)
         self.header = self.doc.xpathNewContext()
 
-    def load(self, path):
+    def find(self, path):
         for prefix in self.dirs:
             tmppath = abspath(expanduser((prefix + "/" + path) if prefix and path[0] != "/" else path ))
             if exists(tmppath):
-                self.path = tmppath
-                break
+                return tmppath
+        return None
+
+    def load(self, path):
+        found = self.find(path)
+        if found:
+            self.path = found
         self.free()
         if self.path:
             self.doc = libxml2.parseFile(self.path)
@@ -0,0 +1,361 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Equity of poker hands, as used by PokerGame.handEV.
+
+PokerEquity.handsEV returns the same "ev" (the share of the pot won,
+per mille) as pokereval.PokerEval.poker_eval with fill_pockets = 1.
+The unknown cards (PokerCards.NOCARD) of the pockets and the board are
+dealt in every possible way when there are no more than EXACT_RUNOUTS
+combinations, otherwise they are sampled. All the pockets are
+evaluated against the same runout in a single pass, using the lookup
+tables of pokerevaluator.
+
+A runout costs tens of times more here than in the C code of
+pokereval: the sampling is only done here when it can stop early,
+because the time budget is exhausted or the standard error of every
+ev is below the requested precision. Otherwise all the iterations are
+sampled by pokereval.
+"""
+import time
+from math import sqrt
+from random import Random
+from itertools import combinations
+
+from pokerengine.pokerevaluator import CARD_KEYS, CARD_SUITS, CARD_BITS, CARD_LOW_BITS, \
+     RANK_VALUES, FLUSH_VALUES, LOW_VALUES, LOW_NOTHING, rankValue
+
+NOCARD = 255
+
+#
+# Check the time budget and the precision every CHECK_EVERY iterations
+#
+CHECK_EVERY = 128
+
+#
+# The unknown cards are dealt in every possible way, instead of being
+# sampled by pokereval, when there are no more combinations than this
+#
+EXACT_RUNOUTS = 256
+
+def _choose(n, k):
+    if k < 0 or k > n:
+        return 0
+    result = 1
+    for i in xrange(k):
+        result = result * (n - i) / (i + 1)
+    return result
+
+def _deals(cards, sizes):
+    if not sizes:
+        yield []
+        return
+    for chosen in combinations(cards, sizes[0]):
+        left = [ card for card in cards if card not in chosen ]
+        for deal in _deals(left, sizes[1:]):
+            yield list(chosen) + deal
+
+def _hiValues(pockets, board):
+    key = 0
+    masks = [0, 0, 0, 0]
+    for card in board:
+        key += CARD_KEYS[card]
+        masks[CARD_SUITS[card]] |= CARD_BITS[card]
+    values = []
+    for pocket in pockets:
+        pocket_key = key
+        pocket_masks = masks[:]
+        for card in pocket:
+            pocket_key += CARD_KEYS[card]
+            pocket_masks[CARD_SUITS[card]] |= CARD_BITS[card]
+        value = RANK_VALUES.get(pocket_key) or rankValue(pocket_key)
+        for mask in pocket_masks:
+            flush = FLUSH_VALUES[mask]
+            if flush > value:
+                value = flush
+        values.append(value)
+    return values
+
+def _lowValues(pockets, board):
+    mask = 0
+    for card in board:
+        mask |= CARD_LOW_BITS[card]
+    values = []
+    for pocket in pockets:
+        pocket_mask = mask
+        for card in pocket:
+            pocket_mask |= CARD_LOW_BITS[card]
+        values.append(LOW_VALUES[pocket_mask & 0xFF])
+    return values
+
+def _parts(cards):
+    key = 0
+    suit = CARD_SUITS[cards[0]]
+    rank_mask = 0
+    low_mask = 0
+    for card in cards:
+        key += CARD_KEYS[card]
+        rank_mask |= CARD_BITS[card]
+        low_mask |= CARD_LOW_BITS[card]
+        if CARD_SUITS[card] != suit:
+            suit = -1
+    return ( key, suit, rank_mask, low_mask )
+
+def _omahaValues(pockets, board, low):
+    flops = [ _parts(flop) for flop in combinations(board, 3) ]
+    hi_values = []
+    low_values = []
+    for pocket in pockets:
+        best_hi = 0
+        best_low = LOW_NOTHING
+        for hole in combinations(pocket, 2):
+            ( hole_key, hole_suit, hole_mask, hole_low_mask ) = _parts(hole)
+            for ( flop_key, flop_suit, flop_mask, flop_low_mask ) in flops:
+                if hole_suit >= 0 and hole_suit == flop_suit:
+                    value = FLUSH_VALUES[hole_mask | flop_mask]
+                else:
+                    key = hole_key + flop_key
+                    value = RANK_VALUES.get(key) or rankValue(key)
+                if value > best_hi:
+                    best_hi = value
+                if low:
+                    value = LOW_VALUES[( hole_low_mask | flop_low_mask ) & 0xFF]
+                    if value < best_low:
+                        best_low = value
+        hi_values.append(best_hi)
+        low_values.append(best_low)
+    return ( hi_values, low_values )
+
+def hiValues(pockets, board):
+    return ( _hiValues(pockets, board), None )
+
+def stud8Values(pockets, board):
+    return ( _hiValues(pockets, board), _lowValues(pockets, board) )
+
+def omahaValues(pockets, board):
+    return ( _omahaValues(pockets, board, False)[0], None )
+
+def omaha8Values(pockets, board):
+    return _omahaValues(pockets, board, True)
+
+#
+# variant => function returning the ( hi values, low values ) of the pockets
+#
+VARIANT_VALUES = {
+    "holdem": hiValues,
+    "omaha": omahaValues,
+    "omaha8": omaha8Values,
+    "7stud": hiValues,
+    "7stud8": stud8Values,
+}
+
+def _hiRunout(board_known, pockets_known, sizes, shares, squares):
+    """
+    Return a function that adds the shares of a runout of a hi only
+    variant that uses all the cards of the pocket and the board. The
+    rank keys and suit masks of the known cards are computed once.
+    """
+    board_size = sizes[0]
+    board_key = 0
+    board_masks = [0, 0, 0, 0]
+    for card in board_known:
+        board_key += CARD_KEYS[card]
+        board_masks[CARD_SUITS[card]] |= CARD_BITS[card]
+    players = []
+    start = board_size
+    for ( index, ( known_cards, size ) ) in enumerate(zip(pockets_known, sizes[1:])):
+        key = 0
+        masks = [0, 0, 0, 0]
+        for card in known_cards:
+            key += CARD_KEYS[card]
+            masks[CARD_SUITS[card]] |= CARD_BITS[card]
+        players.append(( index, key, masks, start, start + size ))
+        start += size
+
+    def runout(deal):
+        key = board_key
+        masks = board_masks[:]
+        for card in deal[:board_size]:
+            key += CARD_KEYS[card]
+            masks[CARD_SUITS[card]] |= CARD_BITS[card]
+        best = -1
+        winners = None
+        for ( index, pocket_key, pocket_masks, start, end ) in players:
+            pocket_key += key
+            value = RANK_VALUES.get(pocket_key) or rankValue(pocket_key)
+            hearts, diamonds, clubs, spades = pocket_masks
+            hearts |= masks[0]
+            diamonds |= masks[1]
+            clubs |= masks[2]
+            spades |= masks[3]
+            for card in deal[start:end]:
+                pocket_key += CARD_KEYS[card]
+                suit = CARD_SUITS[card]
+                if suit == 0:
+                    hearts |= CARD_BITS[card]
+                elif suit == 1:
+                    diamonds |= CARD_BITS[card]
+                elif suit == 2:
+                    clubs |= CARD_BITS[card]
+                else:
+                    spades |= CARD_BITS[card]
+            if end > start:
+                value = RANK_VALUES.get(pocket_key) or rankValue(pocket_key)
+            value = max(value, FLUSH_VALUES[hearts], FLUSH_VALUES[diamonds], FLUSH_VALUES[clubs], FLUSH_VALUES[spades])
+            if value > best:
+                best = value
+                winners = [ index ]
+            elif value == best:
+                winners.append(index)
+        if len(winners) == 1:
+            shares[winners[0]] += 1.0
+            squares[winners[0]] += 1.0
+        else:
+            share = 1.0 / len(winners)
+            for index in winners:
+                shares[index] += share
+                squares[index] += share * share
+
+    return runout
+
+def _valuesRunout(values, board_known, pockets_known, sizes, shares, squares):
+    def runout(deal):
+        start = sizes[0]
+        runout_board = board_known + deal[:start]
+        runout_pockets = []
+        for ( known_cards, size ) in zip(pockets_known, sizes[1:]):
+            runout_pockets.append(known_cards + deal[start:start + size])
+            start += size
+        ( hi_values, low_values ) = values(runout_pockets, runout_board)
+        _shares(hi_values, low_values, shares, squares)
+    return runout
+
+def _shares(hi_values, low_values, shares, squares):
+    best = max(hi_values)
+    hi_winners = [ i for i, value in enumerate(hi_values) if value == best ]
+    low_winners = None
+    if low_values:
+        best = min(low_values)
+        if best != LOW_NOTHING:
+            low_winners = [ i for i, value in enumerate(low_values) if value == best ]
+    pot = 1.0 if low_winners is None else 0.5
+    won = {}
+    share = pot / len(hi_winners)
+    for i in hi_winners:
+        won[i] = share
+    if low_winners:
+        share = pot / len(low_winners)
+        for i in low_winners:
+            won[i] = won.get(i, 0) + share
+    for ( i, share ) in won.iteritems():
+        shares[i] += share
+        squares[i] += share * share
+
+class PokerEquity:
+
+    def __init__(self, eval, random = None):
+        self.eval = eval
+        self.random = random or Random()
+        #
+        # Statistics of the last handsEV call
+        #
+        self.iterations = 0
+        self.exact = False
+
+    def handsEV(self, variant, pockets, board, iterations, time_budget = None, precision = None):
+        """
+        Return the list of the ev (per mille) of each pocket. At most
+        iterations runouts are evaluated. If time_budget (in seconds)
+        is set, stop sampling when it is exhausted. If precision (per
+        mille) is set, stop sampling when the standard error of all ev
+        is below it. If neither is set, the sampling is done by
+        pokereval.
+        """
+        board_known = [ card for card in board if card != NOCARD ]
+        pockets_known = [ [ card for card in pocket if card != NOCARD ] for pocket in pockets ]
+        known = set(board_known)
+        for known_cards in pockets_known:
+            known.update(known_cards)
+
+        values = VARIANT_VALUES.get(variant)
+        if values is None or len(known) != len(board_known) + sum(map(len, pockets_known)):
+            #
+            # The lookup tables assume distinct cards, let pokereval
+            # handle duplicates and the variants it does not know.
+            #
+            return self.pokerEval(variant, pockets, board, iterations)
+
+        rest = [ card for card in xrange(52) if card not in known ]
+        sizes = [ len(board) - len(board_known) ] + [ len(pocket) - len(known_cards) for ( pocket, known_cards ) in zip(pockets, pockets_known) ]
+
+        count = 1
+        left = len(rest)
+        for size in sizes:
+            count *= _choose(left, size)
+            left -= size
+        if count == 0:
+            raise UserWarning("handsEV: not enough cards left to deal %s" % sizes)
+        if count > min(iterations, EXACT_RUNOUTS) and not time_budget and not precision:
+            return self.pokerEval(variant, pockets, board, iterations)
+
+        shares = [0.0] * len(pockets)
+        squares = [0.0] * len(pockets)
+        missing = sum(sizes)
+
+        if values is hiValues:
+            runout = _hiRunout(board_known, pockets_known, sizes, shares, squares)
+        else:
+            runout = _valuesRunout(values, board_known, pockets_known, sizes, shares, squares)
+
+        done = 0
+        if count <= iterations:
+            self.exact = True
+            for deal in _deals(rest, sizes):
+                runout(deal)
+            done = count
+        else:
+            self.exact = False
+            sample = self.random.sample
+            deadline = time_budget and time.time() + time_budget
+            while done < iterations:
+                runout(sample(rest, missing))
+                done += 1
+                if done % CHECK_EVERY == 0:
+                    if deadline and time.time() > deadline:
+                        break
+                    if precision and self.precise(shares, squares, done, precision):
+                        break
+        self.iterations = done
+        return [ int(1000 * share / done) for share in shares ]
+
+    def precise(self, shares, squares, done, precision):
+        for ( share, square ) in zip(shares, squares):
+            mean = share / done
+            variance = max(square / done - mean * mean, 0.0)
+            if 1000 * sqrt(variance / done) > precision:
+                return False
+        return True
+
+    def pokerEval(self, variant, pockets, board, iterations):
+        result = self.eval.poker_eval(game = variant, pockets = pockets, board = board, fill_pockets = 1, iterations = iterations)
+        self.iterations = iterations
+        self.exact = False
+        return [ info["ev"] for info in result["eval"] ]
@@ -0,0 +1,524 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Best hand evaluators used by PokerGame.bestHand and PokerGame.bestHands.
+
+An evaluator returns the same ( value, [ name, card1, ... card5 ] )
+tuples as pokereval.PokerEval.best. The results, and any other result
+PokerGame memoizes with memoize(), are kept in a bounded LRU cache
+until reset() is called, which PokerGame does at the beginning of each
+hand. The hit and miss counters of the cache are returned by stats().
+
+ pokereval  delegates to pokereval.PokerEval.best
+ lookup     pure Python, rank count and suit mask lookup tables, falls
+            back to pokereval.PokerEval.best for incomplete hands. The
+            default: bestHands evaluates the hands of a showdown
+            together, the cards they share (the board) only once
+"""
+from itertools import combinations, permutations
+from collections import OrderedDict
+
+from pokerengine import log as engine_log
+log = engine_log.get_child('pokerevaluator')
+
+EVALUATOR_DEFAULT = "lookup"
+CACHE_SIZE = 4096
+
+#
+# Same encoding as the poker-eval HandVal
+#
+HAND_NAMES = ( "NoPair", "OnePair", "TwoPair", "Trips", "Straight", "Flush", "FlHouse", "Quads", "StFlush" )
+NOPAIR, ONEPAIR, TWOPAIR, TRIPS, STRAIGHT, FLUSH, FLHOUSE, QUADS, STFLUSH = range(9)
+LOW_NOTHING = 0x0FFFFFFF
+
+ACE = 12
+RANKS = range(ACE, -1, -1)
+POW5 = tuple(5 ** rank for rank in xrange(13))
+
+#
+# card => contribution to the rank count key, suit, rank bit
+#
+CARD_KEYS = tuple(POW5[card % 13] for card in xrange(52))
+CARD_SUITS = tuple(card / 13 for card in xrange(52))
+CARD_BITS = tuple(1 << (card % 13) for card in xrange(52))
+#
+# card => rank bit in a low mask (Ace is the lowest)
+#
+CARD_LOW_BITS = tuple(1 << (0 if card % 13 == ACE else card % 13 + 1) for card in xrange(52))
+
+def handValue(hand_type, ranks):
+    value = hand_type << 24
+    shift = 16
+    for rank in ranks:
+        value |= rank << shift
+        shift -= 4
+    return value
+
+def handRanks(value):
+    return [ (value >> shift) & 0xF for shift in (16, 12, 8, 4, 0) ]
+
+def _straightTop(mask):
+    for top in xrange(ACE, 3, -1):
+        straight = 0x1F << (top - 4)
+        if mask & straight == straight:
+            return top
+    if mask & 0x100F == 0x100F:
+        return 3
+    return -1
+
+def _maskRanks(mask):
+    return [ rank for rank in RANKS if mask & (1 << rank) ]
+
+#
+# 13 bits rank mask => highest straight rank or -1
+#
+STRAIGHT_TOP = tuple(_straightTop(mask) for mask in xrange(1 << 13))
+
+def _flushValue(mask):
+    ranks = _maskRanks(mask)
+    if len(ranks) < 5:
+        return 0
+    if STRAIGHT_TOP[mask] >= 0:
+        return handValue(STFLUSH, [ STRAIGHT_TOP[mask] ])
+    return handValue(FLUSH, ranks[:5])
+
+#
+# 13 bits mask of the ranks of a suit => flush or straight flush value, 0 if none
+#
+FLUSH_VALUES = tuple(_flushValue(mask) for mask in xrange(1 << 13))
+
+def _lowValue(mask):
+    ranks = [ rank for rank in xrange(8) if mask & (1 << rank) ][:5]
+    if len(ranks) < 5:
+        return LOW_NOTHING
+    ranks.reverse()
+    return handValue(NOPAIR, ranks)
+
+#
+# 8 bits mask of the ranks Ace (bit 0) to Eight (bit 7) => 8 or better low value
+#
+LOW_VALUES = tuple(_lowValue(mask) for mask in xrange(1 << 8))
+
+#
+# Sum of 5 ** rank for each card (a base 5 number with one digit per
+# rank) => value of the hand ignoring flushes. It is a perfect hash of
+# the rank counts, filled as hands are evaluated.
+#
+RANK_VALUES = {}
+
+def _rankValue(key):
+    counts = [0] * 13
+    mask = 0
+    digits = key
+    for rank in xrange(13):
+        counts[rank] = digits % 5
+        digits /= 5
+        if counts[rank]:
+            mask |= 1 << rank
+    groups = {}
+    for rank in RANKS:
+        groups.setdefault(counts[rank], []).append(rank)
+    quads = groups.get(4, [])
+    trips = groups.get(3, [])
+    pairs = groups.get(2, [])
+    if quads:
+        kickers = [ rank for rank in RANKS if counts[rank] and rank != quads[0] ]
+        value = handValue(QUADS, quads[:1] + kickers[:1])
+    elif trips and ( len(trips) > 1 or pairs ):
+        value = handValue(FLHOUSE, [ trips[0], max(trips[1:] + pairs) ])
+    elif STRAIGHT_TOP[mask] >= 0:
+        value = handValue(STRAIGHT, [ STRAIGHT_TOP[mask] ])
+    elif trips:
+        kickers = [ rank for rank in RANKS if counts[rank] and rank != trips[0] ]
+        value = handValue(TRIPS, trips[:1] + kickers[:2])
+    elif len(pairs) > 1:
+        kickers = [ rank for rank in RANKS if counts[rank] and rank not in pairs[:2] ]
+        value = handValue(TWOPAIR, pairs[:2] + kickers[:1])
+    elif pairs:
+        kickers = [ rank for rank in RANKS if counts[rank] and rank != pairs[0] ]
+        value = handValue(ONEPAIR, pairs[:1] + kickers[:3])
+    else:
+        value = handValue(NOPAIR, _maskRanks(mask)[:5])
+    RANK_VALUES[key] = value
+    return value
+
+def rankValue(key):
+    return RANK_VALUES.get(key) or _rankValue(key)
+
+def hiKeyValue(key, masks):
+    """
+    Value of the hi hand whose rank count key and suit masks are given.
+    """
+    value = RANK_VALUES.get(key) or _rankValue(key)
+    for mask in masks:
+        flush = FLUSH_VALUES[mask]
+        if flush > value:
+            value = flush
+    return value
+
+def hiKeyMasks(cards):
+    """
+    The rank count key and the suit masks of cards.
+    """
+    key = 0
+    masks = [0, 0, 0, 0]
+    for card in cards:
+        key += CARD_KEYS[card]
+        masks[CARD_SUITS[card]] |= CARD_BITS[card]
+    return ( key, masks )
+
+def hiValue(cards):
+    """
+    Value of the best five cards hi hand made with cards (five or more
+    distinct cards).
+    """
+    ( key, masks ) = hiKeyMasks(cards)
+    return hiKeyValue(key, masks)
+
+def lowValue(cards):
+    """
+    Value of the best 8 or better low hand made with cards, LOW_NOTHING
+    if there is none.
+    """
+    mask = 0
+    for card in cards:
+        mask |= CARD_LOW_BITS[card]
+    return LOW_VALUES[mask & 0xFF]
+
+def _pick(cards, rank, count):
+    #
+    # Prefer the cards with the lowest index, as the first
+    # combination found when enumerating cards in order would,
+    # and show them with the highest index first.
+    #
+    chosen = [ card for card in cards if card % 13 == rank ][:count]
+    chosen.reverse()
+    return chosen
+
+def hiCards(value, cards):
+    """
+    The five cards, among the sorted cards, that make the hi hand value,
+    in the order pokereval.PokerEval.best lists them.
+    """
+    hand_type = value >> 24
+    ranks = handRanks(value)
+    if hand_type in (FLUSH, STFLUSH):
+        for suit in xrange(4):
+            suited = [ card for card in cards if card / 13 == suit ]
+            mask = 0
+            for card in suited:
+                mask |= 1 << (card % 13)
+            if FLUSH_VALUES[mask] == value:
+                cards = suited
+                break
+    if hand_type in (STRAIGHT, STFLUSH):
+        top = ranks[0]
+        wanted = [ ( rank, 1 ) for rank in ( [3, 2, 1, 0, ACE] if top == 3 else range(top, top - 5, -1) ) ]
+    else:
+        counts = {
+            NOPAIR: (1, 1, 1, 1, 1),
+            ONEPAIR: (2, 1, 1, 1),
+            TWOPAIR: (2, 2, 1),
+            TRIPS: (3, 1, 1),
+            FLUSH: (1, 1, 1, 1, 1),
+            FLHOUSE: (3, 2),
+            QUADS: (4, 1),
+            }[hand_type]
+        wanted = zip(ranks, counts)
+    result = []
+    for ( rank, count ) in wanted:
+        result.extend(_pick(cards, rank, count))
+    return result
+
+def lowCards(value, cards):
+    result = []
+    for rank in handRanks(value):
+        result.extend(_pick(cards, ACE if rank == 0 else rank - 1, 1))
+    return result
+
+SUIT_PERMUTATIONS = tuple(permutations(range(4)))
+
+def suitIsomorphic(cards_lists):
+    """
+    Canonical form of a list of lists of cards, the same for all the
+    lists that only differ by a renaming of the suits or by the order
+    of the cards within each list. The order of the lists is kept.
+    Cards that are not in the deck (NOCARD) are left untouched.
+    """
+    best = None
+    for permutation in SUIT_PERMUTATIONS:
+        canonical = tuple(
+            tuple(sorted(permutation[card / 13] * 13 + card % 13 if 0 <= card < 52 else card for card in cards))
+            for cards in cards_lists
+            )
+        if best is None or canonical < best:
+            best = canonical
+    return best
+
+class LRUCache:
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default = None):
+        entries = self.entries
+        if key in entries:
+            value = entries.pop(key)
+            entries[key] = value
+            self.hits += 1
+            return value
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        entries = self.entries
+        if key in entries:
+            del entries[key]
+        elif len(entries) >= self.size:
+            entries.popitem(last = False)
+        entries[key] = value
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': self.size,
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': lookups and float(self.hits) / lookups,
+            }
+
+class PokerEvaluator:
+
+    def __init__(self, eval, cache_size = CACHE_SIZE):
+        self.eval = eval
+        self.cache = LRUCache(cache_size)
+        #
+        # cards lists as tuples => suitIsomorphic, see canonical
+        #
+        self.canonicals = {}
+
+    def reset(self):
+        self.cache.clear()
+        self.canonicals.clear()
+
+    def canonical(self, cards_lists):
+        """
+        suitIsomorphic(cards_lists), computed once per cards until
+        reset(): the cards of a hand only change a few times per street.
+        """
+        key = tuple(tuple(cards) for cards in cards_lists)
+        canonical = self.canonicals.get(key)
+        if canonical is None:
+            canonical = self.canonicals[key] = suitIsomorphic(cards_lists)
+        return canonical
+
+    def stats(self):
+        return self.cache.stats()
+
+    def best(self, side, hand, board = []):
+        #
+        # The best hand does not depend on the order of the cards but
+        # the suits matter because the cards are returned
+        #
+        key = ( side, tuple(sorted(hand)), tuple(sorted(board)) )
+        result = self.cache.get(key)
+        if result is None:
+            result = self.evaluate(side, hand, board)
+            self.cache.set(key, result)
+        return result
+
+    def memoize(self, key, function, *args):
+        """
+        Return function(*args), computed once per key until reset().
+        """
+        result = self.cache.get(key)
+        if result is None:
+            result = function(*args)
+            self.cache.set(key, result)
+        return result
+
+    def bestHands(self, requests):
+        """
+        Evaluate a list of ( side, hand, board ) in a single call and
+        return the list of the matching best() results.
+        """
+        best = self.best
+        return [ best(side, hand, board) for ( side, hand, board ) in requests ]
+
+    def evaluate(self, side, hand, board):
+        return self.eval.best(side, hand, board)
+
+class PokerEvalEvaluator(PokerEvaluator):
+    pass
+
+class LookupEvaluator(PokerEvaluator):
+
+    def evaluate(self, side, hand, board):
+        if side not in ('hi', 'low') or not self.canEvaluate(hand, board):
+            return self.eval.best(side, hand, board)
+        if board:
+            return self.evaluateOmaha(side, [ sorted(set(hand)) ], sorted(set(board)))[0]
+        else:
+            return self.evaluateHands(side, [ sorted(set(hand)) ])[0]
+
+    def bestHands(self, requests):
+        """
+        The requests that are not cached are grouped by side and board
+        and each group is evaluated with evaluateHands or evaluateOmaha.
+        """
+        cache = self.cache
+        results = []
+        groups = {}
+        for ( side, hand, board ) in requests:
+            key = ( side, tuple(sorted(hand)), tuple(sorted(board)) )
+            result = cache.get(key)
+            if result is None:
+                if side in ('hi', 'low') and self.canEvaluate(hand, board):
+                    groups.setdefault(( side, tuple(sorted(set(board))) ), []).append(( len(results), key, sorted(set(hand)) ))
+                else:
+                    result = self.eval.best(side, hand, board)
+                    cache.set(key, result)
+            results.append(result)
+        for ( ( side, board ), group ) in groups.iteritems():
+            hands = [ hand for ( position, key, hand ) in group ]
+            if board:
+                evaluated = self.evaluateOmaha(side, hands, list(board))
+            else:
+                evaluated = self.evaluateHands(side, hands)
+            for ( ( position, key, hand ), result ) in zip(group, evaluated):
+                cache.set(key, result)
+                results[position] = result
+        return results
+
+    def canEvaluate(self, hand, board):
+        for card in hand:
+            if card < 0 or card > 51:
+                return False
+        for card in board:
+            if card < 0 or card > 51:
+                return False
+        if board:
+            return len(set(hand)) >= 2 and len(set(board)) >= 3
+        else:
+            return len(set(hand)) >= 5
+
+    def evaluateHands(self, side, hands):
+        """
+        Evaluate hands (sorted lists of five or more distinct cards).
+        The cards found in every hand (the board of a holdem showdown)
+        are accounted for once.
+        """
+        shared = set(hands[0])
+        for cards in hands[1:]:
+            shared.intersection_update(cards)
+        results = []
+        if side == 'hi':
+            ( shared_key, shared_masks ) = hiKeyMasks(shared)
+            for cards in hands:
+                key = shared_key
+                masks = shared_masks[:]
+                for card in cards:
+                    if card not in shared:
+                        key += CARD_KEYS[card]
+                        masks[CARD_SUITS[card]] |= CARD_BITS[card]
+                value = hiKeyValue(key, masks)
+                results.append(( value, [ HAND_NAMES[value >> 24] ] + hiCards(value, cards) ))
+        else:
+            shared_mask = 0
+            for card in shared:
+                shared_mask |= CARD_LOW_BITS[card]
+            for cards in hands:
+                mask = shared_mask
+                for card in cards:
+                    mask |= CARD_LOW_BITS[card]
+                results.append(self.lowResult(LOW_VALUES[mask & 0xFF], cards))
+        return results
+
+    def evaluateOmaha(self, side, hands, board):
+        """
+        Evaluate hands that must use exactly two of their cards and
+        three of the board. The three cards combinations of the board
+        are computed once for all the hands.
+        """
+        hi = side == 'hi'
+        flops = []
+        for flop in combinations(board, 3):
+            if hi:
+                ( key, masks ) = hiKeyMasks(flop)
+            else:
+                masks = None
+                key = 0
+                for card in flop:
+                    key |= CARD_LOW_BITS[card]
+            flops.append(( flop, key, masks ))
+        results = []
+        for hand in hands:
+            best_value = None
+            best_cards = None
+            for pocket in combinations(hand, 2):
+                ( first, second ) = pocket
+                for ( flop, key, masks ) in flops:
+                    if hi:
+                        masks = masks[:]
+                        masks[CARD_SUITS[first]] |= CARD_BITS[first]
+                        masks[CARD_SUITS[second]] |= CARD_BITS[second]
+                        value = hiKeyValue(key + CARD_KEYS[first] + CARD_KEYS[second], masks)
+                        better = best_value is None or value > best_value
+                    else:
+                        value = LOW_VALUES[( key | CARD_LOW_BITS[first] | CARD_LOW_BITS[second] ) & 0xFF]
+                        better = best_value is None or value < best_value
+                    if better:
+                        best_value = value
+                        best_cards = pocket + flop
+            cards = sorted(best_cards)
+            if hi:
+                results.append(( best_value, [ HAND_NAMES[best_value >> 24] ] + hiCards(best_value, cards) ))
+            else:
+                results.append(self.lowResult(best_value, cards))
+        return results
+
+    def lowResult(self, value, cards):
+        if value == LOW_NOTHING:
+            return ( value, [ 'Nothing' ] )
+        return ( value, [ HAND_NAMES[NOPAIR] ] + lowCards(value, cards) )
+
+EVALUATORS = {
+    "pokereval": PokerEvalEvaluator,
+    "lookup": LookupEvaluator,
+}
+
+def get_evaluator(name, eval, cache_size = CACHE_SIZE):
+    if name not in EVALUATORS:
+        raise UserWarning("unknown evaluator %s, expected one of %s" % ( name, sorted(EVALUATORS.keys()) ))
+    return EVALUATORS[name](eval, cache_size)
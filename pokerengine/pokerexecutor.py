@@ -0,0 +1,108 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Executors running the equity simulations of bot decisions outside of
+the thread that plays the game, see PokerGame.setBotExecutor.
+
+An executor implements submit(function, args, callback): it must run
+function(*args) and later call callback(result), or callback(None) if
+function raised, in the thread that plays the game. PokerGame is not
+thread safe and the callback acts on behalf of the bot.
+
+ InlineExecutor   runs the function and the callback immediately
+ FuturesExecutor  wraps a concurrent.futures style executor (a
+                  ProcessPoolExecutor for instance) and hands the
+                  callbacks to a dispatch function (reactor.callFromThread
+                  with twisted) or queues them until poll() is called
+"""
+from collections import deque
+
+from pokerengine import log as engine_log
+log = engine_log.get_child('pokerexecutor')
+
+#
+# PokerEquity of the worker process, see botEquity
+#
+WORKER_EQUITY = []
+
+def botEquity(variant, pockets, board, iterations, time_budget, precision):
+    """
+    PokerEquity.handsEV in a worker. Module level so that it can be
+    pickled by a process pool.
+    """
+    if not WORKER_EQUITY:
+        import pokereval
+        from pokerengine.pokerequity import PokerEquity
+        WORKER_EQUITY.append(PokerEquity(pokereval.PokerEval()))
+    return WORKER_EQUITY[0].handsEV(variant, pockets, board, iterations, time_budget, precision)
+
+class InlineExecutor:
+
+    def submit(self, function, args, callback):
+        try:
+            result = function(*args)
+        except Exception, e:
+            log.error("submit: %s failed: %s", function.__name__, e)
+            result = None
+        callback(result)
+
+class FuturesExecutor:
+
+    def __init__(self, executor, dispatch = None):
+        self.executor = executor
+        self.dispatch = dispatch
+        #
+        # ( callback, result ) waiting for poll() when there is no dispatch
+        #
+        self.done = deque()
+
+    def submit(self, function, args, callback):
+        future = self.executor.submit(function, *args)
+        future.add_done_callback(lambda future: self.resolved(future, callback))
+        return future
+
+    def resolved(self, future, callback):
+        #
+        # Called in the thread of the executor
+        #
+        if future.cancelled() or future.exception() is not None:
+            log.error("resolved: %s", future.cancelled() and "cancelled" or future.exception())
+            result = None
+        else:
+            result = future.result()
+        if self.dispatch:
+            self.dispatch(callback, result)
+        else:
+            self.done.append(( callback, result ))
+
+    def poll(self):
+        """
+        Run the callbacks of the resolved futures, return how many ran.
+        """
+        count = 0
+        while self.done:
+            ( callback, result ) = self.done.popleft()
+            callback(result)
+            count += 1
+        return count
+
+    def shutdown(self, wait = True):
+        self.executor.shutdown(wait)
@@ -29,8 +29,9 @@
 #
 
 import sys
-import re
+import time
 import platform
+import marshal
 
 import pokereval
 
@@ -39,8 +40,14 @@ log = engine_log.get_child('pokergame')
 
 from pokerengine.pokercards import *
 from pokerengine.pokerengineconfig import Config
+from pokerengine.pokerdescriptor import getVariantDescriptor, getBettingStructureDescriptor
+from pokerengine import pokerevaluator
+from pokerengine.pokerequity import PokerEquity
+from pokerengine.pokerpreflop import loadPreflopEquity, equityPath
 from pokerengine.pokerchips import PokerChips
 from pokerengine import pokerrake
+from pokerengine.pokerbetting import compileBetRule
+from pokerengine import pokerinstrument
 from random import Random as Shuffler
 
 import locale
@@ -48,8 +55,7 @@ import gettext
 
 from pprint import pformat
 
-from copy import deepcopy
-from collections import defaultdict
+from collections import namedtuple
 from functools import wraps
 
 def update_player_last_auto_move(fn):
@@ -69,6 +75,42 @@ def update_player_last_auto_move(fn):
         return val
     return new_function
 
+def batch_callbacks(fn):
+    """
+    The events produced while fn runs are delivered to the callbacks
+    registered with batch = True as a single list when it returns,
+    see PokerGame.registerCallback. When fn is not called by another
+    batch_callbacks method, the call is given to the action recorder,
+    see PokerGame.setActionRecorder.
+    """
+    name = fn.__name__
+    @wraps(fn)
+    def new_function(self_, *args, **kw):
+        if self_.callback_depth == 0 and self_.action_recorder is not None:
+            self_.action_recorder.record(name, args, kw)
+        self_.callback_depth += 1
+        try:
+            result = fn(self_, *args, **kw)
+        except:
+            #
+            # Deliver the events produced before the failure, without
+            # letting an exception raised by a callback replace the
+            # exception of fn
+            #
+            exc_info = sys.exc_info()
+            self_.callback_depth -= 1
+            if self_.callback_depth == 0 and self_.callback_batch:
+                try:
+                    self_.flushCallbacks()
+                except Exception:
+                    self_.log.error("%s: flushCallbacks failed while handling %s", name, exc_info[1], exc_info=1)
+            raise exc_info[0], exc_info[1], exc_info[2]
+        self_.callback_depth -= 1
+        if self_.callback_depth == 0 and self_.callback_batch:
+            self_.flushCallbacks()
+        return result
+    return new_function
+
 def init_i18n(locale_dir, overrideTranslationFunction=None):
     global _
 
@@ -137,16 +179,47 @@ AUTO_POLICY_FOLD = 'fold'
 
 AUTO_POLICY_DEFAULT = AUTO_POLICY_FOLD
 
-class PokerPlayer:
+# variants for which the values of the best hands (PokerGame.serial2best)
+# decide the winners of the showdown exactly as pokereval winners() does
+SHOWDOWN_RANKED_VARIANTS = ("holdem", "omaha", "omaha8", "7stud", "7stud8")
+
+# what a player can do, see PokerGame.legalActions
+#  actions    tuple of "call", "raise", "check", "fold", empty if the
+#             player cannot act
+#  to_call, min_raise, max_raise
+#             as returned by PokerGame.betLimitsForSerial
+#  pot_max    the pot limit maximum raise before it is capped by the
+#             player money, None if the betting structure is not pot limit
+#  cap_left   the number of raises left in the betting round
+LegalActions = namedtuple('LegalActions', 'actions to_call min_raise max_raise pot_max cap_left')
+
+class PokerPlayer(object):
+
+    #
+    # One PokerPlayer per seat, keep them small: no per instance
+    # dictionary unless an attribute outside of __slots__ is set and
+    # no logger until one is needed
+    #
+    __slots__ = (
+        'serial', 'name', 'game', '_fold', '_remove_next_turn', '_sit_out',
+        'sit_out_next_turn', 'sit_requested', 'bot', 'auto', 'auto_blind_ante',
+        'auto_muck', 'auto_policy', 'auto_refill', 'auto_rebuy', 'wait_for',
+        'missed_blind', 'missed_big_blind_count', 'blind', 'buy_in_payed',
+        'ante', 'side_pot_index', '_all_in', 'seat', 'hand', 'money',
+        'rebuy_given', '_bet', 'dead', 'talked_once', 'user_data',
+        'raise_count', 'action_issued',
+        '_log', '__dict__', '__weakref__',
+    )
+
+    #
+    # The attributes copied as they are by copy(), hand excepted
+    #
+    COPIED = tuple(name for name in __slots__ if name not in ('hand', '_log', '__dict__', '__weakref__'))
 
-    log = log.get_child('PokerPlayer')
+    player_log = log.get_child('PokerPlayer')
 
     def __init__(self, serial, name, game):
-        self.log = PokerPlayer.log.get_instance(self, refs=[
-            ('Game', game, lambda game: game.id),
-            ('Hand', game, lambda game: game.hand_serial if game.hand_serial > 1 else None),
-            ('Player', self, lambda player: player.serial)
-        ])
+        self._log = None
         self.serial = serial
         self.name = name if name else "noname"
         self.game = game
@@ -181,38 +254,70 @@ class PokerPlayer:
         self.raise_count = 0
         self.action_issued = False
 
+    def _stateChanged(self):
+        #
+        # fold, all_in, sit_out and remove_next_turn select the players
+        # returned by the PokerGame predicates (serialsNotFold, ...)
+        # which are cached until the game player_state_version changes
+        #
+        try:
+            self.game.player_state_version += 1
+        except AttributeError:
+            pass
+
+    def _setFold(self, fold):
+        self._fold = fold
+        self._stateChanged()
+
+    def _setAllIn(self, all_in):
+        self._all_in = all_in
+        self._stateChanged()
+
+    def _setSitOut(self, sit_out):
+        self._sit_out = sit_out
+        self._stateChanged()
+
+    def _setRemoveNextTurn(self, remove_next_turn):
+        self._remove_next_turn = remove_next_turn
+        self._stateChanged()
+
+    def _setBet(self, bet):
+        #
+        # The highest bets are cached until the game bet_version
+        # changes, see PokerGame.__betState
+        #
+        self._bet = bet
+        try:
+            self.game.bet_version += 1
+        except AttributeError:
+            pass
+
+    fold = property(lambda self: self._fold, _setFold)
+    all_in = property(lambda self: self._all_in, _setAllIn)
+    sit_out = property(lambda self: self._sit_out, _setSitOut)
+    remove_next_turn = property(lambda self: self._remove_next_turn, _setRemoveNextTurn)
+    bet = property(lambda self: self._bet, _setBet)
+
+    @property
+    def log(self):
+        if self._log is None:
+            self._log = PokerPlayer.player_log.get_instance(self, refs=[
+                ('Game', self.game, lambda game: game.id),
+                ('Hand', self.game, lambda game: game.hand_serial if game.hand_serial > 1 else None),
+                ('Player', self, lambda player: player.serial)
+            ])
+        return self._log
+
     def copy(self):
-        other = PokerPlayer(self.serial, self.name, self.game)
-        other.fold = self.fold
-        other.remove_next_turn = self.remove_next_turn
-        other.sit_out = self.sit_out
-        other.sit_out_next_turn = self.sit_out_next_turn
-        other.sit_requested = self.sit_requested
-        other.bot = self.bot
-        other.auto = self.auto
-        other.auto_blind_ante = self.auto_blind_ante
-        other.auto_muck = self.auto_muck
-        other.auto_policy = self.auto_policy
-        other.auto_refill = self.auto_refill
-        other.auto_rebuy = self.auto_rebuy
-        other.wait_for = self.wait_for
-        other.missed_blind = self.missed_blind
-        other.missed_big_blind_count = self.missed_big_blind_count
-        other.blind = self.blind
-        other.buy_in_payed = self.buy_in_payed
-        other.ante = self.ante
-        other.side_pot_index = self.side_pot_index
-        other.all_in = self.all_in
-        other.seat = self.seat
+        #
+        # Does not run __init__, the logger of the copy is created
+        # when it is first used
+        #
+        other = object.__new__(self.__class__)
+        for name in PokerPlayer.COPIED:
+            setattr(other, name, getattr(self, name))
         other.hand = self.hand.copy()
-        other.money = self.money
-        other.rebuy_given = self.rebuy_given
-        other.bet = self.bet
-        other.dead = self.dead
-        other.talked_once = self.talked_once
-        other.user_data = self.user_data
-        other.raise_count = self.raise_count
-        other.action_issued = self.action_issued
+        other._log = None
         return other
 
     def __str__(self):
@@ -297,28 +402,28 @@ class PokerPlayer:
         self.ante = False
 
     def isInGame(self):
-        return not self.all_in and not self.fold
+        return not self._all_in and not self._fold
 
     def isAllIn(self):
-        return self.all_in
+        return self._all_in
 
     def isFold(self):
-        return self.fold
+        return self._fold
 
     def isNotFold(self):
-        return not self.fold
+        return not self._fold
 
     def isConnected(self):
-        return not self.remove_next_turn
+        return not self._remove_next_turn
 
     def isDisconnected(self):
-        return self.remove_next_turn
+        return self._remove_next_turn
 
     def isSitOut(self):
-        return self.sit_out
+        return self._sit_out
 
     def isSit(self):
-        return not self.sit_out
+        return not self._sit_out
 
     def isSitRequested(self):
         return self.sit_requested
@@ -352,12 +457,97 @@ class PokerPlayer:
         self.missed_big_blind_count = 0
 
 
-def __historyResolve2messages(game, hands, serial2name, serial2displayed, frame):
-    messages = []
+#
+# translation function => templates, see historyTemplates
+#
+HISTORY_TEMPLATES = {}
+HISTORY_TEMPLATES_MAX = 32
+#
+# readable hand values and cards strings remembered for each
+# translation function
+#
+HAND_VALUES_MAX = 100000
+#
+# events that do not produce a message
+#
+HISTORY_SILENT_EVENTS = frozenset(( "position", "blind_request", "wait_blind", "rebuy", "ante_request", "player_list", "leave", "finish", "muck", "sit" ))
+
+def historyTemplates():
+    """
+    The messages of history2messages translated with the current _(),
+    computed once for each translation function (i.e. each locale).
+    Words are the translated variant names, hand_values the
+    readableHandValueLong of ( game class, side, value, cards ) and
+    cards the cards2string of ( game class, cards ), filled as they
+    are needed: a subclass overriding them gets its own strings.
+    """
+    templates = HISTORY_TEMPLATES.get(_)
+    if templates is None:
+        if len(HISTORY_TEMPLATES) >= HISTORY_TEMPLATES_MAX:
+            HISTORY_TEMPLATES.clear()
+        templates = HISTORY_TEMPLATES[_] = {
+            'words': {},
+            'hand_values': {},
+            'cards': {},
+            'side': { 'hi': '', 'low': '(%s)' % _('low') },
+            'shows': _("%(name)s shows %(value)s %(side)s"),
+            'mucks': _("%(name)s mucks loosing hand"),
+            'tie': _(" tie %(side)s"),
+            'wins': _(" wins %(side)s"),
+            'share': _("winners share a pot of %(pot)s"),
+            'odd_chips': _(" (minus %(chips_left)d odd chips)"),
+            'receives': _("%(name)s receives %(amount)s"),
+            'subject': _("hand #%(hand_serial)d, %(variant)s, %(betting_structure)s"),
+            'wait_for': _("%(serial)s waiting for "),
+            'round': _("%(name)s, %(len_pockets)d players"),
+            'board': _("Board: %(board)s"),
+            'round_cards': _("Cards player %(name)s: %(card)s"),
+            'showdown_board': _("Board: %(cards)s"),
+            'showdown_cards': _("Cards player %(name)s: %(cards)s"),
+            'rake': _("Rake %(amount)s"),
+            'blind_dead': _("%(name)s pays %(amount)s blind and %(dead)d dead"),
+            'blind': _("%(name)s pays %(amount)s blind"),
+            'ante': _("%(name)s pays %(amount)s ante"),
+            'all-in': _("%(name)s is all in"),
+            'call': _("%(name)s calls %(amount)s"),
+            'check': _("%(name)s checks"),
+            'fold': _("%(name)s folds"),
+            'raise': _("%(name)s raises %(amount)s"),
+            'canceled': _("turn canceled"),
+            'returned': _(" (%(amount)s returned to %(name)s)"),
+            'foldwin': _("%(name)s receives %(amount)s (everyone else folded)"),
+            'left_over': _("%(name)s receives %(amount)d odd chips"),
+            'uncalled': _("returning uncalled bet %(amount)s to %(name)s"),
+            'sitOut': _("%(name)s sits out"),
+        }
+    return templates
+
+def historyHandValue(game, templates, side, hand):
+    hand_values = templates['hand_values']
+    key = ( game.__class__, side, hand[0], tuple(hand[1:]) )
+    value = hand_values.get(key)
+    if value is None:
+        if len(hand_values) >= HAND_VALUES_MAX:
+            hand_values.clear()
+        value = hand_values[key] = game.readableHandValueLong(side, hand[0], hand[1:])
+    return value
+
+def historyCards(game, templates, cards):
+    strings = templates['cards']
+    key = ( game.__class__, tuple(cards.toRawList()) )
+    string = strings.get(key)
+    if string is None:
+        if len(strings) >= HAND_VALUES_MAX:
+            strings.clear()
+        string = strings[key] = game.cards2string(cards)
+    return string
+
+def _historyResolve2messages(game, hands, serial2name, serial2displayed, frame, templates):
     best = {
         'hi': 0,
         'low': 0x0FFFFFFF
     }
+    side2fmt = templates['side']
     for serial in frame['serials']:
         for side in ('hi', 'low'):
             if serial not in hands:
@@ -384,214 +574,203 @@ def __historyResolve2messages(game, hands, serial2name, serial2displayed, frame)
                 continue
             if show:
                 serial2displayed[serial] = True
-                value = game.readableHandValueLong(side, hand[1][0], hand[1][1:])
-                side_fmt = '(%s)' % _(side) if side == 'low' else ''
-                messages.append(_("%(name)s shows %(value)s %(side)s") % {
+                yield templates['shows'] % {
                     'name': serial2name(serial),
-                    'value': value,
-                    'side': side_fmt
-                })
+                    'value': historyHandValue(game, templates, side, hand[1]),
+                    'side': side2fmt[side]
+                }
             else:
-                messages.append(_("%(name)s mucks loosing hand") % {
+                yield templates['mucks'] % {
                     'name': serial2name(serial)
-                })
+                }
 
     for side in ('hi', 'low'):
         if side not in frame: continue
         message = ' '.join(serial2name(serial) for serial in frame[side])
-        side_fmt = '(%s)' % _(side) if side == 'low' else ''
+        side_fmt = side2fmt[side]
         if len(frame[side]) > 1:
-            message += _(" tie %(side)s") % {'side': side_fmt}
+            message += templates['tie'] % {'side': side_fmt}
         else:
-            message += _(" wins %(side)s") % {'side': side_fmt}
-        messages.append(message)
+            message += templates['wins'] % {'side': side_fmt}
+        yield message
 
     if len(frame['serial2share']) > 1:
         if 'chips_left' in frame:
-            messages.append(
-                _("winners share a pot of %(pot)s") % {'pot': PokerChips.tostring(frame['pot'])} +
-                _(" (minus %(chips_left)d odd chips)") % {'chips_left': frame['chips_left']}
+            yield (
+                templates['share'] % {'pot': PokerChips.tostring(frame['pot'])} +
+                templates['odd_chips'] % {'chips_left': frame['chips_left']}
             )
         else:
-            messages.append(_("winners share a pot of %(pot)s") % {'pot': PokerChips.tostring(frame['pot'])})
+            yield templates['share'] % {'pot': PokerChips.tostring(frame['pot'])}
 
     for (serial, share) in frame['serial2share'].iteritems():
-        messages.append(_("%(name)s receives %(amount)s") % {
+        yield templates['receives'] % {
             'name': serial2name(serial),
             'amount': PokerChips.tostring(share)
-        })
+        }
 
-    return messages
 
+class PokerHistoryMessages:
+    """
+    The messages of history2messages, yielded one at a time while
+    iterating over the events of history (which can itself be an
+    iterator, pokerhistory.iterHistory for instance). The subject is
+    set when the game event is met.
+    """
 
-def history2messages(game, history, serial2name=str, pocket_messages=False):
-    messages = []
-    subject = ''
-    for event in history:
-        event_type = event[0]
-        if event_type == "game":
-            level, hand_serial, hands_count, time, variant, betting_structure, player_list, dealer, serial2chips = event[1:]
-            subject = _("hand #%(hand_serial)d, %(variant)s, %(betting_structure)s") % {
-                'hand_serial': hand_serial,
-                'variant': _(variant),
-                'betting_structure': betting_structure
-            }
+    def __init__(self, game, history, serial2name=str, pocket_messages=False):
+        self.game = game
+        self.history = history
+        self.serial2name = serial2name
+        self.pocket_messages = pocket_messages
+        self.subject = ''
+
+    def __iter__(self):
+        game = self.game
+        serial2name = self.serial2name
+        pocket_messages = self.pocket_messages
+        templates = historyTemplates()
+        tostring = PokerChips.tostring
+        for event in self.history:
+            event_type = event[0]
+            if event_type in HISTORY_SILENT_EVENTS:
+                pass
 
-        elif event_type == "wait_for":
-            serial, reason = event[1:]
-            messages.append(
-                _("%(serial)s waiting for ") % {'serial': serial2name(serial)} +
-                ("late blind" if reason == "late" else "big blind")
-            )
+            elif event_type == "game":
+                level, hand_serial, hands_count, time, variant, betting_structure, player_list, dealer, serial2chips = event[1:]
+                words = templates['words']
+                if variant not in words:
+                    words[variant] = _(variant)
+                self.subject = templates['subject'] % {
+                    'hand_serial': hand_serial,
+                    'variant': words[variant],
+                    'betting_structure': betting_structure
+                }
 
-        elif event_type == "player_list":
-            pass
+            elif event_type == "wait_for":
+                serial, reason = event[1:]
+                yield (
+                    templates['wait_for'] % {'serial': serial2name(serial)} +
+                    ("late blind" if reason == "late" else "big blind")
+                )
 
-        elif event_type == "round":
-            name, board, pockets = event[1:]
-            if pockets:
-                messages.append(_("%(name)s, %(len_pockets)d players") % {
-                    'name': name,
-                    'len_pockets': len(pockets)
-                })
-            else:
-                messages.append(name)
-            if board and not board.isEmpty():
-                messages.append(_("Board: %(board)s") % {
-                    'board': game.cards2string(board)
-                })
-            if pockets and pocket_messages:
-                for (serial, pocket) in pockets.iteritems():
-                    if not pocket.areAllNocard():
-                        messages.append(_("Cards player %(name)s: %(card)s") % {
-                            'name': serial2name(serial),
-                            'card': game.cards2string(pocket)
-                        })
-        elif event_type == "showdown":
-            board, pockets = event[1:]
-            if board and not board.isEmpty():
-                messages.append(_("Board: %(cards)s") % {
-                    'cards': game.cards2string(board)
-                })
-            if pockets and pocket_messages:
-                for (serial, pocket) in pockets.iteritems():
-                    if not pocket.areAllNocard():
-                        messages.append(_("Cards player %(name)s: %(cards)s") % {
-                            'name': serial2name(serial),
-                            'cards': game.cards2string(pocket)
-                        })
-        elif event_type == "rake":
-            amount = event[1]
-            messages.append(_("Rake %(amount)s") % {
-                'amount': PokerChips.tostring(amount)
-            })
-        elif event_type == "position":
-            pass
-        elif event_type == "blind_request":
-            pass
-        elif event_type == "wait_blind":
-            pass
-        elif event_type == "rebuy":
-            pass
-        elif event_type == "blind":
-            serial, amount, dead = event[1:]
-            if dead:
-                messages.append(_("%(name)s pays %(amount)s blind and %(dead)d dead") % {
-                    'name': serial2name(serial),
-                    'amount': PokerChips.tostring(amount),
-                    'dead': dead,
-                })
-            else:
-                messages.append(_("%(name)s pays %(amount)s blind") % {
-                    'name': serial2name(serial),
-                    'amount': PokerChips.tostring(amount),
-                })
-        elif event_type == "ante_request":
-            pass
-        elif event_type == "ante":
-            serial, amount = event[1:]
-            messages.append(_("%(name)s pays %(amount)s ante") % {
-                'name': serial2name(serial),
-                'amount': PokerChips.tostring(amount)
-            })
-        elif event_type == "all-in":
-            serial = event[1]
-            messages.append(_("%(name)s is all in") % {'name': serial2name(serial)})
-        elif event_type == "call":
-            serial, amount = event[1:]
-            messages.append(_("%(name)s calls %(amount)s") % {
-                'name': serial2name(serial),
-                'amount': PokerChips.tostring(amount)
-            })
-        elif event_type == "check":
-            serial = event[1]
-            messages.append(_("%(name)s checks") % {'name': serial2name(serial)})
-        elif event_type == "fold":
-            serial = event[1]
-            messages.append(_("%(name)s folds") % {'name': serial2name(serial)})
-        elif event_type == "raise":
-            serial, amount = event[1:]
-            messages.append(_("%(name)s raises %(amount)s") % {
-                'name': serial2name(serial),
-                'amount': PokerChips.tostring(amount)
-            })
-        elif event_type == "canceled":
-            serial, amount = event[1:]
-            if serial > 0 and amount > 0:
-                messages.append(_("turn canceled") + _(" (%(amount)s returned to %(name)s)") % {
-                    'amount': PokerChips.tostring(amount),
-                    'name': serial2name(serial)
-                })
-            else:
-                messages.append(_("turn canceled"))
-        elif event_type == "end":
-            winners, showdown_stack = event[1:]
-            if showdown_stack:
-                game_state = showdown_stack[0]
-                if game_state['foldwin']:
-                    serial = winners[0]
-                    messages.append(_("%(name)s receives %(amount)s (everyone else folded)") % {
-                        'name': serial2name(serial),
-                        'amount': PokerChips.tostring(game_state['serial2share'][serial])
-                    })
+            elif event_type == "round":
+                name, board, pockets = event[1:]
+                if pockets:
+                    yield templates['round'] % {
+                        'name': name,
+                        'len_pockets': len(pockets)
+                    }
                 else:
-                    serial2displayed = {}
-                    hands = showdown_stack[0]['serial2best']
-                    for frame in showdown_stack[1:]:
-                        message = None
-                        if frame['type'] == 'left_over':
-                            message = _("%(name)s receives %(amount)d odd chips") % {
-                                'name': serial2name(frame['serial']),
-                                'amount': frame['chips_left']
+                    yield name
+                if board and not board.isEmpty():
+                    yield templates['board'] % {
+                        'board': historyCards(game, templates, board)
+                    }
+                if pockets and pocket_messages:
+                    for (serial, pocket) in pockets.iteritems():
+                        if not pocket.areAllNocard():
+                            yield templates['round_cards'] % {
+                                'name': serial2name(serial),
+                                'card': historyCards(game, templates, pocket)
                             }
-                        elif frame['type'] == 'uncalled':
-                            message = _("returning uncalled bet %(amount)s to %(name)s") % {
-                                'amount': PokerChips.tostring(frame['uncalled']),
-                                'name': serial2name(frame['serial'])
+            elif event_type == "showdown":
+                board, pockets = event[1:]
+                if board and not board.isEmpty():
+                    yield templates['showdown_board'] % {
+                        'cards': historyCards(game, templates, board)
+                    }
+                if pockets and pocket_messages:
+                    for (serial, pocket) in pockets.iteritems():
+                        if not pocket.areAllNocard():
+                            yield templates['showdown_cards'] % {
+                                'name': serial2name(serial),
+                                'cards': historyCards(game, templates, pocket)
                             }
-                        elif frame['type'] == 'resolve':
-                            messages.extend(__historyResolve2messages(game, hands, serial2name, serial2displayed, frame))
-                        else:
-                            engine_log.warn("history2messages unexpected showdown_stack frame type %s (%s)", frame['type'], str(frame))
-                        if message:
-                            messages.append(message)
+            elif event_type == "rake":
+                amount = event[1]
+                yield templates['rake'] % {
+                    'amount': tostring(amount)
+                }
+            elif event_type == "blind":
+                serial, amount, dead = event[1:]
+                if dead:
+                    yield templates['blind_dead'] % {
+                        'name': serial2name(serial),
+                        'amount': tostring(amount),
+                        'dead': dead,
+                    }
+                else:
+                    yield templates['blind'] % {
+                        'name': serial2name(serial),
+                        'amount': tostring(amount),
+                    }
+            elif event_type == "ante":
+                serial, amount = event[1:]
+                yield templates['ante'] % {
+                    'name': serial2name(serial),
+                    'amount': tostring(amount)
+                }
+            elif event_type in ("all-in", "check", "fold", "sitOut"):
+                yield templates[event_type] % {'name': serial2name(event[1])}
+            elif event_type in ("call", "raise"):
+                serial, amount = event[1:]
+                yield templates[event_type] % {
+                    'name': serial2name(serial),
+                    'amount': tostring(amount)
+                }
+            elif event_type == "canceled":
+                serial, amount = event[1:]
+                if serial > 0 and amount > 0:
+                    yield templates['canceled'] + templates['returned'] % {
+                        'amount': tostring(amount),
+                        'name': serial2name(serial)
+                    }
+                else:
+                    yield templates['canceled']
+            elif event_type == "end":
+                winners, showdown_stack = event[1:]
+                if showdown_stack:
+                    game_state = showdown_stack[0]
+                    if game_state['foldwin']:
+                        serial = winners[0]
+                        yield templates['foldwin'] % {
+                            'name': serial2name(serial),
+                            'amount': tostring(game_state['serial2share'][serial])
+                        }
+                    else:
+                        serial2displayed = {}
+                        hands = showdown_stack[0]['serial2best']
+                        for frame in showdown_stack[1:]:
+                            message = None
+                            if frame['type'] == 'left_over':
+                                message = templates['left_over'] % {
+                                    'name': serial2name(frame['serial']),
+                                    'amount': frame['chips_left']
+                                }
+                            elif frame['type'] == 'uncalled':
+                                message = templates['uncalled'] % {
+                                    'amount': tostring(frame['uncalled']),
+                                    'name': serial2name(frame['serial'])
+                                }
+                            elif frame['type'] == 'resolve':
+                                for message in _historyResolve2messages(game, hands, serial2name, serial2displayed, frame, templates):
+                                    yield message
+                                message = None
+                            else:
+                                engine_log.warn("history2messages unexpected showdown_stack frame type %s (%s)", frame['type'], str(frame))
+                            if message:
+                                yield message
+                else:
+                    engine_log.warn("ERROR history2messages ignored empty showdown_stack")
             else:
-                engine_log.warn("ERROR history2messages ignored empty showdown_stack")
-        elif event_type == "sitOut":
-            serial = event[1]
-            messages.append(_("%(name)s sits out") % {'name': serial2name(serial)})
-        elif event_type == "leave":
-            pass
-        elif event_type == "finish":
-            pass
-        elif event_type == "muck":
-            pass
-        elif event_type == "sit":
-            pass
-        else:
-            engine_log.warn("history2messages: unknown history type %s", event_type)
+                engine_log.warn("history2messages: unknown history type %s", event_type)
 
-    return (subject, messages)
+
+def history2messages(game, history, serial2name=str, pocket_messages=False):
+    history_messages = PokerHistoryMessages(game, history, serial2name, pocket_messages)
+    messages = list(history_messages)
+    return (history_messages.subject, messages)
 
 
 # poker game states
@@ -614,6 +793,32 @@ WON_ALLIN = 1  # turn ended on allin
 WON_FOLD = 2  # turn ended on fold
 WON_REGULAR = 3  # turn ended normally
 
+#
+# PokerGame.snapshot format: marshal of ( SNAPSHOT_VERSION, variant,
+# betting_structure, values of SNAPSHOT_ATTRIBUTES, board, deck,
+# players, turn_history ). Changing the attributes requires a new version
+#
+SNAPSHOT_VERSION = 2
+SNAPSHOT_ATTRIBUTES = (
+    'id', 'name', 'prefix', 'level_skin', 'is_open', 'max_players',
+    'hand_serial', 'time', 'time_of_first_hand', 'hands_count', 'stats',
+    'first_turn', 'level', 'state', 'win_condition', 'current_round',
+    'round_info', 'round_info_backup', 'player_list', 'seats_all', 'seats_left',
+    'dealer', 'dealer_seat', 'forced_dealer_seat', 'position', 'last_to_talk',
+    'pot', 'raked_amount', 'round_cap_left', 'last_bet', 'uncalled', 'uncalled_serial',
+    'winners', 'muckable_serials', 'side2winners', 'serial2best', 'showdown_stack',
+    'side_pots', 'first_betting_pass', 'turn_history_is_reduced',
+    'last_auto_action', 'bot_decision_serial', 'pending_decision',
+)
+#
+# The player attributes, the hand is saved as a list of cards
+#
+SNAPSHOT_PLAYER_ATTRIBUTES = tuple(name for name in PokerPlayer.COPIED if name != 'game')
+#
+# The history events holding PokerCards (board and serial => hand)
+#
+SNAPSHOT_CARDS_EVENTS = ( "round", "showdown" )
+
 
 class PokerGame:
 
@@ -632,16 +837,23 @@ class PokerGame:
         self.url = url
 
         self.variant = False
+        self.variant_descriptor = None
         self.variant_name = "unknown"
         self.round_info = False
         self.round_info_backup = False
         self.win_orders = False
 
         self.betting_structure = False
+        self.betting_structure_descriptor = None
         self.betting_structure_name = "unknown"
         self.blind_info = False
         self.ante_info = False
         self.bet_info = False
+        #
+        # Compiled from bet_info when first used, see betRule
+        #
+        self.bet_rules = []
+        self.bet_rules_info = None
         self.unit = 1
         self.buy_in = 0
         self.max_buy_in = 100000000
@@ -670,12 +882,78 @@ class PokerGame:
 
         self.prefix = ""
         self.callbacks = []
+        #
+        # callback => ( events or None, batch ), see registerCallback
+        #
+        self.callback_options = {}
+        #
+        # event => [ ( callback, batch ) ] computed from callback_options
+        #
+        self.callback_routes = {}
+        #
+        # callback => [ event, ... ] not yet delivered to a batch callback
+        # and the nesting of the batch_callbacks methods running
+        #
+        self.callback_batch = {}
+        self.callback_depth = 0
+        #
+        # Receives the calls to the batch_callbacks methods, see
+        # setActionRecorder
+        #
+        self.action_recorder = None
+        #
+        # PokerInstrumentation timing the GAME_METHODS, see setInstrumentation
+        #
+        self.instrumentation = None
+        #
+        # When True, check the incrementally maintained highest bets
+        # against the bets of the players at each use (debug)
+        #
+        self.bet_check = False
+        #
+        # ( key, actions, LegalActions ) of the last possibleActions or
+        # legalActions call, see __legalActionsCache
+        #
+        self.legal_actions = None
 
         self.first_turn = True
 
         self.level_skin = ""
 
         self.eval = pokereval.PokerEval()
+        self.evaluator = pokerevaluator.get_evaluator(pokerevaluator.EVALUATOR_DEFAULT, self.eval)
+        self.equity = PokerEquity(self.eval)
+        self.preflop_equity = None
+        #
+        # Budget of a bot decision: number of runouts, seconds and
+        # standard error (per mille) at which the sampling stops. The
+        # time budget and the precision are off by default, the bots
+        # play the bot_eval_iterations runouts sampled by pokereval as
+        # they always did, see pokerequity
+        #
+        self.bot_eval_iterations = 10000
+        self.bot_eval_time_budget = None
+        self.bot_eval_precision = None
+        #
+        # When set, the bot simulations are submitted to this executor
+        # (see pokerexecutor) and the bot waits for the result at most
+        # bot_decision_timeout seconds of bot_clock, see expireBotDecision
+        #
+        self.bot_executor = None
+        self.bot_decision_timeout = 10
+        self.bot_clock = time.time
+        self.bot_decision_serial = 0
+        self.pending_decision = None
+        #
+        # Iterator of the ( serial, action ) decided by the bots while
+        # a hand is replayed, see pokerreplay.PokerReplay
+        #
+        self.bot_decisions = None
+        #
+        # True while __autoPlay plays, see __autoPlay
+        #
+        self.auto_playing = False
+        self.auto_play_again = False
         if self.is_directing:
             self.shuffler = Shuffler()
         self.reset()
@@ -691,6 +969,14 @@ class PokerGame:
         self.current_round = -2
         self.serial2player = {}
         self.player_list = []
+        #
+        # Results of the player predicates (serialsNotFold, ...), valid
+        # as long as player_state_key matches, see __playerState
+        #
+        self.player_state_version = 0
+        self.player_state_key = None
+        self.player_state_cache = {}
+        self.bet_version = 0
         self.resetSeatsLeft()
         self.dealer = -1
         self.dealer_seat = -1
@@ -728,6 +1014,7 @@ class PokerGame:
             self.max_players = 0
         self.resetSeatsLeft()
         self.serial2player = {}
+        self.player_state_version += 1
 
     def seatsLeftCount(self):
         return len(self.seats_left)
@@ -807,6 +1094,7 @@ class PokerGame:
             serial in self.serial2player and \
             self.serial2player[serial].isSitOut()
 
+    @batch_callbacks
     def sitOutNextTurn(self, serial):
         player = self.serial2player[serial]
         if self.isInTurn(serial) and not (self.isBlindAnteRound() and self.getSerialInPosition() == serial):
@@ -821,6 +1109,7 @@ class PokerGame:
         else:
             return self.sitOut(serial)
 
+    @batch_callbacks
     def sitOut(self, serial):
         player = self.serial2player[serial]
         if player.isSitOut():
@@ -843,6 +1132,7 @@ class PokerGame:
             # the else is impossible because checked above
         return True
 
+    @batch_callbacks
     def sit(self, serial):
         player = self.serial2player[serial]
         
@@ -996,6 +1286,7 @@ class PokerGame:
         player = PokerPlayer(serial, name, self)
         self.seats_left.remove(seat)
         self.serial2player[serial] = player
+        self.player_state_version += 1
         if seat == -1:
             seat = self.getBestSeat()#self.seats_left[0]
         player.seat = seat
@@ -1040,6 +1331,7 @@ class PokerGame:
         else:
             return False
 
+    @batch_callbacks
     def removePlayer(self, serial):
         if self.isInTurn(serial):
             self.serial2player[serial].remove_next_turn = True
@@ -1101,6 +1393,7 @@ class PokerGame:
         else:
             self.log.error("getBestSeat: No free seat found")
 
+    @batch_callbacks
     def beginTurn(self, hand_serial):
         if not self.isEndOrNull():
             self.log.warn("beginTurn: turn is not over yet")
@@ -1121,6 +1414,7 @@ class PokerGame:
         self.showdown_stack = []
         self.turn_history = []
         self.turn_history_is_reduced = False
+        self.evaluator.reset()
         
         if self.levelUp():
             self.setLevel(self.getLevel() + 1)
@@ -1524,6 +1818,7 @@ class PokerGame:
     def bigBlind(self):
         return self.blind_info["big"] if self.blind_info and "big" in self.blind_info else None
 
+    @batch_callbacks
     def autoPayBlindAnte(self):
         if not self.is_directing:
             return
@@ -1675,6 +1970,7 @@ class PokerGame:
 
     def sortPlayerList(self):
         self.player_list.sort(key=lambda i: self.serial2player[i].seat)
+        self.player_state_version += 1
 
     def playersBeginTurn(self):
         for player in self.playersAll():
@@ -1859,6 +2155,7 @@ class PokerGame:
         if serial in self.player_list: self.player_list.remove(serial)
         if serial in self.last_auto_action: del self.last_auto_action[serial]
         del self.serial2player[serial]
+        self.player_state_version += 1
 
     def isBlindAnteRound(self):
         return self.current_round == -1
@@ -2018,6 +2315,22 @@ class PokerGame:
     def betInfo(self):
         return self.bet_info[max(self.current_round,0)]
 
+    def betRule(self):
+        #
+        # PokerGame is an old style class and bet_info cannot be a
+        # property: the rules remember the bet_info they were compiled
+        # from and are dropped when it is assigned another list.
+        #
+        bet_info = self.bet_info
+        if self.bet_rules_info is not bet_info:
+            self.bet_rules = [None] * len(bet_info)
+            self.bet_rules_info = bet_info
+        index = max(self.current_round,0)
+        rule = self.bet_rules[index]
+        if rule is None:
+            rule = self.bet_rules[index] = compileBetRule(bet_info[index])
+        return rule
+
     def getChipUnit(self):
         return self.unit
 
@@ -2107,6 +2420,43 @@ class PokerGame:
                 return None
 
     def possibleActions(self, serial):
+        if serial not in self.serial2player:
+            return []
+        return list(self.__legalActionsCache(serial)[1])
+
+    def legalActions(self, serial):
+        """
+        Return the LegalActions of the player. It is computed once and
+        reused until the position moves or chips move.
+        """
+        cached = self.__legalActionsCache(serial)
+        if cached[2] is None:
+            self.legal_actions = cached = ( cached[0], cached[1], self.__legalActions(serial, cached[1]) )
+        return cached[2]
+
+    def __legalActionsCache(self, serial):
+        #
+        # ( key, actions, LegalActions or None ). The actions are
+        # computed first, the limits (betLimits, pot) only when
+        # legalActions needs them. Betting, folding or going all in
+        # bumps bet_version or player_state_version, the pot, the cap
+        # and the money of the player change when chips move. The cards of the
+        # players are dealt after the position changed: dealCards
+        # forgets the cache and clients, which receive the cards from
+        # the server, also check cardsDealt.
+        #
+        player = self.serial2player[serial]
+        key = (
+            serial, self.hand_serial, self.state, self.position, self.pot,
+            self.round_cap_left, self.last_bet, self.bet_version, self.player_state_version, player.money, player.talked_once,
+            self.bet_info, self.is_directing or not self.isRunning() or self.cardsDealt()
+        )
+        cached = self.legal_actions
+        if cached is None or cached[0] != key:
+            self.legal_actions = cached = ( key, self.__possibleActions(serial), None )
+        return cached
+
+    def __possibleActions(self, serial):
         actions = []
         if self.canAct(serial) and not self.isBlindAnteRound():
             if self.canCall(serial):
@@ -2117,11 +2467,42 @@ class PokerGame:
                 actions.append("check")
             else:
                 actions.append("fold")
-        return actions
+        return tuple(actions)
+
+    def __legalActions(self, serial, actions):
+        if not self.isRunning():
+            return LegalActions(actions, 0, 0, 0, None, 0)
+
+        highest_bet = self.highestBetNotFold()
+        player = self.serial2player[serial]
+        money = player.money
+        bet = player.bet
+        highest_bet_diff = highest_bet - bet
+
+        if self.round_cap_left <= 0:
+            return LegalActions(actions, highest_bet_diff, 0, 0, None, self.round_cap_left)
+
+        min_bet, max_bet = self.betLimits()
+        min_bet = max(min_bet, self.last_bet)
+
+        pot_max = None
+        if max_bet == "money": max_bet = money
+        elif max_bet == "pot":
+            max_bet = max(self.potAndBetsAmount() + highest_bet_diff, min_bet)
+            pot_max = max_bet + highest_bet_diff
+        #
+        # A player can't bet more than he has.
+        # After calling, the amount of money a player has bet is at least min_bet.
+        #
+        to_call = min(money, max(min_bet - bet, highest_bet_diff))
+        min_raise = min(money, min_bet + highest_bet_diff)
+        max_raise = min(money, max_bet + highest_bet_diff)
+        return LegalActions(actions, to_call, min_raise, max_raise, pot_max, self.round_cap_left)
 
     def inSmallBlindPosition(self):
         return self.indexInGameAdd(self.dealer, 1) == self.position
 
+    @batch_callbacks
     @update_player_last_auto_move
     def call(self, serial):
         if self.isBlindAnteRound() or not self.canAct(serial):
@@ -2145,6 +2526,7 @@ class PokerGame:
         self.bet(serial, to_call)
         return True
 
+    @batch_callbacks
     @update_player_last_auto_move
     def callNraise(self, serial, amount):
         if self.isBlindAnteRound() or not self.canAct(serial):
@@ -2188,6 +2570,7 @@ class PokerGame:
         self.money2bet(serial, amount)
         self.__talked(serial)
 
+    @batch_callbacks
     @update_player_last_auto_move
     def check(self, serial):
         if self.isBlindAnteRound() or not self.canAct(serial):
@@ -2212,6 +2595,7 @@ class PokerGame:
         self.__talked(serial)
         return True
 
+    @batch_callbacks
     @update_player_last_auto_move
     def fold(self, serial):
         player = self.serial2player[serial]
@@ -2239,6 +2623,7 @@ class PokerGame:
         self.__talked(serial)
         return True
 
+    @batch_callbacks
     def waitBigBlind(self, serial):
         if not self.blind_info:
             self.log.inform("no blind due")
@@ -2260,6 +2645,7 @@ class PokerGame:
             self.__talkedBlindAnte()
         return True
 
+    @batch_callbacks
     def blind(self, serial, amount=0, dead=0):
         if not self.blind_info:
             self.log.inform("no blind due")
@@ -2313,6 +2699,7 @@ class PokerGame:
         player.resetMissedBlinds()
         player.wait_for = False
 
+    @batch_callbacks
     def ante(self, serial, amount=0):
         if not self.ante_info:
             self.log.inform("no ante due")
@@ -2372,6 +2759,7 @@ class PokerGame:
         else:
             self.nextRound()
 
+    @batch_callbacks
     def muck(self, serial, want_to_muck):
         if not self.is_directing:
             self.log.inform("muck action ignored...")
@@ -2516,8 +2904,10 @@ class PokerGame:
             self.endState()
 
     def __botEval(self, serial):
-        ev = self.handEV(serial, 10000, True)
+        ev = self.handEV(serial, self.bot_eval_iterations, True, self.bot_eval_time_budget, self.bot_eval_precision)
+        return (self.__botAction(ev), ev)
 
+    def __botAction(self, ev):
         if self.state == GAME_STATE_PRE_FLOP:
             if ev < 100:
                 action = "check"
@@ -2547,11 +2937,169 @@ class PokerGame:
             else:
                 action = "raise"
 
-        return (action, ev)
+        return action
+
+    def setBotExecutor(self, executor, timeout = None, clock = None):
+        self.bot_executor = executor
+        if timeout is not None:
+            self.bot_decision_timeout = timeout
+        if clock is not None:
+            self.bot_clock = clock
+
+    def isDecisionPending(self, serial = None):
+        """
+        True if the player in position (or serial, if not None) is a
+        bot waiting for the bot_executor to evaluate its hand.
+        """
+        pending = self.pending_decision
+        if not pending or not self.isRunning() or pending['hand_serial'] != self.hand_serial or pending['state'] != self.state:
+            return False
+        if self.getSerialInPosition() != pending['serial']:
+            return False
+        return serial is None or serial == pending['serial']
+
+    def __submitBotEval(self, serial):
+        request = self.handEVRequest(serial, self.bot_eval_iterations, True, self.bot_eval_time_budget, self.bot_eval_precision)
+        if request is None:
+            return False
+        ( ev, key, index, args ) = request
+        if ev is not None or key in self.evaluator.cache:
+            #
+            # Known without simulation, no need to wait
+            #
+            return False
+        self.__submitBotDecision(self.__pendBotDecision(serial), key, index, args)
+        return True
+
+    def __pendBotDecision(self, serial):
+        self.bot_decision_serial += 1
+        token = self.bot_decision_serial
+        self.pending_decision = {
+            'token': token,
+            'serial': serial,
+            'hand_serial': self.hand_serial,
+            'state': self.state,
+            'deadline': self.bot_clock() + self.bot_decision_timeout,
+            }
+        return token
+
+    def __submitBotDecision(self, token, key, index, args):
+        from pokerengine.pokerexecutor import botEquity
+        self.log.debug("__submitBotDecision: decision %d pending", token)
+        self.bot_executor.submit(botEquity, args, lambda evs: self.botDecision(token, key, index, evs))
+
+    def __botDecide(self, serial):
+        """
+        Return the action of the bot serial or None if it waits for
+        the bot_executor. The decision is given to the action recorder
+        or, while a hand is replayed, is the one that was recorded.
+        """
+        if self.bot_decisions is not None:
+            try:
+                ( decided_serial, desired_action ) = self.bot_decisions.next()
+            except StopIteration:
+                #
+                # The record ends before this decision
+                #
+                self.bot_decisions = None
+            else:
+                if decided_serial != serial:
+                    raise UserWarning("the decision of bot %d is replayed for bot %d" % ( decided_serial, serial ))
+                if desired_action is None:
+                    self.__pendBotDecision(serial)
+                return desired_action
+        if self.bot_executor and self.__submitBotEval(serial):
+            desired_action = None
+        else:
+            desired_action, _ev = self.__botEval(serial)
+        if self.action_recorder is not None:
+            self.action_recorder.botDecided(serial, desired_action)
+        return desired_action
+
+    @batch_callbacks
+    def resumeBotDecision(self):
+        """
+        The pending decision of a bot is lost when the game is rebuilt
+        (restore, pokerreplay): forget it and let the bot decide again,
+        either by submitting a new simulation to the bot_executor or
+        at once.
+        """
+        if not self.pending_decision:
+            return False
+        pending = self.isDecisionPending()
+        self.pending_decision = None
+        if pending:
+            self.__autoPlay()
+        return pending
+
+    @batch_callbacks
+    def botDecision(self, token, key, index, evs):
+        """
+        Called by the bot_executor when the evs of the pending decision
+        token are known. Ignored if the decision expired or the hand
+        moved on in the meantime. If evs is None (the simulation failed)
+        the bot folds, as after the deadline.
+        """
+        pending = self.pending_decision
+        if not pending or pending['token'] != token or not self.isDecisionPending():
+            self.log.debug("botDecision: decision %d is obsolete", token)
+            return False
+        self.pending_decision = None
+        player = self.getPlayer(pending['serial'])
+        if evs is None:
+            desired_action = "fold"
+        else:
+            self.evaluator.cache.set(key, evs)
+            desired_action = self.__botAction(evs[index])
+        self.__autoAction(player, desired_action)
+        return True
+
+    @batch_callbacks
+    def expireBotDecision(self, now = None):
+        """
+        To be called periodically when a bot_executor is set. If the
+        pending decision is past its deadline at now (bot_clock() if
+        None), the bot folds as a player with the AUTO_POLICY_FOLD
+        policy would.
+        """
+        pending = self.pending_decision
+        if not pending:
+            return False
+        if not self.isDecisionPending():
+            self.pending_decision = None
+            return False
+        if now is None:
+            now = self.bot_clock()
+        if now < pending['deadline']:
+            return False
+        self.log.inform("expireBotDecision: player %d did not decide in time", pending['serial'])
+        self.pending_decision = None
+        self.__autoAction(self.getPlayer(pending['serial']), "fold")
+        return True
 
     def __autoPlay(self):
         if not self.is_directing:
             return
+        #
+        # The action of an automatic player gives the position to the
+        # next player, who may be automatic as well: play the next
+        # turn when the action returns instead of recursing, a hand of
+        # bots would otherwise exhaust the stack
+        #
+        if self.auto_playing:
+            self.auto_play_again = True
+            return
+        self.auto_playing = True
+        try:
+            self.auto_play_again = True
+            while self.auto_play_again:
+                self.auto_play_again = False
+                self.__autoPlayTurn()
+        finally:
+            self.auto_playing = False
+            self.auto_play_again = False
+
+    def __autoPlayTurn(self):
         player = self.getPlayerInPosition()
         serial = player.serial
 
@@ -2559,22 +3107,31 @@ class PokerGame:
             serial, player.isBot(), player.isSitOut(), player.isAuto(),
             player.auto_policy
         ))
-        if player.isBot():
-            desired_action, _ev = self.__botEval(serial)
-            actions = set(self.possibleActions(serial))
-            if player.raise_count >= 3: actions -= set(["raise"])
-        elif player.isAuto() and player.auto_policy == AUTO_POLICY_BOT:
-            desired_action, _ev = self.__botEval(serial)
-            actions = set(self.possibleActions(serial)) - set(["raise"])
+        if player.isBot() or player.isAuto() and player.auto_policy == AUTO_POLICY_BOT:
+            if self.isDecisionPending(serial):
+                return
+            desired_action = self.__botDecide(serial)
+            if desired_action is None:
+                return
         elif player.isAuto() and player.auto_policy == AUTO_POLICY_FOLD:
             desired_action = "fold"
-            actions = set(["fold"])
         elif player.isSitOut():
             desired_action = "fold"
-            actions = set(["fold"])
         else:
             return
 
+        self.__autoAction(player, desired_action)
+
+    def __autoAction(self, player, desired_action):
+        serial = player.serial
+        if player.isBot():
+            actions = set(self.possibleActions(serial))
+            if player.raise_count >= 3: actions -= set(["raise"])
+        elif player.isAuto() and player.auto_policy == AUTO_POLICY_BOT:
+            actions = set(self.possibleActions(serial)) - set(["raise"])
+        else:
+            actions = set(["fold"])
+
         self.log.debug("__autoPlay desired action %s", desired_action)
         
         # try to find the next best action if not found in possible actions
@@ -2620,40 +3177,14 @@ class PokerGame:
         return self.variant_name
 
     def setVariant(self, variant):
-        self.__variant.load(self.url % variant)
+        descriptor = getVariantDescriptor(self.dirs, self.url % variant, self.__variant.path)
+        self.__variant = descriptor.config
+        self.variant_descriptor = descriptor
         self.variant = variant
-        self.variant_name = self.getParam("/poker/variant/@name")
-        self.round_info = []
-        self.round_info_backup = []
-        self.win_orders = []
-        for win_order in self.getParamList("/poker/variant/wins/winner/@order"):
-            if win_order == "low8":
-                self.win_orders.append("low")
-            elif win_order == "high":
-                self.win_orders.append("hi")
-            else:
-                self.log.inform("unexpected win order: %s for variant %s", win_order, variant)
-        if not self.win_orders:
-            raise UserWarning("failed to read win orders from %s" % self.__variant.path)
-
-        board_size = 0
-        hand_size = 0
-        for name in self.getParamList("/poker/variant/round/@name"):
-            board = self.getParamList("/poker/variant/round[@name='%s']/deal[@card='board']" % (name,))
-            board_size += len(board)
-            cards = self.getParamList("/poker/variant/round[@name='%s']/deal[@card='up' or @card='down']/@card" % (name,))
-            hand_size += len(cards)
-            position = self.getParam("/poker/variant/round[@name='%s']/position/@type" % (name,))
-            info = {
-                "name": name,
-                "position": position,
-                "board": board,
-                "board_size": board_size,
-                "hand_size": hand_size,
-                "cards": cards,
-            }
-            self.round_info.append(info)
-            self.round_info_backup.append(info.copy())
+        self.variant_name = descriptor.name
+        self.win_orders = list(descriptor.win_orders)
+        self.round_info, self.round_info_backup = descriptor.roundInfo()
+        self.preflop_equity = loadPreflopEquity(equityPath(descriptor.path))
         self.rake = pokerrake.get_rake_instance(self)
 
     def resetRoundInfo(self):
@@ -2670,66 +3201,25 @@ class PokerGame:
         return self.betting_structure_name
 
     def setBettingStructure(self, betting_structure):
-        self.__betting_structure.load(self.url % betting_structure)
+        descriptor = getBettingStructureDescriptor(self.dirs, self.url % betting_structure, self.__betting_structure.path)
+        self.__betting_structure = descriptor.config
+        self.betting_structure_descriptor = descriptor
         self.betting_structure = betting_structure
-        self.betting_structure_name = self.getParam("/bet/description")
-        self.buy_in = int(self.getParam('/bet/@buy-in') or "0")
-        self.max_buy_in = int(self.getParam('/bet/@max-buy-in') or sys.maxint)
-        self.best_buy_in = int(self.getParam('/bet/@best-buy-in') or "0")
-        self.unit = int(self.getParam('/bet/@unit'))
-
-        self.bet_info = self.getParamProperties('/bet/variants[contains(@ids,"' + self.variant + '")]/round')
-        for bet_info in self.bet_info:
-            if 'cap' not in bet_info:
-                bet_info["cap"] = sys.maxint
-            else:
-                bet_info["cap"] = int(bet_info["cap"])
-            if bet_info["cap"] < 0:
-                bet_info["cap"] = sys.maxint
+        self.betting_structure_name = descriptor.name
+        self.buy_in = descriptor.buy_in
+        self.max_buy_in = descriptor.max_buy_in
+        self.best_buy_in = descriptor.best_buy_in
+        self.unit = descriptor.unit
 
-        self.blind_info = False
-        blind_info = self.getParamProperties("/bet/blind")
-        if len(blind_info) > 0:
-            blinds = blind_info[0]
-            self.blind_info = {
-                "change": 'change' in blinds and blinds["change"]
-            }
+        self.bet_info = descriptor.betInfo(self.variant)
 
-            if self.blind_info["change"] != False:
-                self.blind_info["frequency"] = int(blinds["frequency"])
-                self.blind_info["unit"] = blinds["unit"]
-                if self.blind_info["change"] == "levels":
-                    self.blind_info["levels"] = self.loadTournamentLevels(self.getParam('/bet/blind/@levels'))
-                elif self.blind_info["change"] == "double":
-                    self.blind_info["small"] = int(blinds["small"])
-                    self.blind_info["small_reference"] = self.blind_info["small"]
-                    self.blind_info["big"] = int(blinds["big"])
-                    self.blind_info["big_reference"] = self.blind_info["big"]
-            else:
-                self.blind_info["small"] = int(blinds["small"])
-                self.blind_info["big"] = int(blinds["big"])
+        self.blind_info = descriptor.blindInfo()
+        if descriptor.blind_levels is not None:
+            self.blind_info["levels"] = self.loadTournamentLevels(descriptor.blind_levels)
 
-        self.ante_info = False
-        ante_info = self.getParamProperties("/bet/ante")
-        if len(ante_info) > 0:
-            antes = ante_info[0]
-            self.ante_info = {
-                "change": 'change' in antes and antes["change"]
-                }
-
-            if self.ante_info["change"]:
-                self.ante_info["frequency"] = int(antes["frequency"])
-                self.ante_info["unit"] = antes["unit"]
-                if self.ante_info["change"] == "levels":
-                    self.ante_info["levels"] = self.loadTournamentLevels(self.getParam('/bet/ante/@levels'))
-                elif self.ante_info["change"] == "double":
-                    self.ante_info["value"] = int(antes["value"])
-                    self.ante_info["value_reference"] = self.ante_info["value"]
-                    self.ante_info["bring-in"] = int(antes["bring-in"])
-                    self.ante_info["bring-in_reference"] = self.ante_info["bring-in"]
-            else:
-                self.ante_info["value"] = int(antes["value"])
-                self.ante_info["bring-in"] = int(antes["bring-in"])
+        self.ante_info = descriptor.anteInfo()
+        if descriptor.ante_levels is not None:
+            self.ante_info["levels"] = self.loadTournamentLevels(descriptor.ante_levels)
         self.rake = pokerrake.get_rake_instance(self)
 
     def loadTournamentLevels(self, levels_file):
@@ -2765,13 +3255,10 @@ class PokerGame:
         return self.cardsDealtThisRoundCount(lambda x: x == "down")
 
     def getMaxHandSize(self):
-        return len(self.getParamList("/poker/variant/hand/position"))
+        return self.variant_descriptor.max_hand_size
 
     def getMaxBoardSize(self):
-        if self.getParam("/poker/variant/@type") == "community":
-            return len(self.getParamList("/poker/variant/community/position"))
-        else:
-            return 0
+        return self.variant_descriptor.max_board_size
 
     def cardsDealt(self):
         if self.isBlindAnteRound():
@@ -2814,6 +3301,7 @@ class PokerGame:
         for card in info["cards"]:
             for player in self.playersNotFold():
                 player.hand.add(self.deck.pop(), card == "up")
+        self.legal_actions = None
         if len(info["cards"]):
             for serial in self.serialsNotFold():
                 self.log.debug("player %d cards: %s", serial, self.getHandAsString(serial))
@@ -2964,8 +3452,14 @@ class PokerGame:
         #
         # While there is some money left at the table
         #
+        #
+        # Rank the hands once, each side pot is settled by comparing
+        # the values of its potential winners
+        #
+        players_showdown = self.playersNotFoldShowdownSorted()
+        showdown_ranks = self.__showdownRanks(players_showdown)
         while True:
-            potential_winners = filter(lambda player: serial2side_pot.get(player.serial,0) > 0, self.playersNotFoldShowdownSorted())
+            potential_winners = [player for player in players_showdown if serial2side_pot.get(player.serial,0) > 0]
             #
             # Loop ends when there is no more money, i.e. no more
             # players with a side_pot greater than 0
@@ -3041,20 +3535,12 @@ class PokerGame:
             frame['serials'] = [player.serial for player in potential_winners]
 
             self.log.debug(
-                "looking for winners with boards %s\n" + "\n".join("    hand for player %d: %s" for p in potential_winners),
+                "looking for winners with boards %s\n%s",
                 lambda: self.getBoardAsString(),
-                *reduce(lambda a, b: a + b, [(p.serial, self.getHandAsString(p.serial)) for p in potential_winners], ())
+                lambda: "\n".join("    hand for player %d: %s" % (p.serial, self.getHandAsString(p.serial)) for p in potential_winners)
             )
 
-            #
-            #
-            # Ask poker-eval to figure out who the winners actually are
-            #
-            poker_eval = self.eval.winners(
-                game=self.variant,
-                pockets=[player.hand.tolist(True) for player in potential_winners],
-                board=self.board.tolist(True)
-            )
+            poker_eval = self.__showdownWinners(potential_winners, showdown_ranks)
             #
             # Feed local variables with eval results sorted in various
             # forms to ease computing the results.
@@ -3196,6 +3682,50 @@ class PokerGame:
             self.updateHistoryEnd(self.winners, showdown_stack)
         self.log.debug("%s", lambda: pformat(self.showdown_stack))
 
+    def __showdownRanks(self, players):
+        """
+        Return { side: { serial: value } } with the value of the best
+        hand of each player for each side (only the qualifying low
+        hands), or None if the values of serial2best cannot decide the
+        winners and poker-eval must be asked for each pot.
+        """
+        if self.variant not in SHOWDOWN_RANKED_VARIANTS:
+            return None
+        ranks = dict((side, {}) for side in self.win_orders)
+        for player in players:
+            best = self.serial2best.get(player.serial)
+            if best is None:
+                return None
+            for side in self.win_orders:
+                (value, cards) = best[side]
+                if side == 'hi' or cards[0] != 'Nothing':
+                    ranks[side][player.serial] = value
+        return ranks
+
+    def __showdownWinners(self, players, ranks):
+        """
+        Return { side: [index of the winners in players] } as
+        pokereval.PokerEval.winners does.
+        """
+        if ranks is None:
+            return self.eval.winners(
+                game=self.variant,
+                pockets=[player.hand.tolist(True) for player in players],
+                board=self.board.tolist(True)
+            )
+        winners = {}
+        for (side, values) in ranks.iteritems():
+            side_values = [values.get(player.serial) for player in players]
+            if side == 'hi':
+                best = max(side_values)
+            else:
+                qualifying = [value for value in side_values if value is not None]
+                if not qualifying:
+                    continue
+                best = min(qualifying)
+            winners[side] = [index for (index, value) in enumerate(side_values) if value == best]
+        return winners
+
     def divideChips(self, amount, divider):
         return (amount / divider, amount % divider)
 
@@ -3275,18 +3805,40 @@ class PokerGame:
     def showdown(self):
         self.historyAdd("showdown", self.board.copy(), self.handsMap())
 
-    def handEV(self, serial, iterations, self_only=False):
+    def handEV(self, serial, iterations, self_only=False, time_budget=None, precision=None):
+        request = self.handEVRequest(serial, iterations, self_only, time_budget, precision)
+        if request is None:
+            self.log.warn("handEV: player %d is not holding cards in the hand", serial)
+            return None
+        ( ev, key, index, args ) = request
+        if ev is None:
+            ev = self.evaluator.memoize(key, self.equity.handsEV, *args)[index]
+        return ev
+
+    def handEVRequest(self, serial, iterations, self_only=False, time_budget=None, precision=None):
+        """
+        Return None if serial is not in the hand. Otherwise return
+        ( ev, key, index, args ) where ev is not None if it was found
+        in the preflop table. If ev is None, it is
+        PokerEquity.handsEV(*args)[index] and key memoizes the
+        handsEV result in the evaluator.
+        """
         pocket_size = self.getMaxHandSize()
         pockets = []
         serials = self.serialsNotFold()
+        if serial not in serials:
+            return None
+        index = serials.index(serial)
         if self_only:
             #
             # Pretend that the pocket cards of other players are unknown
             #
             pockets = [[PokerCards.NOCARD] * pocket_size] * len(serials)
-            if serial in serials:
-                my_cards = self.getPlayer(serial).hand.tolist(True)
-                pockets[serials.index(serial)] = my_cards
+            my_cards = self.getPlayer(serial).hand.tolist(True)
+            pockets[index] = my_cards
+            ev = self.preflopEV(my_cards, len(serials) - 1)
+            if ev is not None:
+                return ( ev, None, index, None )
         else:
             for pocket in [player.hand.tolist(True) for player in self.playersNotFold()]:
                 if len(pocket) < pocket_size:
@@ -3296,19 +3848,21 @@ class PokerGame:
         board_size = self.getMaxBoardSize()
         if len(board) < board_size:
             board.extend([PokerCards.NOCARD] * (board_size - len(board)))
-        poker_eval = self.eval.poker_eval(
-            game=self.variant,
-            pockets=pockets,
-            board=board,
-            fill_pockets=1,
-            iterations=iterations
-        )
-        if serial in serials:
-            player_index = serials.index(serial)
-            return poker_eval["eval"][player_index]["ev"]
-        else:
-            self.log.warn("handEV: player %d is not holding cards in the hand", serial)
+        key = ('handEV', self.variant, self.evaluator.canonical(pockets + [board]), iterations, time_budget, precision)
+        return ( None, key, index, ( self.variant, pockets, board, iterations, time_budget, precision ) )
+
+    def preflopEV(self, pocket, opponents):
+        """
+        The ev of pocket against opponents unknown hands, read from the
+        precomputed table of the variant, or None if it must be
+        simulated (no table, board cards dealt, incomplete pocket).
+        """
+        equity = self.preflop_equity
+        if not equity or equity.variant != self.variant or self.board.len() > 0:
+            return None
+        if len(pocket) != 2 or PokerCards.NOCARD in pocket or pocket[0] == pocket[1]:
             return None
+        return equity.handEV(pocket, opponents)
 
     def readableHandValueLong(self, side, value, cards):
         cards = self.eval.card2string(cards)
@@ -3413,32 +3967,41 @@ class PokerGame:
                 return _("Straight flush")
         return value
 
+    def setEvaluator(self, name, cache_size = None):
+        self.evaluator = pokerevaluator.get_evaluator(name, self.eval, cache_size or self.evaluator.cache.size)
+
     def bestHands(self, serials):
-        results = {}
+        #
+        # Cannot figure out the best hand for a player with
+        # a placeholder.
+        #
+        serials = [serial for serial in serials if not self.serial2player[serial].hand.hasCard(PokerCards.NOCARD)]
+        requests = []
         for serial in serials:
-            #
-            # Cannot figure out the best hand for a player with
-            # a placeholder.
-            #
-            if self.serial2player[serial].hand.hasCard(PokerCards.NOCARD):
-                continue
-            result = {}
+            hand, board = self.bestHandCardsLists(serial)
             for side in self.win_orders:
-                result[side] = self.bestHand(side, serial)
-            results[serial] = result
+                requests.append((side, hand, board))
+        bests = iter(self.evaluator.bestHands(requests))
+        results = {}
+        for serial in serials:
+            results[serial] = dict((side, bests.next()) for side in self.win_orders)
         return results
 
     def bestCardsAsString(self, bests, serial, side):
         return " ".join(self.eval.card2string(bests[serial][side][1][1:]))
 
-    def bestHand(self, side, serial):
+    def bestHandCardsLists(self, serial):
         if self.variant == "omaha" or self.variant == "omaha8":
             hand = self.serial2player[serial].hand.tolist(True)
             board = self.board.tolist(True)
         else:
             hand = self.serial2player[serial].hand.tolist(True) + self.board.tolist(True)
             board = []
-        return self.eval.best(side, hand, board)
+        return (hand, board)
+
+    def bestHand(self, side, serial):
+        hand, board = self.bestHandCardsLists(serial)
+        return self.evaluator.best(side, hand, board)
 
     def bestHandValue(self, side, serial):
         return self.bestHand(side, serial)[0]
@@ -3471,7 +4034,7 @@ class PokerGame:
 
     def betsNull(self):
         if self.isRunning():
-            return sum([player.bet for player in self.playersNotFold()]) == 0
+            return not self.__betState()[1]
         else:
             return False
 
@@ -3500,11 +4063,13 @@ class PokerGame:
             self.log.inform("money2bet: %d > %d", amount, player.money)
             amount = player.money
         player.money -= amount
+        bet = player.bet
         player.bet += amount
         self.runCallbacks("money2bet", serial, amount)
         if dead_money:
             self.side_pots['building'] += amount
         else:
+            self.__betRaised(player, bet)
             self.__updateUncalled()
             self.updatePots(serial, amount)
         if player.money == 0:
@@ -3512,14 +4077,7 @@ class PokerGame:
             player.all_in = True
 
     def __updateUncalled(self):
-        highest_bet = 0
-        highest_bet_players_count = 0
-        for player in self.playersNotFold():
-            if player.bet > highest_bet:
-                highest_bet = player.bet
-                highest_bet_players_count = 1
-            elif player.bet == highest_bet:
-                highest_bet_players_count += 1
+        ( version, highest_bet, highest_bet_players_count, highest_bet_serial, second_bet, highest_bet_in_game, highest_bet_in_game_count ) = self.__betState()
 
         if highest_bet_players_count == 0:
             raise UserWarning("there should be at least one player in the game")  # pragma: no cover
@@ -3529,13 +4087,95 @@ class PokerGame:
             self.uncalled_serial = 0
             return
 
-        self.uncalled = highest_bet
+        self.uncalled = highest_bet - second_bet
+        self.uncalled_serial = highest_bet_serial
+
+    #
+    # The bets of the players that did not fold are summarized as
+    #
+    #  [ bet_version,
+    #    highest bet, number of players with the highest bet, serial of
+    #    the player with the highest bet (if there is only one),
+    #    highest of the lower bets (0 if none, None if unknown because
+    #    more than one player has the highest bet),
+    #    highest bet of the players in game (None if none), number of
+    #    players in game with that bet ]
+    #
+    # The summary is computed by scanning the players when a player
+    # folds, goes all in, ... or when a bet is set directly and updated
+    # in constant time by money2bet.
+    #
+    def __betScan(self):
+        highest_bet = None
+        count = 0
+        serial = 0
+        second_bet = 0
+        highest_bet_in_game = None
+        count_in_game = 0
         for player in self.playersNotFold():
-            if player.bet != highest_bet and highest_bet - player.bet < self.uncalled:
-                self.uncalled = highest_bet - player.bet
-            if player.bet == highest_bet:
-                self.uncalled_serial = player.serial
-                
+            bet = player.bet
+            if highest_bet is None or bet > highest_bet:
+                if highest_bet is not None:
+                    second_bet = highest_bet
+                highest_bet = bet
+                count = 1
+                serial = player.serial
+            elif bet == highest_bet:
+                count += 1
+            elif bet > second_bet:
+                second_bet = bet
+            if not player.isAllIn():
+                if highest_bet_in_game is None or bet > highest_bet_in_game:
+                    highest_bet_in_game = bet
+                    count_in_game = 1
+                elif bet == highest_bet_in_game:
+                    count_in_game += 1
+        return [ self.bet_version, highest_bet, count, serial, second_bet, highest_bet_in_game, count_in_game ]
+
+    def __betState(self):
+        bets = self.__playerState('bets', self.__betScan)
+        if bets[0] != self.bet_version:
+            bets[:] = self.__betScan()
+        if self.bet_check:
+            scan = self.__betScan()
+            if ( bets[1:3] != scan[1:3] or bets[5:] != scan[5:] or
+                 ( bets[2] == 1 and bets[3:5] != scan[3:5] ) ):
+                raise UserWarning("incremental bets %s differ from the players bets %s" % ( bets, scan ))
+        return bets
+
+    def __betRaised(self, player, bet):
+        #
+        # The bet of player was raised from bet by money2bet
+        #
+        bets = self.__playerState('bets', self.__betScan)
+        version = self.bet_version
+        if bets[0] == version:
+            return
+        if bets[0] != version - 1 or player.isFold():
+            bets[:] = self.__betScan()
+            return
+        bets[0] = version
+        raised = player.bet
+        if raised == bet:
+            return
+        highest_bet = bets[1]
+        if raised > highest_bet:
+            if bet < highest_bet or bets[2] > 1:
+                bets[4] = highest_bet
+            bets[1] = raised
+            bets[2] = 1
+            bets[3] = player.serial
+        elif raised == highest_bet:
+            bets[2] += 1
+            bets[4] = None
+        elif bets[4] is not None and raised > bets[4]:
+            bets[4] = raised
+        if not player.isAllIn():
+            if bets[5] is None or raised > bets[5]:
+                bets[5] = raised
+                bets[6] = 1
+            elif raised == bets[5]:
+                bets[6] += 1
 
     def updatePots(self, serial, amount):
         pot_index = len(self.side_pots['pots']) - 1
@@ -3583,10 +4223,17 @@ class PokerGame:
         self.pot = 0
 
     def highestBetNotFold(self):
-        return max([player.bet for player in self.playersNotFold()])
+        highest_bet = self.__betState()[1]
+        if highest_bet is None:
+            # no player, max() raises as it always did
+            return max([player.bet for player in self.playersNotFold()])
+        return highest_bet
 
     def highestBetInGame(self):
-        return max([player.bet for player in self.playersInGame()])
+        highest_bet = self.__betState()[5]
+        if highest_bet is None:
+            return max([player.bet for player in self.playersInGame()])
+        return highest_bet
 
     def betsEqual(self):
         if self.notFoldCount() > 1 and self.inGameCount() > 0:
@@ -3595,18 +4242,15 @@ class PokerGame:
             # than any of the bets of the players still in game, the
             # bets are not equal.
             #
-            if self.highestBetNotFold() > self.highestBetInGame():
+            bets = self.__betState()
+            if bets[1] > bets[5]:
                 return False
             #
             # If one of the players still in game placed a bet that
             # is different from the others, the bets are not equal.
             #
-            players = self.playersInGame()
-            bet = players[0].bet
-            for player in players:
-                player_bet = player.bet
-                if bet != player_bet:
-                    return False
+            if bets[6] != self.inGameCount():
+                return False
         return True
 
     def __makeSidePots(self):
@@ -3622,68 +4266,67 @@ class PokerGame:
         if not round_contributions:
             return
 
-        serials_by_contribution = round_contributions[len(pots) - 1].items()[:]
-        serials_by_contribution.sort(key=lambda s: s[1], reverse=True)
-        max_contribution_not_fold = 0
-
-        for serial, contribution in serials_by_contribution:
-            if not self.getPlayer(serial).isFold():
+        #
+        # ( contribution, serial, all in, fold, player ) of every
+        # player contributing to the last pot, by increasing contribution
+        #
+        contributions = []
+        max_contribution_not_fold = -1
+        for ( serial, contribution ) in round_contributions[current_pot_index].iteritems():
+            player = self.serial2player[serial]
+            fold = player.isFold()
+            contributions.append(( contribution, serial, player.isAllIn(), fold, player ))
+            if not fold and contribution > max_contribution_not_fold:
                 max_contribution_not_fold = contribution
-                break
-        else:
-            # for: ... else
-            raise UserWarning("every user is fold")
+        contributions.sort()
 
-        def filterPlayers(player):
-            if player.side_pot_index == current_pot_index:
-                if not player.isAllIn():
-                    if max_contribution_not_fold != serials_by_contribution[0][1] and round_contributions[len(pots) - 1].get(player.serial,0) >= max_contribution_not_fold:
-                        return True
-                    return False
-                return True
-            return False
-
-        players = filter(filterPlayers, self.playersAll())
+        if max_contribution_not_fold < 0:
+            raise UserWarning("every user is fold")
+        max_contribution = contributions[-1][0]
 
-        if not players:
-            return
-        # we need to sort by the pot contribution amount
-        # it is possible that someone folded a blind but the big blind is allready all in
-        # because of this, it is possible that the person who is all in didn't contributet the most money
-        # so we need to check also all players.
-        players.sort(key=lambda player: round_contributions[len(pots) - 1].get(player.serial,0))
-        for player in players:
-            pot_contributions = round_contributions[len(pots) - 1]
-            if player.serial not in pot_contributions:
+        #
+        # The pot is split at the contribution of the players who went
+        # all in. It is also split at the contribution of the players
+        # who did not fold when a folded player contributed more than
+        # all of them (someone folded a blind but the big blind is
+        # already all in).
+        #
+        count = len(contributions)
+        splits = [ player.side_pot_index == current_pot_index for ( contribution, serial, all_in, fold, player ) in contributions ]
+        first = 0 # index of the first contribution of the last pot
+        for index in xrange(count):
+            ( contribution, serial, all_in, fold, player ) = contributions[index]
+            if index < first or not splits[index]:
                 continue
-            if len(pot_contributions) == 1:
+            if not all_in and ( max_contribution_not_fold == max_contribution or contribution < max_contribution_not_fold ):
+                continue
+            if count - first == 1:
                 #
                 # This may happen when a player goes all in and
                 # has more chips than all other players
                 #
                 break
-            new_pot_contributions = {}
             pot = pots[last_pot_index]
-            new_pot = [0, 0]
+            pot_contributions = round_contributions[len(pots) - 1]
             new_pot_index = len(pots)
-            contribution = pot_contributions[player.serial]
-            for serial in pot_contributions.keys():
-                other_contribution = pot_contributions[serial]
-                pot_contributions[serial] = min(contribution, other_contribution)
-                remainder = other_contribution - pot_contributions[serial]
-                pot[amount_index] -= remainder
-                pot[total_index] -= remainder
-                other_player = self.getPlayer(serial)
+            new_pot_contributions = {}
+            remainders = 0
+            for other in xrange(first, count):
+                ( other_contribution, other_serial, other_all_in, other_fold, other_player ) = contributions[other]
                 if other_contribution > contribution:
-                    new_pot_contributions[serial] = remainder
-                    new_pot[amount_index] += remainder
-                    other_player.side_pot_index = new_pot_index
-                elif (other_contribution == contribution and
-                       not other_player.isAllIn()):
+                    remainder = other_contribution - contribution
+                    pot_contributions[other_serial] -= remainder
+                    new_pot_contributions[other_serial] = remainder
+                    remainders += remainder
                     other_player.side_pot_index = new_pot_index
+                else:
+                    if other_contribution == contribution and not other_all_in:
+                        other_player.side_pot_index = new_pot_index
+                    first = other + 1
+            pot[amount_index] -= remainders
+            pot[total_index] -= remainders
             round_contributions[new_pot_index] = new_pot_contributions
-            new_pot[total_index] = new_pot[amount_index] + pot[total_index]
-            pots.append(new_pot)
+            pots.append([remainders, remainders + pot[total_index]])
 
     def getPots(self):
         return self.side_pots
@@ -3752,32 +4395,68 @@ class PokerGame:
     def getPlayerLastToTalk(self):
         return self.serial2player[self.player_list[self.last_to_talk]]
 
+    def __playerState(self, name, compute):
+        #
+        # The cache is valid while the same player_list and
+        # serial2player are used and player_state_version does not
+        # change. It is bumped when a player changes state
+        # (PokerPlayer._stateChanged) and wherever PokerGame modifies
+        # player_list or serial2player in place (addPlayer,
+        # __removePlayer, sortPlayerList, setMaxPlayers, restore).
+        # Code modifying them in place from outside PokerGame must
+        # bump it too; the length check is only a safety net.
+        #
+        # The predicates return a copy of the cached list, the caller
+        # may modify it. Copying a list of at most max_players items
+        # is much cheaper than scanning the players again.
+        #
+        player_list = self.player_list
+        serial2player = self.serial2player
+        key = self.player_state_key
+        if ( key is None or key[0] is not player_list or key[1] != len(player_list) or
+             key[2] is not serial2player or key[3] != len(serial2player) or key[4] != self.player_state_version ):
+            self.player_state_key = ( player_list, len(player_list), serial2player, len(serial2player), self.player_state_version )
+            self.player_state_cache = {}
+        cache = self.player_state_cache
+        if name not in cache:
+            cache[name] = compute()
+        return cache[name]
+
     def disconnectedCount(self):
-        return len(self.serialsDisconnected())
+        return len(self.__playerState('serialsDisconnected', self.__serialsDisconnected))
 
     def serialsDisconnected(self):
+        return self.__playerState('serialsDisconnected', self.__serialsDisconnected)[:]
+
+    def __serialsDisconnected(self):
         return [s for s, p in self.serial2player.iteritems() if p.isDisconnected()]
 
     def playersDisconnected(self):
-        return [p for p in self.serial2player.itervalues() if p.isDisconnected()]
+        return self.__playerState('playersDisconnected', lambda: [p for p in self.serial2player.itervalues() if p.isDisconnected()])[:]
 
     def connectedCount(self):
-        return len(self.serialsConnected())
+        return len(self.__playerState('serialsConnected', self.__serialsConnected))
 
     def serialsConnected(self):
+        return self.__playerState('serialsConnected', self.__serialsConnected)[:]
+
+    def __serialsConnected(self):
         return [s for s, p in self.serial2player.iteritems() if p.isConnected()]
 
     def playersConnected(self):
-        return [p for p in self.serial2player.itervalues() if p.isConnected()]
+        return self.__playerState('playersConnected', lambda: [p for p in self.serial2player.itervalues() if p.isConnected()])[:]
 
     def sitOutCount(self):
-        return len(self.serialsSitOut())
+        return len(self.__playerState('serialsSitOut', self.__serialsSitOut))
 
     def serialsSitOut(self):
+        return self.__playerState('serialsSitOut', self.__serialsSitOut)[:]
+
+    def __serialsSitOut(self):
         return [s for s, p in self.serial2player.iteritems() if p.isSitOut()]
 
     def playersSitOut(self):
-        return [p for p in self.serial2player.itervalues() if p.isSitOut()]
+        return self.__playerState('playersSitOut', lambda: [p for p in self.serial2player.itervalues() if p.isSitOut()])[:]
 
     def brokeCount(self):
         return len(self.serialsBroke())
@@ -3789,13 +4468,16 @@ class PokerGame:
         return [p for s, p in self.serial2player.iteritems() if self.isBroke(s)]
 
     def sitCount(self):
-        return len(self.serialsSit())
+        return len(self.__playerState('serialsSit', self.__serialsSit))
 
     def serialsSit(self):
+        return self.__playerState('serialsSit', self.__serialsSit)[:]
+
+    def __serialsSit(self):
         return [s for s, p in self.serial2player.iteritems() if p.isSit()]
 
     def playersSit(self):
-        return [p for p in self.serial2player.itervalues() if p.isSit()]
+        return self.__playerState('playersSit', lambda: [p for p in self.serial2player.itervalues() if p.isSit()])[:]
 
     def notPlayingCount(self):
         if not self.isRunning():
@@ -3871,22 +4553,28 @@ class PokerGame:
         return self.serial2player.values()
 
     def inGameCount(self):
-        return len(self.serialsInGame())
+        return len(self.__playerState('serialsInGame', self.__serialsInGame))
 
     def serialsInGame(self):
+        return self.__playerState('serialsInGame', self.__serialsInGame)[:]
+
+    def __serialsInGame(self):
         return [s for s, p in self.serial2player.iteritems() if s in self.player_list and p.isInGame()]
 
     def playersInGame(self):
-        return [p for s, p in self.serial2player.iteritems() if s in self.player_list and p.isInGame()]
+        return self.__playerState('playersInGame', lambda: [self.serial2player[s] for s in self.__playerState('serialsInGame', self.__serialsInGame)])[:]
 
     def allInCount(self):
-        return len(self.serialsAllIn())
+        return len(self.__playerState('serialsAllIn', self.__serialsAllIn))
 
     def serialsAllIn(self):
+        return self.__playerState('serialsAllIn', self.__serialsAllIn)[:]
+
+    def __serialsAllIn(self):
         return filter(lambda x: self.serial2player[x].isAllIn(), self.player_list)
 
     def playersAllIn(self):
-        return [self.serial2player[serial] for serial in self.serialsAllIn()]
+        return self.__playerState('playersAllIn', lambda: [self.serial2player[serial] for serial in self.__playerState('serialsAllIn', self.__serialsAllIn)])[:]
 
     def serialsNotFoldShowdownSorted(self):
         next_to_dealer = self.indexAdd(self.dealer, 1)
@@ -3897,13 +4585,16 @@ class PokerGame:
         return [self.serial2player[serial] for serial in self.serialsNotFoldShowdownSorted()]
 
     def notFoldCount(self):
-        return len(self.serialsNotFold())
+        return len(self.__playerState('serialsNotFold', self.__serialsNotFold))
 
     def serialsNotFold(self):
+        return self.__playerState('serialsNotFold', self.__serialsNotFold)[:]
+
+    def __serialsNotFold(self):
         return [serial for serial in self.player_list if not self.serial2player[serial].isFold()]
 
     def playersNotFold(self):
-        return [self.serial2player[serial] for serial in self.serialsNotFold()]
+        return self.__playerState('playersNotFold', lambda: [self.serial2player[serial] for serial in self.__playerState('serialsNotFold', self.__serialsNotFold)])[:]
 
     def playersWinner(self):
         return map(lambda serial: self.serial2player[serial], self.winners)
@@ -3927,7 +4618,7 @@ class PokerGame:
     #
     def roundCap(self):
         if self.isRunning():
-            return self.betInfo()["cap"]
+            return self.betRule().cap
         return 0
 
     def betLimits(self):
@@ -3935,60 +4626,13 @@ class PokerGame:
         # Figure out the theorical max/min bet, regarless of the
         # player[serial] bet/money status
         #
-        info = self.betInfo()
-
-        if 'fixed' in info:
-            fixed = int(info["fixed"])
-            min_bet, max_bet = fixed, fixed
-        elif 'pow_level' in info:
-            fixed = int(info["pow_level"]) * pow(2, self.getLevel() - 1)
-            min_bet, max_bet = fixed, fixed
-        else:
-            if 'min' in info:
-                if info["min"] == "big":
-                    min_bet = self.bigBlind()
-                else:
-                    min_bet = int(info["min"])
-            elif 'min_pow_level' in info:
-                min_bet = int(info["min_pow_level"]) * pow(2, self.getLevel() - 1)
-            else:
-                min_bet = 0
-
-            if 'max' in info:
-                if re.match("[0-9]+$", info["max"]):
-                    max_bet = int(info["max"])
-                elif info["max"] == "pot":
-                    max_bet = "pot"
-            else:
-                max_bet = "money"
-                
-        return (min_bet, max_bet)
+        return self.betRule().limits(self)
     
     def betLimitsForSerial(self, serial):
         if not self.isRunning():
             return 0,0,0
-        highest_bet = self.highestBetNotFold()
-        player = self.serial2player[serial]
-        money = player.money
-        bet = player.bet
-        highest_bet_diff = highest_bet - bet
-        
-        if self.round_cap_left <= 0:
-            return (0, 0, highest_bet_diff)
-        
-        min_bet, max_bet = self.betLimits()
-        min_bet = max(min_bet, self.last_bet)
-        
-        if max_bet == "money": max_bet = money
-        elif max_bet == "pot": max_bet = max(self.potAndBetsAmount() + highest_bet_diff, min_bet) 
-        #
-        # A player can't bet more than he has.
-        # After calling, the amount of money a player has bet is at least min_bet.
-        #
-        to_call = min(money, max(min_bet - bet, highest_bet_diff))
-        min_raise = min(money, min_bet + highest_bet_diff)
-        max_raise = min(money, max_bet + highest_bet_diff)
-        return (min_raise, max_raise, to_call)
+        legal_actions = self.legalActions(serial)
+        return (legal_actions.min_raise, legal_actions.max_raise, legal_actions.to_call)
 
     def potAndBetsAmount(self):
         pot = self.pot
@@ -4007,6 +4651,7 @@ class PokerGame:
     def autoMuck(self, serial, auto_muck):
         self.getPlayer(serial).auto_muck = auto_muck
 
+    @batch_callbacks
     def payBuyIn(self, serial, amount):
         if not self.isTournament() and amount > self.maxBuyIn():
             self.log.inform("payBuyIn: maximum buy in is %d and %d is too much", self.maxBuyIn(), amount)
@@ -4020,6 +4665,7 @@ class PokerGame:
             self.log.inform("payBuyIn: minimum buy in is %d but %d is not enough", self.buyIn(), player.money)
             return False
 
+    @batch_callbacks
     def rebuy(self, serial, amount):
         player = self.getPlayer(serial)
         if not player:
@@ -4050,6 +4696,7 @@ class PokerGame:
         if self.isRunning(): player.rebuy_given += amount
         return True
     
+    @batch_callbacks
     def receiveBuyOut(self, serial):
         if not self.is_directing: return
         player = self.getPlayer(serial)
@@ -4104,16 +4751,181 @@ class PokerGame:
     def isEndOrNull(self):
         return self.state == GAME_STATE_NULL or self.state == GAME_STATE_END
 
-    def registerCallback(self, callback):
+    def setInstrumentation(self, instrumentation):
+        """
+        Time the pokerinstrument.GAME_METHODS of the game with the
+        instrumentation (a PokerInstrumentation) or stop timing them if
+        it is None.
+        """
+        pokerinstrument.uninstrument(self, pokerinstrument.GAME_METHODS)
+        self.instrumentation = instrumentation
+        if instrumentation:
+            instrumentation.instrument(self, pokerinstrument.GAME_METHODS)
+
+    def snapshot(self):
+        """
+        Return the state of the game as a string, for restore to set
+        it in another PokerGame built with the same url and dirs (in
+        another process for instance). Only the data of the game is
+        saved: the variant and betting structure are saved by name,
+        the callbacks, the shuffler, the logs, the bot settings and the
+        instrumentation are those of the restored game. The user_data
+        of the players must be None or made of builtin types.
+        """
+        history = []
+        for event in self.turn_history:
+            if event[0] in SNAPSHOT_CARDS_EVENTS:
+                event = tuple([ field.toRawList() if isinstance(field, PokerCards) else
+                                dict(( serial, cards.toRawList() ) for ( serial, cards ) in field.iteritems()) if type(field) is dict else
+                                field for field in event ])
+            history.append(event)
+        players = []
+        for player in self.serial2player.itervalues():
+            values = [ getattr(player, name) for name in SNAPSHOT_PLAYER_ATTRIBUTES ]
+            values.append(player.hand.toRawList())
+            players.append(values)
+        return marshal.dumps((
+            SNAPSHOT_VERSION,
+            self.variant,
+            self.betting_structure,
+            [ getattr(self, name) for name in SNAPSHOT_ATTRIBUTES ],
+            self.blind_info and dict(( key, value ) for ( key, value ) in self.blind_info.iteritems() if key != "levels"),
+            self.ante_info and dict(( key, value ) for ( key, value ) in self.ante_info.iteritems() if key != "levels"),
+            self.board.toRawList(),
+            getattr(self, 'deck', None),
+            players,
+            history,
+            ), 2)
+
+    def restore(self, snapshot, resume = True):
+        """
+        Set the state of the game to the snapshot returned by snapshot.
+        The variant and betting structure are set if they differ, their
+        descriptors are cached (see pokerdescriptor). The decision of a
+        bot that was waiting for the bot_executor is lost: unless
+        resume is False, the bot decides again (see resumeBotDecision).
+        """
+        try:
+            data = marshal.loads(snapshot)
+        except (ValueError, EOFError, TypeError), e:
+            raise UserWarning("restore: invalid snapshot (%s)" % e)
+        if type(data) is not tuple or not data or data[0] != SNAPSHOT_VERSION:
+            raise UserWarning("restore: snapshot version %s, expected %d" % ( type(data) is tuple and data and data[0], SNAPSHOT_VERSION ))
+        ( version, variant, betting_structure, values, blind_info, ante_info, board, deck, players, history ) = data
+        if variant and self.variant != variant:
+            self.setVariant(variant)
+        if betting_structure and self.betting_structure != betting_structure:
+            self.setBettingStructure(betting_structure)
+        for ( name, value ) in zip(SNAPSHOT_ATTRIBUTES, values):
+            setattr(self, name, value)
+        #
+        # The lists of cards of round_info are shared with
+        # round_info_backup (see pokerdescriptor.roundInfo) and
+        # changed in place when the deck is short (see dealCards)
+        #
+        for ( info, backup ) in zip(self.round_info, self.round_info_backup):
+            for key in ( "board", "cards" ):
+                if info[key] == backup[key]:
+                    info[key] = backup[key]
+        #
+        # The levels of the tournaments are shared, see loadTournamentLevels
+        #
+        if blind_info and self.blind_info and "levels" in self.blind_info:
+            blind_info["levels"] = self.blind_info["levels"]
+        self.blind_info = blind_info
+        if ante_info and self.ante_info and "levels" in self.ante_info:
+            ante_info["levels"] = self.ante_info["levels"]
+        self.ante_info = ante_info
+        fromRawList = PokerCards.fromRawList
+        self.board = fromRawList(board)
+        if deck is not None:
+            self.deck = deck
+        serial2player = {}
+        for values in players:
+            player = object.__new__(PokerPlayer)
+            for ( name, value ) in zip(SNAPSHOT_PLAYER_ATTRIBUTES, values):
+                setattr(player, name, value)
+            player.hand = fromRawList(values[-1])
+            player.game = self
+            player._log = None
+            serial2player[player.serial] = player
+        self.serial2player = serial2player
+        for ( index, event ) in enumerate(history):
+            if event[0] in SNAPSHOT_CARDS_EVENTS:
+                history[index] = tuple([ fromRawList(field) if type(field) is list else
+                                         dict(( serial, fromRawList(cards) ) for ( serial, cards ) in field.iteritems()) if type(field) is dict else
+                                         field for field in event ])
+        self.turn_history = history
+        self.player_state_version += 1
+        self.player_state_key = None
+        self.player_state_cache = {}
+        self.bet_version += 1
+        self.legal_actions = None
+        self.callback_batch = {}
+        if resume and self.pending_decision:
+            self.resumeBotDecision()
+
+    def setActionRecorder(self, recorder):
+        """
+        Call recorder.record(name, args, kw) before running a method
+        decorated with batch_callbacks (beginTurn, blind, call, fold,
+        ...) unless it is called by another of these methods, or stop
+        if recorder is None. See pokerreplay.PokerHandRecorder.
+        """
+        self.action_recorder = recorder
+
+    def registerCallback(self, callback, events = None, batch = False):
+        """
+        Call callback(game_id, event, *args) for each event of the game,
+        or only those listed in events if it is not None. If batch is
+        True, call callback(game_id, [ ( event, *args ), ... ]) once
+        with all the events produced by a call to the game (call,
+        fold, beginTurn, sit, ...), in order.
+        """
         if not callback in self.callbacks:
             self.callbacks.append(callback)
+        self.callback_options[callback] = ( events is not None and frozenset(events) or None, batch )
+        self.callback_routes = {}
 
     def unregisterCallback(self, callback):
         self.callbacks.remove(callback)
+        del self.callback_options[callback]
+        self.callback_routes = {}
+        self.callback_batch.pop(callback, None)
 
-    def runCallbacks(self, *args):
+    def __callbackRoutes(self, event):
+        routes = []
         for callback in self.callbacks:
-            callback(self.id, *args)
+            ( events, batch ) = self.callback_options.get(callback, ( None, False ))
+            if events is None or event in events:
+                routes.append(( callback, batch ))
+        self.callback_routes[event] = routes
+        return routes
+
+    def runCallbacks(self, *args):
+        event = args[0] if args else None
+        routes = self.callback_routes.get(event)
+        if routes is None:
+            routes = self.__callbackRoutes(event)
+        for ( callback, batch ) in routes:
+            if not batch:
+                callback(self.id, *args)
+            elif self.callback_depth > 0:
+                self.callback_batch.setdefault(callback, []).append(args)
+            else:
+                callback(self.id, [ args ])
+
+    def flushCallbacks(self):
+        """
+        Deliver the events waiting for the batch callbacks.
+        """
+        while self.callback_batch:
+            pending = self.callback_batch
+            self.callback_batch = {}
+            for callback in self.callbacks[:]:
+                events = pending.get(callback)
+                if events:
+                    callback(self.id, events)
 
     def historyAddNoDuplicate(self, *args):
         if len(self.turn_history) < 1 or self.turn_history[-1] != args:
@@ -4150,92 +4962,85 @@ class PokerGame:
     
     @staticmethod
     def _historyReduce(turn_history, money_map, in_place=False):
+        """
+        Remove the sit, sitOut, blind_request, ... events that happened
+        before the game started and rewrite the positions accordingly.
+        Unless in_place is True, turn_history is left untouched and the
+        reduced history shares its events, except for the game event
+        and the position events that need to be rewritten.
+        """
         player_list_index = 7
         serial2chips_index = 9
         
-        if not in_place: turn_history = deepcopy(turn_history)
-            
-        game_event = None
+        game_index = None
         player_list_new = None
         #
         # parse events
-        remove_indexes = []
-        sitouts_for_player = defaultdict(list)
-        sits_for_player = defaultdict(list)
-        index = 0
+        remove_indexes = set()
         for index,event in enumerate(turn_history):
             event_type = event[0]
             if PokerGame._historyFinalEvent(event):
                 break
             elif event_type == 'game':
-                game_event = turn_history[index]
-            elif event_type == 'sit':
-                remove_indexes.append(index)
-                sits_for_player[event[1]].append(index)
-            elif event_type in ('blind_request','ante_request'):
-                remove_indexes.append(index)
-            elif event_type in ('sitOut','wait_blind'):
-                remove_indexes.append(index)
-                sitouts_for_player[event[1]].append(index)
-            elif event_type == 'wait_for':
-                remove_indexes.append(index)
-                sitouts_for_player[event[1]].append(index)
+                game_index = index
+            elif event_type in ('sit','blind_request','ante_request','sitOut','wait_blind','wait_for'):
+                remove_indexes.add(index)
             elif event_type == 'player_list':
-                remove_indexes.append(index)
+                remove_indexes.add(index)
                 player_list_new = event[1]
+        game_event = turn_history[game_index] if game_index is not None else None
         #
         # recreate playerlist.
         # either use the player list, if their is some
         if player_list_new is not None:
-            for serial in set(game_event[player_list_index]) - set(player_list_new):
-                del game_event[serial2chips_index][serial]
-            for serial in set(player_list_new) - set(game_event[player_list_index]):
-                game_event[serial2chips_index][serial] = money_map[serial]
-            game_event[player_list_index][:] = player_list_new
-            for index,event in enumerate(turn_history):
-                if event[0] == 'rebuy' and event[1] in player_list_new:
-                    remove_indexes.append(index)
-        #
-        # recreate and mark positions if needed
-        for p_index in range(0,len(turn_history)):
-            if (
-                not turn_history[p_index][0] == "position" or 
-                not turn_history[p_index][1] >= 0 
-                or p_index in remove_indexes
-            ):
-                continue
-            event_type, position, serial = turn_history[p_index]
-            position_reduced = game_event[player_list_index].index(serial) \
-                if serial is not None and serial in game_event[player_list_index] \
-                else None
-            if position == position_reduced:
-                pass # no need to replace if it's already equal
-            elif position_reduced is not None and position >= 0: 
-                turn_history[p_index] = (event_type, position_reduced, serial)
-            else:
-                remove_indexes.append(p_index)
+            if not in_place:
+                clone = list(game_event)
+                clone[serial2chips_index] = dict(game_event[serial2chips_index])
+                clone[player_list_index] = list(game_event[player_list_index])
+                game_event = tuple(clone) if isinstance(game_event, tuple) else clone
+            player_list = game_event[player_list_index]
+            serial2chips = game_event[serial2chips_index]
+            for serial in set(player_list) - set(player_list_new):
+                del serial2chips[serial]
+            for serial in set(player_list_new) - set(player_list):
+                serial2chips[serial] = money_map[serial]
+            player_list[:] = player_list_new
+            rebuy_serials = set(player_list_new)
+        else:
+            rebuy_serials = ()
+        serial2position = {}
+        if game_event is not None:
+            for position, serial in enumerate(game_event[player_list_index]):
+                serial2position.setdefault(serial, position)
         #
-        # delete duplicate positions
+        # keep the events that are not obsolete, recreate positions if
+        # needed and delete duplicate positions
+        reduced = []
         pos_last = None
-        for p_index in range(0,len(turn_history)):
-            if (
-                not turn_history[p_index][0] == "position" or 
-                not turn_history[p_index][1] >= 0 
-                or p_index in remove_indexes
-            ):
+        for index,event in enumerate(turn_history):
+            if index in remove_indexes:
                 continue
-            pos_current = turn_history[p_index]
-            if pos_current == pos_last:
-                remove_indexes.append(p_index)
-            else:
-                pos_last = pos_current
-        #
-        # delete all obsolete elements
-        for index in sorted(remove_indexes,reverse=True):
-            del turn_history[index]
+            event_type = event[0]
+            if event_type == 'position' and event[1] >= 0:
+                event_type, position, serial = event
+                position_reduced = serial2position.get(serial) if serial is not None else None
+                if position_reduced is None:
+                    continue
+                elif position != position_reduced:
+                    event = (event_type, position_reduced, serial)
+                if event == pos_last:
+                    continue
+                pos_last = event
+            elif event_type == 'rebuy' and event[1] in rebuy_serials:
+                continue
+            elif index == game_index:
+                event = game_event
+            reduced.append(event)
         
-        if not in_place:
-            return turn_history
+        if in_place:
+            turn_history[:] = reduced
+        else:
+            return reduced
 
 
 class PokerGameServer(PokerGame):
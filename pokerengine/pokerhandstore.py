@@ -0,0 +1,445 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Append only archive of hand histories, indexed by hand serial.
+
+The histories are encoded with pokerhistory and appended to segment
+files (NNNNNNNNNN.hands) until they reach segment_size, then a new
+segment is started. Each record of a segment is the hand serial, the
+length of the encoded history and the encoded history (RECORD).
+
+When a segment is full or the store is closed, the serials of the
+segment are written, sorted, to its index (NNNNNNNNNN.index): the
+number of bytes of the segment covered by the index (INDEX_HEADER)
+followed by one INDEX_ENTRY (hand serial, offset of the record,
+length of the history) per hand. A lookup is a binary search in the
+mmap of the index of the segments whose serial range contains the
+hand serial, followed by a read of the history in the mmap of the
+segment: only the pages touched are read from disk and memory does not
+grow with the number of hands archived. At most MAPS segments are
+mapped at the same time. When the hand serials are archived in
+increasing order, the segment is found with a binary search on the
+first serial of the segments, otherwise they are all tried, most
+recent first.
+
+If the store was not closed (the process crashed), the records beyond
+what the index covers are found by reading the end of the segment and
+a record cut short is discarded.
+
+A hand serial archived twice is found in the most recent segment it
+was archived in and is counted once.
+"""
+import os
+import mmap
+from os import path
+from bisect import bisect_right
+from struct import Struct
+from collections import OrderedDict
+
+from pokerengine.pokerhistory import encodeHistory, decodeHistory
+
+from pokerengine import log as engine_log
+log = engine_log.get_child('pokerhandstore')
+
+RECORD = Struct("<QI")
+INDEX_HEADER = Struct("<Q")
+INDEX_ENTRY = Struct("<QQI")
+
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+MAPS = 64
+
+class PokerHandSegment:
+
+    def __init__(self, directory, number):
+        self.number = number
+        self.data_path = path.join(directory, "%010d.hands" % number)
+        self.index_path = path.join(directory, "%010d.index" % number)
+        self.size = 0
+        self.count = 0
+        self.first = None
+        self.last = None
+        #
+        # hand serial => ( offset, length ) while the segment is
+        # written, the index is used otherwise
+        #
+        self.entries = None
+        self.writer = None
+        self.reader = None
+
+    def load(self):
+        """
+        Check that the index covers the whole segment, update it
+        otherwise.
+        """
+        self.size = path.getsize(self.data_path)
+        covered = 0
+        if path.exists(self.index_path):
+            index = open(self.index_path, "rb")
+            header = index.read(INDEX_HEADER.size)
+            if len(header) == INDEX_HEADER.size:
+                ( covered, ) = INDEX_HEADER.unpack(header)
+            if covered == self.size:
+                self.count = (path.getsize(self.index_path) - INDEX_HEADER.size) / INDEX_ENTRY.size
+                if self.count > 0:
+                    self.first = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))[0]
+                    index.seek(-INDEX_ENTRY.size, os.SEEK_END)
+                    self.last = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))[0]
+                index.close()
+                return
+            index.close()
+        if 0 < covered < self.size:
+            self.entries = self.readEntries()
+        else:
+            self.entries = {}
+            covered = 0
+        self.recover(covered)
+        self.seal()
+
+    def readEntries(self):
+        entries = {}
+        index = open(self.index_path, "rb")
+        index.seek(INDEX_HEADER.size)
+        while True:
+            entry = index.read(INDEX_ENTRY.size)
+            if len(entry) < INDEX_ENTRY.size:
+                break
+            ( hand_serial, offset, length ) = INDEX_ENTRY.unpack(entry)
+            entries[hand_serial] = ( offset, length )
+        index.close()
+        return entries
+
+    def recover(self, offset):
+        data = open(self.data_path, "rb")
+        data.seek(offset)
+        while True:
+            header = data.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            ( hand_serial, length ) = RECORD.unpack(header)
+            if len(data.read(length)) < length:
+                break
+            self.entries[hand_serial] = ( offset, length )
+            offset += RECORD.size + length
+        data.close()
+        if offset < self.size:
+            log.warn("%s: discard %d bytes of a record cut short", self.data_path, self.size - offset)
+            data = open(self.data_path, "r+b")
+            data.truncate(offset)
+            data.close()
+        self.size = offset
+        self.count = len(self.entries)
+        if self.entries:
+            self.first = min(self.entries)
+            self.last = max(self.entries)
+
+    def reopen(self):
+        """
+        Append to a segment that has an index.
+        """
+        if self.count > 0:
+            self.entries = self.readEntries()
+        else:
+            self.entries = {}
+        self.writer = open(self.data_path, "ab")
+
+    def create(self):
+        self.entries = {}
+        self.writer = open(self.data_path, "ab")
+
+    def append(self, hand_serial, data):
+        offset = self.size
+        self.writer.write(RECORD.pack(hand_serial, len(data)))
+        self.writer.write(data)
+        self.size += RECORD.size + len(data)
+        if hand_serial not in self.entries:
+            self.count += 1
+        self.entries[hand_serial] = ( offset, len(data) )
+        if self.first is None or hand_serial < self.first:
+            self.first = hand_serial
+        if self.last is None or hand_serial > self.last:
+            self.last = hand_serial
+
+    def flush(self, sync = False):
+        if self.writer:
+            self.writer.flush()
+            if sync:
+                os.fsync(self.writer.fileno())
+
+    def read(self, hand_serial):
+        """
+        Encoded history of hand_serial in the segment being written.
+        """
+        entry = self.entries.get(hand_serial)
+        if entry is None:
+            return None
+        ( offset, length ) = entry
+        self.flush()
+        if self.reader is None:
+            self.reader = open(self.data_path, "rb")
+        self.reader.seek(offset + RECORD.size)
+        return self.reader.read(length)
+
+    def seal(self):
+        """
+        Write the index of the segment and stop writing to it.
+        """
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+        index = open(self.index_path + ".tmp", "wb")
+        index.write(INDEX_HEADER.pack(self.size))
+        for hand_serial in sorted(self.entries):
+            ( offset, length ) = self.entries[hand_serial]
+            index.write(INDEX_ENTRY.pack(hand_serial, offset, length))
+        index.flush()
+        os.fsync(index.fileno())
+        index.close()
+        os.rename(self.index_path + ".tmp", self.index_path)
+        self.entries = None
+
+class PokerHandStore:
+
+    def __init__(self, directory, segment_size = SEGMENT_SIZE, maps = MAPS):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.maps_size = maps
+        #
+        # segment number => ( segment mmap, index mmap ), least
+        # recently used first
+        #
+        self.maps = OrderedDict()
+        if not path.isdir(directory):
+            os.makedirs(directory)
+        numbers = sorted(int(name[:-len(".hands")]) for name in os.listdir(directory) if name.endswith(".hands"))
+        self.segments = []
+        #
+        # the segments that are no longer written and have hands, their
+        # first hand serial, the highest hand serial they contain and
+        # whether their serials ranges follow each other
+        #
+        self.sealed = []
+        self.firsts = []
+        self.last = None
+        self.ordered = True
+        #
+        # number of distinct hand serials, counted when first needed
+        #
+        self.length = None
+        for number in numbers:
+            segment = PokerHandSegment(directory, number)
+            segment.load()
+            self.segments.append(segment)
+        if self.segments and self.segments[-1].size < segment_size:
+            self.active = self.segments[-1]
+            self.active.reopen()
+        else:
+            self.active = None
+        for segment in self.segments:
+            if segment is not self.active:
+                self.addSealed(segment)
+        if self.active is None:
+            self.newSegment()
+
+    def addSealed(self, segment):
+        if segment.count == 0:
+            return
+        if self.sealed and segment.first <= self.last:
+            self.ordered = False
+        self.sealed.append(segment)
+        self.firsts.append(segment.first)
+        if self.last is None or segment.last > self.last:
+            self.last = segment.last
+
+    def newSegment(self):
+        number = self.segments and self.segments[-1].number + 1 or 0
+        self.active = PokerHandSegment(self.directory, number)
+        self.active.create()
+        self.segments.append(self.active)
+
+    def append(self, hand_serial, history):
+        """
+        Archive the history (the list returned by PokerGame.historyGet)
+        of hand_serial.
+        """
+        self.appendEncoded(hand_serial, encodeHistory(history))
+
+    def appendEncoded(self, hand_serial, data):
+        """
+        Archive a history encoded with pokerhistory.encodeHistory.
+        """
+        if self.active is None:
+            raise UserWarning("PokerHandStore: cannot append hand %d to %s, it is closed" % ( hand_serial, self.directory ))
+        if self.length is not None and not self.isArchived(hand_serial):
+            self.length += 1
+        if self.active.size > 0 and self.active.size + RECORD.size + len(data) > self.segment_size:
+            self.active.seal()
+            self.addSealed(self.active)
+            self.newSegment()
+        self.active.append(hand_serial, data)
+
+    def flush(self, sync = False):
+        """
+        Write the histories to the operating system and, if sync is
+        True, wait for them to be written to disk.
+        """
+        if self.active is None:
+            raise UserWarning("PokerHandStore: cannot flush %s, it is closed" % self.directory)
+        self.active.flush(sync)
+
+    def close(self):
+        self.active.seal()
+        self.addSealed(self.active)
+        self.active = None
+        for ( data_map, index_map ) in self.maps.itervalues():
+            data_map.close()
+            index_map.close()
+        self.maps.clear()
+
+    def map(self, segment):
+        maps = self.maps.pop(segment.number, None)
+        if maps is None:
+            if len(self.maps) >= self.maps_size:
+                ( data_map, index_map ) = self.maps.popitem(last = False)[1]
+                data_map.close()
+                index_map.close()
+            maps = []
+            for filename in ( segment.data_path, segment.index_path ):
+                fileobj = open(filename, "rb")
+                maps.append(mmap.mmap(fileobj.fileno(), 0, access = mmap.ACCESS_READ))
+                fileobj.close()
+            maps = tuple(maps)
+        self.maps[segment.number] = maps
+        return maps
+
+    def getEncoded(self, hand_serial):
+        """
+        Return the encoded history of hand_serial or None if it is not
+        archived.
+        """
+        active = self.active
+        if active and active.count > 0 and active.first <= hand_serial <= active.last:
+            data = active.read(hand_serial)
+            if data is not None:
+                return data
+        return self.getSealedEncoded(hand_serial)
+
+    def getSealedEncoded(self, hand_serial):
+        if self.ordered:
+            index = bisect_right(self.firsts, hand_serial) - 1
+            segments = index >= 0 and self.sealed[index:index + 1] or []
+        else:
+            segments = reversed(self.sealed)
+        for segment in segments:
+            if not segment.first <= hand_serial <= segment.last:
+                continue
+            ( data_map, index_map ) = self.map(segment)
+            low = 0
+            high = segment.count
+            while low < high:
+                middle = (low + high) / 2
+                ( serial, offset, length ) = INDEX_ENTRY.unpack_from(index_map, INDEX_HEADER.size + middle * INDEX_ENTRY.size)
+                if serial < hand_serial:
+                    low = middle + 1
+                elif serial > hand_serial:
+                    high = middle
+                else:
+                    offset += RECORD.size
+                    return data_map[offset:offset + length]
+        return None
+
+    def get(self, hand_serial):
+        """
+        Return the history of hand_serial or None if it is not archived.
+        """
+        data = self.getEncoded(hand_serial)
+        if data is None:
+            return None
+        return decodeHistory(data)
+
+    def __contains__(self, hand_serial):
+        return self.getEncoded(hand_serial) is not None
+
+    def isArchived(self, hand_serial):
+        active = self.active
+        if active and hand_serial in active.entries:
+            return True
+        if self.last is None or hand_serial > self.last:
+            return False
+        return self.getSealedEncoded(hand_serial) is not None
+
+    def __len__(self):
+        if self.length is None:
+            self.length = self.countHands()
+        return self.length
+
+    def countHands(self):
+        """
+        Count the distinct hand serials. The counts of the segments
+        are added when their serial ranges do not overlap, otherwise
+        the serials of the indexes are collected.
+        """
+        active = self.active
+        if self.ordered and ( active is None or active.count == 0 or self.last is None or active.first > self.last ):
+            return sum(segment.count for segment in self.segments)
+        serials = set()
+        for segment in self.sealed:
+            ( data_map, index_map ) = self.map(segment)
+            for index in xrange(segment.count):
+                serials.add(INDEX_ENTRY.unpack_from(index_map, INDEX_HEADER.size + index * INDEX_ENTRY.size)[0])
+        if active:
+            serials.update(active.entries)
+        return len(serials)
+
+    def iterEncoded(self):
+        """
+        Yield ( hand serial, encoded history ) of every hand in the
+        order they were archived, reading one segment at a time.
+        """
+        for segment in self.segments:
+            if segment is self.active:
+                segment.flush()
+            size = segment.size
+            if size == 0:
+                continue
+            fileobj = open(segment.data_path, "rb")
+            data_map = mmap.mmap(fileobj.fileno(), size, access = mmap.ACCESS_READ)
+            fileobj.close()
+            offset = 0
+            try:
+                while offset < size:
+                    ( hand_serial, length ) = RECORD.unpack_from(data_map, offset)
+                    offset += RECORD.size
+                    yield ( hand_serial, data_map[offset:offset + length] )
+                    offset += length
+            finally:
+                data_map.close()
+
+    def iterHands(self):
+        """
+        Yield ( hand serial, history ) of every hand in the order they
+        were archived.
+        """
+        for ( hand_serial, data ) in self.iterEncoded():
+            yield ( hand_serial, decodeHistory(data) )
@@ -0,0 +1,406 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Compact binary encoding of the PokerGame.turn_history events.
+
+A history is encoded as a header (MAGIC followed by the VERSION byte)
+and the events, one after the other. An event is the index of its
+type in EVENT_TYPES (0 followed by the type as a value if it is not
+listed), the number of fields and the fields, each encoded as a value:
+
+ 0x00 None, 0x01 False, 0x02 True
+ 0x03 positive integer, varint
+ 0x04 negative integer, varint of the opposite
+ 0x05 float, 8 bytes little endian
+ 0x06 string seen for the first time, varint length and bytes
+ 0x07 string seen before, varint index in the string table
+ 0x08 unicode, varint length and utf-8 bytes
+ 0x09 list, 0x0A tuple, varint length and values
+ 0x0B dictionary, varint length and key, value pairs
+ 0x0C PokerCards, varint length and one byte per card
+ 0x10 - 0xFF integers 0 to 239
+
+Varints are 7 bits per byte, least significant first. The string table
+of a history starts with STRINGS and grows with each new string, the
+decoder rebuilds it as it goes. Changing EVENT_TYPES or STRINGS
+requires a new VERSION.
+
+ encodeHistory / decodeHistory   a whole history to and from a string
+ PokerHistoryWriter              streams events to a file like write
+ PokerHistoryReader              decodes the events as bytes arrive
+ readHistory                     yields the events of a file object
+
+The decoded events are tuples equal to the encoded ones and can be
+given to history2messages.
+"""
+from struct import pack, unpack
+
+from pokerengine.pokercards import PokerCards
+
+MAGIC = "PKH"
+VERSION = 1
+HEADER = MAGIC + chr(VERSION)
+
+EVENT_TYPES = (
+    None, # 0 : the event type is encoded as a value
+    "game", "wait_for", "player_list", "round", "position", "showdown",
+    "blind_request", "wait_blind", "blind", "ante_request", "ante",
+    "all-in", "call", "check", "fold", "raise", "canceled", "end",
+    "sitOut", "sit", "leave", "finish", "muck", "rake", "rebuy", "buyOut",
+)
+
+EVENT2CODE = dict(( event_type, code ) for ( code, event_type ) in enumerate(EVENT_TYPES) if event_type)
+
+STRINGS = (
+    "blind_ante", "pre-flop", "flop", "turn", "river",
+    "third", "fourth", "fifth", "sixth", "seventh",
+    "small", "big", "late", "hi", "low",
+    "type", "game_state", "resolve", "uncalled", "left_over",
+    "serial2best", "player_list", "side_pots", "pot", "foldwin",
+    "serial2share", "serial2delta", "serial2rake", "serial2money",
+    "serials", "serial", "chips_left",
+    "contributions", "total", "pots", "building", "last_round",
+)
+
+NONE, FALSE, TRUE, INT, NEGATIVE, FLOAT, STRING, STRING_REF, UNICODE, LIST, TUPLE, DICT, CARDS = range(13)
+SMALL_INT = 0x10
+SMALL_INTS = 0x100 - SMALL_INT
+
+CHR = [ chr(i) for i in xrange(0x100) ]
+
+def varint(value):
+    if value < 0x80:
+        return CHR[value]
+    out = []
+    while value >= 0x80:
+        out.append(CHR[(value & 0x7F) | 0x80])
+        value >>= 7
+    out.append(CHR[value])
+    return "".join(out)
+
+class PokerHistoryEncoder:
+    """
+    Encode the events of a single history, in order: the strings
+    seen in an event are referenced by index in the following ones.
+    """
+
+    def __init__(self):
+        self.strings = dict(( string, index ) for ( index, string ) in enumerate(STRINGS))
+
+    def encode(self, event):
+        out = []
+        code = EVENT2CODE.get(event[0])
+        if code is None:
+            out.append(CHR[0])
+            self.value(event[0], out)
+        else:
+            out.append(CHR[code])
+        out.append(varint(len(event) - 1))
+        value = self.value
+        for field in event[1:]:
+            if type(field) is int and 0 <= field < SMALL_INTS:
+                out.append(CHR[SMALL_INT + field])
+            else:
+                value(field, out)
+        return "".join(out)
+
+    def value(self, value, out):
+        append = out.append
+        kind = type(value)
+        if kind is int or kind is long:
+            if 0 <= value < SMALL_INTS:
+                append(CHR[SMALL_INT + value])
+            elif value >= 0:
+                append(CHR[INT])
+                append(varint(value))
+            else:
+                append(CHR[NEGATIVE])
+                append(varint(-value))
+        elif kind is str:
+            index = self.strings.get(value)
+            if index is None:
+                self.strings[value] = len(self.strings)
+                append(CHR[STRING])
+                append(varint(len(value)))
+                append(value)
+            else:
+                append(CHR[STRING_REF])
+                append(varint(index))
+        elif kind is tuple or kind is list:
+            append(CHR[kind is list and LIST or TUPLE])
+            append(varint(len(value)))
+            encode = self.value
+            for item in value:
+                if type(item) is int and 0 <= item < SMALL_INTS:
+                    append(CHR[SMALL_INT + item])
+                else:
+                    encode(item, out)
+        elif kind is dict:
+            append(CHR[DICT])
+            append(varint(len(value)))
+            encode = self.value
+            for ( key, item ) in value.iteritems():
+                if type(key) is int and 0 <= key < SMALL_INTS:
+                    append(CHR[SMALL_INT + key])
+                else:
+                    encode(key, out)
+                if type(item) is int and 0 <= item < SMALL_INTS:
+                    append(CHR[SMALL_INT + item])
+                else:
+                    encode(item, out)
+        elif value is None:
+            append(CHR[NONE])
+        elif kind is bool:
+            append(CHR[value and TRUE or FALSE])
+        elif isinstance(value, PokerCards):
+            cards = value.toRawList()
+            append(CHR[CARDS])
+            append(varint(len(cards)))
+            append("".join([ CHR[card] for card in cards ]))
+        elif kind is float:
+            append(CHR[FLOAT])
+            append(pack("<d", value))
+        elif kind is unicode:
+            value = value.encode("utf-8")
+            append(CHR[UNICODE])
+            append(varint(len(value)))
+            append(value)
+        else:
+            raise UserWarning("PokerHistoryEncoder: cannot encode %s of type %s" % ( value, kind ))
+
+class PokerHistoryDecoder:
+    """
+    Decode the events produced by a PokerHistoryEncoder, in the same
+    order.
+    """
+
+    def __init__(self):
+        self.strings = list(STRINGS)
+
+    def decode(self, data, offset):
+        """
+        Return the event starting at offset in data and the offset of
+        the next one. Raise IndexError if data ends before the event.
+        """
+        value = self.value
+        code = ord(data[offset])
+        if code:
+            event_type = EVENT_TYPES[code]
+            offset += 1
+        else:
+            ( event_type, offset ) = value(data, offset + 1)
+        ( count, offset ) = self.varint(data, offset)
+        event = [ event_type ]
+        for i in xrange(count):
+            tag = ord(data[offset])
+            if tag >= SMALL_INT:
+                event.append(tag - SMALL_INT)
+                offset += 1
+            else:
+                ( field, offset ) = value(data, offset)
+                event.append(field)
+        return ( tuple(event), offset )
+
+    def varint(self, data, offset):
+        byte = ord(data[offset])
+        offset += 1
+        if byte < 0x80:
+            return ( byte, offset )
+        result = byte & 0x7F
+        shift = 7
+        while True:
+            byte = ord(data[offset])
+            offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return ( result, offset )
+            shift += 7
+
+    def bytes(self, data, offset, length):
+        end = offset + length
+        if end > len(data):
+            raise IndexError("truncated history")
+        return ( data[offset:end], end )
+
+    def value(self, data, offset):
+        tag = ord(data[offset])
+        offset += 1
+        if tag >= SMALL_INT:
+            return ( tag - SMALL_INT, offset )
+        elif tag == STRING_REF:
+            ( index, offset ) = self.varint(data, offset)
+            return ( self.strings[index], offset )
+        elif tag == INT:
+            return self.varint(data, offset)
+        elif tag == LIST or tag == TUPLE:
+            ( length, offset ) = self.varint(data, offset)
+            items = []
+            for i in xrange(length):
+                item = ord(data[offset])
+                if item >= SMALL_INT:
+                    items.append(item - SMALL_INT)
+                    offset += 1
+                else:
+                    ( item, offset ) = self.value(data, offset)
+                    items.append(item)
+            if tag == TUPLE:
+                items = tuple(items)
+            return ( items, offset )
+        elif tag == DICT:
+            ( length, offset ) = self.varint(data, offset)
+            result = {}
+            for i in xrange(length):
+                ( key, offset ) = self.value(data, offset)
+                ( result[key], offset ) = self.value(data, offset)
+            return ( result, offset )
+        elif tag == CARDS:
+            ( length, offset ) = self.varint(data, offset)
+            ( cards, offset ) = self.bytes(data, offset, length)
+            return ( PokerCards([ ord(card) for card in cards ]), offset )
+        elif tag == STRING:
+            ( length, offset ) = self.varint(data, offset)
+            ( string, offset ) = self.bytes(data, offset, length)
+            self.strings.append(string)
+            return ( string, offset )
+        elif tag == NONE:
+            return ( None, offset )
+        elif tag == FALSE:
+            return ( False, offset )
+        elif tag == TRUE:
+            return ( True, offset )
+        elif tag == NEGATIVE:
+            ( value, offset ) = self.varint(data, offset)
+            return ( -value, offset )
+        elif tag == FLOAT:
+            ( value, offset ) = self.bytes(data, offset, 8)
+            return ( unpack("<d", value)[0], offset )
+        elif tag == UNICODE:
+            ( length, offset ) = self.varint(data, offset)
+            ( value, offset ) = self.bytes(data, offset, length)
+            return ( value.decode("utf-8"), offset )
+        else:
+            raise UserWarning("PokerHistoryDecoder: unknown tag 0x%02x" % tag)
+
+def checkHeader(header):
+    if header[:len(MAGIC)] != MAGIC:
+        raise UserWarning("not an encoded history")
+    if ord(header[len(MAGIC)]) != VERSION:
+        raise UserWarning("history encoded with version %d, expected %d" % ( ord(header[len(MAGIC)]), VERSION ))
+
+def encodeHistory(history):
+    encoder = PokerHistoryEncoder()
+    return HEADER + "".join([ encoder.encode(event) for event in history ])
+
+def iterHistory(data):
+    """
+    Yield the events of a history encoded with encodeHistory. Data can
+    be any buffer supporting indexing and slicing (an mmap for instance).
+    """
+    checkHeader(data[:len(HEADER)])
+    decoder = PokerHistoryDecoder()
+    offset = len(HEADER)
+    end = len(data)
+    while offset < end:
+        ( event, offset ) = decoder.decode(data, offset)
+        yield event
+
+def decodeHistory(data):
+    return list(iterHistory(data))
+
+class PokerHistoryWriter:
+    """
+    Encode the events of a history and hand them to write (the write
+    method of a file, a socket, ...) one at a time, starting with the
+    header.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self.encoder = PokerHistoryEncoder()
+        self.write(HEADER)
+
+    def append(self, event):
+        self.write(self.encoder.encode(event))
+
+    def extend(self, events):
+        self.write("".join([ self.encoder.encode(event) for event in events ]))
+
+class PokerHistoryReader:
+    """
+    Decode a history received in chunks of any size: feed returns the
+    events completed by the chunk.
+    """
+
+    def __init__(self):
+        self.decoder = PokerHistoryDecoder()
+        self.buffer = ""
+        self.header = False
+
+    def feed(self, data):
+        buffer = self.buffer + data
+        if not self.header:
+            if len(buffer) < len(HEADER):
+                self.buffer = buffer
+                return []
+            checkHeader(buffer)
+            buffer = buffer[len(HEADER):]
+            self.header = True
+        strings = self.decoder.strings
+        events = []
+        offset = 0
+        end = len(buffer)
+        while offset < end:
+            known = len(strings)
+            try:
+                ( event, next_offset ) = self.decoder.decode(buffer, offset)
+            except IndexError:
+                #
+                # The event is incomplete, forget the strings it
+                # introduced, they will be decoded again with the
+                # next chunk
+                #
+                del strings[known:]
+                break
+            events.append(event)
+            offset = next_offset
+        self.buffer = buffer[offset:]
+        return events
+
+    def pending(self):
+        """
+        Return the number of bytes of an incomplete event.
+        """
+        return len(self.buffer)
+
+def readHistory(fileobj, size = 65536):
+    """
+    Yield the events of the history written to fileobj by a
+    PokerHistoryWriter, reading size bytes at a time.
+    """
+    reader = PokerHistoryReader()
+    while True:
+        data = fileobj.read(size)
+        if not data:
+            break
+        for event in reader.feed(data):
+            yield event
+    if reader.pending():
+        raise UserWarning("readHistory: truncated history (%d bytes left)" % reader.pending())
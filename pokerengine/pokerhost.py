@@ -0,0 +1,442 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Drive many PokerGameServer (and the games of PokerTournament) from a
+single loop.
+
+PokerTableHost keeps at most one deadline per table in PokerTimers and
+sets it again each time the table changes (it is registered as a batch
+callback of the game, see PokerGame.registerCallback):
+
+ - the hand is over: beginTurn after hand_delay seconds, if enough
+   players are sit and the tournament (if any) is not on break. When a
+   tournament hand ends, PokerTournament.endTurn and tourneyEnd are
+   called at once and the tables broken by the tournament are removed
+ - a player is in position: action_timeout seconds after the player
+   came in position (for this hand and betting round) the player is
+   set to auto (see PokerGame.autoPlayer) which folds or lets the
+   bot play, depending on the auto_policy of the player
+ - the muck state: after action_timeout seconds the muckable players
+   muck
+ - a bot decision is pending (see PokerGame.setBotExecutor):
+   expireBotDecision at its deadline. The deadline is computed with
+   the clock of the host, see addGame
+
+The bots that decide without a bot_executor play inside the game
+methods (beginTurn, call, ...) and need no timer.
+
+The timers are kept in a heap (PokerTimers). A cancelled timer stays
+in the heap until it reaches the top or until the cancelled timers
+outnumber the others and the heap is rebuilt without them.
+
+The host is driven by tick(now), which fires the timers expired,
+updates the tables that changed and returns the delay before the next
+timer. drive(call_later) calls tick with a call_later(delay, function)
+function (reactor.callLater with twisted or loop.call_later with
+asyncio) and run() loops with time.sleep.
+"""
+import time
+from heapq import heappush, heappop, heapify
+
+from pokerengine import log as engine_log
+log = engine_log.get_child('pokerhost')
+
+RESOLUTION = 0.01
+
+TICK_EPSILON = 1e-6
+
+#
+# The heap is rebuilt when more than this many cancelled timers
+# outnumber the others
+#
+COMPACT_MIN = 64
+
+HAND_DELAY = 5
+
+ACTION_TIMEOUT = 60
+
+class PokerTimer:
+
+    def __init__(self, tick, callback, args):
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        #
+        # False when the timer fired or was cancelled
+        #
+        self.pending = True
+
+    def active(self):
+        return self.pending
+
+class PokerTimers:
+
+    def __init__(self, resolution = RESOLUTION, now = 0.0):
+        self.resolution = resolution
+        self.tick = self.ticks(now)
+        #
+        # heap of ( tick, sequence, timer ), the sequence keeps the
+        # timers of a tick in the order they were scheduled
+        #
+        self.heap = []
+        self.sequence = 0
+        #
+        # Number of timers pending and of timers cancelled still in
+        # the heap
+        #
+        self.count = 0
+        self.cancelled = 0
+
+    def ticks(self, when):
+        #
+        # nextTime() / resolution must not round to the tick before
+        #
+        return int(when / self.resolution + TICK_EPSILON)
+
+    def schedule(self, when, callback, *args):
+        """
+        Call callback(*args) at the first tick at or after when
+        (seconds, same clock as now in advance). Return the timer, to
+        be cancelled with cancel.
+        """
+        tick = self.ticks(when)
+        if tick <= self.tick:
+            tick = self.tick + 1
+        timer = PokerTimer(tick, callback, args)
+        self.sequence += 1
+        heappush(self.heap, ( tick, self.sequence, timer ))
+        self.count += 1
+        return timer
+
+    def cancel(self, timer):
+        if not timer.pending:
+            return
+        timer.pending = False
+        self.count -= 1
+        self.cancelled += 1
+        if self.cancelled > COMPACT_MIN and self.cancelled > self.count:
+            self.heap = [ entry for entry in self.heap if entry[2].pending ]
+            heapify(self.heap)
+            self.cancelled = 0
+
+    def advance(self, now):
+        """
+        Fire the timers up to now, return how many fired.
+        """
+        target = self.ticks(now)
+        fired = 0
+        heap = self.heap
+        while heap and heap[0][0] <= target:
+            ( tick, sequence, timer ) = heappop(heap)
+            if not timer.pending:
+                self.cancelled -= 1
+                continue
+            timer.pending = False
+            self.count -= 1
+            self.tick = tick
+            timer.callback(*timer.args)
+            fired += 1
+            heap = self.heap
+        if target > self.tick:
+            self.tick = target
+        return fired
+
+    def nextTime(self):
+        """
+        The time of the next tick at which a timer fires, None if
+        there are no timers.
+        """
+        heap = self.heap
+        while heap and not heap[0][2].pending:
+            heappop(heap)
+            self.cancelled -= 1
+        if not heap:
+            return None
+        return heap[0][0] * self.resolution
+
+class PokerHostTable:
+
+    def __init__(self, game, tourney):
+        self.game = game
+        self.tourney = tourney
+        self.timer = None
+        #
+        # ( serial, hand_serial, state ) of the player in position when
+        # the action timeout was set
+        #
+        self.position = None
+        #
+        # hand_serial of the last hand whose end was handled
+        #
+        self.ended = None
+
+class PokerTableHost:
+
+    def __init__(self, hand_delay = HAND_DELAY, action_timeout = ACTION_TIMEOUT, resolution = RESOLUTION, clock = time.time, hand_serial = 1, hand_serial_step = 1):
+        self.hand_delay = hand_delay
+        self.action_timeout = action_timeout
+        self.clock = clock
+        self.timers = PokerTimers(resolution, clock())
+        #
+        # Hosts sharing the hand serials use the same step and a
+        # different first hand_serial, see PokerShards
+        #
+        self.hand_serial = hand_serial
+        self.hand_serial_step = hand_serial_step
+        #
+        # game id => PokerHostTable
+        #
+        self.tables = {}
+        #
+        # tournament => break timer
+        #
+        self.tourneys = {}
+        #
+        # ids of the games changed since their timer was set
+        #
+        self.dirty = set()
+        #
+        # Called with the game when a hand ends, after the tournament
+        # (if any) was told
+        #
+        self.callback_hand_end = lambda game: None
+        #
+        # Set by drive
+        #
+        self.call_later = None
+        self.delayed = None
+        self.wakeup = False
+
+    def addGame(self, game, tourney = None):
+        """
+        Host game, the deadlines of its bot decisions are computed
+        with the clock of the host from now on.
+        """
+        if game.id in self.tables:
+            raise UserWarning("addGame: game %d is already hosted" % game.id)
+        self.tables[game.id] = PokerHostTable(game, tourney)
+        game.bot_clock = self.clock
+        game.registerCallback(self.gameEvents, batch = True)
+        self.changed(game.id)
+
+    def removeGame(self, game_id):
+        table = self.tables.pop(game_id, None)
+        if table is None:
+            return False
+        if table.timer:
+            self.timers.cancel(table.timer)
+        table.game.unregisterCallback(self.gameEvents)
+        self.dirty.discard(game_id)
+        return True
+
+    def addTournament(self, tourney):
+        """
+        Host the games of a running tournament.
+        """
+        for game in tourney.games:
+            self.addGame(game, tourney)
+        self.tourneys[tourney] = None
+
+    def removeTournament(self, tourney):
+        timer = self.tourneys.pop(tourney, None)
+        if timer:
+            self.timers.cancel(timer)
+        for ( game_id, table ) in self.tables.items():
+            if table.tourney is tourney:
+                self.removeGame(game_id)
+
+    def gameEvents(self, game_id, events):
+        self.changed(game_id)
+
+    def changed(self, game_id):
+        self.dirty.add(game_id)
+        if self.call_later and not self.wakeup:
+            self.wakeup = True
+            self.later(0)
+
+    def newHandSerial(self):
+        hand_serial = self.hand_serial
+        self.hand_serial += self.hand_serial_step
+        return hand_serial
+
+    def update(self, table):
+        """
+        Set the timer of the table according to its state.
+        """
+        game = table.game
+        position = None
+        if game.isRunning() and not game.isDecisionPending():
+            position = ( game.getSerialInPosition(), game.hand_serial, game.state )
+            if table.timer and table.position == position:
+                #
+                # The player in position still has to act (another
+                # player sat out, the bet of the player changed, ...),
+                # the action timeout keeps running
+                #
+                return
+        if table.timer:
+            self.timers.cancel(table.timer)
+            table.timer = None
+        table.position = None
+        now = self.clock()
+        if game.isRunning():
+            if game.isDecisionPending():
+                table.timer = self.timers.schedule(game.pending_decision['deadline'], self.expireDecision, table)
+            elif position[0]:
+                table.timer = self.timers.schedule(now + self.action_timeout, self.actionTimeout, table, *position)
+                table.position = position
+        elif game.state == "muck":
+            table.timer = self.timers.schedule(now + self.action_timeout, self.muckTimeout, table, game.hand_serial)
+        else:
+            if game.isEndOrNull() and table.ended != game.hand_serial and game.state == "end":
+                table.ended = game.hand_serial
+                self.handEnd(table)
+                if self.tables.get(game.id) is not table:
+                    return
+            if self.canBeginTurn(table):
+                table.timer = self.timers.schedule(now + self.hand_delay, self.beginTurn, table)
+
+    def canBeginTurn(self, table):
+        tourney = table.tourney
+        if tourney is not None and tourney.state != "running":
+            return False
+        return table.game.sitCount() >= 2
+
+    def handEnd(self, table):
+        game = table.game
+        tourney = table.tourney
+        if tourney is not None:
+            tourney.endTurn(game.id)
+            #
+            # endTurn removes the inactive players and the tournament
+            # may be over
+            #
+            if game.id in tourney.id2game:
+                tourney.tourneyEnd(game.id)
+            for ( game_id, other ) in self.tables.items():
+                if other.tourney is tourney and game_id not in tourney.id2game:
+                    self.removeGame(game_id)
+            if tourney.state == "break":
+                self.scheduleBreak(tourney)
+        self.callback_hand_end(game)
+
+    def scheduleBreak(self, tourney):
+        if self.tourneys.get(tourney):
+            return
+        self.tourneys[tourney] = self.timers.schedule(self.clock() + max(tourney.remainingBreakSeconds(), 0), self.breakEnd, tourney)
+
+    def breakEnd(self, tourney):
+        self.tourneys[tourney] = None
+        tourney.updateBreak()
+        if tourney.state == "break":
+            self.scheduleBreak(tourney)
+            return
+        for ( game_id, table ) in self.tables.iteritems():
+            if table.tourney is tourney:
+                self.dirty.add(game_id)
+
+    def beginTurn(self, table):
+        table.timer = None
+        if self.canBeginTurn(table):
+            table.game.beginTurn(self.newHandSerial())
+        self.dirty.add(table.game.id)
+
+    def actionTimeout(self, table, serial, hand_serial, state):
+        table.timer = None
+        game = table.game
+        if game.hand_serial == hand_serial and game.state == state and game.getSerialInPosition() == serial:
+            log.debug("actionTimeout: game %d player %d did not act in time", game.id, serial)
+            game.autoPlayer(serial)
+        self.dirty.add(game.id)
+
+    def muckTimeout(self, table, hand_serial):
+        table.timer = None
+        game = table.game
+        if game.hand_serial == hand_serial and game.state == "muck":
+            for serial in game.muckable_serials[:]:
+                game.muck(serial, True)
+        self.dirty.add(game.id)
+
+    def expireDecision(self, table):
+        table.timer = None
+        table.game.expireBotDecision(self.clock())
+        self.dirty.add(table.game.id)
+
+    def tick(self, now = None):
+        """
+        Fire the timers expired and update the tables changed. Return
+        the delay before the next timer, None if there are none.
+        """
+        #
+        # The tables changed while ticking are updated below, no need
+        # to wake up
+        #
+        self.wakeup = True
+        if now is None:
+            now = self.clock()
+        self.timers.advance(now)
+        while self.dirty:
+            dirty = self.dirty
+            self.dirty = set()
+            for game_id in dirty:
+                table = self.tables.get(game_id)
+                if table is not None:
+                    self.update(table)
+        self.wakeup = False
+        when = self.timers.nextTime()
+        if when is None:
+            return None
+        return max(when - now, 0)
+
+    def drive(self, call_later):
+        """
+        Call tick with call_later(delay, function), when the next timer
+        expires or as soon as a table changes. call_later must return
+        an object with a cancel method (reactor.callLater with twisted
+        or loop.call_later with asyncio).
+        """
+        self.call_later = call_later
+        self.delayed = None
+        self.later(0)
+
+    def later(self, delay):
+        if self.delayed is not None:
+            self.delayed.cancel()
+        self.delayed = self.call_later(delay, self.step)
+
+    def step(self):
+        self.delayed = None
+        delay = self.tick()
+        if delay is not None:
+            self.later(delay)
+
+    def run(self, until = None):
+        """
+        Call tick until there are no timers or until the clock reaches
+        until.
+        """
+        while True:
+            delay = self.tick()
+            if delay is None:
+                return
+            if until is not None and self.clock() + delay > until:
+                return
+            time.sleep(delay)
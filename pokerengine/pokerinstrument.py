@@ -0,0 +1,150 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Opt-in timing of the PokerGame and PokerTournament methods, see
+PokerGame.setInstrumentation and PokerTournament.setInstrumentation.
+
+When instrumentation is enabled, the methods listed in GAME_METHODS or
+TOURNAMENT_METHODS are shadowed by timing wrappers stored in the
+instance dictionary. When it is disabled the wrappers are removed and
+the methods are called exactly as if instrumentation did not exist.
+Methods registered as callbacks (PokerTournament.gameAction for
+instance) are not instrumented because the wrapper would not compare
+equal to the method when unregistering it.
+
+The time of a method includes the time of the instrumented methods it
+calls: the time of call includes historyAdd which includes
+runCallbacks, the time spent in the callbacks.
+"""
+import time
+from collections import deque
+
+#
+# ( attribute, name ) of the instrumented methods
+#
+GAME_METHODS = (
+    ( "call", "call" ),
+    ( "callNraise", "callNraise" ),
+    ( "check", "check" ),
+    ( "fold", "fold" ),
+    ( "_PokerGame__talked", "__talked" ),
+    ( "distributeMoney", "distributeMoney" ),
+    ( "_PokerGame__makeSidePots", "__makeSidePots" ),
+    ( "historyAdd", "historyAdd" ),
+    ( "runCallbacks", "runCallbacks" ),
+)
+
+TOURNAMENT_METHODS = (
+    ( "createGames", "createGames" ),
+    ( "removeBrokePlayers", "removeBrokePlayers" ),
+    ( "endTurn", "endTurn" ),
+    ( "balanceGames", "balanceGames" ),
+    ( "movePlayer", "movePlayer" ),
+    ( "updateRunning", "updateRunning" ),
+)
+
+#
+# Histogram bucket i counts the calls that lasted less than 2**i
+# microseconds (wall time), the last bucket counts everything longer
+#
+BUCKETS = 24
+
+RING_SIZE = 4096
+
+class PokerInstrumentation:
+
+    def __init__(self, size = RING_SIZE):
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        #
+        # ( name, wall seconds, cpu seconds ) of the last size calls
+        #
+        self.ring = deque(maxlen = self.size)
+        #
+        # name => [ count, wall total, cpu total, wall max, histogram ]
+        #
+        self.methods = {}
+
+    def record(self, name, wall, cpu):
+        self.ring.append(( name, wall, cpu ))
+        stats = self.methods.get(name)
+        if stats is None:
+            stats = self.methods[name] = [ 0, 0.0, 0.0, 0.0, [0] * BUCKETS ]
+        stats[0] += 1
+        stats[1] += wall
+        stats[2] += cpu
+        if wall > stats[3]:
+            stats[3] = wall
+        stats[4][min(int(wall * 1000000).bit_length(), BUCKETS - 1)] += 1
+
+    def wrap(self, function, name):
+        record = self.record
+        clock = time.clock
+        now = time.time
+        def timed(*args, **kwargs):
+            wall = now()
+            cpu = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, now() - wall, clock() - cpu)
+        timed.__name__ = function.__name__
+        timed.instrumented = function
+        return timed
+
+    def instrument(self, obj, methods):
+        """
+        Shadow the methods of obj with timing wrappers.
+        """
+        uninstrument(obj, methods)
+        for ( attribute, name ) in methods:
+            setattr(obj, attribute, self.wrap(getattr(obj, attribute), name))
+
+    def snapshot(self):
+        """
+        Return a dictionary (that can be serialized with JSON) of the
+        statistics of each method and the last calls, oldest first.
+        Times are in seconds.
+        """
+        methods = {}
+        for ( name, ( count, wall, cpu, wall_max, histogram ) ) in self.methods.iteritems():
+            methods[name] = {
+                'count': count,
+                'wall': wall,
+                'cpu': cpu,
+                'wall_max': wall_max,
+                'histogram': histogram[:],
+                }
+        return {
+            'size': self.size,
+            'methods': methods,
+            'recent': [ list(call) for call in self.ring ],
+            }
+
+def uninstrument(obj, methods):
+    """
+    Remove the timing wrappers set by PokerInstrumentation.instrument.
+    """
+    for ( attribute, name ) in methods:
+        if hasattr(obj.__dict__.get(attribute), 'instrumented'):
+            delattr(obj, attribute)
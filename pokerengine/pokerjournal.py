@@ -0,0 +1,496 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Write-ahead journal of the hands played by the games of a process.
+
+A PokerJournalRecorder records the hands of a game (see
+pokerreplay.PokerHandRecorder) in a PokerJournal shared by all the
+games of the process: the snapshot of the game when a hand begins,
+the deck and each action, as they happen. The records are numbered in
+the order they are appended (lsn).
+
+The journal appends the records to segment files (NNNNNNNNNN.journal,
+named after the lsn of their first record) and forces them to disk in
+groups: a record waits at most max_latency seconds (or until max_bytes
+are waiting) for others to join it, so that a single fsync commits
+the actions of all the tables in the meantime. whenCommitted(lsn,
+callback) calls callback(lsn) once the record lsn is on disk, to
+acknowledge the action of a player for instance. As with
+pokerexecutor.FuturesExecutor, the callbacks are handed to a dispatch
+function (reactor.callFromThread with twisted) or queued until poll()
+is called.
+
+The records are written and synced by a thread started by start().
+Without it, commit() writes and syncs the waiting records in the
+calling thread. If a record cannot be written, the journal fails: the
+callbacks waiting are called with None instead of their lsn and
+append raises UserWarning from then on.
+
+A record is RECORD (length and crc32 of the data) followed by the
+data, the marshal of ( game id, kind, value ):
+
+ JOURNAL_SNAPSHOT   PokerGame.snapshot of the game
+ JOURNAL_DECK       the deck shuffled by beginTurn
+ JOURNAL_ACTION     ( name, args, kw ) of a PokerGame method call
+ JOURNAL_BOT        ( serial, action ) decided by a bot
+
+When the journal is opened after a crash, the end of the last segment
+that is not a complete record matching its crc32 is discarded.
+lastHands reads a journal and returns the record of the last hand of
+each game, for pokerreplay.PokerReplay to rebuild the games. purge()
+removes the segments that only hold hands older than the current hand
+of every game recorded.
+"""
+import os
+import time
+import marshal
+import threading
+from os import path
+from zlib import crc32
+from struct import Struct
+from heapq import heappush, heappop
+from collections import deque
+
+from pokerengine.pokerreplay import PokerHandRecorder
+
+from pokerengine import log as engine_log
+log = engine_log.get_child('pokerjournal')
+
+RECORD = Struct("<II")
+
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+MAX_LATENCY = 0.002
+
+MAX_BYTES = 1024 * 1024
+
+JOURNAL_SNAPSHOT = 0
+JOURNAL_DECK = 1
+JOURNAL_ACTION = 2
+JOURNAL_BOT = 3
+
+def segmentPath(directory, lsn):
+    return path.join(directory, "%010d.journal" % lsn)
+
+def listSegments(directory):
+    """
+    The lsn of the first record of each segment of directory, sorted.
+    """
+    return sorted(int(name[:-len(".journal")]) for name in os.listdir(directory) if name.endswith(".journal"))
+
+def readSegment(filename):
+    """
+    Yield ( offset of the next record, game id, kind, value ) for each
+    valid record of the segment.
+    """
+    data = open(filename, "rb")
+    offset = 0
+    try:
+        while True:
+            header = data.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            ( length, checksum ) = RECORD.unpack(header)
+            record = data.read(length)
+            if len(record) < length or crc32(record) & 0xffffffff != checksum:
+                break
+            try:
+                ( game_id, kind, value ) = marshal.loads(record)
+            except (ValueError, EOFError, TypeError):
+                break
+            offset += RECORD.size + length
+            yield ( offset, game_id, kind, value )
+    finally:
+        data.close()
+
+def readJournal(directory):
+    """
+    Yield ( lsn, game id, kind, value ) for each record of the journal.
+    """
+    for first in listSegments(directory):
+        lsn = first
+        for ( offset, game_id, kind, value ) in readSegment(segmentPath(directory, first)):
+            yield ( lsn, game_id, kind, value )
+            lsn += 1
+
+def lastHands(directory):
+    """
+    Return a dictionary mapping the id of each game of the journal to
+    the record of its last hand, see pokerreplay.
+    """
+    hands = {}
+    for ( lsn, game_id, kind, value ) in readJournal(directory):
+        if kind == JOURNAL_SNAPSHOT:
+            hands[game_id] = {
+                'snapshot': value,
+                'deck': None,
+                'actions': [],
+                'bots': [],
+                }
+            continue
+        hand = hands.get(game_id)
+        if hand is None:
+            #
+            # The beginning of the hand was purged
+            #
+            continue
+        if kind == JOURNAL_DECK:
+            hand['deck'] = value
+        elif kind == JOURNAL_ACTION:
+            hand['actions'].append(value)
+        elif kind == JOURNAL_BOT:
+            hand['bots'].append(value)
+        else:
+            log.warn("lastHands: ignore record %d of unknown kind %s", lsn, kind)
+    return hands
+
+class PokerJournal:
+
+    def __init__(self, directory, max_latency = MAX_LATENCY, max_bytes = MAX_BYTES, segment_size = SEGMENT_SIZE, dispatch = None):
+        self.directory = directory
+        self.max_latency = max_latency
+        self.max_bytes = max_bytes
+        self.segment_size = segment_size
+        self.dispatch = dispatch
+        self.lock = threading.Condition()
+        #
+        # Held while writing so that the records reach the segments in
+        # order, see commit
+        #
+        self.write_lock = threading.Lock()
+        #
+        # The records appended and not yet written, their size and
+        # when the first of them was appended
+        #
+        self.pending = []
+        self.pending_bytes = 0
+        self.pending_since = None
+        #
+        # lsn of the next record and number of records on disk (the
+        # records lsn < committed are)
+        #
+        self.lsn = 0
+        self.committed = 0
+        #
+        # heap of ( lsn, callback ) waiting for their record to be
+        # committed and ( callback, lsn ) waiting for poll() when
+        # there is no dispatch
+        #
+        self.waiting = []
+        self.done = deque()
+        #
+        # game id => lsn of the snapshot of its current hand, see purge
+        #
+        self.snapshots = {}
+        self.segment = None
+        self.size = 0
+        self.writer = None
+        self.thread = None
+        self.running = False
+        #
+        # The exception that made the journal fail, see commit
+        #
+        self.failure = None
+        self.open()
+
+    def open(self):
+        if not path.exists(self.directory):
+            os.makedirs(self.directory)
+        segments = listSegments(self.directory)
+        if not segments:
+            return
+        first = segments[-1]
+        filename = segmentPath(self.directory, first)
+        count = 0
+        offset = 0
+        for ( offset, game_id, kind, value ) in readSegment(filename):
+            count += 1
+        size = path.getsize(filename)
+        if offset < size:
+            log.warn("%s: discard %d bytes of a record cut short", filename, size - offset)
+            data = open(filename, "r+b")
+            data.truncate(offset)
+            data.close()
+        self.lsn = self.committed = first + count
+        self.segment = first
+        self.size = offset
+        self.writer = open(filename, "ab")
+
+    def start(self):
+        """
+        Write and sync the records in a thread.
+        """
+        if self.thread:
+            return
+        self.running = True
+        self.thread = threading.Thread(target = self.run, name = "pokerjournal")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        if not self.thread:
+            return
+        self.lock.acquire()
+        self.running = False
+        self.lock.notify()
+        self.lock.release()
+        self.thread.join()
+        self.thread = None
+
+    def close(self):
+        """
+        Stop the thread and commit the records waiting.
+        """
+        self.stop()
+        if self.failure is None:
+            self.commit()
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    def append(self, game_id, kind, value):
+        """
+        Append a record and return its lsn. It is not on disk until
+        committed, see whenCommitted. Raise UserWarning if the journal
+        failed.
+        """
+        data = marshal.dumps(( game_id, kind, value ), 2)
+        record = RECORD.pack(len(data), crc32(data) & 0xffffffff) + data
+        self.lock.acquire()
+        try:
+            if self.failure is not None:
+                raise UserWarning("append: the journal failed (%s)" % self.failure)
+            lsn = self.lsn
+            self.lsn += 1
+            self.pending.append(record)
+            self.pending_bytes += len(record)
+            if kind == JOURNAL_SNAPSHOT:
+                self.snapshots[game_id] = lsn
+            if self.pending_since is None:
+                self.pending_since = time.time()
+                self.lock.notify()
+            elif self.pending_bytes >= self.max_bytes:
+                self.lock.notify()
+        finally:
+            self.lock.release()
+        return lsn
+
+    def whenCommitted(self, lsn, callback):
+        """
+        Call callback(lsn) when the record lsn is on disk or
+        callback(None) if the journal failed before.
+        """
+        self.lock.acquire()
+        try:
+            if lsn >= self.committed:
+                if self.failure is None:
+                    heappush(self.waiting, ( lsn, callback ))
+                    return
+                lsn = None
+        finally:
+            self.lock.release()
+        self.resolved([ ( callback, lsn ) ])
+
+    def forget(self, game_id):
+        """
+        The game is no longer recorded, see purge.
+        """
+        self.lock.acquire()
+        self.snapshots.pop(game_id, None)
+        self.lock.release()
+
+    def run(self):
+        lock = self.lock
+        while True:
+            lock.acquire()
+            try:
+                while self.running and not self.pending:
+                    lock.wait()
+                if not self.running and not self.pending:
+                    break
+                #
+                # Group commit: wait for more records until the first
+                # has waited max_latency or max_bytes are waiting
+                #
+                deadline = self.pending_since + self.max_latency
+                while self.running and self.pending_bytes < self.max_bytes:
+                    delay = deadline - time.time()
+                    if delay <= 0:
+                        break
+                    lock.wait(delay)
+            finally:
+                lock.release()
+            try:
+                self.commit()
+            except Exception, e:
+                log.error("run: commit failed, the journal stops: %s", e, exc_info=1)
+                self.lock.acquire()
+                self.running = False
+                self.lock.release()
+                break
+
+    def commit(self):
+        """
+        Write and sync the records waiting and run or dispatch the
+        callbacks of those that were waiting for them. Return the
+        number of records committed. If the records cannot be written
+        the journal fails, the callbacks waiting are called with None
+        and the exception is raised.
+        """
+        self.write_lock.acquire()
+        try:
+            self.lock.acquire()
+            try:
+                if self.failure is not None:
+                    raise UserWarning("commit: the journal failed (%s)" % self.failure)
+                records = self.pending
+                end = self.lsn
+                self.pending = []
+                self.pending_bytes = 0
+                self.pending_since = None
+            finally:
+                self.lock.release()
+            if not records:
+                return 0
+            first = end - len(records)
+            try:
+                if self.writer is None or self.size >= self.segment_size:
+                    self.newSegment(first)
+                data = "".join(records)
+                self.writer.write(data)
+                self.writer.flush()
+                os.fsync(self.writer.fileno())
+            except Exception, e:
+                self.fail(e)
+                raise
+            self.size += len(data)
+            self.lock.acquire()
+            try:
+                self.committed = end
+                ready = []
+                waiting = self.waiting
+                while waiting and waiting[0][0] < end:
+                    ( lsn, callback ) = heappop(waiting)
+                    ready.append(( callback, lsn ))
+            finally:
+                self.lock.release()
+        finally:
+            self.write_lock.release()
+        if ready:
+            self.resolved(ready)
+        return len(records)
+
+    def fail(self, exception):
+        self.lock.acquire()
+        try:
+            self.failure = exception
+            failed = [ ( callback, None ) for ( lsn, callback ) in sorted(self.waiting) ]
+            self.waiting = []
+        finally:
+            self.lock.release()
+        if failed:
+            self.resolved(failed)
+
+    def newSegment(self, first):
+        if self.writer:
+            self.writer.close()
+        self.segment = first
+        self.size = 0
+        self.writer = open(segmentPath(self.directory, first), "ab")
+
+    def resolved(self, ready):
+        if self.dispatch:
+            for ( callback, lsn ) in ready:
+                self.dispatch(callback, lsn)
+        else:
+            self.done.extend(ready)
+
+    def poll(self):
+        """
+        Run the callbacks of the records committed, return how many ran.
+        """
+        count = 0
+        while self.done:
+            ( callback, lsn ) = self.done.popleft()
+            callback(lsn)
+            count += 1
+        return count
+
+    def purge(self):
+        """
+        Remove the segments before the one holding the oldest snapshot
+        of the current hands, return how many were removed. Only the
+        games recorded since the journal was opened are known: call it
+        once all the games rebuilt from the journal are recorded again.
+        """
+        self.lock.acquire()
+        try:
+            if not self.snapshots:
+                return 0
+            oldest = min(self.snapshots.itervalues())
+        finally:
+            self.lock.release()
+        count = 0
+        segments = listSegments(self.directory)
+        for ( first, next ) in zip(segments, segments[1:]):
+            if next > oldest:
+                break
+            os.remove(segmentPath(self.directory, first))
+            count += 1
+        return count
+
+class PokerJournalRecorder(PokerHandRecorder):
+    """
+    Record the hands of game in journal. lsn is the record of the last
+    action, whenCommitted(callback) calls callback(lsn) once it is on
+    disk, or callback(None) if the journal failed.
+    """
+
+    def __init__(self, game, journal):
+        PokerHandRecorder.__init__(self, game)
+        self.journal = journal
+        self.lsn = None
+
+    def stop(self):
+        PokerHandRecorder.stop(self)
+        self.journal.forget(self.game.id)
+
+    def begin(self, snapshot):
+        PokerHandRecorder.begin(self, snapshot)
+        self.lsn = self.journal.append(self.game.id, JOURNAL_SNAPSHOT, snapshot)
+
+    def action(self, name, args, kw):
+        PokerHandRecorder.action(self, name, args, kw)
+        self.lsn = self.journal.append(self.game.id, JOURNAL_ACTION, ( name, args, kw ))
+
+    def botDecided(self, serial, action):
+        PokerHandRecorder.botDecided(self, serial, action)
+        if self.hand is not None:
+            self.lsn = self.journal.append(self.game.id, JOURNAL_BOT, ( serial, action ))
+
+    def shuffled(self, deck):
+        PokerHandRecorder.shuffled(self, deck)
+        if self.hand is not None:
+            self.lsn = self.journal.append(self.game.id, JOURNAL_DECK, deck)
+
+    def whenCommitted(self, callback):
+        if self.lsn is not None:
+            self.journal.whenCommitted(self.lsn, callback)
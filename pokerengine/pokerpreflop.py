@@ -0,0 +1,199 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Precomputed preflop equity tables.
+
+A poker.<variant>.equity file lives next to the poker.<variant>.xml
+file and holds the ev (per mille) of each of the 169 canonical
+starting hands against 1 to MAX_OPPONENTS opponents holding unknown
+cards, as PokerGame.handEV(serial, iterations, self_only = True)
+would compute it before the flop. It is generated offline with
+
+  python -m pokerengine.pokerpreflop conf/poker.holdem.equity holdem [iterations]
+
+and memory mapped by loadPreflopEquity. The header records the format
+VERSION, which must be bumped whenever the layout changes, the variant
+and the number of iterations used for each entry.
+"""
+import os
+import sys
+import mmap
+import struct
+from random import Random
+
+from pokerengine import log as engine_log
+log = engine_log.get_child('pokerpreflop')
+
+from pokerengine.pokerequity import PokerEquity
+
+NOCARD = 255
+
+MAGIC = "PEQT"
+VERSION = 1
+MAX_OPPONENTS = 9
+HANDS = 169
+
+#
+# magic, version, variant, hands, max opponents, iterations
+# followed by hands * max opponents little endian unsigned shorts
+#
+HEADER = struct.Struct("<4sH16sHHI")
+ENTRY = struct.Struct("<H")
+
+#
+# path => ( stamp of the file, PreflopEquity or None ), see
+# loadPreflopEquity
+#
+PREFLOP_CACHE = {}
+
+def canonicalHand(pocket):
+    """
+    Index (0 to 168) of the two cards pocket in the 13x13 grid of
+    starting hands, row * 13 + column with the ranks from 0 (deuce) to
+    12 (ace): pairs on the diagonal, suited hands below it (the row is
+    the high rank) and offsuit hands above it (the row is the low
+    rank). The entries of the equity files are in this order, there
+    are no hand names: AKs is 12 * 13 + 11 = 167, AKo is
+    11 * 13 + 12 = 155 and 22 is 0.
+    """
+    ( first, second ) = pocket
+    high = max(first % 13, second % 13)
+    low = min(first % 13, second % 13)
+    if first / 13 == second / 13:
+        return high * 13 + low
+    else:
+        return low * 13 + high
+
+def canonicalPocket(hand):
+    """
+    A two cards pocket of the hand index returned by canonicalHand.
+    """
+    ( row, column ) = divmod(hand, 13)
+    if row > column:
+        return [ row, column ]
+    else:
+        return [ row, 13 + column ]
+
+class PreflopEquity:
+
+    def __init__(self, path):
+        self.path = path
+        fd = open(path, "rb")
+        try:
+            self.map = mmap.mmap(fd.fileno(), 0, access = mmap.ACCESS_READ)
+        finally:
+            fd.close()
+        if len(self.map) < HEADER.size:
+            raise UserWarning("%s: too short for a preflop equity table" % path)
+        ( magic, version, variant, hands, max_opponents, iterations ) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise UserWarning("%s: not a preflop equity table" % path)
+        if version != VERSION:
+            raise UserWarning("%s: preflop equity table version %d, expected %d" % ( path, version, VERSION ))
+        if len(self.map) != HEADER.size + hands * max_opponents * ENTRY.size:
+            raise UserWarning("%s: preflop equity table size %d does not match its header" % ( path, len(self.map) ))
+        self.variant = variant.rstrip("\0")
+        self.hands = hands
+        self.max_opponents = max_opponents
+        self.iterations = iterations
+
+    def close(self):
+        self.map.close()
+
+    def handEV(self, pocket, opponents):
+        """
+        Return the ev (per mille) of the two cards pocket against
+        opponents players, or None if the table does not have it.
+        """
+        if opponents < 1 or opponents > self.max_opponents:
+            return None
+        offset = HEADER.size + ( canonicalHand(pocket) * self.max_opponents + opponents - 1 ) * ENTRY.size
+        return ENTRY.unpack_from(self.map, offset)[0]
+
+def _stamp(path):
+    info = os.stat(path)
+    return ( info.st_mtime, info.st_size, info.st_ino )
+
+def loadPreflopEquity(path):
+    """
+    Return the PreflopEquity of the file at path, or None if there is
+    no such file or it cannot be used. The result is cached and shared
+    by all the games until the file changes. A missing file is not
+    cached: a table installed later is found by the next call.
+    """
+    try:
+        stamp = _stamp(path)
+    except EnvironmentError:
+        PREFLOP_CACHE.pop(path, None)
+        return None
+    cached = PREFLOP_CACHE.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    equity = None
+    try:
+        equity = PreflopEquity(path)
+    except (UserWarning, EnvironmentError), e:
+        log.warn("loadPreflopEquity: %s", e)
+    PREFLOP_CACHE[path] = ( stamp, equity )
+    return equity
+
+def clearPreflopEquity():
+    #
+    # The tables are not closed, games may still hold them
+    #
+    PREFLOP_CACHE.clear()
+
+def equityPath(variant_path):
+    """
+    The preflop equity table that goes with a poker.<variant>.xml file.
+    """
+    return os.path.splitext(variant_path)[0] + ".equity"
+
+def generatePreflopEquity(path, variant, eval, iterations, max_opponents = MAX_OPPONENTS, random = None):
+    if variant != "holdem":
+        raise UserWarning("generatePreflopEquity: no preflop equity table for variant %s" % variant)
+    equity = PokerEquity(eval, random or Random(1))
+    entries = []
+    for hand in xrange(HANDS):
+        pocket = canonicalPocket(hand)
+        for opponents in xrange(1, max_opponents + 1):
+            pockets = [ pocket ] + [ [NOCARD, NOCARD] ] * opponents
+            entries.append(equity.handsEV(variant, pockets, [NOCARD] * 5, iterations)[0])
+    tmp = path + ".tmp"
+    fd = open(tmp, "wb")
+    try:
+        fd.write(HEADER.pack(MAGIC, VERSION, variant, HANDS, max_opponents, iterations))
+        fd.write(struct.pack("<%dH" % len(entries), *entries))
+    finally:
+        fd.close()
+    os.rename(tmp, path)
+
+def main(argv):
+    import pokereval
+    if len(argv) < 2:
+        print "usage: python -m pokerengine.pokerpreflop <path> <variant> [iterations]"
+        return 1
+    iterations = int(argv[2]) if len(argv) > 2 else 20000
+    generatePreflopEquity(argv[0], argv[1], pokereval.PokerEval(), iterations)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,212 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Record the hands played by a PokerGame and play them again to rebuild
+the game, for instance after the process running a table died.
+
+A hand record is a dictionary:
+
+ snapshot   the state of the game before beginTurn, see
+            PokerGame.snapshot
+ deck       the deck as shuffled by beginTurn
+ actions    the ( name, args, kw ) of the calls to the PokerGame
+            methods decorated with batch_callbacks (beginTurn, blind,
+            ante, call, callNraise, check, fold, muck, sit, sitOut,
+            botDecision, ...) in order, starting with beginTurn and
+            ending with the last call before the hand ends. The
+            calls made between two hands are not recorded, their
+            effect is in the snapshot of the next hand
+ bots       the ( serial, action ) decided by the bots, in order. The
+            action is None when the bot waited for the bot_executor,
+            its decision is then the botDecision call of the actions
+
+PokerHandRecorder builds the record of each hand while the game is
+played. PokerReplay restores the snapshot of a record in a game and
+calls the methods again with the logs, the callbacks and (unless
+history is True) the turn_history disabled, leaving the game in the
+state it was after the last action.
+
+The bots sample equities at random and their evs may be cached: while
+a hand is replayed they do not decide again, they take the decisions
+of the record instead. The bot_executor of the game is not used during
+the replay. If the hand ends with a bot waiting for the bot_executor,
+game.resumeBotDecision() submits its decision again once the game is
+ready to be played (and recorded).
+
+The replay is exact as long as the game is driven by these methods
+only. The methods that are not decorated with batch_callbacks
+(addPlayer, autoBlindAnte, autoMuck, ...) are not recorded: when they
+are called while a hand is running, the caller records them with
+PokerHandRecorder.record.
+
+The replay costs about 70% of playing the hand: most of the time
+is spent in the PokerGame methods it calls. Rebuilding a process only
+replays the last hand of each table, from the snapshot taken when it
+began.
+"""
+
+class PokerHandRecorder:
+    """
+    Record the hands of game, see PokerGame.setActionRecorder. The
+    record of the hand being played (or the last hand played) is in
+    the hand attribute. Subclasses extend begin, action, botDecided
+    and shuffled to save the record as it grows, see pokerjournal.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.hand = None
+        self.shuffler = None
+
+    def start(self):
+        game = self.game
+        self.shuffler = game.shuffler
+        game.shuffler = PokerRecordingShuffler(self.shuffler, self)
+        game.setActionRecorder(self)
+        if not game.isEndOrNull():
+            #
+            # The record of a hand in progress starts from its current
+            # state, without beginTurn
+            #
+            self.begin(game.snapshot())
+
+    def stop(self):
+        game = self.game
+        game.setActionRecorder(None)
+        game.shuffler = self.shuffler
+        self.shuffler = None
+
+    def record(self, name, args, kw):
+        if name == "beginTurn":
+            self.begin(self.game.snapshot())
+        elif self.hand is None or self.game.isEndOrNull():
+            #
+            # Between hands, the changes are in the snapshot of the
+            # next hand
+            #
+            return
+        self.action(name, args, kw)
+
+    def begin(self, snapshot):
+        self.hand = {
+            'snapshot': snapshot,
+            'deck': None,
+            'actions': [],
+            'bots': [],
+            }
+
+    def action(self, name, args, kw):
+        self.hand['actions'].append(( name, args, kw ))
+
+    def botDecided(self, serial, action):
+        if self.hand is not None:
+            self.hand['bots'].append(( serial, action ))
+
+    def shuffled(self, deck):
+        if self.hand is not None:
+            self.hand['deck'] = deck[:]
+
+class PokerRecordingShuffler:
+
+    def __init__(self, shuffler, recorder):
+        self.shuffler = shuffler
+        self.recorder = recorder
+
+    def shuffle(self, deck):
+        self.shuffler.shuffle(deck)
+        self.recorder.shuffled(deck)
+
+class PokerReplayShuffler:
+    """
+    Deal the deck of a hand record.
+    """
+
+    def __init__(self, deck):
+        self.deck = deck
+
+    def shuffle(self, deck):
+        deck[:] = self.deck
+
+class PokerNullLog:
+
+    def debug(self, *args, **kwargs):
+        pass
+
+    inform = warn = error = crit = debug
+
+NULL_LOG = PokerNullLog()
+
+def noHistory(*args):
+    pass
+
+class PokerReplay:
+    """
+    Play hand records again in game.
+    """
+
+    def __init__(self, game, history = False):
+        self.game = game
+        self.history = history
+
+    def replay(self, hand):
+        """
+        Restore the snapshot of hand in the game and call the actions
+        of hand. Return the game.
+        """
+        game = self.game
+        game.restore(hand['snapshot'], resume = False)
+        saved = (
+            game.shuffler, game.log,
+            game.callbacks, game.callback_options, game.callback_routes,
+            game.action_recorder, game.bot_executor,
+            )
+        history_add = game.__dict__.get('historyAdd')
+        game.shuffler = PokerReplayShuffler(hand['deck'])
+        game.log = NULL_LOG
+        game.callbacks = []
+        game.callback_options = {}
+        game.callback_routes = {}
+        game.action_recorder = None
+        game.bot_executor = None
+        game.bot_decisions = iter(hand['bots'])
+        if not self.history:
+            game.historyAdd = noHistory
+        players = game.serial2player.values()
+        for player in players:
+            player._log = NULL_LOG
+        try:
+            for ( name, args, kw ) in hand['actions']:
+                getattr(game, name)(*args, **kw)
+        finally:
+            for player in players:
+                player._log = None
+            (
+                game.shuffler, game.log,
+                game.callbacks, game.callback_options, game.callback_routes,
+                game.action_recorder, game.bot_executor,
+            ) = saved
+            game.bot_decisions = None
+            game.callback_routes = {}
+            if history_add is not None:
+                game.historyAdd = history_add
+            elif 'historyAdd' in game.__dict__:
+                del game.historyAdd
+        return game
@@ -0,0 +1,373 @@
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+"""
+Run PokerGameServer in worker processes, a PokerTableHost in each, so
+that the tables use more than one core.
+
+PokerShards starts the workers and sends each game to a worker, by
+default game_id % count. The workers share nothing: a game is sent as
+a snapshot (see PokerGame.snapshot) and lives in a single worker until
+it is removed or migrated to another worker (migrate), which is again
+a snapshot restored by the other worker.
+
+The messages are lists of tuples sent through a multiprocessing Pipe,
+in both directions all the messages of a loop are sent at once:
+
+ to the worker
+  ( "create", game_id, snapshot, settings )
+  ( "call", game_id, token, method, args )   game.method(*args)
+  ( "snapshot", game_id, token )
+  ( "remove", game_id, token )               replies with the snapshot
+  ( "stop", )
+ to PokerShards
+  ( "events", game_id, events )              the events of the game,
+                                             as a batch callback
+  ( "result", token, value )                 the return value of call,
+                                             snapshot or remove
+
+settings are game attributes (bot_eval_iterations for instance) set
+before the snapshot is restored. The results are given to the
+callback of call, snapshot or removeGame, the events to
+callback_events. Nothing is sent or received until poll is called.
+
+A callback is given None when the call fails: the worker raised, the
+result cannot be pickled (call "getPlayer" for instance), the game
+could not be migrated or the worker died. The games of a dead
+worker are lost, the messages sent to them fail.
+"""
+import select
+import cPickle
+import multiprocessing
+
+from pokerengine import log as engine_log
+log = engine_log.get_child('pokershard')
+
+from pokerengine.pokergame import PokerGameServer
+from pokerengine.pokerhost import PokerTableHost, HAND_DELAY, ACTION_TIMEOUT
+
+GAME_URL = "poker.%s.xml"
+
+class PokerShardWorker:
+
+    def __init__(self, connection, host, url, dirs, events):
+        self.connection = connection
+        self.host = host
+        self.url = url
+        self.dirs = dirs
+        self.events = events
+        self.outbox = []
+
+    def run(self):
+        while True:
+            delay = self.host.tick()
+            self.flush()
+            if self.connection.poll(delay):
+                for message in self.connection.recv():
+                    if message[0] == "stop":
+                        self.flush()
+                        return
+                    self.handle(message)
+
+    def flush(self):
+        if self.outbox:
+            outbox = self.outbox
+            self.outbox = []
+            try:
+                self.connection.send(outbox)
+            except ( IOError, EOFError ):
+                raise
+            except Exception, e:
+                #
+                # A message that cannot be pickled must not kill the
+                # worker: send the others, a result that cannot be sent
+                # is None, events that cannot be sent are lost
+                #
+                log.error("flush: %d messages cannot be sent at once: %s", len(outbox), e)
+                messages = []
+                for message in outbox:
+                    if picklable(message):
+                        messages.append(message)
+                    elif message[0] == "result":
+                        messages.append(( "result", message[1], None ))
+                    else:
+                        log.error("flush: the %s of game %s cannot be sent, dropped", message[0], message[1])
+                self.connection.send(messages)
+
+    def handle(self, message):
+        try:
+            getattr(self, message[0])(*message[1:])
+        except Exception, e:
+            log.error("handle: %s failed: %s", message[0], e)
+            if message[0] in ( "call", "snapshot", "remove" ):
+                self.outbox.append(( "result", message[2], None ))
+
+    def gameEvents(self, game_id, events):
+        self.outbox.append(( "events", game_id, events ))
+
+    def create(self, game_id, snapshot, settings):
+        game = PokerGameServer(self.url, self.dirs)
+        for ( name, value ) in settings.iteritems():
+            setattr(game, name, value)
+        game.restore(snapshot, resume = False)
+        game.id = game_id
+        game.registerCallback(self.gameEvents, self.events, batch = True)
+        self.host.addGame(game)
+        game.resumeBotDecision()
+
+    def call(self, game_id, token, method, args):
+        if method.startswith("_"):
+            raise UserWarning("call: %s is private" % method)
+        result = getattr(self.host.tables[game_id].game, method)(*args)
+        if token:
+            self.reply(token, result)
+
+    def snapshot(self, game_id, token):
+        self.reply(token, self.host.tables[game_id].game.snapshot())
+
+    def remove(self, game_id, token):
+        game = self.host.tables[game_id].game
+        self.host.removeGame(game_id)
+        game.unregisterCallback(self.gameEvents)
+        self.reply(token, game.snapshot())
+
+    def reply(self, token, result):
+        if not picklable(result):
+            raise UserWarning("reply: a %s cannot be sent" % type(result).__name__)
+        self.outbox.append(( "result", token, result ))
+
+def picklable(value):
+    try:
+        cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+        return True
+    except Exception:
+        return False
+
+def shardWorker(connection, index, count, url, dirs, hand_delay, action_timeout, events):
+    """
+    The main of a worker process. Module level so that it can be the
+    target of a multiprocessing.Process.
+    """
+    host = PokerTableHost(hand_delay, action_timeout, hand_serial = index + 1, hand_serial_step = count)
+    PokerShardWorker(connection, host, url, dirs, events).run()
+    connection.close()
+
+class PokerShards:
+
+    def __init__(self, count, dirs, url = GAME_URL, hand_delay = HAND_DELAY, action_timeout = ACTION_TIMEOUT, events = None):
+        self.count = count
+        self.dirs = dirs
+        self.url = url
+        self.hand_delay = hand_delay
+        self.action_timeout = action_timeout
+        #
+        # Only these events are sent by the workers if not None, see
+        # PokerGame.registerCallback
+        #
+        self.events = events
+        self.connections = []
+        self.processes = []
+        self.outboxes = []
+        #
+        # The tokens of the messages sent to each worker and not
+        # answered yet
+        #
+        self.sent = []
+        #
+        # game_id => worker index, settings
+        #
+        self.route = {}
+        self.settings = {}
+        #
+        # game_id => messages held while the game is migrated
+        #
+        self.migrating = {}
+        #
+        # token => callback
+        #
+        self.callbacks = {}
+        self.token = 0
+        self.callback_events = lambda game_id, events: None
+
+    def start(self):
+        for index in xrange(self.count):
+            ( connection, child ) = multiprocessing.Pipe()
+            process = multiprocessing.Process(target = shardWorker, args = ( child, index, self.count, self.url, self.dirs, self.hand_delay, self.action_timeout, self.events ))
+            process.daemon = True
+            process.start()
+            child.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+            self.outboxes.append([])
+            self.sent.append(set())
+
+    def stop(self):
+        for index in xrange(self.count):
+            self.outboxes[index].append(( "stop", ))
+        self.flush()
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            if connection:
+                connection.close()
+        self.connections = []
+        self.processes = []
+        self.outboxes = []
+        self.sent = []
+
+    def shardOf(self, game_id):
+        return self.route.get(game_id, game_id % self.count)
+
+    def newToken(self, callback):
+        self.token += 1
+        self.callbacks[self.token] = callback
+        return self.token
+
+    def post(self, game_id, message):
+        if game_id in self.migrating:
+            self.migrating[game_id].append(message)
+        else:
+            self.outboxes[self.shardOf(game_id)].append(message)
+
+    def fail(self, messages):
+        """
+        Call the callbacks of messages with None.
+        """
+        for message in messages:
+            if message[0] in ( "call", "snapshot", "remove" ) and message[2]:
+                self.callbacks.pop(message[2])(None)
+
+    def createGame(self, game_id, snapshot, settings = None, shard = None):
+        """
+        Create the game in the worker shard (shardOf by default) from
+        a snapshot of PokerGame.snapshot.
+        """
+        if game_id in self.route:
+            raise UserWarning("createGame: game %d already exists" % game_id)
+        if shard is None:
+            shard = game_id % self.count
+        settings = settings or {}
+        self.route[game_id] = shard
+        self.settings[game_id] = settings
+        self.post(game_id, ( "create", game_id, snapshot, settings ))
+
+    def call(self, game_id, method, args, callback = None):
+        """
+        game.method(*args) in the worker of the game, the return value
+        is given to callback (None if the call failed).
+        """
+        token = callback and self.newToken(callback) or 0
+        self.post(game_id, ( "call", game_id, token, method, args ))
+
+    def snapshot(self, game_id, callback):
+        self.post(game_id, ( "snapshot", game_id, self.newToken(callback) ))
+
+    def removeGame(self, game_id, callback = None):
+        """
+        Remove the game from its worker, callback is given the snapshot
+        of the game. The game must not be migrating.
+        """
+        if game_id in self.migrating:
+            raise UserWarning("removeGame: game %d is migrating" % game_id)
+        self.post(game_id, ( "remove", game_id, self.newToken(callback or ( lambda snapshot: None )) ))
+        del self.route[game_id]
+        del self.settings[game_id]
+
+    def migrate(self, game_id, shard):
+        """
+        Move the game to the worker shard. The messages for the game
+        are held until the worker shard has created it.
+        """
+        if game_id in self.migrating:
+            raise UserWarning("migrate: game %d is already migrating" % game_id)
+        if self.shardOf(game_id) == shard:
+            return False
+        settings = self.settings[game_id]
+        def removed(snapshot):
+            held = self.migrating.pop(game_id)
+            if snapshot is None:
+                log.error("migrate: game %d could not be removed from worker %d", game_id, self.route[game_id])
+                self.fail(held)
+                return
+            self.route[game_id] = shard
+            self.outboxes[shard].append(( "create", game_id, snapshot, settings ))
+            self.outboxes[shard].extend(held)
+        self.post(game_id, ( "remove", game_id, self.newToken(removed) ))
+        self.migrating[game_id] = []
+        return True
+
+    def flush(self):
+        for ( index, outbox ) in enumerate(self.outboxes):
+            if not outbox:
+                continue
+            self.outboxes[index] = []
+            if self.connections[index] is None:
+                self.fail(outbox)
+                continue
+            sent = self.sent[index]
+            for message in outbox:
+                if message[0] in ( "call", "snapshot", "remove" ) and message[2]:
+                    sent.add(message[2])
+            try:
+                self.connections[index].send(outbox)
+            except ( IOError, EOFError ), e:
+                self.workerDied(index, e)
+
+    def workerDied(self, index, error):
+        """
+        The callbacks of the messages sent to the worker index are
+        given None, the messages sent to it from now on fail.
+        """
+        sent = self.sent[index]
+        log.error("worker %d died (%s), %d calls fail", index, error, len(sent))
+        self.connections[index].close()
+        self.connections[index] = None
+        self.sent[index] = set()
+        for token in sorted(sent):
+            self.callbacks.pop(token)(None)
+
+    def poll(self, timeout = 0):
+        """
+        Send the messages, wait at most timeout seconds (forever if
+        None) for the messages of the workers and dispatch them. Return
+        how many were received.
+        """
+        self.flush()
+        connections = [ connection for connection in self.connections if connection ]
+        if not connections:
+            return 0
+        ( readable, writable, errors ) = select.select(connections, [], [], timeout)
+        count = 0
+        for connection in readable:
+            index = self.connections.index(connection)
+            sent = self.sent[index]
+            try:
+                while connection.poll():
+                    for message in connection.recv():
+                        count += 1
+                        if message[0] == "events":
+                            self.callback_events(message[1], message[2])
+                        else:
+                            sent.discard(message[1])
+                            self.callbacks.pop(message[1])(message[2])
+            except ( IOError, EOFError ), e:
+                self.workerDied(index, e)
+        self.flush()
+        return count
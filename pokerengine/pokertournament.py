@@ -34,6 +34,7 @@ shuffler = random
 
 from pokerengine.pokergame import PokerGameServer
 from pokerengine import pokerprizes
+from pokerengine import pokerinstrument
 from pokerengine import log as engine_log
 log = engine_log.get_child('pokertournament')
 
@@ -287,6 +288,7 @@ class PokerTournament:
         self.id2game = {}
         self.stats = PokerTournamentStats(self)
         self._last_winner_position = 0
+        self.instrumentation = None
         
         self.callback_new_state = lambda tournament, old_state, new_state: True
         self.callback_create_game = lambda tournament: PokerGameServer("poker.%s.xml", tournament.dirs)
@@ -311,6 +313,19 @@ class PokerTournament:
         if self.state == TOURNAMENT_STATE_ANNOUNCED:
             self.updateRegistering()
     
+    def setInstrumentation(self, instrumentation):
+        """
+        Time the pokerinstrument.TOURNAMENT_METHODS of the tournament
+        and the GAME_METHODS of its games, present and future, with the
+        instrumentation or stop timing them if it is None.
+        """
+        pokerinstrument.uninstrument(self, pokerinstrument.TOURNAMENT_METHODS)
+        self.instrumentation = instrumentation
+        if instrumentation:
+            instrumentation.instrument(self, pokerinstrument.TOURNAMENT_METHODS)
+        for game in self.games:
+            game.setInstrumentation(instrumentation)
+
     def _getWinners(self):
         """returns a list of serials of players that already lost the game."""
         return [k for (k,_v) in sorted(self.winners_dict.iteritems(), key=lambda (a,b): (b,a), reverse=True)]
@@ -611,7 +626,8 @@ class PokerTournament:
             game.setVariant(self.variant)
             game.setBettingStructure(self.betting_structure)
             game.setMaxPlayers(self.seats_per_game)
-            game.registerCallback(self.gameAction)
+            game.registerCallback(self.gameAction, events = ( "call", "raise", "check", "fold" ))
+            if self.instrumentation: game.setInstrumentation(self.instrumentation)
             if game.id == 0: game.id = game_id
 
             buy_in = game.buyIn()
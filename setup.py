@@ -78,6 +78,7 @@ setup(
             'conf/poker.7stud.xml',
             'conf/poker.8000-16000_600000-800000_pokermania.xml',
             'conf/poker.8000-16000_800000-1000000_pokermania.xml',
+            'conf/poker.holdem.equity',
             'conf/poker.holdem.xml',
             'conf/poker.level-001.xml',
             'conf/poker.level-10-15-pot-limit.xml',
@@ -10,12 +10,25 @@ import test_history
 import test_i18n
 import test_libxml2leak
 import test_muck
+import test_pokerbetting
 import test_pokercards
 import test_pokerchips
+import test_pokerdescriptor
 import test_pokerengineconfig
+import test_pokerequity
+import test_pokerevaluator
+import test_pokerexecutor
+import test_pokerhandstore
+import test_pokerhistory
+import test_pokerhost
+import test_pokerinstrument
+import test_pokerjournal
 import test_pokerplayer
+import test_pokerpreflop
 import test_pokerprizes
 import test_pokerrake
+import test_pokerreplay
+import test_pokershard
 import test_pokertournament
 import test_positions
 import test_sit
@@ -29,6 +29,7 @@
 
 import unittest, sys
 from os import path
+from random import Random
 
 TESTS_PATH = path.dirname(path.realpath(__file__))
 sys.path.insert(0, path.join(TESTS_PATH, ".."))
@@ -93,9 +94,107 @@ class TestPosition(unittest.TestCase):
         player[1].hand = self.make_cards('2s', '7s')
         self.assertTrue(3 <= game.handEV(1, 100000) <= 9)
 
+class TestShowdown(unittest.TestCase):
+
+    def setUp(self):
+        self.random = Random(1)
+
+    def make_game(self, variant, players):
+        game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant(variant)
+        for serial in xrange(1, players + 1):
+            self.assert_(game.addPlayer(serial))
+        return game
+
+    def showdown(self, game, hands, board):
+        """
+        Set the hands and the board, compute serial2best as the
+        showdown does and return the players in showdown order.
+        """
+        for ( serial, hand ) in hands.iteritems():
+            game.serial2player[serial].hand = PokerCards(poker_eval.string2card(hand) if type(hand[0]) is str else hand)
+        game.board = PokerCards(poker_eval.string2card(board) if board and type(board[0]) is str else board)
+        serials = sorted(hands.keys())
+        game.serial2best = game.bestHands(serials)
+        return [ game.serial2player[serial] for serial in serials ]
+
+    def check_showdown(self, game, players):
+        """
+        The ranks and the winners of the showdown are those of
+        pokereval for the players and for every side pot (the last
+        players of the list) they may compete for.
+        """
+        for player in players:
+            ( hand, board ) = game.bestHandCardsLists(player.serial)
+            for side in game.win_orders:
+                self.assertEqual(game.serial2best[player.serial][side][0], poker_eval.best(side, hand, board)[0])
+        ranks = game._PokerGame__showdownRanks(players)
+        self.assertNotEqual(ranks, None)
+        winners = []
+        for first in xrange(len(players) - 1):
+            side_pot = players[first:]
+            expected = poker_eval.winners(game = game.variant,
+                                          pockets = [ player.hand.tolist(True) for player in side_pot ],
+                                          board = game.board.tolist(True))
+            self.assertEqual(game._PokerGame__showdownWinners(side_pot, ranks), expected)
+            winners.append(expected)
+        return winners
+
+    def check_random(self, variant, pocket_size, board_size):
+        game = self.make_game(variant, 6)
+        for i in xrange(100):
+            deck = range(52)
+            self.random.shuffle(deck)
+            players = self.random.randint(2, 6)
+            hands = dict(( serial, [ deck.pop() for card in xrange(pocket_size) ] ) for serial in xrange(1, players + 1))
+            board = [ deck.pop() for card in xrange(board_size) ]
+            self.check_showdown(game, self.showdown(game, hands, board))
+
+    def test_random_hi(self):
+        """Test Showdown : hi winners of random hands are those of pokereval"""
+        self.check_random("holdem", 2, 5)
+        self.check_random("omaha", 4, 5)
+        self.check_random("7stud", 7, 0)
+
+    def test_random_hilo(self):
+        """Test Showdown : hi/lo winners of random hands are those of pokereval"""
+        self.check_random("omaha8", 4, 5)
+
+    def test_split_hi(self):
+        """Test Showdown : the board plays, every player splits the pot"""
+        game = self.make_game("holdem", 3)
+        players = self.showdown(game, { 1: [ '2c', '3d' ], 2: [ '2d', '4h' ], 3: [ '5s', '2h' ] },
+                                [ 'As', 'Ks', 'Qs', 'Js', 'Ts' ])
+        self.assertEqual(self.check_showdown(game, players)[0], { 'hi': [ 0, 1, 2 ] })
+
+    def test_split_hilo(self):
+        """Test Showdown : hi/lo pots scooped, split and without a low"""
+        game = self.make_game("omaha8", 4)
+        board = [ '2c', '3d', '7h', 'Kc', 'Kd' ]
+        #
+        # 1 has the nut low, 2 ties the nut low, 3 has the best hi hand
+        # and 4 nothing: the low is split, 3 scoops the side pot
+        # between 3 and 4
+        #
+        players = self.showdown(game, { 1: [ 'Ac', '4h', '9s', 'Ts' ],
+                                        2: [ 'Ad', '4s', 'Jh', 'Qh' ],
+                                        3: [ 'Kh', 'Ks', '8c', '8d' ],
+                                        4: [ 'Tc', 'Td', 'Jc', 'Jd' ] }, board)
+        winners = self.check_showdown(game, players)
+        self.assertEqual(winners[0], { 'hi': [ 2 ], 'low': [ 0, 1 ] })
+        self.assertEqual(winners[2], { 'hi': [ 0 ] })
+        #
+        # Nobody qualifies for low
+        #
+        players = self.showdown(game, { 1: [ 'Tc', 'Td', 'Jc', 'Jd' ],
+                                        2: [ 'Th', 'Ts', 'Jh', 'Js' ] },
+                                [ 'Qc', 'Qd', '9h', '8s', '2c' ])
+        self.assertEqual(self.check_showdown(game, players)[0], { 'hi': [ 0, 1 ] })
+
 def GetTestSuite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(TestPosition))
+    suite.addTest(unittest.makeSuite(TestShowdown))
     return suite
 
 def run():
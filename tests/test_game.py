@@ -35,6 +35,7 @@ import libxml2
 import string
 import tempfile
 import math
+import inspect
 import unittest
  
 from os import path
@@ -554,6 +555,66 @@ class PokerGameTestCase(unittest.TestCase):
         self.failUnlessEqual(CallbackIds, None)
         self.failUnlessEqual(CallbackArgs, None)
         
+    # ---------------------------------------------------------    
+    def testPokerGameCallbackEvents(self):
+        """Test Poker Game: Callback filtered by event and batched"""
+        
+        # Only the listed events are received
+        InitCallback()
+        self.game.registerCallback(Callback, events = ('Args1',))
+        self.game.runCallbacks('Args1', 'Args2')
+        self.game.runCallbacks('Args2', 'Args1')
+        self.failUnlessEqual(CallbackArgs, [('Args1', 'Args2')])
+        self.game.unregisterCallback(Callback)
+        self.failUnlessEqual(len(self.game.callbacks), 0)
+        
+        # Outside of a game method a batch callback receives each event at once
+        batches = []
+        def batch(game_id, events):
+            batches.append(events)
+        self.game.registerCallback(batch, batch = True)
+        self.game.runCallbacks('Args1', 'Args2')
+        self.failUnlessEqual(batches, [[('Args1', 'Args2')]])
+        
+        # All the events of beginTurn are delivered in one list, in order
+        del batches[:]
+        InitCallback()
+        self.game.registerCallback(Callback)
+        self.AddPlayerAndSit(1, 2)
+        self.AddPlayerAndSit(2, 7)
+        del batches[:]
+        InitCallback()
+        self.game.beginTurn(1)
+        self.failUnlessEqual(len(batches), 1)
+        self.failUnless(len(batches[0]) > 1)
+        self.failUnlessEqual(batches[0], CallbackArgs)
+        self.failUnlessEqual(self.game.callback_batch, {})
+        
+        # A callback without event
+        del batches[:]
+        self.game.runCallbacks()
+        self.failUnlessEqual(batches, [[()]])
+        
+        # The exception of a game method is not replaced by the
+        # exception of a batch callback receiving the events produced
+        # before the failure
+        def fail(game_id, event, *args):
+            if event == 'position':
+                raise ValueError(event)
+        def failBatch(game_id, events):
+            raise KeyError(events[0])
+        self.game.unregisterCallback(batch)
+        self.game.registerCallback(failBatch, batch = True)
+        self.game.registerCallback(fail)
+        self.failUnlessRaises(ValueError, self.game.blind, self.game.getSerialInPosition())
+        self.failUnlessEqual(self.game.callback_depth, 0)
+        self.failUnlessEqual(self.game.callback_batch, {})
+        self.game.unregisterCallback(fail)
+        self.game.unregisterCallback(failBatch)
+        
+        self.game.unregisterCallback(Callback)
+        self.failUnlessEqual(len(self.game.callbacks), 0)
+        
     # ---------------------------------------------------------    
     def testPokerGameBettingStructure(self):
         """Test Poker Game: Initialisation of the betting structure"""
@@ -1399,6 +1460,44 @@ class PokerGameTestCase(unittest.TestCase):
         self.failUnlessEqual(self.game.highestBetNotFold(), 1000)
         self.failUnlessEqual(self.game.highestBetInGame(), 500)    
         
+    # ---------------------------------------------------------
+    def testHighestBetIncremental(self):
+        """Test Poker Game: Highest bet and uncalled updated by money2bet"""
+
+        self.game.setMaxPlayers(3)
+        # Create players
+        player1 = self.AddPlayerAndSit(1, 2)
+        player2 = self.AddPlayerAndSit(2, 5)
+        player3 = self.AddPlayerAndSit(3, 7)
+        for player in (player1, player2, player3):
+            player.money = 5000
+
+        # Blind and ante turn
+        self.game.beginTurn(1)
+        self.failUnless(self.game.isBlindAnteRound())
+        self.game.bet_check = True
+
+        self.game.money2bet(1, 100)
+        self.failUnlessEqual(self.game.highestBetNotFold(), 100)
+        self.failUnlessEqual((self.game.getUncalled(), self.game.getUncalledSerial()), (100, 1))
+        self.game.money2bet(2, 300)
+        self.failUnlessEqual((self.game.getUncalled(), self.game.getUncalledSerial()), (200, 2))
+        self.game.money2bet(3, 300)
+        self.failUnlessEqual((self.game.getUncalled(), self.game.getUncalledSerial()), (0, 0))
+        self.failIf(self.game.betsEqual())
+        self.game.money2bet(1, 200)
+        self.failUnless(self.game.betsEqual())
+        self.game.money2bet(3, 400)
+        self.failUnlessEqual(self.game.highestBetInGame(), 700)
+        self.failUnlessEqual((self.game.getUncalled(), self.game.getUncalledSerial()), (400, 3))
+        player3.fold = True
+        self.failUnlessEqual(self.game.highestBetNotFold(), 300)
+        self.game.money2bet(2, 4700)
+        self.failUnless(player2.all_in)
+        self.failUnlessEqual(self.game.highestBetNotFold(), 5000)
+        self.failUnlessEqual(self.game.highestBetInGame(), 300)
+        self.failUnlessEqual((self.game.getUncalled(), self.game.getUncalledSerial()), (4700, 2))
+
     # ---------------------------------------------------------
     def testBetsEqual(self):
         """Test Poker Game: Bets equal"""
@@ -2496,6 +2595,58 @@ class PokerGameTestCase(unittest.TestCase):
         
         self.failUnlessRaises(UserWarning,self.game.dealCards)
         
+    # ---------------------------------------------------------
+    def testLegalActions(self):
+        """Test Poker Game: Legal actions computed once per position"""
+        
+        # Change the bet properties
+        if not self.ModifyXMLFile(self.ConfigTempFile, '/bet/variants/round', None, {'min': '100', 'max': 'pot'}):
+            self.fail('Error during modification of configuration file ' + self.ConfigTempFile)
+        self.game.setBettingStructure(PokerGameTestCase.TestConfigTemporaryFile)
+        self.game.variant = 'holdem'
+        
+        # Create players
+        player1 = self.AddPlayerAndSit(1, 2)
+        player2 = self.AddPlayerAndSit(2, 7)
+        
+        self.game.beginTurn(1)
+        self.game.nextRound()
+        self.game.initRound()
+        
+        # No action until the cards are dealt
+        self.failUnlessEqual(self.game.legalActions(1).actions, ())
+        self.game.dealCards()
+        
+        legal_actions = self.game.legalActions(1)
+        self.failUnlessEqual(legal_actions.actions, ('raise', 'check'))
+        self.failUnlessEqual(legal_actions.to_call, 100)
+        self.failUnlessEqual((legal_actions.min_raise, legal_actions.max_raise), self.game.betLimitsForSerial(1)[:2])
+        self.failUnlessEqual(legal_actions.pot_max, legal_actions.max_raise)
+        self.failUnlessEqual(legal_actions.cap_left, self.game.round_cap_left)
+        self.failUnless(self.game.legalActions(1) is legal_actions)
+        self.failUnlessEqual(self.game.possibleActions(1), ['raise', 'check'])
+        
+        # Chips move, the actions are computed again
+        player2.bet = 200
+        legal_actions = self.game.legalActions(1)
+        self.failUnlessEqual(legal_actions.actions, ('call', 'raise', 'fold'))
+        self.failUnlessEqual(legal_actions.to_call, 200)
+        
+        # The limits are only computed when legalActions needs them
+        player2.bet = 300
+        self.failUnlessEqual(self.game.possibleActions(1), ['call', 'raise', 'fold'])
+        self.failUnlessEqual(self.game.legal_actions[2], None)
+        self.failUnlessEqual(self.game.legalActions(1).to_call, 300)
+        self.failUnless(self.game.legalActions(1) is self.game.legalActions(1))
+        
+        # Clients cache the actions as well, until the cards are received
+        self.game.is_directing = False
+        cards = player1.hand
+        player1.hand = pokercards.PokerCards()
+        self.failUnlessEqual(self.game.possibleActions(1), [])
+        player1.hand = cards
+        self.failUnlessEqual(self.game.possibleActions(1), ['call', 'raise', 'fold'])
+        
     # ---------------------------------------------------------
     def testBotAutoPlay(self):
         """Test Poker Game: Bot auto play"""
@@ -3787,6 +3938,32 @@ class PokerGameTestCase(unittest.TestCase):
         self.failUnlessEqual(3000, self.game.getPotAmount())
         self.failUnlessEqual({1: 50, 2: 50, 3: 50}, self.game.getRakeContributions())
         
+    # ---------------------------------------------------------
+    def testBotsHandDoesNotRecurse(self):
+        """Test Poker Game: the turns of a hand of bots are played in a loop"""
+        
+        self.game.setVariant('holdem')
+        self.game.setMaxPlayers(10)
+        for i in xrange(1, 11):
+            player = self.AddPlayerAndSit(i)
+            player.money = 100000
+            self.game.botPlayer(i)
+        self.game.bot_eval_iterations = 10
+        #
+        # every bot raises, the hand is as long as the betting structure allows
+        #
+        self.game._PokerGame__botAction = lambda ev: "raise"
+        
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len(inspect.stack()) + 150)
+        try:
+            self.game.beginTurn(1)
+        finally:
+            sys.setrecursionlimit(limit)
+
+        self.failIf(self.game.isRunning())
+        self.failUnless(len([event for event in self.game.historyGet() if event[0] == "raise"]) > 20)
+        
     # ---------------------------------------------------------
     def testRakeContributionsUncalled(self):
         """Test Poker Game: rake contributions uncalled"""
@@ -4718,6 +4895,71 @@ class PokerGameTestCase(unittest.TestCase):
         self.failUnlessEqual(self.game.getSidePotTotal(), 2600)
         self.failUnlessEqual(self.game.playersInPotCount(self.game.getPots()), 0)
         
+    # ---------------------------------------------------------
+    def testMakeSidePots(self):
+        """Test Poker Game: Side pots built at the end of a round"""
+        
+        game = self.game
+        game.setMaxPlayers(5)
+        for serial in xrange(1, 6):
+            self.failUnless(game.addPlayer(serial))
+        
+        def makeSidePots(contributions, fold = (), all_in = ()):
+            game.current_round = 1
+            game.side_pots = {
+                'contributions': { 'total': {}, 1: { 0: contributions } },
+                'pots': [[0, 0]],
+                'building': sum(contributions.values()),
+                'last_round': 1,
+            }
+            for player in game.playersAll():
+                player.fold = player.serial in fold or player.serial not in contributions
+                player.all_in = player.serial in all_in
+                player.side_pot_index = 0
+            game._PokerGame__makeSidePots()
+            side_pot_index = dict(( serial, game.getPlayer(serial).side_pot_index ) for serial in contributions)
+            return ( game.side_pots['pots'], game.side_pots['contributions'][1], side_pot_index )
+        
+        # Every player called, a single pot
+        self.failUnlessEqual(makeSidePots({ 1: 300, 2: 300, 3: 300 }), (
+            [[900, 900]],
+            { 0: { 1: 300, 2: 300, 3: 300 } },
+            { 1: 0, 2: 0, 3: 0 } ))
+        
+        # Multi-way all in: one side pot per all in amount
+        self.failUnlessEqual(makeSidePots({ 1: 100, 2: 300, 3: 500, 4: 500 }, all_in = ( 1, 2 )), (
+            [[400, 400], [600, 1000], [400, 1400]],
+            { 0: { 1: 100, 2: 100, 3: 100, 4: 100 }, 1: { 2: 200, 3: 200, 4: 200 }, 2: { 3: 200, 4: 200 } },
+            { 1: 0, 2: 1, 3: 2, 4: 2 } ))
+        
+        # Two players all in for the same amount share the main pot
+        self.failUnlessEqual(makeSidePots({ 1: 100, 2: 100, 3: 300, 4: 300 }, fold = ( 4, ), all_in = ( 1, 2 )), (
+            [[400, 400], [400, 800]],
+            { 0: { 1: 100, 2: 100, 3: 100, 4: 100 }, 1: { 3: 200, 4: 200 } },
+            { 1: 0, 2: 0, 3: 1, 4: 1 } ))
+        
+        # A folded player contributed more than the players still in
+        # the hand: the pot is also split at their highest contribution
+        self.failUnlessEqual(makeSidePots({ 1: 200, 2: 100, 3: 150 }, fold = ( 1, ), all_in = ( 2, )), (
+            [[300, 300], [100, 400], [50, 450]],
+            { 0: { 1: 100, 2: 100, 3: 100 }, 1: { 1: 50, 3: 50 }, 2: { 1: 50 } },
+            { 1: 2, 2: 0, 3: 2 } ))
+        
+        # The uncalled part of a bet goes to a side pot of its own
+        self.failUnlessEqual(makeSidePots({ 1: 500, 2: 200 }, all_in = ( 2, )), (
+            [[400, 400], [300, 700]],
+            { 0: { 1: 200, 2: 200 }, 1: { 1: 300 } },
+            { 1: 1, 2: 0 } ))
+        self.failUnless(game.isSingleUncalledBet(game.getPots()))
+        
+        # ... also when a folded player called the all in
+        self.failUnlessEqual(makeSidePots({ 1: 500, 2: 200, 3: 200 }, fold = ( 3, ), all_in = ( 2, )), (
+            [[600, 600], [300, 900]],
+            { 0: { 1: 200, 2: 200, 3: 200 }, 1: { 1: 300 } },
+            { 1: 1, 2: 0, 3: 1 } ))
+        
+        # Every player folded
+        self.failUnlessRaises(UserWarning, makeSidePots, { 1: 100, 2: 100 }, fold = ( 1, 2 ))
         
     # ---------------------------------------------------------
     def testEndTurn(self):
@@ -6021,6 +6263,51 @@ class PokerGameTestCase(unittest.TestCase):
         self.assertEqual(4,game.playerListIndexAdd(3, 4+2*players_truey_count, pred))
         self.assertEqual(0,game.playerListIndexAdd(3, 4-2*players_truey_count, pred))
 
+    def testPlayerStateCache(self):
+        """Test Poker Game: player predicates follow the players state changes"""
+        game = self.game
+        game.setMaxPlayers(3)
+        self.AddPlayerAndSit(1, 2)
+        self.AddPlayerAndSit(2, 5)
+        self.AddPlayerAndSit(3, 7)
+        game.player_list = [1, 2, 3]
+        self.assertEqual([1, 2, 3], game.serialsNotFold())
+        self.assertEqual(3, game.inGameCount())
+
+        # the caller gets a copy of the cached list
+        self.failIf(game.serialsNotFold() is game.serialsNotFold())
+        game.serialsNotFold().remove(1)
+        game.playersInGame().pop()
+        self.assertEqual([1, 2, 3], game.serialsNotFold())
+        self.assertEqual(3, len(game.playersInGame()))
+
+        game.serial2player[1].fold = True
+        self.assertEqual([2, 3], game.serialsNotFold())
+        self.assertEqual(2, game.inGameCount())
+        game.serial2player[2].all_in = True
+        self.assertEqual([3], game.serialsInGame())
+        self.assertEqual([2], game.serialsAllIn())
+        game.serial2player[3].sit_out = True
+        self.assertEqual([3], game.serialsSitOut())
+        game.serial2player[3].remove_next_turn = True
+        self.assertEqual([3], game.serialsDisconnected())
+
+        # the player list changes
+        game.player_list = [2, 3]
+        self.assertEqual([2, 3], game.serialsNotFold())
+        game.player_list.remove(2)
+        self.assertEqual([3], game.serialsNotFold())
+        del game.serial2player[1]
+        self.assertEqual(1, game.sitCount())
+
+        # a player replaced by another, the length does not change
+        self.assertEqual([2], game.serialsSit())
+        self.failUnless(game.removePlayer(2))
+        self.failUnless(game.addPlayer(4, 5))
+        self.assertEqual([3, 4], sorted(game.serial2player.keys()))
+        self.assertEqual([], game.serialsSit())
+        self.assertEqual([3, 4], sorted(game.serialsSitOut()))
+
     def testHistoryReduceAutoPlaySitInAndOut(self):
         histories = []
         self.game.variant = 'holdem'
@@ -6136,6 +6423,102 @@ class PokerGameTestCase(unittest.TestCase):
         game.blind(10)
         game.historyReduce()
 
+    def testHistoryReduceSharesEvents(self):
+        round_event = ('round', 'pre-flop', pokercards.PokerCards([]), {100: pokercards.PokerCards([1, 2])})
+        turn_history = [
+            ('game', 0, 1, 0, 0, 'holdem', 'config', [100, 200], 0, {100: 1600, 200: 1600}),
+            ('sit', 300),
+            ('position', 1, 200),
+            ('player_list', [100, 300]),
+            ('position', 1, 300),
+            ('position', 1, 300),
+            ('rebuy', 300, 100),
+            ('position', -1, None),
+            round_event,
+            ('position', 0, 100),
+        ]
+        original = [ list(event) if event[0] == 'game' else event for event in turn_history ]
+        reduced = pokergame.PokerGame._historyReduce(turn_history, {300: 1000})
+        self.assertEqual(reduced, [
+            ('game', 0, 1, 0, 0, 'holdem', 'config', [100, 300], 0, {100: 1600, 300: 1000}),
+            ('position', 1, 300),
+            ('position', -1, None),
+            round_event,
+            ('position', 0, 100),
+        ])
+        self.assertEqual([ list(event) if event[0] == 'game' else event for event in turn_history ], original)
+        self.failUnless(reduced[3] is round_event)
+
+    def testSnapshotRestore(self):
+        """Test Poker Game: snapshot and restore a hand in progress"""
+        def newGame():
+            return pokergame.PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf'), PokerGameTestCase.TestConfDirectory])
+        def state(game):
+            return (
+                game.variant, game.betting_structure, game.state, game.hand_serial, game.dealer_seat,
+                game.position, game.pot, game.board, game.deck, game.side_pots, game.winners,
+                game.blind_info, game.round_info, game.turn_history,
+                [ ( player.serial, player.seat, player.money, player.bet, player.fold, player.all_in,
+                    player.sit_out, player.talked_once, player.hand ) for player in game.playersAll() ],
+                )
+        def play(game, choices):
+            for choice in choices:
+                serial = game.getSerialInPosition()
+                actions = game.possibleActions(serial)
+                action = actions[choice % len(actions)]
+                if action == "raise":
+                    game.callNraise(serial, 0)
+                else:
+                    getattr(game, action)(serial)
+        game = newGame()
+        game.setVariant("holdem")
+        game.setBettingStructure("level-001")
+        for serial in xrange(1, 6):
+            self.failUnless(game.addPlayer(serial))
+            self.failUnless(game.payBuyIn(serial, game.maxBuyIn()))
+            self.failUnless(game.sit(serial))
+            game.autoBlindAnte(serial)
+        game.beginTurn(1)
+        play(game, [ 1, 2, 0, 0, 0, 0, 0 ])
+        self.failUnless(game.isRunning())
+        self.failUnless(game.board.len() > 0)
+
+        other = newGame()
+        other.restore(game.snapshot())
+        self.assertEqual(state(other), state(game))
+        self.assertEqual(other.round_info_backup, game.round_info_backup)
+        for ( info, backup ) in zip(other.round_info, other.round_info_backup):
+            self.failUnless(info["cards"] is backup["cards"])
+        self.failUnless(other.blind_info["levels"] is game.blind_info["levels"])
+        for player in other.playersAll():
+            self.failUnless(player.game is other)
+        self.assertEqual(other.possibleActions(other.getSerialInPosition()), game.possibleActions(game.getSerialInPosition()))
+
+        # Both games play the rest of the hand and the next one alike
+        while game.isRunning():
+            play(game, [ -1 ])
+            play(other, [ -1 ])
+        self.assertEqual(state(other), state(game))
+        game.shuffler = pokergame.Shuffler(3)
+        other.shuffler = pokergame.Shuffler(3)
+        game.beginTurn(2)
+        other.beginTurn(2)
+        self.assertEqual(state(other), state(game))
+
+        # The snapshot is not shared with the game
+        snapshot = game.snapshot()
+        other.restore(snapshot)
+        other.turn_history.append(("sit", 1))
+        other.board.add(0, True)
+        other.getPlayer(1).money = 0
+        self.assertEqual(newGame().restore(snapshot), None)
+        restored = newGame()
+        restored.restore(snapshot)
+        self.assertEqual(state(restored), state(game))
+
+        self.assertRaises(UserWarning, other.restore, "garbage")
+        self.assertRaises(UserWarning, other.restore, snapshot.replace(chr(pokergame.SNAPSHOT_VERSION), chr(pokergame.SNAPSHOT_VERSION + 1), 1))
+
     def testBlindAndAnteTogetherAllIn(self):
         game = self.game
         game.variant = 'holdem'
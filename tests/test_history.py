@@ -33,6 +33,7 @@ TESTS_PATH = path.dirname(path.realpath(__file__))
 sys.path.insert(0, path.join(TESTS_PATH, ".."))
 
 from string import split
+from pokerengine import pokergame
 from pokerengine.pokergame import PokerGameServer, history2messages
 from pokerengine.pokercards import PokerCards
 
@@ -89,6 +90,43 @@ class TestHistory(unittest.TestCase):
                     pocket.loseNotVisible()
                     self.assertEqual(pocket, PokerCards([PokerCards.NOCARD] * pocket.len()))
 
+    def test3(self):
+        for (serial, seat) in ((1, 0), (2, 1), (3, 2), (4, 3)):
+            self.make_new_player(serial, seat)
+        self.game.beginTurn(1)
+        (subject, messages) = history2messages(self.game, self.game.turn_history, pocket_messages = True)
+        history_messages = pokergame.PokerHistoryMessages(self.game, iter(self.game.turn_history), pocket_messages = True)
+        iterator = iter(history_messages)
+        self.assertEqual(iterator.next(), messages[0])
+        self.assertEqual(history_messages.subject, subject)
+        self.assertEqual([messages[0]] + list(iterator), messages)
+        #
+        # The templates are translated again when the translation changes
+        #
+        translations = {"%(name)s calls %(amount)s": "%(name)s suit %(amount)s"}
+        old = pokergame.init_i18n(None, lambda text: translations.get(text, text))
+        try:
+            (translated_subject, translated) = history2messages(self.game, self.game.turn_history, pocket_messages = True)
+        finally:
+            pokergame.init_i18n(None, old)
+        self.assertEqual(translated_subject, subject)
+        self.assertEqual(translated, [ message.replace(" calls ", " suit ") for message in messages ])
+        self.assertEqual(history2messages(self.game, self.game.turn_history, pocket_messages = True), (subject, messages))
+        #
+        # A game class rendering the cards differently gets its own strings
+        #
+        class LowerCardsGame(PokerGameServer):
+            def cards2string(self, cards):
+                return PokerGameServer.cards2string(self, cards).lower()
+        self.game.__class__ = LowerCardsGame
+        try:
+            (lower_subject, lower) = history2messages(self.game, self.game.turn_history, pocket_messages = True)
+        finally:
+            self.game.__class__ = PokerGameServer
+        self.assertNotEqual(lower, messages)
+        self.assertEqual([ message.lower() for message in lower ], [ message.lower() for message in messages ])
+        self.assertEqual(history2messages(self.game, self.game.turn_history, pocket_messages = True), (subject, messages))
+
 def GetTestSuite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(TestHistory))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys, re, glob
+from os import path
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokerbetting
+from pokerengine.pokergame import PokerGameServer
+
+def legacyBetLimits(game, info):
+    #
+    # PokerGame.betLimits before the rules were compiled
+    #
+    if 'fixed' in info:
+        fixed = int(info["fixed"])
+        min_bet, max_bet = fixed, fixed
+    elif 'pow_level' in info:
+        fixed = int(info["pow_level"]) * pow(2, game.getLevel() - 1)
+        min_bet, max_bet = fixed, fixed
+    else:
+        if 'min' in info:
+            if info["min"] == "big":
+                min_bet = game.bigBlind()
+            else:
+                min_bet = int(info["min"])
+        elif 'min_pow_level' in info:
+            min_bet = int(info["min_pow_level"]) * pow(2, game.getLevel() - 1)
+        else:
+            min_bet = 0
+
+        if 'max' in info:
+            if re.match("[0-9]+$", info["max"]):
+                max_bet = int(info["max"])
+            elif info["max"] == "pot":
+                max_bet = "pot"
+        else:
+            max_bet = "money"
+    return (min_bet, max_bet)
+
+class Game:
+
+    def __init__(self, level, big):
+        self.level = level
+        self.big = big
+
+    def getLevel(self):
+        return self.level
+
+    def bigBlind(self):
+        return self.big
+
+class PokerBettingTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Rules(self):
+        """Test Poker Betting : compile each kind of round"""
+        game = Game(3, 20)
+        for ( info, kind, limits ) in (
+            ( { 'fixed': '30', 'cap': 3 }, pokerbetting.FixedLimitRule, ( 30, 30 ) ),
+            ( { 'pow_level': '2', 'cap': 3 }, pokerbetting.LevelLimitRule, ( 8, 8 ) ),
+            ( { 'min': '10', 'max': '300', 'cap': 3 }, pokerbetting.SpreadLimitRule, ( 10, 300 ) ),
+            ( { 'min': 'big', 'max': 'pot', 'cap': 10000 }, pokerbetting.PotLimitRule, ( 20, 'pot' ) ),
+            ( { 'min': 'big', 'cap': sys.maxint }, pokerbetting.NoLimitRule, ( 20, 'money' ) ),
+            ( { 'min_pow_level': '20', 'cap': sys.maxint }, pokerbetting.NoLimitRule, ( 80, 'money' ) ),
+            ( { 'cap': sys.maxint }, pokerbetting.NoLimitRule, ( 0, 'money' ) ),
+            ):
+            rule = pokerbetting.compileBetRule(info)
+            self.failUnless(isinstance(rule, kind))
+            self.assertEqual(rule.cap, info['cap'])
+            self.assertEqual(rule.limits(game), limits)
+            self.assertEqual(rule.limits(game), legacyBetLimits(game, info))
+        #
+        # The bets depending on the level follow the level
+        #
+        rule = pokerbetting.compileBetRule({ 'pow_level': '2', 'cap': 3 })
+        self.assertEqual(rule.limits(Game(1, 0)), ( 2, 2 ))
+        self.assertEqual(rule.limits(Game(4, 0)), ( 16, 16 ))
+        self.failUnlessRaises(UserWarning, pokerbetting.compileBetRule, { 'min': '10', 'max': 'all', 'cap': 3 })
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Structures(self):
+        """Test Poker Betting : the rules of the betting structures match their bet_info"""
+        conf = path.join(TESTS_PATH, '../conf')
+        count = 0
+        for filename in glob.glob(path.join(conf, 'poker.*.xml')):
+            if '<bet ' not in open(filename).read():
+                continue
+            name = path.basename(filename)[len('poker.'):-len('.xml')]
+            game = PokerGameServer("poker.%s.xml", [conf])
+            game.setVariant("holdem")
+            game.setBettingStructure(name)
+            game.level = 2
+            for ( index, info ) in enumerate(game.bet_info):
+                game.current_round = index
+                try:
+                    limits = legacyBetLimits(game, info)
+                except ValueError:
+                    # a placeholder (_BIGBET_ for instance) not replaced
+                    self.failUnlessRaises(ValueError, game.betLimits)
+                    continue
+                self.assertEqual(game.betLimits(), limits, name)
+                self.assertEqual(game.betRule().cap, info["cap"])
+                count += 1
+        self.failUnless(count > 0)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_BetInfoAssigned(self):
+        """Test Poker Betting : the rules are compiled again when bet_info is assigned"""
+        game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("holdem")
+        game.setBettingStructure("level-2-4-limit")
+        game.current_round = 0
+        limits = game.betLimits()
+        game.bet_info = [ { 'fixed': '10', 'cap': info['cap'] } for info in game.bet_info ]
+        self.assertEqual(game.betLimits(), ( 10, 10 ))
+        game.setBettingStructure("level-2-4-limit")
+        self.assertEqual(game.betLimits(), limits)
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerBettingTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerBettingTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerbetting.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerbetting.py' TESTS='coverage-reset test-pokerbetting.py coverage-report' check )"
+# End:
@@ -76,6 +76,12 @@ class PokerCardsTestCase(unittest.TestCase):
         cards2 = pokercards.PokerCards(cards)
         self.failUnlessEqual(cards2, cards)
         
+        cards = pokercards.PokerCards([12, 25, 37, pokercards.PokerCards.NOCARD])
+        cards.setVisible(25, False)
+        cards2 = pokercards.PokerCards.fromRawList(cards.toRawList())
+        self.failUnlessEqual(cards2, cards)
+        self.failUnlessEqual(cards2.tolist(False), cards.tolist(False))
+        
     # -----------------------------------------------------------------------------------------------------    
     def TestGetValue(self):
         """Test PokerCards : Get value"""
@@ -295,6 +301,51 @@ class PokerCardsTestCase(unittest.TestCase):
         cards.add(26, False)
         self.failUnlessEqual(str(cards), str([ 'Card(12, visible)', 'Card(26, not visible)']))
         
+    # -----------------------------------------------------------------------------------------------------    
+    def testMasks(self):
+        """Test PokerCards : Card masks follow the list"""
+        
+        cards = pokercards.PokerCards(['Ah', 'Kd'])
+        self.failUnlessEqual(( cards.visible, cards.hidden, cards.nocards ), ( (1 << 12) | (1 << 24), 0, 0 ))
+        cards.setVisible(24, False)
+        self.failUnlessEqual(( cards.visible, cards.hidden ), ( 1 << 12, 1 << 24 ))
+        self.failIf(cards.areVisible())
+        self.failIf(cards.areHidden())
+        cards.cards = [ cards.nocard(), 3 ]
+        self.failUnless(cards.hasCard(cards.nocard()))
+        self.failUnless(cards.hasCard(3))
+        self.failIf(cards.hasCard(12))
+        self.failIf(cards.hasCard(-1))
+        # The cards modified in place update the masks
+        self.failUnlessEqual(cards.cards, [ cards.nocard(), 3 ])
+        cards.cards.append(12)
+        self.failUnless(cards.hasCard(12))
+        cards.cards[2] = 13
+        self.failUnless(cards.hasCard(13))
+        self.failIf(cards.hasCard(12))
+        cards.cards.remove(13)
+        self.failIf(cards.hasCard(13))
+        self.failUnlessEqual(cards.cards, [ cards.nocard(), 3 ])
+        cards.add(12, True)
+        copy = cards.copy()
+        copy.setVisible(12, False)
+        self.failUnlessEqual(cards.cards, [ cards.nocard(), 3, 12 ])
+        self.failUnlessEqual(( cards.visible, cards.hidden ), ( (1 << 3) | (1 << 12), 0 ))
+        self.failUnlessEqual(copy.toRawList(), [ cards.nocard(), 3, pokercards.not_visible_card(12) ])
+        
+        # The same card twice
+        cards1 = pokercards.PokerCards([12, 12, 26])
+        cards2 = pokercards.PokerCards([12, 26, 26])
+        self.failIf(cards1 == cards2)
+        cards2 = pokercards.PokerCards([12, 26])
+        cards2.add(12, True)
+        self.failUnless(cards1 == cards2)
+        
+        self.failUnlessEqual(pokercards.STRING2CARD['2h'], 0)
+        self.failUnlessEqual(pokercards.STRING2CARD['As'], 51)
+        self.failUnlessEqual(pokercards.PokerCards('__').toRawList(), [ pokercards.PokerCards.NOCARD ])
+        self.assertRaises(UserWarning, pokercards.PokerCards, 'Xx')
+        
 # -----------------------------------------------------------------------------------------------------
 def GetTestSuite():
     suite = unittest.TestSuite()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys, os
+import shutil
+import tempfile
+from os import path
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokerdescriptor, pokergame
+from pokerengine.pokerengineconfig import Config
+
+class PokerDescriptorTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        pokerdescriptor.clearDescriptors()
+        self.dirs = [path.join(TESTS_PATH, '../conf')]
+        self.tmpdir = tempfile.mkdtemp()
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        pokerdescriptor.clearDescriptors()
+        shutil.rmtree(self.tmpdir)
+
+    # -----------------------------------------------------------------------------------------------------
+    def createGame(self, variant, betting_structure, dirs = None):
+        game = pokergame.PokerGameServer("poker.%s.xml", dirs or self.dirs)
+        game.setVariant(variant)
+        game.setBettingStructure(betting_structure)
+        return game
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Shared(self):
+        """Test Poker Descriptor : games share the same compiled descriptors"""
+        game1 = self.createGame('holdem', '0-0-limit')
+        game2 = self.createGame('holdem', '0-0-limit')
+        self.failUnless(game1.variant_descriptor is game2.variant_descriptor)
+        self.failUnless(game1.betting_structure_descriptor is game2.betting_structure_descriptor)
+        self.assertEqual(1, len([key for key in pokerdescriptor.DESCRIPTORS_CACHE if key[0] == pokerdescriptor.compileVariant]))
+        self.assertEqual(game1.getMaxHandSize(), 2)
+        self.assertEqual(game1.getMaxBoardSize(), 5)
+        self.assertEqual(game1.win_orders, ["hi"])
+        self.assertEqual(game1.getParam('/poker/variant/@type'), 'community')
+        stud = self.createGame('7stud', '0-0-limit')
+        self.assertEqual(stud.getMaxHandSize(), 7)
+        self.assertEqual(stud.getMaxBoardSize(), 0)
+        self.failUnless(stud.betting_structure_descriptor is game1.betting_structure_descriptor)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_PrivateCopies(self):
+        """Test Poker Descriptor : games do not alter the shared descriptors"""
+        game1 = self.createGame('holdem', 'level-001')
+        game2 = self.createGame('holdem', 'level-001')
+        game1.round_info[0]["cards"].remove("down")
+        game1.bet_info[0]["cap"] = 1
+        game1.blind_info["frequency"] = 1000
+        self.assertNotEqual(game1.round_info[0]["cards"], game2.round_info[0]["cards"])
+        self.assertEqual(game1.round_info[0]["cards"], game1.round_info_backup[0]["cards"])
+        self.assertEqual(game2.bet_info[0]["cap"], sys.maxint)
+        self.assertNotEqual(game2.blind_info["frequency"], 1000)
+        game3 = self.createGame('holdem', 'level-001')
+        self.assertEqual(game2.round_info, game3.round_info)
+        self.assertEqual(game2.bet_info, game3.bet_info)
+        self.assertEqual(game2.blind_info, game3.blind_info)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_BetInfo(self):
+        """Test Poker Descriptor : bet info matches the XPath query of each variant"""
+        config = Config(self.dirs)
+        config.load('poker.0-0-limit.xml')
+        for variant in ('holdem', 'omaha', 'omaha8', '7stud'):
+            game = self.createGame(variant, '0-0-limit')
+            expected = config.headerGetProperties('/bet/variants[contains(@ids,"' + variant + '")]/round')
+            self.assertEqual([ info["name"] for info in game.bet_info ], [ info["name"] for info in expected ])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test04_Levels(self):
+        """Test Poker Descriptor : blind levels are resolved when binding"""
+        game = self.createGame('holdem', 'level-001')
+        self.assertEqual(game.blind_info["change"], "levels")
+        self.assertEqual(game.blind_info["levels"], game.loadTournamentLevels('poker.levels-blinds.xml'))
+        self.assertEqual(game.betting_structure_descriptor.blind_levels, 'poker.levels-blinds.xml')
+
+    # -----------------------------------------------------------------------------------------------------
+    def test05_Modified(self):
+        """Test Poker Descriptor : a modified file is compiled again"""
+        dirs = [self.tmpdir] + self.dirs
+        variant = path.join(self.tmpdir, 'poker.holdem.xml')
+        shutil.copyfile(path.join(TESTS_PATH, '../conf/poker.holdem.xml'), variant)
+        game1 = self.createGame('holdem', '0-0-limit', dirs)
+        game2 = self.createGame('holdem', '0-0-limit', dirs)
+        self.failUnless(game1.variant_descriptor is game2.variant_descriptor)
+        content = open(variant).read()
+        open(variant, 'w').write(content.replace('name="Hold\'em"', 'name="Modified Hold\'em"'))
+        game3 = self.createGame('holdem', '0-0-limit', dirs)
+        self.failIf(game1.variant_descriptor is game3.variant_descriptor)
+        self.assertEqual(game3.variant_name, "Modified Hold'em")
+        self.assertEqual(game1.variant_name, "Hold'em")
+        self.assertEqual(1, len([key for key in pokerdescriptor.DESCRIPTORS_CACHE if key == ( pokerdescriptor.compileVariant, variant )]))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test06_NoWinOrders(self):
+        """Test Poker Descriptor : a variant without win orders is not cached"""
+        variant = path.join(self.tmpdir, 'poker.nowin.xml')
+        content = open(path.join(TESTS_PATH, '../conf/poker.holdem.xml')).read()
+        open(variant, 'w').write(content.replace('order="high"', 'order="invalid"'))
+        game = pokergame.PokerGameServer("poker.%s.xml", [self.tmpdir])
+        self.assertRaises(UserWarning, game.setVariant, 'nowin')
+        self.assertEqual(0, len(pokerdescriptor.DESCRIPTORS_CACHE))
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerDescriptorTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerDescriptorTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerdescriptor.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerdescriptor.py' TESTS='coverage-reset test-pokerdescriptor.py coverage-report' check )"
+# End:
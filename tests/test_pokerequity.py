@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys
+from os import path
+from random import Random
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+import pokereval
+
+from pokerengine import pokerequity
+from pokerengine.pokerequity import PokerEquity
+from pokerengine.pokerevaluator import hiValue
+from pokerengine.pokercards import PokerCards
+
+NOCARD = PokerCards.NOCARD
+
+class PokerEquityTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.eval = pokereval.PokerEval()
+        self.equity = PokerEquity(self.eval, Random(1))
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        pass
+
+    # -----------------------------------------------------------------------------------------------------
+    def cards(self, *strings):
+        return self.eval.string2card(list(strings))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Showdown(self):
+        """Test Poker Equity : all cards known"""
+        board = self.cards('2c', '3c', '4s', 'Kd', 'Qh')
+        pockets = [ self.cards('Ad', 'As'), self.cards('5h', '6s'), self.cards('Ac', 'Ah') ]
+        self.assertEqual(self.equity.handsEV('holdem', pockets, board, 10000), [0, 1000, 0])
+        self.failUnless(self.equity.exact)
+        self.assertEqual(self.equity.iterations, 1)
+        pockets = [ self.cards('Ad', 'As'), self.cards('Ac', 'Ah') ]
+        self.assertEqual(self.equity.handsEV('holdem', pockets, board, 10000), [500, 500])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Exact(self):
+        """Test Poker Equity : enumerate the river cards"""
+        board = self.cards('2c', '3c', '4s', 'Kd')
+        pockets = [ self.cards('Ad', 'Kc'), self.cards('5c', '7c') ]
+        known = board + pockets[0] + pockets[1]
+        wins = [0.0, 0.0]
+        rivers = [ card for card in xrange(52) if card not in known ]
+        for river in rivers:
+            values = [ hiValue(pocket + board + [river]) for pocket in pockets ]
+            if values[0] == values[1]:
+                wins[0] += 0.5
+                wins[1] += 0.5
+            else:
+                wins[values.index(max(values))] += 1
+        expected = [ int(1000 * win / len(rivers)) for win in wins ]
+        self.assertEqual(self.equity.handsEV('holdem', pockets, board + [NOCARD], 10000), expected)
+        self.failUnless(self.equity.exact)
+        self.assertEqual(self.equity.iterations, len(rivers))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Sample(self):
+        """Test Poker Equity : sample the unknown cards"""
+        pockets = [ self.cards('Ad', 'As'), [NOCARD, NOCARD] ]
+        ev = self.equity.handsEV('holdem', pockets, [NOCARD] * 5, 20000, precision = 1)
+        self.failIf(self.equity.exact)
+        self.assertEqual(self.equity.iterations, 20000)
+        self.failUnless(830 <= ev[0] <= 870, ev)
+        self.failUnless(abs(sum(ev) - 1000) <= 2)
+        #
+        # Without a time budget or a precision, pokereval samples all
+        # the iterations
+        #
+        calls = []
+        poker_eval = self.eval.poker_eval
+        def recorded(**kwargs):
+            calls.append(kwargs['iterations'])
+            return poker_eval(**kwargs)
+        self.eval.poker_eval = recorded
+        ev = self.equity.handsEV('holdem', pockets, [NOCARD] * 5, 2000)
+        self.assertEqual(calls, [ 2000 ])
+        self.assertEqual(self.equity.iterations, 2000)
+        self.failUnless(780 <= ev[0] <= 920, ev)
+        #
+        # Unless there are few enough combinations to deal them all
+        #
+        board = self.cards('2c', '3d', '7s', 'Kd') + [NOCARD]
+        pockets = [ self.cards('Ad', 'As'), self.cards('Kc', 'Kh') ]
+        self.equity.handsEV('holdem', pockets, board, 2000)
+        self.failUnless(self.equity.exact)
+        self.assertEqual(calls, [ 2000 ])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test04_Budget(self):
+        """Test Poker Equity : time budget and precision stop the sampling"""
+        pockets = [ self.cards('Ad', 'As'), [NOCARD, NOCARD] ]
+        self.equity.handsEV('holdem', pockets, [NOCARD] * 5, 1000000, time_budget = 0.01)
+        self.failUnless(pokerequity.CHECK_EVERY <= self.equity.iterations < 1000000)
+        ev = self.equity.handsEV('holdem', pockets, [NOCARD] * 5, 1000000, precision = 10)
+        self.failUnless(self.equity.iterations < 10000)
+        self.failUnless(800 <= ev[0] <= 900, ev)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test05_HighLow(self):
+        """Test Poker Equity : high low split"""
+        board = self.cards('2c', '3d', '7s', 'Kd', 'Qh')
+        pockets = [ self.cards('Ad', '4s', '9c', '9h'), self.cards('Kc', 'Kh', 'Jd', 'Td') ]
+        self.assertEqual(self.equity.handsEV('omaha8', pockets, board, 10000), [500, 500])
+        board = self.cards('2c', '3d', 'Js', 'Kd', 'Qh')
+        self.assertEqual(self.equity.handsEV('omaha8', pockets, board, 10000), [0, 1000])
+        pockets = [ self.cards('Ad', '4s', '5c', '6h', '2c', 'Ts', '9d'), self.cards('Kc', 'Kh', 'Ks', '8d', 'Th', '2h', 'Qs') ]
+        self.assertEqual(self.equity.handsEV('7stud8', pockets, [], 10000), [500, 500])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test06_Duplicates(self):
+        """Test Poker Equity : duplicated cards are evaluated by pokereval"""
+        board = self.cards('2c', '3c', '4s') + [NOCARD, NOCARD]
+        pockets = [ self.cards('2c', '7s'), [NOCARD, NOCARD] ]
+        ev = self.equity.handsEV('holdem', pockets, board, 100)
+        self.assertEqual(len(ev), 2)
+        self.failIf(self.equity.exact)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test07_BotBudget(self):
+        """Test Poker Equity : bots sample all their iterations unless told otherwise"""
+        from pokerengine.pokergame import PokerGameServer
+        game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("holdem")
+        game.setBettingStructure("1-2_20-200_limit")
+        calls = []
+        def handsEV(variant, pockets, board, iterations, time_budget = None, precision = None):
+            calls.append(( iterations, time_budget, precision ))
+            return [ 500 ] * len(pockets)
+        game.equity.handsEV = handsEV
+        for ( serial, seat ) in ( ( 1, 0 ), ( 2, 1 ) ):
+            game.addPlayer(serial, seat)
+            game.payBuyIn(serial, game.bestBuyIn())
+            game.sit(serial)
+            game.autoBlindAnte(serial)
+            game.botPlayer(serial)
+        game.beginTurn(1)
+        self.failUnless(game.isEndOrNull())
+        self.failUnless(calls)
+        self.assertEqual(set(calls), set([ ( 10000, None, None ) ]))
+        game.bot_eval_precision = 10
+        game.beginTurn(2)
+        self.assertEqual(calls[-1], ( 10000, None, 10 ))
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerEquityTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerEquityTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerequity.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerequity.py' TESTS='coverage-reset test-pokerequity.py coverage-report' check )"
+# End:
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys
+from os import path
+from random import Random
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+import pokereval
+
+from pokerengine import pokerevaluator, pokergame
+from pokerengine.pokercards import PokerCards
+
+class PokerEvaluatorTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.eval = pokereval.PokerEval()
+        self.evaluator = pokerevaluator.get_evaluator("lookup", self.eval)
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        pass
+
+    # -----------------------------------------------------------------------------------------------------
+    def best(self, side, hand, board = []):
+        value, cards = self.evaluator.best(side, self.eval.string2card(hand), self.eval.string2card(board))
+        return [ cards[0] ] + self.eval.card2string(cards[1:])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Hi(self):
+        """Test Poker Evaluator : hi hands"""
+        self.assertEqual(self.best('hi', ['Ad', 'As', 'Ah', '3s', '9d', '6s', 'Td', '4d', '4h']), ['FlHouse', 'As', 'Ad', 'Ah', '4d', '4h'])
+        self.assertEqual(self.best('hi', ['Jh', '5c', '7d', '2d', '9d', '6s', 'Td', '4d', '4h']), ['Flush', 'Td', '9d', '7d', '4d', '2d'])
+        self.assertEqual(self.best('hi', ['Ad', 'As', '9d', '6s', 'Td']), ['OnePair', 'As', 'Ad', 'Td', '9d', '6s'])
+        self.assertEqual(self.best('hi', ['Jh', '5c', '9d', '6s', 'Td']), ['NoPair', 'Jh', 'Td', '9d', '6s', '5c'])
+        self.assertEqual(self.best('hi', ['Ac', '2c', '9d', '5s', '3h', '4d']), ['Straight', '5s', '4d', '3h', '2c', 'Ac'])
+        self.assertEqual(self.best('hi', ['Ts', 'Js', 'Qs', 'Ks', 'As', 'Ah']), ['StFlush', 'As', 'Ks', 'Qs', 'Js', 'Ts'])
+        self.assertEqual(self.best('hi', ['6h', '6s', '6d', '6c', 'Qs', 'Qh']), ['Quads', '6s', '6c', '6d', '6h', 'Qh'])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Omaha(self):
+        """Test Poker Evaluator : exactly two cards from the hand"""
+        self.assertEqual(self.best('hi', ['Ad', 'As', 'Ah', '3s'], ['9d', '6s', 'Td', '4d', '4h']), ['TwoPair', 'Ad', 'Ah', '4d', '4h', 'Td'])
+        self.assertEqual(self.best('hi', ['Ah', 'Kh', '2c', '3c'], ['Qh', 'Jh', 'Th', '9h', '8h']), ['StFlush', 'Ah', 'Kh', 'Qh', 'Jh', 'Th'])
+        self.assertEqual(self.best('low', ['Ah', '2h', 'Kc', 'Kd'], ['3c', '4d', '8s', 'Qh', 'Qd']), ['NoPair', '8s', '4d', '3c', '2h', 'Ah'])
+        self.assertEqual(self.best('low', ['Kh', 'Qh', 'Kc', 'Kd'], ['3c', '4d', '8s', 'Ah', '2d']), ['Nothing'])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Low(self):
+        """Test Poker Evaluator : 8 or better low hands"""
+        self.assertEqual(self.best('low', ['Ac', '2s', '3h', '4d', '5s']), ['NoPair', '5s', '4d', '3h', '2s', 'Ac'])
+        self.assertEqual(self.best('low', ['8h', '2s', '9d', '5s', '3h', '4d', '5s']), ['NoPair', '8h', '5s', '4d', '3h', '2s'])
+        self.assertEqual(self.best('low', ['9h', '2s', '9d', '5s', '3h', '4d', '5c']), ['Nothing'])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test04_Pokereval(self):
+        """Test Poker Evaluator : same values as pokereval"""
+        random = Random(1)
+        deck = range(52)
+        for i in xrange(200):
+            random.shuffle(deck)
+            for side in ('hi', 'low'):
+                for ( hand, board ) in ( ( deck[:7], [] ), ( deck[:5], [] ), ( deck[:4], deck[4:9] ) ):
+                    expected = self.eval.best(side, hand, board)
+                    value, cards = self.evaluator.best(side, hand, board)
+                    self.assertEqual(( side, hand, board, value, cards[0] ), ( side, hand, board, expected[0], expected[1][0] ))
+                    self.assertEqual(sorted(card % 13 for card in cards[1:]), sorted(card % 13 for card in expected[1][1:]))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test05_Fallback(self):
+        """Test Poker Evaluator : incomplete hands are evaluated by pokereval"""
+        hand = self.eval.string2card(['Ad', 'As', '9d', '6s'])
+        self.assertEqual(self.evaluator.best('hi', hand), self.eval.best('hi', hand))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test06_Cache(self):
+        """Test Poker Evaluator : results are cached until reset"""
+        hand = self.eval.string2card(['Ad', 'As', 'Ah', '3s', '9d', '6s', 'Td'])
+        first = self.evaluator.best('hi', hand)
+        self.failUnless(self.evaluator.best('hi', hand) is first)
+        self.assertEqual(self.evaluator.bestHands([ ('hi', hand, []), ('low', hand, []) ]), [ first, self.evaluator.best('low', hand) ])
+        self.evaluator.reset()
+        self.failIf(self.evaluator.best('hi', hand) is first)
+        self.assertRaises(UserWarning, pokerevaluator.get_evaluator, "unknown", self.eval)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test07_Game(self):
+        """Test Poker Evaluator : per game evaluator"""
+        game = pokergame.PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("omaha8")
+        game.setBettingStructure("0-0-limit")
+        self.failUnless(isinstance(game.evaluator, pokerevaluator.LookupEvaluator))
+        game.setEvaluator("pokereval")
+        self.failUnless(isinstance(game.evaluator, pokerevaluator.PokerEvalEvaluator))
+        game.setEvaluator("lookup")
+        self.failUnless(isinstance(game.evaluator, pokerevaluator.LookupEvaluator))
+        for ( serial, seat ) in ( ( 1, 0 ), ( 2, 1 ) ):
+            game.addPlayer(serial, seat)
+        game.getPlayer(1).hand = PokerCards(['Ad', 'As', 'Ah', '3s'])
+        game.getPlayer(2).hand = PokerCards(['Jh', '5c', '7d', '2d'])
+        game.board = PokerCards(['9d', '6s', 'Td', '4d', '4h'])
+        bests = game.bestHands([1, 2])
+        self.assertEqual(bests[1]['hi'], game.bestHand('hi', 1))
+        self.assertEqual(bests[2]['low'], game.bestHand('low', 2))
+        self.assertEqual(game.readablePlayerBestHands(1), 'Two pairs Aces and Fours, Ten kicker: Ad, Ah, 4d, 4h, Td\nNothing: ')
+
+    # -----------------------------------------------------------------------------------------------------
+    def test08_LRU(self):
+        """Test Poker Evaluator : bounded cache with hit and miss counters"""
+        cache = pokerevaluator.LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats(), { 'size': 2, 'entries': 2, 'hits': 2, 'misses': 1, 'hit_rate': 2.0 / 3 })
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()['hits'], 2)
+        evaluator = pokerevaluator.get_evaluator("pokereval", self.eval, 1)
+        first = self.eval.string2card(['Ad', 'As', 'Ah', '3s', '9d'])
+        second = self.eval.string2card(['Jh', '5c', '9d', '6s', 'Td'])
+        evaluator.best('hi', first)
+        evaluator.best('hi', list(reversed(first)))
+        evaluator.best('hi', second)
+        evaluator.best('hi', first)
+        self.assertEqual(( evaluator.stats()['hits'], evaluator.stats()['misses'] ), ( 1, 3 ))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test09_SuitIsomorphic(self):
+        """Test Poker Evaluator : suit isomorphic keys"""
+        cards = self.eval.string2card
+        NOCARD = PokerCards.NOCARD
+        key = pokerevaluator.suitIsomorphic([ cards(['Ad', 'As']), cards(['2c', '3c', '4s']) + [NOCARD] ])
+        self.assertEqual(key, pokerevaluator.suitIsomorphic([ cards(['Ah', 'Ac']), [NOCARD] + cards(['4c', '2d', '3d']) ]))
+        self.assertNotEqual(key, pokerevaluator.suitIsomorphic([ cards(['Ad', 'As']), cards(['2c', '3d', '4s']) + [NOCARD] ]))
+        self.assertNotEqual(key, pokerevaluator.suitIsomorphic([ cards(['2c', '3c', '4s']) + [NOCARD], cards(['Ad', 'As']) ]))
+        #
+        # Computed once per cards until reset
+        #
+        cards_lists = [ cards(['Ad', 'As']), cards(['2c', '3c', '4s']) + [NOCARD] ]
+        canonical = self.evaluator.canonical(cards_lists)
+        self.assertEqual(canonical, key)
+        self.failUnless(self.evaluator.canonical([ list(cards) for cards in cards_lists ]) is canonical)
+        self.evaluator.reset()
+        self.assertEqual(self.evaluator.canonicals, {})
+
+    # -----------------------------------------------------------------------------------------------------
+    def test10_HandEV(self):
+        """Test Poker Evaluator : handEV is computed once per hand"""
+        game = pokergame.PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("holdem")
+        game.setBettingStructure("1-2_20-200_limit")
+        game.setEvaluator("lookup", 16)
+        self.assertEqual(game.evaluator.cache.size, 16)
+        for ( serial, seat ) in ( ( 1, 0 ), ( 2, 1 ) ):
+            game.addPlayer(serial, seat)
+            game.payBuyIn(serial, game.bestBuyIn())
+            game.sit(serial)
+            game.autoBlindAnte(serial)
+        game.beginTurn(1)
+        game.getPlayer(1).hand = PokerCards(['Ad', 'As'])
+        game.getPlayer(2).hand = PokerCards(['Kd', 'Ks'])
+        game.board = PokerCards(['2c', '3c', '4s'])
+        ev = game.handEV(1, 1000)
+        misses = game.evaluator.stats()['misses']
+        game.getPlayer(1).hand = PokerCards(['Ah', 'Ac'])
+        game.getPlayer(2).hand = PokerCards(['Kh', 'Kc'])
+        game.board = PokerCards(['2d', '3d', '4c'])
+        self.assertEqual(game.handEV(1, 1000), ev)
+        self.assertEqual(game.evaluator.stats()['misses'], misses)
+        game.board = PokerCards()
+        self.failUnless(game.fold(game.getSerialInPosition()))
+        game.beginTurn(2)
+        self.assertEqual([ key for key in game.evaluator.cache.entries if key[0] == 'handEV' ], [])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test11_BestHands(self):
+        """Test Poker Evaluator : a showdown evaluated in a single bestHands call"""
+        random = Random(2)
+        deck = range(52)
+        for i in xrange(50):
+            random.shuffle(deck)
+            board = deck[:5]
+            requests = []
+            for player in xrange(10):
+                pocket = deck[5 + player * 4:9 + player * 4]
+                for side in ('hi', 'low'):
+                    requests.append(( side, pocket[:2] + board, [] ))
+                    requests.append(( side, pocket, board ))
+            #
+            # Cached, incomplete and duplicate requests
+            #
+            self.evaluator.reset()
+            cached = self.evaluator.best('hi', requests[0][1])
+            requests.append(( 'hi', deck[:3], [] ))
+            requests.append(requests[1])
+            bests = self.evaluator.bestHands(requests)
+            self.failUnless(bests[0] is cached)
+            self.assertEqual(len(bests), len(requests))
+            evaluator = pokerevaluator.get_evaluator("lookup", self.eval)
+            for ( ( side, hand, board ), best ) in zip(requests, bests):
+                self.assertEqual(best, evaluator.evaluate(side, hand, board))
+                self.assertEqual(best[0], self.eval.best(side, hand, board)[0])
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerEvaluatorTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerEvaluatorTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerevaluator.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerevaluator.py' TESTS='coverage-reset test-pokerevaluator.py coverage-report' check )"
+# End:
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys, time
+from os import path
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokergame, pokerexecutor
+from pokerengine.pokergame import PokerGameServer
+
+class ManualExecutor:
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, args, callback):
+        self.submitted.append(( function, args, callback ))
+
+    def run(self):
+        ( function, args, callback ) = self.submitted.pop(0)
+        callback(function(*args))
+
+class ImmediateFuture:
+
+    def __init__(self, result):
+        self.value = result
+
+    def add_done_callback(self, callback):
+        callback(self)
+
+    def cancelled(self):
+        return False
+
+    def exception(self):
+        return None
+
+    def result(self):
+        return self.value
+
+class ImmediateFutures:
+
+    def submit(self, function, *args):
+        return ImmediateFuture(function(*args))
+
+    def shutdown(self, wait):
+        pass
+
+class PokerExecutorTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        #
+        # No preflop equity table for omaha, all decisions are simulated
+        #
+        self.game.setVariant("omaha")
+        self.game.setBettingStructure("1-2_20-200_limit")
+        self.game.bot_eval_iterations = 100
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        del self.game
+
+    # -----------------------------------------------------------------------------------------------------
+    def bots(self, executor):
+        game = self.game
+        game.setBotExecutor(executor, 5)
+        for ( serial, seat ) in ( ( 1, 0 ), ( 2, 1 ) ):
+            self.failUnless(game.addPlayer(serial, seat))
+            self.failUnless(game.payBuyIn(serial, game.bestBuyIn()))
+            self.failUnless(game.sit(serial))
+            game.botPlayer(serial)
+        game.beginTurn(1)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Pending(self):
+        """Test Poker Executor : the bot acts when the simulation is done"""
+        executor = ManualExecutor()
+        self.bots(executor)
+        game = self.game
+        self.assertEqual(game.state, pokergame.GAME_STATE_PRE_FLOP)
+        serial = game.getSerialInPosition()
+        self.failUnless(game.isDecisionPending())
+        self.failUnless(game.isDecisionPending(serial))
+        self.failIf(game.isDecisionPending(3 - serial))
+        self.assertEqual(len(executor.submitted), 1)
+        self.failIf(serial in game.last_auto_action)
+        executor.run()
+        self.failUnless(serial in game.last_auto_action)
+        self.failIf(game.isDecisionPending(serial))
+        while executor.submitted:
+            executor.run()
+        self.assertEqual(game.state, pokergame.GAME_STATE_END)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Expire(self):
+        """Test Poker Executor : the bot folds after the deadline"""
+        executor = ManualExecutor()
+        self.bots(executor)
+        game = self.game
+        serial = game.getSerialInPosition()
+        self.failIf(game.expireBotDecision(time.time() + 1))
+        self.failUnless(game.isDecisionPending(serial))
+        self.failUnless(game.expireBotDecision(time.time() + 6))
+        self.assertEqual(game.last_auto_action[serial], "fold")
+        self.assertEqual(game.state, pokergame.GAME_STATE_END)
+        self.failIf(game.isDecisionPending())
+        ( function, args, callback ) = executor.submitted.pop(0)
+        callback(function(*args))
+        self.assertEqual(game.last_auto_action[serial], "fold")
+        self.failIf(game.expireBotDecision(time.time() + 6))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Inline(self):
+        """Test Poker Executor : inline and futures executors"""
+        self.bots(pokerexecutor.InlineExecutor())
+        self.assertEqual(self.game.state, pokergame.GAME_STATE_END)
+        self.failIf(self.game.isDecisionPending())
+
+    # -----------------------------------------------------------------------------------------------------
+    def test04_Futures(self):
+        """Test Poker Executor : futures executor callbacks run on poll"""
+        executor = pokerexecutor.FuturesExecutor(ImmediateFutures())
+        self.bots(executor)
+        game = self.game
+        self.failUnless(game.isDecisionPending())
+        while executor.poll():
+            pass
+        self.assertEqual(game.state, pokergame.GAME_STATE_END)
+        dispatched = []
+        executor = pokerexecutor.FuturesExecutor(ImmediateFutures(), lambda callback, result: dispatched.append(result))
+        executor.submit(pokerexecutor.botEquity, ( "holdem", [ [ 12, 25 ], [ 255, 255 ] ], [ 0, 1, 2, 3, 4 ], 100, None, None ), None)
+        self.assertEqual(len(dispatched), 1)
+        self.assertEqual(len(dispatched[0]), 2)
+        executor.shutdown()
+
+    # -----------------------------------------------------------------------------------------------------
+    def test05_FoldPolicy(self):
+        """Test Poker Executor : the bot folds after the deadline or a failed simulation, even if it could check"""
+        executor = ManualExecutor()
+        self.bots(executor)
+        game = self.game
+        for hand_serial in ( 1, 2 ):
+            if hand_serial == 2:
+                executor.submitted = []
+                game.beginTurn(hand_serial)
+            #
+            # The small blind calls, the big blind could check
+            #
+            self.failUnless(game.call(game.getSerialInPosition()))
+            serial = game.getSerialInPosition()
+            self.failUnless(game.isDecisionPending(serial))
+            self.failUnless("check" in game.possibleActions(serial))
+            if hand_serial == 1:
+                self.failUnless(game.expireBotDecision(time.time() + 6))
+            else:
+                ( function, args, callback ) = executor.submitted[-1]
+                callback(None)
+            self.assertEqual(game.last_auto_action[serial], "fold")
+            self.assertEqual(game.state, pokergame.GAME_STATE_END)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test06_Restore(self):
+        """Test Poker Executor : a pending decision is submitted again when the game is restored"""
+        self.bots(ManualExecutor())
+        game = self.game
+        serial = game.getSerialInPosition()
+        self.failUnless(game.isDecisionPending(serial))
+        snapshot = game.snapshot()
+        def newGame(executor):
+            other = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+            other.bot_eval_iterations = 100
+            if executor:
+                other.setBotExecutor(executor, 5)
+            return other
+        executor = ManualExecutor()
+        other = newGame(executor)
+        other.restore(snapshot)
+        self.failUnless(other.isDecisionPending(serial))
+        self.assertEqual(len(executor.submitted), 1)
+        self.failIf(serial in other.last_auto_action)
+        executor.run()
+        self.failUnless(serial in other.last_auto_action)
+        #
+        # Without a bot_executor the bot decides at once
+        #
+        other = newGame(None)
+        other.restore(snapshot)
+        self.failIf(other.isDecisionPending())
+        self.failUnless(serial in other.last_auto_action)
+        #
+        # Unless the caller resumes the decision later
+        #
+        executor = ManualExecutor()
+        other = newGame(executor)
+        other.restore(snapshot, resume = False)
+        self.assertEqual(executor.submitted, [])
+        self.assertEqual(other.resumeBotDecision(), True)
+        self.assertEqual(len(executor.submitted), 1)
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerExecutorTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerExecutorTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerexecutor.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerexecutor.py' TESTS='coverage-reset test-pokerexecutor.py coverage-report' check )"
+# End:
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys
+import shutil
+import tempfile
+from os import path
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokerhandstore
+from pokerengine.pokercards import PokerCards
+from pokerengine.pokerhandstore import PokerHandStore
+
+class PokerHandStoreTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # -----------------------------------------------------------------------------------------------------
+    def history(self, hand_serial):
+        return [
+            ( 'game', 0, hand_serial, 0, 0, 'holdem', '1-2_20-200_limit', [ 1, 2 ], 0, { 1: 100, 2: 200 } ),
+            ( 'round', 'pre-flop', PokerCards([]), { 1: PokerCards([ 1, 2 ]), 2: PokerCards([ 3, 4 ]) } ),
+            ( 'fold', 1, False ),
+            ( 'finish', hand_serial ),
+        ]
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Lookup(self):
+        """Test Poker Hand Store : archive hands in segments and find them"""
+        store = PokerHandStore(self.directory, segment_size = 512)
+        for hand_serial in xrange(1, 101):
+            store.append(hand_serial, self.history(hand_serial))
+        self.failUnless(len(store.segments) > 10)
+        self.failUnless(store.ordered)
+        self.assertEqual(len(store), 100)
+        #
+        # In the segment being written and in the sealed segments
+        #
+        self.assertEqual(store.get(100), self.history(100))
+        self.assertEqual(store.get(1), self.history(1))
+        self.assertEqual(store.get(57), self.history(57))
+        self.assertEqual(store.get(101), None)
+        self.assertEqual(store.get(0), None)
+        self.failUnless(50 in store)
+        store.close()
+
+        store = PokerHandStore(self.directory, segment_size = 512, maps = 2)
+        self.assertEqual(len(store), 100)
+        for hand_serial in xrange(1, 101):
+            self.assertEqual(store.get(hand_serial), self.history(hand_serial))
+        self.assertEqual(len(store.maps), 2)
+        self.assertEqual([ hand_serial for ( hand_serial, history ) in store.iterHands() ], range(1, 101))
+        #
+        # More hands in the last segment
+        #
+        store.append(101, self.history(101))
+        self.assertEqual(store.get(101), self.history(101))
+        store.close()
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Unordered(self):
+        """Test Poker Hand Store : hand serials in any order, archived twice"""
+        store = PokerHandStore(self.directory, segment_size = 512)
+        for hand_serial in range(50, 0, -1) + range(51, 60):
+            store.append(hand_serial, self.history(hand_serial))
+        store.append(10, self.history(1000))
+        self.failIf(store.ordered)
+        for hand_serial in range(1, 60):
+            if hand_serial != 10:
+                self.assertEqual(store.get(hand_serial), self.history(hand_serial))
+        self.assertEqual(store.get(10), self.history(1000))
+        self.assertEqual(len(store), 59)
+        store.close()
+        store = PokerHandStore(self.directory, segment_size = 512)
+        self.assertEqual(store.get(10), self.history(1000))
+        self.assertEqual(store.get(11), self.history(11))
+        self.assertEqual(len(store), 59)
+        store.append(11, self.history(11))
+        store.append(60, self.history(60))
+        self.assertEqual(len(store), 60)
+        store.close()
+        self.assertEqual(len(store), 60)
+        self.failUnlessRaises(UserWarning, store.append, 61, self.history(61))
+        self.failUnlessRaises(UserWarning, store.flush)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Recover(self):
+        """Test Poker Hand Store : the store was not closed"""
+        store = PokerHandStore(self.directory)
+        for hand_serial in xrange(1, 11):
+            store.append(hand_serial, self.history(hand_serial))
+        store.close()
+        store = PokerHandStore(self.directory)
+        for hand_serial in xrange(11, 21):
+            store.append(hand_serial, self.history(hand_serial))
+        store.flush(sync = True)
+        segment = store.active.data_path
+        #
+        # The process dies while writing a record
+        #
+        data = open(segment, "ab")
+        data.write(pokerhandstore.RECORD.pack(21, 1000) + "partial")
+        data.close()
+        size = path.getsize(segment)
+        store = PokerHandStore(self.directory)
+        self.assertEqual(len(store), 20)
+        self.assertEqual(store.get(15), self.history(15))
+        self.assertEqual(store.get(21), None)
+        self.assertEqual(path.getsize(segment), size - pokerhandstore.RECORD.size - len("partial"))
+        store.append(21, self.history(21))
+        self.assertEqual(store.get(21), self.history(21))
+        self.assertEqual(len(store), 21)
+        store.close()
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerHandStoreTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerHandStoreTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerhandstore.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerhandstore.py' TESTS='coverage-reset test-pokerhandstore.py coverage-report' check )"
+# End:
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys
+from os import path
+from StringIO import StringIO
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokerhistory
+from pokerengine.pokercards import PokerCards
+from pokerengine.pokergame import PokerGameServer, history2messages
+
+class PokerHistoryTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        self.game.setVariant("holdem")
+        self.game.setBettingStructure("1-2_20-200_limit")
+        for ( serial, seat ) in ( ( 1, 0 ), ( 2, 1 ), ( 3, 2 ) ):
+            self.failUnless(self.game.addPlayer(serial, seat))
+            self.failUnless(self.game.payBuyIn(serial, self.game.bestBuyIn()))
+            self.failUnless(self.game.sit(serial))
+            self.game.autoBlindAnte(serial)
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        del self.game
+
+    # -----------------------------------------------------------------------------------------------------
+    def playHand(self):
+        game = self.game
+        game.beginTurn(1)
+        self.failUnless(game.callNraise(game.getSerialInPosition(), 0))
+        self.failUnless(game.fold(game.getSerialInPosition()))
+        while game.isRunning():
+            self.failUnless(game.call(game.getSerialInPosition()) or game.check(game.getSerialInPosition()))
+        return game.historyGet()
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Events(self):
+        """Test Poker History : round trip of every event type"""
+        hands = { 1: PokerCards([ 1, 2 ]), 2: PokerCards([ PokerCards.NOCARD, 200 ]) }
+        history = [
+            ( 'game', 1, 4000001, 3, 12.5, 'holdem', '1-2_20-200_limit', [ 1, 2 ], 0, { 1: 1000, 2: 3000000000 } ),
+            ( 'wait_for', 1, 'late' ),
+            ( 'player_list', [ 1, 2 ] ),
+            ( 'round', 'pre-flop', PokerCards([]), hands ),
+            ( 'position', -1, None ),
+            ( 'showdown', PokerCards([ 3, 4, 5 ]), hands ),
+            ( 'blind_request', 1, 10, 0, 'small' ),
+            ( 'wait_blind', 1 ),
+            ( 'blind', 1, 10, 5 ),
+            ( 'ante_request', 1, 1 ),
+            ( 'ante', 1, 1 ),
+            ( 'all-in', 1 ),
+            ( 'call', 1, 300 ),
+            ( 'check', 1 ),
+            ( 'fold', 1, True ),
+            ( 'raise', 1, 2 ** 70 ),
+            ( 'canceled', 1, 0 ),
+            ( 'end', [ 1 ], [ { 'type': 'game_state', 'foldwin': False, 'serial2delta': { 1: -10, 2: 10 }, 'side_pots': { 'contributions': { 0: {}, 'total': {} }, 'pots': [ [ 0, 0 ] ] } }, { 'type': 'resolve', 'hi': [ 2 ], 'low': None } ] ),
+            ( 'sitOut', 1 ),
+            ( 'sit', 1, False ),
+            ( 'leave', [ ( 1, 0 ), ( 2, 1 ) ] ),
+            ( 'finish', 4000001 ),
+            ( 'muck', [] ),
+            ( 'rake', 3, { 1: 2, 2: 1 } ),
+            ( 'rebuy', 1, 100 ),
+            ( 'buyOut', 1, 100, 0 ),
+            ( 'unknown', u'caf\xe9', (), -1 ),
+        ]
+        for ( code, event_type ) in enumerate(pokerhistory.EVENT_TYPES):
+            if event_type:
+                self.failUnless(event_type in [ event[0] for event in history ], event_type)
+        data = pokerhistory.encodeHistory(history)
+        self.failUnless(data.startswith(pokerhistory.HEADER))
+        decoded = pokerhistory.decodeHistory(data)
+        self.assertEqual(decoded, history)
+        self.assertEqual(type(decoded[-1][2]), tuple)
+        self.assertEqual(type(decoded[2][1]), list)
+        self.assertEqual(decoded[5][2][2].cards, [ PokerCards.NOCARD, 200 ])
+        #
+        # A value that is not part of a history
+        #
+        self.assertRaises(UserWarning, pokerhistory.encodeHistory, [ ( 'call', object() ) ])
+        self.assertRaises(UserWarning, pokerhistory.decodeHistory, "PKX\x01")
+        self.assertRaises(UserWarning, pokerhistory.decodeHistory, "PKH\x02")
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Game(self):
+        """Test Poker History : the decoded history of a hand reads like the original"""
+        history = self.playHand()
+        data = pokerhistory.encodeHistory(history)
+        self.assertEqual(pokerhistory.decodeHistory(data), history)
+        self.assertEqual(history2messages(self.game, pokerhistory.iterHistory(data), pocket_messages = True), history2messages(self.game, history, pocket_messages = True))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Stream(self):
+        """Test Poker History : write and read one event at a time"""
+        history = self.playHand()
+        output = StringIO()
+        writer = pokerhistory.PokerHistoryWriter(output.write)
+        writer.append(history[0])
+        writer.extend(history[1:])
+        data = output.getvalue()
+        self.assertEqual(data, pokerhistory.encodeHistory(history))
+        #
+        # Bytes arrive one by one
+        #
+        reader = pokerhistory.PokerHistoryReader()
+        events = []
+        for byte in data:
+            events.extend(reader.feed(byte))
+        self.assertEqual(events, history)
+        self.assertEqual(reader.pending(), 0)
+        self.assertEqual(list(pokerhistory.readHistory(StringIO(data), 7)), history)
+        #
+        # The last event is incomplete
+        #
+        self.assertRaises(UserWarning, list, pokerhistory.readHistory(StringIO(data[:-1])))
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerHistoryTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerHistoryTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerhistory.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerhistory.py' TESTS='coverage-reset test-pokerhistory.py coverage-report' check )"
+# End:
@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys
+from os import path
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokerhost
+from pokerengine import pokergame
+from pokerengine.pokergame import PokerGameServer
+
+class PokerTimersTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Order(self):
+        """Test Poker Host : timers fire in order"""
+        timers = pokerhost.PokerTimers(resolution = 1)
+        fired = []
+        delays = ( 1, 2, 255, 256, 257, 1000, 70000, 2 ** 32 + 5 )
+        for delay in reversed(delays):
+            timers.schedule(delay, lambda delay: fired.append(( delay, timers.tick )), delay)
+        self.assertEqual(timers.count, len(delays))
+        timers.advance(0)
+        self.assertEqual(fired, [])
+        self.assertEqual(timers.nextTime(), 1)
+        timers.advance(300)
+        self.assertEqual(fired, [ ( 1, 1 ), ( 2, 2 ), ( 255, 255 ), ( 256, 256 ), ( 257, 257 ) ])
+        timers.advance(2 ** 33)
+        self.assertEqual(fired[5:], [ ( 1000, 1000 ), ( 70000, 70000 ), ( 2 ** 32 + 5, 2 ** 32 + 5 ) ])
+        self.assertEqual(timers.count, 0)
+        self.assertEqual(timers.nextTime(), None)
+        #
+        # A timer in the past fires at the next tick
+        #
+        timers.schedule(10, fired.append, "late")
+        self.assertEqual(timers.advance(2 ** 33 + 1), 1)
+        self.assertEqual(fired[-1], "late")
+        #
+        # The timers of a tick fire in the order they were scheduled
+        #
+        del fired[:]
+        for index in xrange(5):
+            timers.schedule(2 ** 33 + 10, fired.append, index)
+        timers.advance(2 ** 33 + 10)
+        self.assertEqual(fired, range(5))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Cancel(self):
+        """Test Poker Host : cancelled timers do not fire"""
+        timers = pokerhost.PokerTimers(resolution = 0.5, now = 10)
+        fired = []
+        first = timers.schedule(11, fired.append, 1)
+        second = timers.schedule(500, fired.append, 2)
+        timers.schedule(501, fired.append, 3)
+        timers.cancel(first)
+        timers.cancel(second)
+        timers.cancel(second)
+        self.failIf(first.active() or second.active())
+        self.assertEqual(timers.count, 1)
+        self.assertEqual(timers.nextTime(), 501)
+        timers.advance(1000)
+        self.assertEqual(fired, [ 3 ])
+        self.assertEqual(timers.cancelled, 0)
+        #
+        # The heap is rebuilt when the cancelled timers outnumber the others
+        #
+        for index in xrange(pokerhost.COMPACT_MIN * 2):
+            timers.cancel(timers.schedule(2000, fired.append, index))
+        self.failUnless(len(timers.heap) <= pokerhost.COMPACT_MIN + 1)
+        self.assertEqual(timers.count, 0)
+        self.assertEqual(timers.nextTime(), None)
+        self.assertEqual(timers.cancelled, 0)
+        self.assertEqual(timers.heap, [])
+
+class PokerTableHostTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.now = 0.0
+        self.host = pokerhost.PokerTableHost(hand_delay = 5, action_timeout = 20, resolution = 1, clock = lambda: self.now)
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        del self.host
+
+    # -----------------------------------------------------------------------------------------------------
+    def newGame(self, game_id, serials, bots):
+        game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("holdem")
+        game.setBettingStructure("1-2_20-200_limit")
+        game.id = game_id
+        game.bot_eval_iterations = 50
+        for seat, serial in enumerate(serials):
+            self.failUnless(game.addPlayer(serial, seat))
+            self.failUnless(game.payBuyIn(serial, game.bestBuyIn()))
+            self.failUnless(game.sit(serial))
+            game.autoBlindAnte(serial)
+            if bots:
+                game.botPlayer(serial)
+        return game
+
+    # -----------------------------------------------------------------------------------------------------
+    def advance(self, seconds):
+        self.now += seconds
+        return self.host.tick()
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Bots(self):
+        """Test Poker Host : a hand of bots begins every hand_delay seconds"""
+        host = self.host
+        game = self.newGame(1, ( 1, 2, 3 ), True)
+        ended = []
+        host.callback_hand_end = ended.append
+        host.addGame(game)
+        self.assertRaises(UserWarning, host.addGame, game)
+        self.assertEqual(host.tick(), 5)
+        self.assertEqual(self.advance(4), 1)
+        self.assertEqual(game.hand_serial, 1)
+        self.advance(1)
+        self.assertEqual(game.hand_serial, 1)
+        self.failUnless(game.isEndOrNull())
+        self.assertEqual(ended, [ game ])
+        self.advance(5)
+        self.assertEqual(game.hand_serial, 2)
+        self.assertEqual(ended, [ game, game ])
+        self.failUnless(host.removeGame(1))
+        self.failIf(host.removeGame(1))
+        self.assertEqual(host.tick(), None)
+        self.assertEqual(game.callbacks, [])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Timeout(self):
+        """Test Poker Host : the player in position is set to auto after action_timeout"""
+        host = self.host
+        game = self.newGame(1, ( 1, 2, 3 ), False)
+        host.addGame(game)
+        host.tick()
+        self.advance(5)
+        self.failUnless(game.isRunning())
+        serial = game.getSerialInPosition()
+        #
+        # The player acts in time, the timeout of the next player starts
+        #
+        self.advance(10)
+        #
+        # The table changes but the player in position is the same,
+        # the timeout is not reset
+        #
+        host.changed(game.id)
+        self.assertEqual(host.tick(), 10)
+        self.advance(9)
+        self.failUnless(game.call(serial))
+        self.assertEqual(host.tick(), 20)
+        self.failIf(game.getPlayer(serial).auto)
+        serial = game.getSerialInPosition()
+        self.advance(20)
+        self.failUnless(game.getPlayer(serial).auto)
+        self.failIf(game.isInGame(serial) and not game.getPlayer(serial).isFold())
+        #
+        # The last player folds as well, the hand ends and the next
+        # begins after hand_delay
+        #
+        serial = game.getSerialInPosition()
+        self.advance(20)
+        self.failUnless(game.isEndOrNull())
+        self.assertEqual(host.tick(), 5)
+        self.advance(5)
+        self.assertEqual(game.hand_serial, 2)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Drive(self):
+        """Test Poker Host : tick is called with call_later"""
+        host = self.host
+        game = self.newGame(1, ( 1, 2 ), False)
+        calls = []
+        class Delayed:
+            def __init__(self, delay, function):
+                self.delay = delay
+                self.function = function
+                calls.append(self)
+            def cancel(self):
+                calls.remove(self)
+        host.drive(Delayed)
+        self.assertEqual([ delayed.delay for delayed in calls ], [ 0 ])
+        calls.pop(0).function()
+        self.assertEqual(calls, [])
+        #
+        # A game change wakes the host up once
+        #
+        host.addGame(game)
+        game.sitOut(1)
+        game.sit(1)
+        self.assertEqual([ delayed.delay for delayed in calls ], [ 0 ])
+        calls.pop(0).function()
+        self.assertEqual([ delayed.delay for delayed in calls ], [ 5 ])
+        self.now += 5
+        calls.pop(0).function()
+        self.assertEqual(game.hand_serial, 1)
+        self.assertEqual([ delayed.delay for delayed in calls ], [ 20 ])
+        #
+        # The player acts, the timer is set again
+        #
+        self.now += 1
+        game.call(game.getSerialInPosition())
+        self.assertEqual([ delayed.delay for delayed in calls ], [ 0 ])
+        calls.pop(0).function()
+        self.assertEqual([ delayed.delay for delayed in calls ], [ 20 ])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test04_BotExecutor(self):
+        """Test Poker Host : the pending decision of a bot expires on the clock of the host"""
+        host = self.host
+        game = self.newGame(1, ( 1, 2 ), True)
+        executor = ManualExecutor()
+        game.setBotExecutor(executor, 10)
+        #
+        # No preflop equity table for omaha, the decisions are simulated
+        #
+        game.setVariant("omaha")
+        host.addGame(game)
+        host.tick()
+        self.advance(5)
+        serial = game.getSerialInPosition()
+        self.failUnless(game.isDecisionPending(serial))
+        self.assertEqual(game.pending_decision['deadline'], 15)
+        self.assertEqual(host.tick(), 10)
+        self.advance(9)
+        self.failUnless(game.isDecisionPending(serial))
+        self.advance(1)
+        self.failIf(game.isDecisionPending(serial))
+        self.assertEqual(game.last_auto_action[serial], "fold")
+        self.failUnless(game.isEndOrNull())
+        #
+        # The result of the simulation comes too late
+        #
+        while executor.submitted:
+            executor.run()
+        self.assertEqual(host.tick(), 5)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test05_Muck(self):
+        """Test Poker Host : the muckable players muck after action_timeout"""
+        host = self.host
+        game = self.newGame(1, ( 1, 2 ), False)
+        for serial in ( 1, 2 ):
+            game.autoMuck(serial, pokergame.AUTO_MUCK_NEVER)
+        host.addGame(game)
+        host.tick()
+        self.advance(5)
+        self.failUnless(game.fold(game.getSerialInPosition()))
+        self.assertEqual(game.state, "muck")
+        self.failUnless(game.muckable_serials)
+        self.assertEqual(host.tick(), 20)
+        self.advance(19)
+        self.assertEqual(game.state, "muck")
+        self.advance(1)
+        self.assertEqual(game.state, "end")
+        self.assertEqual(game.muckable_serials, [])
+        self.assertEqual(host.tick(), 5)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test06_Tournament(self):
+        """Test Poker Host : the tournament is told when a hand ends, its broken tables are removed"""
+        host = self.host
+        games = [ self.newGame(game_id, ( game_id * 10 + 1, game_id * 10 + 2 ), True) for game_id in ( 1, 2 ) ]
+        tourney = FakeTourney(games)
+        host.addTournament(tourney)
+        self.assertEqual(sorted(host.tables.keys()), [ 1, 2 ])
+        host.tick()
+        self.advance(5)
+        #
+        # The first hand that ends breaks table 2 and starts a break
+        #
+        self.failUnless(( "endTurn", 1 ) in tourney.calls)
+        self.failUnless(( "tourneyEnd", 1 ) in tourney.calls)
+        self.assertEqual(host.tables.keys(), [ 1 ])
+        self.assertEqual(games[1].callbacks, [])
+        self.assertEqual(tourney.state, "break")
+        self.failUnless(host.tourneys[tourney].active())
+        self.assertEqual(host.tick(), 30)
+        #
+        # The next hand begins hand_delay seconds after the break
+        #
+        self.advance(30)
+        self.assertEqual(tourney.state, "running")
+        self.assertEqual(host.tourneys[tourney], None)
+        self.assertEqual(host.tick(), 5)
+        hand_serial = games[0].hand_serial
+        self.advance(5)
+        self.failIf(games[0].hand_serial == hand_serial)
+        #
+        # When endTurn ends the tournament, tourneyEnd is not called
+        #
+        del tourney.calls[:]
+        tourney.over = True
+        self.advance(5)
+        self.assertEqual(tourney.calls, [ ( "endTurn", 1 ) ])
+        self.assertEqual(host.tables.keys(), [])
+        host.removeTournament(tourney)
+        self.assertEqual(host.tourneys, {})
+        self.assertEqual(host.tick(), None)
+
+# -----------------------------------------------------------------------------------------------------
+class ManualExecutor:
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, args, callback):
+        self.submitted.append(( function, args, callback ))
+
+    def run(self):
+        ( function, args, callback ) = self.submitted.pop(0)
+        callback(function(*args))
+
+# -----------------------------------------------------------------------------------------------------
+class FakeTourney:
+    """
+    The part of PokerTournament used by PokerTableHost. The first
+    tourneyEnd breaks the last table and starts a break of 30 seconds.
+    When over is True, endTurn ends the tournament.
+    """
+
+    def __init__(self, games):
+        self.games = list(games)
+        self.id2game = dict(( game.id, game ) for game in games)
+        self.state = "running"
+        self.calls = []
+        self.over = False
+
+    def endTurn(self, game_id):
+        self.calls.append(( "endTurn", game_id ))
+        if self.over:
+            self.games = []
+            self.id2game = {}
+            self.state = "complete"
+
+    def tourneyEnd(self, game_id):
+        self.calls.append(( "tourneyEnd", game_id ))
+        if len(self.games) > 1:
+            del self.id2game[self.games.pop().id]
+            self.state = "break"
+
+    def remainingBreakSeconds(self):
+        return 30
+
+    def updateBreak(self):
+        self.calls.append(( "updateBreak", ))
+        self.state = "running"
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerTimersTestCase))
+    suite.addTest(unittest.makeSuite(PokerTableHostTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerTableHostTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerhost.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerhost.py' TESTS='coverage-reset test-pokerhost.py coverage-report' check )"
+# End:
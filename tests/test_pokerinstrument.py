@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys
+from os import path
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokerinstrument
+from pokerengine.pokergame import PokerGameServer
+from pokerengine.pokertournament import PokerTournament
+
+class PokerInstrumentationTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        self.game.setVariant("holdem")
+        self.game.setBettingStructure("1-2_20-200_limit")
+        for ( serial, seat ) in ( ( 1, 0 ), ( 2, 1 ) ):
+            self.failUnless(self.game.addPlayer(serial, seat))
+            self.failUnless(self.game.payBuyIn(serial, self.game.bestBuyIn()))
+            self.failUnless(self.game.sit(serial))
+            self.game.autoBlindAnte(serial)
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        del self.game
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Record(self):
+        """Test Poker Instrumentation : ring buffer and histograms"""
+        instrumentation = pokerinstrument.PokerInstrumentation(2)
+        instrumentation.record("call", 0.000003, 0.000002)
+        instrumentation.record("call", 0.5, 0.25)
+        instrumentation.record("fold", 0.0, 0.0)
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(snapshot['recent'], [ [ "call", 0.5, 0.25 ], [ "fold", 0.0, 0.0 ] ])
+        call = snapshot['methods']['call']
+        self.assertEqual(call['count'], 2)
+        self.assertEqual(call['wall_max'], 0.5)
+        self.assertAlmostEqual(call['cpu'], 0.250002)
+        self.assertEqual(call['histogram'][2], 1)
+        self.assertEqual(call['histogram'][19], 1)
+        self.assertEqual(snapshot['methods']['fold']['histogram'][0], 1)
+        instrumentation.reset()
+        self.assertEqual(instrumentation.snapshot()['methods'], {})
+        self.assertEqual(instrumentation.snapshot()['recent'], [])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Game(self):
+        """Test Poker Instrumentation : time the actions of a game"""
+        game = self.game
+        instrumentation = pokerinstrument.PokerInstrumentation()
+        game.setInstrumentation(instrumentation)
+        game.beginTurn(1)
+        self.failUnless(game.callNraise(game.getSerialInPosition(), 0))
+        self.failUnless(game.call(game.getSerialInPosition()))
+        self.failUnless(game.check(game.getSerialInPosition()))
+        self.failUnless(game.fold(game.getSerialInPosition()))
+        methods = instrumentation.snapshot()['methods']
+        for name in ( "call", "callNraise", "check", "fold", "__talked", "distributeMoney", "__makeSidePots", "historyAdd", "runCallbacks" ):
+            self.failUnless(methods[name]['count'] > 0, name)
+        self.assertEqual(methods['fold']['count'], 1)
+        self.assertEqual(sum(methods['historyAdd']['histogram']), methods['historyAdd']['count'])
+        #
+        # Disabled, the class methods are used again
+        #
+        game.setInstrumentation(None)
+        for ( attribute, name ) in pokerinstrument.GAME_METHODS:
+            self.failIf(attribute in game.__dict__)
+        game.beginTurn(2)
+        self.assertEqual(instrumentation.snapshot()['methods']['historyAdd']['count'], methods['historyAdd']['count'])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Tournament(self):
+        """Test Poker Instrumentation : time a tournament and its games"""
+        tourney = PokerTournament(dirs = [path.join(TESTS_PATH, '../conf')], players_quota = 2, players_min = 2, seats_per_game = 2, betting_structure = "level-001")
+        instrumentation = pokerinstrument.PokerInstrumentation()
+        tourney.setInstrumentation(instrumentation)
+        for serial in ( 1, 2 ):
+            self.failUnless(tourney.register(serial))
+        self.assertEqual(len(tourney.games), 1)
+        game = tourney.games[0]
+        self.failUnless(game.instrumentation is instrumentation)
+        methods = instrumentation.snapshot()['methods']
+        self.assertEqual(methods['createGames']['count'], 1)
+        self.failUnless(methods['balanceGames']['count'] > 0)
+        tourney.setInstrumentation(None)
+        self.failIf(game.instrumentation)
+        self.failIf('createGames' in tourney.__dict__)
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerInstrumentationTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerInstrumentationTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerinstrument.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerinstrument.py' TESTS='coverage-reset test-pokerinstrument.py coverage-report' check )"
+# End:
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys
+import os
+import shutil
+import tempfile
+from os import path
+from random import Random
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokerjournal
+from pokerengine.pokerjournal import PokerJournal, PokerJournalRecorder
+from pokerengine.pokerreplay import PokerReplay
+from pokerengine.pokergame import PokerGameServer
+
+class PokerJournalTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # -----------------------------------------------------------------------------------------------------
+    def newGame(self, game_id):
+        game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("holdem")
+        game.setBettingStructure("1-2_20-200_limit")
+        game.id = game_id
+        return game
+
+    # -----------------------------------------------------------------------------------------------------
+    def state(self, game):
+        return (
+            game.state, game.hand_serial, game.pot, game.board, game.side_pots, game.turn_history,
+            [ ( player.serial, player.money, player.bet, player.fold, player.hand ) for player in game.playersAll() ],
+            )
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Commit(self):
+        """Test Poker Journal : append, commit, read back and recover"""
+        journal = PokerJournal(self.directory, segment_size = 100)
+        committed = []
+        self.assertEqual(journal.append(1, pokerjournal.JOURNAL_ACTION, ( "fold", ( 10, ), {} )), 0)
+        self.assertEqual(journal.append(2, pokerjournal.JOURNAL_DECK, range(52)), 1)
+        journal.whenCommitted(1, committed.append)
+        self.assertEqual(journal.commit(), 2)
+        self.assertEqual(journal.poll(), 1)
+        self.assertEqual(committed, [ 1 ])
+        # Already committed, the callback is called at once
+        journal.whenCommitted(0, committed.append)
+        self.assertEqual(journal.poll(), 1)
+        self.assertEqual(committed, [ 1, 0 ])
+        # The first segment is full, a second one is started
+        self.assertEqual(journal.append(1, pokerjournal.JOURNAL_ACTION, ( "call", ( 11, ), {} )), 2)
+        self.assertEqual(journal.commit(), 1)
+        self.assertEqual(journal.commit(), 0)
+        journal.close()
+        self.assertEqual(pokerjournal.listSegments(self.directory), [ 0, 2 ])
+        self.assertEqual(list(pokerjournal.readJournal(self.directory)), [
+            ( 0, 1, pokerjournal.JOURNAL_ACTION, ( "fold", ( 10, ), {} ) ),
+            ( 1, 2, pokerjournal.JOURNAL_DECK, range(52) ),
+            ( 2, 1, pokerjournal.JOURNAL_ACTION, ( "call", ( 11, ), {} ) ),
+            ])
+        # A record cut short by a crash is discarded
+        filename = pokerjournal.segmentPath(self.directory, 2)
+        size = path.getsize(filename)
+        data = open(filename, "ab")
+        data.write("\x40\x00\x00\x00garbage")
+        data.close()
+        journal = PokerJournal(self.directory)
+        self.assertEqual(path.getsize(filename), size)
+        self.assertEqual(journal.append(2, pokerjournal.JOURNAL_ACTION, ( "check", ( 12, ), {} )), 3)
+        journal.close()
+        self.assertEqual([ lsn for ( lsn, game_id, kind, value ) in pokerjournal.readJournal(self.directory) ], [ 0, 1, 2, 3 ])
+        # The segments before the current hands are removed
+        journal = PokerJournal(self.directory)
+        self.assertEqual(journal.purge(), 0)
+        self.assertEqual(journal.append(1, pokerjournal.JOURNAL_SNAPSHOT, "snapshot"), 4)
+        journal.commit()
+        self.assertEqual(journal.purge(), 1)
+        self.assertEqual(pokerjournal.listSegments(self.directory), [ 2 ])
+        journal.close()
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Recover(self):
+        """Test Poker Journal : rebuild the games of a journal"""
+        acknowledged = []
+        journal = PokerJournal(self.directory, max_latency = 0.001, dispatch = lambda callback, lsn: acknowledged.append(lsn))
+        journal.start()
+        games = []
+        for game_id in ( 1, 2 ):
+            game = self.newGame(game_id)
+            for serial in xrange(1, 5):
+                self.failUnless(game.addPlayer(serial))
+                self.failUnless(game.payBuyIn(serial, game.bestBuyIn()))
+                self.failUnless(game.sit(serial))
+                game.autoBlindAnte(serial)
+            if game_id == 1:
+                game.botPlayer(1)
+                game.botPlayer(2)
+            recorder = PokerJournalRecorder(game, journal)
+            recorder.start()
+            games.append(( game, recorder, Random(game_id) ))
+        for hand_serial in xrange(1, 4):
+            for ( game, recorder, random ) in games:
+                game.beginTurn(hand_serial)
+                while game.isRunning():
+                    serial = game.getSerialInPosition()
+                    action = random.choice(game.possibleActions(serial))
+                    if action == "raise":
+                        game.callNraise(serial, 0)
+                    else:
+                        getattr(game, action)(serial)
+                    if hand_serial == 3 and game.id == 2 and game.state == "flop":
+                        break
+        ( game, recorder, random ) = games[1]
+        self.failUnless(game.isRunning())
+        recorder.whenCommitted(lambda lsn: None)
+        journal.close()
+        self.assertEqual(acknowledged, [ recorder.lsn ])
+        hands = pokerjournal.lastHands(self.directory)
+        self.assertEqual(sorted(hands.keys()), [ 1, 2 ])
+        self.assertEqual(hands[1]['bots'], games[0][1].hand['bots'])
+        self.failUnless(hands[1]['bots'])
+        for ( game, recorder, random ) in games:
+            other = PokerReplay(self.newGame(game.id), history = True).replay(hands[game.id])
+            self.assertEqual(self.state(other), self.state(game))
+        #
+        # The game rebuilt is recorded from its current state and the
+        # previous segments can be removed
+        #
+        journal = PokerJournal(self.directory, segment_size = 1)
+        game = PokerReplay(self.newGame(2), history = True).replay(hands[2])
+        recorder = PokerJournalRecorder(game, journal)
+        recorder.start()
+        serial = game.getSerialInPosition()
+        self.failUnless(game.check(serial) or game.call(serial))
+        journal.commit()
+        self.assertEqual(journal.purge(), 1)
+        recorder.stop()
+        journal.close()
+        other = PokerReplay(self.newGame(2), history = True).replay(pokerjournal.lastHands(self.directory)[2])
+        self.assertEqual(self.state(other), self.state(game))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Failure(self):
+        """Test Poker Journal : the waiting callbacks are called with None when the journal fails"""
+        class FailingWriter:
+            def write(self, data):
+                raise IOError("disk full")
+            def close(self):
+                pass
+        committed = []
+        #
+        # In the calling thread the exception is raised
+        #
+        journal = PokerJournal(self.directory)
+        journal.append(1, pokerjournal.JOURNAL_ACTION, ( "fold", ( 10, ), {} ))
+        journal.commit()
+        journal.writer = FailingWriter()
+        lsn = journal.append(1, pokerjournal.JOURNAL_ACTION, ( "call", ( 11, ), {} ))
+        journal.whenCommitted(lsn, committed.append)
+        self.assertRaises(IOError, journal.commit)
+        self.assertEqual(journal.poll(), 1)
+        self.assertEqual(committed, [ None ])
+        self.assertRaises(UserWarning, journal.append, 1, pokerjournal.JOURNAL_ACTION, ( "check", ( 12, ), {} ))
+        self.assertRaises(UserWarning, journal.commit)
+        journal.whenCommitted(lsn, committed.append)
+        self.assertEqual(journal.poll(), 1)
+        self.assertEqual(committed, [ None, None ])
+        journal.close()
+        #
+        # The thread stops and the callbacks waiting are dispatched
+        #
+        del committed[:]
+        journal = PokerJournal(self.directory, max_latency = 0.001, dispatch = lambda callback, lsn: callback(lsn))
+        journal.writer = FailingWriter()
+        for serial in ( 10, 11 ):
+            journal.whenCommitted(journal.append(1, pokerjournal.JOURNAL_ACTION, ( "fold", ( serial, ), {} )), committed.append)
+        journal.start()
+        thread = journal.thread
+        thread.join(10)
+        self.failIf(thread.isAlive())
+        self.assertEqual(committed, [ None, None ])
+        self.assertRaises(UserWarning, journal.append, 1, pokerjournal.JOURNAL_ACTION, ( "check", ( 12, ), {} ))
+        journal.close()
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerJournalTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerJournalTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerjournal.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerjournal.py' TESTS='coverage-reset test-pokerjournal.py coverage-report' check )"
+# End:
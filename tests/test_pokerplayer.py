@@ -300,6 +300,29 @@ class PokerPlayerTestCase(unittest.TestCase):
         self.player.buy_in_payed = True
         self.failUnless(self.player.isBuyInPayed())
     
+    # -----------------------------------------------------------------------------------------------------    
+    def testSlots(self):
+        """Test Poker Player : Slots, lazy logger and copy"""
+        
+        # No per instance dictionary and no logger until needed
+        self.failIf(self.player.__dict__)
+        self.assertEqual(self.player._log, None)
+        log = self.player.log
+        self.failUnless(self.player.log is log)
+        
+        # The copy has its own cards and logger
+        self.player.hand = pokercards.PokerCards(['Ad', 'As'])
+        self.player.money = 100
+        copy = self.player.copy()
+        self.assertEqual(copy._log, None)
+        self.assertEqual(copy.money, 100)
+        self.assertEqual(copy.hand, self.player.hand)
+        self.failIf(copy.hand is self.player.hand)
+        
+        # Attributes outside of __slots__ are still accepted
+        self.player.extra = 1
+        self.assertEqual(self.player.__dict__, { 'extra': 1 })
+    
 # -----------------------------------------------------------------------------------------------------
 def GetTestSuite():
     suite = unittest.TestSuite()
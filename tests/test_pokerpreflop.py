@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys, os, shutil, tempfile
+from os import path
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+import pokereval
+
+from pokerengine import pokerpreflop, pokergame
+from pokerengine.pokercards import PokerCards
+
+class PokerPreflopTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.eval = pokereval.PokerEval()
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = path.join(self.tmpdir, "poker.holdem.equity")
+        pokerpreflop.clearPreflopEquity()
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        pokerpreflop.clearPreflopEquity()
+        shutil.rmtree(self.tmpdir)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Canonical(self):
+        """Test Poker Preflop : canonical starting hands"""
+        hands = set()
+        for first in xrange(52):
+            for second in xrange(52):
+                if first != second:
+                    hand = pokerpreflop.canonicalHand([first, second])
+                    self.assertEqual(hand, pokerpreflop.canonicalHand([second, first]))
+                    hands.add(hand)
+        self.assertEqual(sorted(hands), range(pokerpreflop.HANDS))
+        for hand in xrange(pokerpreflop.HANDS):
+            self.assertEqual(pokerpreflop.canonicalHand(pokerpreflop.canonicalPocket(hand)), hand)
+        cards = self.eval.string2card
+        self.assertEqual(pokerpreflop.canonicalHand(cards(['Ah', 'Kh'])), pokerpreflop.canonicalHand(cards(['Ks', 'As'])))
+        self.assertNotEqual(pokerpreflop.canonicalHand(cards(['Ah', 'Kh'])), pokerpreflop.canonicalHand(cards(['Ah', 'Ks'])))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Table(self):
+        """Test Poker Preflop : generate and load a table"""
+        pokerpreflop.generatePreflopEquity(self.path, "holdem", self.eval, 200, max_opponents = 2)
+        equity = pokerpreflop.loadPreflopEquity(self.path)
+        self.failUnless(equity is pokerpreflop.loadPreflopEquity(self.path))
+        self.assertEqual(( equity.variant, equity.hands, equity.max_opponents, equity.iterations ), ( "holdem", 169, 2, 200 ))
+        aces = self.eval.string2card(['Ad', 'As'])
+        self.failUnless(750 <= equity.handEV(aces, 1) <= 950)
+        self.failUnless(equity.handEV(aces, 2) < equity.handEV(aces, 1))
+        self.assertEqual(equity.handEV(aces, 3), None)
+        self.assertEqual(equity.handEV(aces, 0), None)
+        self.assertRaises(UserWarning, pokerpreflop.generatePreflopEquity, self.path, "omaha", self.eval, 200)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Invalid(self):
+        """Test Poker Preflop : missing or invalid tables are ignored"""
+        self.assertEqual(pokerpreflop.loadPreflopEquity(self.path), None)
+        fd = open(self.path, "wb")
+        fd.write(pokerpreflop.HEADER.pack(pokerpreflop.MAGIC, pokerpreflop.VERSION + 1, "holdem", 169, 1, 1))
+        fd.write("\0\0" * 169)
+        fd.close()
+        self.assertRaises(UserWarning, pokerpreflop.PreflopEquity, self.path)
+        self.assertEqual(pokerpreflop.loadPreflopEquity(self.path), None)
+        self.assertEqual(pokerpreflop.equityPath("/etc/poker-engine/poker.holdem.xml"), "/etc/poker-engine/poker.holdem.equity")
+
+    # -----------------------------------------------------------------------------------------------------
+    def test04_Game(self):
+        """Test Poker Preflop : handEV reads the table before the flop"""
+        game = pokergame.PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("holdem")
+        game.setBettingStructure("0-0-limit")
+        self.failIf(game.preflop_equity is None)
+        for ( serial, seat ) in ( ( 1, 0 ), ( 2, 1 ), ( 3, 2 ) ):
+            game.addPlayer(serial, seat)
+            game.payBuyIn(serial, game.bestBuyIn())
+            game.sit(serial)
+            game.autoBlindAnte(serial)
+        game.beginTurn(1)
+        game.getPlayer(1).hand = PokerCards(['Ad', 'As'])
+        expected = game.preflop_equity.handEV(self.eval.string2card(['Ad', 'As']), 2)
+        self.assertEqual(game.preflopEV(self.eval.string2card(['Ad', 'As']), 2), expected)
+        self.assertEqual(game.handEV(1, 10000, True), expected)
+        game.board = PokerCards(['2c', '3c', '4s'])
+        self.assertEqual(game.preflopEV(self.eval.string2card(['Ad', 'As']), 2), None)
+        game.preflop_equity = None
+        game.board = PokerCards()
+        self.assertEqual(game.preflopEV(self.eval.string2card(['Ad', 'As']), 2), None)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test05_Reload(self):
+        """Test Poker Preflop : a table installed or replaced later is loaded"""
+        self.assertEqual(pokerpreflop.loadPreflopEquity(self.path), None)
+        pokerpreflop.generatePreflopEquity(self.path, "holdem", self.eval, 10, max_opponents = 1)
+        first = pokerpreflop.loadPreflopEquity(self.path)
+        self.assertEqual(first.iterations, 10)
+        self.failUnless(pokerpreflop.loadPreflopEquity(self.path) is first)
+        pokerpreflop.generatePreflopEquity(self.path, "holdem", self.eval, 20, max_opponents = 1)
+        self.assertEqual(pokerpreflop.loadPreflopEquity(self.path).iterations, 20)
+        os.unlink(self.path)
+        self.assertEqual(pokerpreflop.loadPreflopEquity(self.path), None)
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerPreflopTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerPreflopTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerpreflop.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerpreflop.py' TESTS='coverage-reset test-pokerpreflop.py coverage-report' check )"
+# End:
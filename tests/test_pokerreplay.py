@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys
+from os import path
+from random import Random
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokerreplay
+from pokerengine.pokergame import PokerGameServer
+
+class PokerReplayTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def newGame(self):
+        game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("holdem")
+        game.setBettingStructure("1-2_20-200_limit")
+        return game
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.game = self.newGame()
+        for ( serial, seat ) in ( ( 1, 0 ), ( 2, 1 ), ( 3, 2 ), ( 4, 3 ) ):
+            self.failUnless(self.game.addPlayer(serial, seat))
+            self.failUnless(self.game.payBuyIn(serial, self.game.bestBuyIn()))
+            self.failUnless(self.game.sit(serial))
+            self.game.autoBlindAnte(serial)
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        del self.game
+
+    # -----------------------------------------------------------------------------------------------------
+    def play(self, game, random):
+        while game.isRunning():
+            serial = game.getSerialInPosition()
+            action = random.choice(game.possibleActions(serial))
+            if action == "raise":
+                game.callNraise(serial, 0)
+            else:
+                getattr(game, action)(serial)
+
+    # -----------------------------------------------------------------------------------------------------
+    def state(self, game):
+        return (
+            game.state, game.hand_serial, game.dealer_seat, game.pot, game.board.tolist(True),
+            game.side_pots, game.winners, game.turn_history,
+            [ ( player.serial, player.seat, player.money, player.bet, player.fold, player.all_in,
+                player.sit_out, player.hand.tolist(True) ) for player in game.playersAll() ],
+            )
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_Replay(self):
+        """Test Poker Replay : rebuild the game from the hand records"""
+        game = self.game
+        recorder = pokerreplay.PokerHandRecorder(game)
+        recorder.start()
+        random = Random(1)
+        hands = []
+        for hand_serial in xrange(1, 6):
+            game.beginTurn(hand_serial)
+            hands.append(recorder.hand)
+            self.play(game, random)
+        recorder.stop()
+        self.failIf(game.action_recorder)
+        self.assertEqual(hands[0]['actions'][0], ( "beginTurn", ( 1, ), {} ))
+        self.assertEqual(len(hands[-1]['deck']), 52)
+        #
+        # The last hand, replayed in a new game, ends in the same state
+        #
+        other = self.newGame()
+        callbacks = []
+        other.registerCallback(lambda *args: callbacks.append(args))
+        pokerreplay.PokerReplay(other, history = True).replay(hands[-1])
+        self.assertEqual(self.state(other), self.state(game))
+        self.assertEqual(callbacks, [])
+        #
+        # The callbacks and the history are back once the replay is over
+        #
+        other.beginTurn(6)
+        self.failUnless(callbacks)
+        self.assertEqual(other.turn_history[0][0], "game")
+        #
+        # Without history
+        #
+        other = self.newGame()
+        pokerreplay.PokerReplay(other).replay(hands[2])
+        self.assertEqual(other.turn_history, [])
+        self.failIf('historyAdd' in other.__dict__)
+        next = self.newGame()
+        next.restore(hands[3]['snapshot'])
+        self.assertEqual(
+            [ ( player.serial, player.money ) for player in other.playersAll() ],
+            [ ( player.serial, player.money ) for player in next.playersAll() ])
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_InFlight(self):
+        """Test Poker Replay : rebuild a hand that is not over"""
+        game = self.game
+        recorder = pokerreplay.PokerHandRecorder(game)
+        recorder.start()
+        game.beginTurn(1)
+        self.failUnless(game.callNraise(game.getSerialInPosition(), 0))
+        self.failUnless(game.call(game.getSerialInPosition()))
+        self.failUnless(game.fold(game.getSerialInPosition()))
+        self.assertEqual([ name for ( name, args, kw ) in recorder.hand['actions'] ], [ "beginTurn", "callNraise", "call", "fold" ])
+        other = pokerreplay.PokerReplay(self.newGame(), history = True).replay(recorder.hand)
+        self.assertEqual(self.state(other), self.state(game))
+        self.assertEqual(other.getSerialInPosition(), game.getSerialInPosition())
+        self.assertEqual(other.possibleActions(other.getSerialInPosition()), game.possibleActions(game.getSerialInPosition()))
+        serial = game.getSerialInPosition()
+        self.failUnless(game.call(serial))
+        self.failUnless(other.call(serial))
+        self.assertEqual(self.state(other), self.state(game))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Bots(self):
+        """Test Poker Replay : the bots take the decisions of the record"""
+        game = self.game
+        game.botPlayer(1)
+        game.botPlayer(2)
+        recorder = pokerreplay.PokerHandRecorder(game)
+        recorder.start()
+        random = Random(2)
+        for hand_serial in xrange(1, 4):
+            game.beginTurn(hand_serial)
+            self.play(game, random)
+        hand = recorder.hand
+        self.failUnless(hand['bots'])
+        self.failUnless(None not in [ action for ( serial, action ) in hand['bots'] ])
+        #
+        # The bots of the replay do not evaluate their hand
+        #
+        def botEval(serial):
+            self.fail("bot %d evaluates its hand" % serial)
+        other = self.newGame()
+        other._PokerGame__botEval = botEval
+        pokerreplay.PokerReplay(other, history = True).replay(hand)
+        self.assertEqual(self.state(other), self.state(game))
+        self.assertEqual(other.bot_decisions, None)
+        #
+        # A bot waiting for the bot_executor when the record ends
+        # decides again once the replay is over
+        #
+        executor = ManualExecutor()
+        game.bot_executor = executor
+        game.beginTurn(4)
+        while not game.isDecisionPending():
+            serial = game.getSerialInPosition()
+            self.failUnless(game.call(serial) or game.check(serial))
+        self.assertEqual(recorder.hand['bots'][-1], ( game.getSerialInPosition(), None ))
+        other = self.newGame()
+        other.bot_executor = ManualExecutor()
+        pokerreplay.PokerReplay(other, history = True).replay(recorder.hand)
+        self.assertEqual(other.bot_executor.submitted, [])
+        self.assertEqual(self.state(other), self.state(game))
+        self.failUnless(other.isDecisionPending(game.getSerialInPosition()))
+        self.assertEqual(other.resumeBotDecision(), True)
+        self.assertEqual(len(other.bot_executor.submitted), 1)
+        #
+        # The decision received by botDecision is replayed
+        #
+        executor.run()
+        other = pokerreplay.PokerReplay(self.newGame(), history = True).replay(recorder.hand)
+        self.assertEqual(other.isDecisionPending(), game.isDecisionPending())
+        self.assertEqual(self.state(other), self.state(game))
+        recorder.stop()
+
+# -----------------------------------------------------------------------------------------------------
+class ManualExecutor:
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, args, callback):
+        self.submitted.append(( function, args, callback ))
+
+    def run(self):
+        ( function, args, callback ) = self.submitted.pop(0)
+        callback(function(*args))
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerReplayTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerReplayTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokerreplay.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokerreplay.py' TESTS='coverage-reset test-pokerreplay.py coverage-report' check )"
+# End:
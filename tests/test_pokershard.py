@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 agent <agent@local>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# Authors:
+#  agent <agent@local>
+#
+
+import unittest, sys, time
+from os import path
+
+TESTS_PATH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(TESTS_PATH, ".."))
+
+from pokerengine import pokershard
+from pokerengine.pokergame import PokerGameServer
+
+class PokerShardsTestCase(unittest.TestCase):
+
+    # -----------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.shards = None
+        self.events = []
+
+    # -----------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        if self.shards:
+            self.shards.stop()
+
+    # -----------------------------------------------------------------------------------------------------
+    def start(self, **kwargs):
+        self.shards = pokershard.PokerShards(2, [path.join(TESTS_PATH, '../conf')], **kwargs)
+        self.shards.callback_events = lambda game_id, events: self.events.extend(( game_id, event ) for event in events)
+        self.shards.start()
+        return self.shards
+
+    # -----------------------------------------------------------------------------------------------------
+    def newGame(self, serials = ( 1, 2, 3 ), bots = False):
+        game = PokerGameServer("poker.%s.xml", [path.join(TESTS_PATH, '../conf')])
+        game.setVariant("holdem")
+        game.setBettingStructure("1-2_20-200_limit")
+        for seat, serial in enumerate(serials):
+            self.failUnless(game.addPlayer(serial, seat))
+            self.failUnless(game.payBuyIn(serial, game.bestBuyIn()))
+            self.failUnless(game.sit(serial))
+            game.autoBlindAnte(serial)
+            if bots:
+                game.botPlayer(serial)
+        return game
+
+    # -----------------------------------------------------------------------------------------------------
+    def wait(self, predicate, seconds = 30):
+        deadline = time.time() + seconds
+        while not predicate():
+            self.failUnless(time.time() < deadline, "timeout")
+            self.shards.poll(0.1)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test01_PlayAndMigrate(self):
+        """Test Poker Shards : play a hand in a worker and migrate the table to another worker"""
+        shards = self.start(hand_delay = 0)
+        shards.createGame(1, self.newGame().snapshot())
+        self.assertEqual(shards.shardOf(1), 1)
+        self.assertRaises(UserWarning, shards.createGame, 1, None)
+        self.wait(lambda: ( 1, "position" ) in [ ( game_id, event[0] ) for ( game_id, event ) in self.events ])
+        results = []
+        shards.snapshot(1, results.append)
+        self.wait(lambda: results)
+        #
+        # The worker 1 of 2 gives the even hand serials
+        #
+        game = self.newGame()
+        game.restore(results.pop())
+        self.failUnless(game.isRunning())
+        self.assertEqual(game.hand_serial, 2)
+        serial = game.getSerialInPosition()
+        shards.call(1, "call", ( serial, ), results.append)
+        shards.call(1, "_PokerGame__talked", ( serial, ), results.append)
+        self.wait(lambda: len(results) == 2)
+        self.assertEqual(results, [ True, None ])
+        self.failUnless(game.call(serial))
+        #
+        # The fold is held until the game is created in worker 0
+        #
+        self.failUnless(shards.migrate(1, 0))
+        self.assertRaises(UserWarning, shards.migrate, 1, 1)
+        serial = game.getSerialInPosition()
+        shards.call(1, "fold", ( serial, ), results.append)
+        shards.snapshot(1, results.append)
+        self.wait(lambda: len(results) == 4)
+        self.assertEqual(shards.shardOf(1), 0)
+        self.failIf(shards.migrating)
+        self.assertEqual(results[2], True)
+        self.failUnless(game.fold(serial))
+        other = self.newGame()
+        other.restore(results[3])
+        self.assertEqual(( other.state, other.hand_serial, other.pot, other.getSerialInPosition() ), ( game.state, game.hand_serial, game.pot, game.getSerialInPosition() ))
+        self.assertEqual([ ( player.serial, player.money, player.bet ) for player in other.playersAll() ],
+                         [ ( player.serial, player.money, player.bet ) for player in game.playersAll() ])
+        self.failIf(shards.migrate(1, 0))
+        shards.removeGame(1, results.append)
+        self.wait(lambda: len(results) == 5)
+        self.failIf(1 in shards.route)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test02_Bots(self):
+        """Test Poker Shards : bot tables in both workers, only the selected events"""
+        shards = self.start(hand_delay = 0, events = ( "end", ))
+        for game_id in ( 2, 3 ):
+            shards.createGame(game_id, self.newGame(bots = True).snapshot(), { 'bot_eval_iterations': 50 })
+        self.wait(lambda: set(game_id for ( game_id, event ) in self.events) == set(( 2, 3 )))
+        self.assertEqual(set(event[0] for ( game_id, event ) in self.events), set(( "end", )))
+
+    # -----------------------------------------------------------------------------------------------------
+    def test03_Failures(self):
+        """Test Poker Shards : the callbacks are given None when a migration fails, a result cannot be pickled or a worker dies"""
+        shards = self.start(hand_delay = 0)
+        results = []
+        #
+        # The game cannot be created, the migration fails and so do the
+        # messages held meanwhile
+        #
+        shards.createGame(1, "garbage")
+        self.failUnless(shards.migrate(1, 0))
+        self.assertRaises(UserWarning, shards.removeGame, 1)
+        shards.call(1, "getSerialInPosition", (), results.append)
+        shards.snapshot(1, results.append)
+        self.wait(lambda: not shards.migrating)
+        self.assertEqual(results, [ None, None ])
+        self.assertEqual(shards.shardOf(1), 1)
+        #
+        # A result that cannot be pickled is None, the worker lives on
+        #
+        shards.createGame(2, self.newGame().snapshot())
+        shards.call(2, "getPlayer", ( 1, ), results.append)
+        shards.snapshot(2, results.append)
+        self.wait(lambda: len(results) == 4)
+        self.assertEqual(results[2], None)
+        self.failUnless(results[3])
+        del results[2:]
+        #
+        # A worker dies, the calls sent to it fail
+        #
+        shards.snapshot(2, results.append)
+        self.wait(lambda: len(results) == 3)
+        self.failUnless(results[2])
+        shards.processes[0].terminate()
+        shards.processes[0].join()
+        shards.snapshot(2, results.append)
+        self.wait(lambda: len(results) == 4)
+        self.assertEqual(results[3], None)
+        self.assertEqual(shards.connections[0], None)
+        shards.call(2, "getSerialInPosition", (), results.append)
+        shards.poll(0)
+        self.assertEqual(results[4:], [ None ])
+        #
+        # The other worker still answers
+        #
+        shards.snapshot(1, results.append)
+        self.wait(lambda: len(results) == 6)
+
+    # -----------------------------------------------------------------------------------------------------
+    def test04_WorkerFlush(self):
+        """Test Poker Shards : the messages that cannot be pickled do not prevent the others from being sent"""
+        class Connection:
+            def __init__(self):
+                self.sent = []
+            def send(self, messages):
+                pokershard.cPickle.dumps(messages, pokershard.cPickle.HIGHEST_PROTOCOL)
+                self.sent.append(messages)
+        connection = Connection()
+        worker = pokershard.PokerShardWorker(connection, None, None, None, None)
+        worker.outbox = [ ( "events", 1, [ ( "position", 0 ) ] ),
+                          ( "events", 2, [ ( "bad", lambda: None ) ] ),
+                          ( "result", 3, lambda: None ),
+                          ( "result", 4, True ) ]
+        worker.flush()
+        self.assertEqual(connection.sent, [ [ ( "events", 1, [ ( "position", 0 ) ] ),
+                                              ( "result", 3, None ),
+                                              ( "result", 4, True ) ] ])
+        self.assertEqual(worker.outbox, [])
+
+# -----------------------------------------------------------------------------------------------------
+def GetTestSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(PokerShardsTestCase))
+    # Comment out above and use line below this when you wish to run just
+    # one test by itself (changing prefix as needed).
+#    suite.addTest(unittest.makeSuite(PokerShardsTestCase, prefix = "test2"))
+    return suite
+
+# -----------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------
+def run():
+    return unittest.TextTestRunner().run(GetTestSuite())
+
+# -----------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if run().wasSuccessful():
+        sys.exit(0)
+    else:
+        sys.exit(1)
+
+# Interpreted by emacs
+# Local Variables:
+# compile-command: "( cd .. ; ./config.status tests/test-pokershard.py ) ; ( cd ../tests ; make COVERAGE_FILES='../pokerengine/pokershard.py' TESTS='coverage-reset test-pokershard.py coverage-report' check )"
+# End: